@@ -42,13 +42,13 @@ The audit is idempotent — running it after a fix produces zero issues.
 from __future__ import annotations
 
 import argparse
-import json
 import re
 import sys
 from pathlib import Path
 from typing import Iterator
 
-from bs4 import BeautifulSoup
+import json_loader
+from html_backend import parse_fragment
 
 REPO_ROOT = Path(__file__).resolve().parent
 CURRICULUM_PATH = REPO_ROOT / "master Curiculum.json"
@@ -134,7 +134,7 @@ def load_curriculum() -> dict:
     out: dict[tuple[int, str], list[str]] = {}
     if not CURRICULUM_PATH.exists():
         return out
-    data = json.loads(CURRICULUM_PATH.read_text(encoding="utf-8"))
+    data = json_loader.load_json(CURRICULUM_PATH)
     for entry in data:
         wk = entry.get("week")
         if not isinstance(wk, int):
@@ -143,7 +143,7 @@ def load_curriculum() -> dict:
         for qkey in ("q1", "q2", "q3"):
             q = l1.get(qkey, {})
             html = q.get("html", "")
-            soup = BeautifulSoup(html, "html.parser")
+            soup = parse_fragment(html)
             prompt_p = next(
                 (p for p in soup.find_all("p") if "You should say" in p.get_text()),
                 None,
@@ -155,7 +155,7 @@ def load_curriculum() -> dict:
                 continue
             after = content.split("You should say:", 1)[1]
             bullets = [
-                BeautifulSoup(b, "html.parser").get_text().strip()
+                parse_fragment(b).get_text().strip()
                 for b in re.split(r"<br\s*/?>", after)
             ]
             out[(wk, qkey)] = [b for b in bullets if b][:4]
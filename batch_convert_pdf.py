@@ -1,13 +1,19 @@
+import argparse
 import os
 import sys
 from playwright.sync_api import sync_playwright
 
-def batch_convert(input_dir="."):
+import pipeline_trace
+import week_selection
+
+def batch_convert(input_dir=".", weeks=None):
     """
     Finds all Week_*.html files and converts them to PDF.
+    With `weeks` (e.g. week_selection.parse("17,20-22")) only those weeks are converted.
     """
     html_files = [f for f in os.listdir(input_dir) if f.startswith("Week_") and f.endswith(".html")]
     html_files.sort() # Process in order
+    html_files = week_selection.filter_paths(html_files, weeks)
     
     if not html_files:
         print("No HTML files found.")
@@ -25,17 +31,20 @@ def batch_convert(input_dir="."):
             print(f"Converting {html_file} -> {pdf_file}...")
             
             try:
-                page = context.new_page()
-                page.goto(f"file://{os.path.abspath(html_path)}", wait_until="networkidle")
-                
-                page.pdf(
-                    path=pdf_path,
-                    format="A4",
-                    print_background=True,
-                    prefer_css_page_size=True,
-                    margin={"top": "0", "right": "0", "bottom": "0", "left": "0"}
-                )
-                page.close()
+                with pipeline_trace.span("page_pdf", week=week_selection.week_of(html_file),
+                                         bytes_in=os.path.getsize(html_path)) as trace_args:
+                    page = context.new_page()
+                    page.goto(f"file://{os.path.abspath(html_path)}", wait_until="networkidle")
+
+                    page.pdf(
+                        path=pdf_path,
+                        format="A4",
+                        print_background=True,
+                        prefer_css_page_size=True,
+                        margin={"top": "0", "right": "0", "bottom": "0", "left": "0"}
+                    )
+                    page.close()
+                    trace_args["bytes_out"] = os.path.getsize(pdf_path)
                 print("Done.")
             except Exception as e:
                 print(f"Failed to convert {html_file}: {e}")
@@ -43,4 +52,10 @@ def batch_convert(input_dir="."):
         browser.close()
 
 if __name__ == "__main__":
-    batch_convert()
+    ap = argparse.ArgumentParser(description="Convert Week_*.html files to A4 PDFs.")
+    ap.add_argument("input_dir", nargs="?", default=".")
+    week_selection.add_argument(ap)
+    pipeline_trace.add_argument(ap)
+    args = ap.parse_args()
+    pipeline_trace.start_from_args(args.trace)
+    batch_convert(args.input_dir, args.weeks)
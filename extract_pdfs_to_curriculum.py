@@ -61,6 +61,8 @@ import sys
 import time
 from pathlib import Path
 
+import json_loader
+
 try:
     import anthropic
 except ImportError:
@@ -380,7 +382,7 @@ def main() -> int:
     for w in range(1, 41):
         p = PER_WEEK_DIR / f"week_{w:02d}.json"
         if p.exists():
-            merged.append(json.loads(p.read_text(encoding="utf-8")))
+            merged.append(json_loader.load_json(p))
     with MERGED_OUTPUT.open("w", encoding="utf-8") as f:
         json.dump(merged, f, ensure_ascii=False, indent=2)
 
@@ -0,0 +1,87 @@
+"""Glyph-subset the handwriting web fonts (Caveat, Indie Flower).
+
+Every Interactive page embeds Caveat-400.woff2 and IndieFlower-400.woff2
+(make_interactive.py), and index.html embeds Caveat again
+(build_landing_page.py). subset_woff2() cuts a font down to the glyphs a
+piece of text needs, plus whatever the font's features reach from them
+(Caveat's contextual alternates, ligatures), so the text renders exactly
+as with the full font.
+
+What text to keep depends on the page:
+
+  build_landing_page.py  knows everything it renders in Caveat (the hero
+                         title, "Week N"), so it keeps exactly those characters.
+  make_interactive.py    uses the faces for what students type and what the
+                         AI writes back, which no build step can see, so it
+                         keeps HANDWRITING_TEXT. A character outside it falls
+                         back to the next font in the CSS stack.
+
+Results are cached in .cache/fonts/ by font bytes, glyph set and fontTools
+version. Without fontTools (pip install fonttools brotli) subset_woff2()
+returns the full font, as before.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+from pathlib import Path
+
+try:
+    import brotli  # noqa: F401  # type: ignore  (fontTools' woff2 writer needs it)
+    import fontTools
+    from fontTools import subset as _subset
+    from fontTools.ttLib import TTFont
+    _HAVE_FONTTOOLS = True
+except ImportError:
+    _HAVE_FONTTOOLS = False
+
+CACHE_DIR = Path(__file__).resolve().parent / ".cache" / "fonts"
+SUBSET_VERSION = 1
+
+# Printable ASCII and the typographic punctuation the AI's corrections use.
+HANDWRITING_TEXT = "".join(chr(c) for c in range(0x20, 0x7F)) + "‘’“”–—…£€°"
+
+
+def available() -> bool:
+    return _HAVE_FONTTOOLS
+
+
+def signature(text: str) -> str:
+    """Identifies what subset_woff2(_, text) produces, for callers' cache keys."""
+    if not _HAVE_FONTTOOLS:
+        return "full"
+    glyphs = "".join(sorted(set(text)))
+    digest = hashlib.sha256(glyphs.encode("utf-8")).hexdigest()[:16]
+    return f"v{SUBSET_VERSION}:fonttools={fontTools.version}:{digest}"
+
+
+def subset_woff2(path: Path, text: str) -> bytes:
+    """The woff2 font at `path` reduced to what `text` needs (cached)."""
+    data = Path(path).read_bytes()
+    if not _HAVE_FONTTOOLS:
+        return data
+    key = hashlib.sha256(data + signature(text).encode("utf-8")).hexdigest()[:16]
+    cached = CACHE_DIR / f"{Path(path).stem}-{key}.woff2"
+    if cached.exists():
+        return cached.read_bytes()
+
+    # recalcTimestamp=False: same input, same bytes (the external-assets
+    # file names are content hashes).
+    font = TTFont(io.BytesIO(data), recalcTimestamp=False)
+    options = _subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = ["*"]   # keep calt/liga: the handwriting look
+    options.name_IDs = ["*"]          # keep the licence/copyright names
+    subsetter = _subset.Subsetter(options)
+    subsetter.populate(text=text)
+    subsetter.subset(font)
+    out = io.BytesIO()
+    font.save(out)
+    result = out.getvalue()
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = cached.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(result)
+    os.replace(tmp, cached)
+    return result
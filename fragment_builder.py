@@ -0,0 +1,149 @@
+"""Direct fragment builder for the per-row markup in parse_data.py.
+
+The content builders used to return f-string HTML that the soup path fed to
+`BeautifulSoup(row_html, 'html.parser')` — one parser instantiation per
+vocab row, idiom row, example row, homework row and differentiation box,
+a few hundred per week. They now describe the same markup as a small node
+tree instead:
+
+    cells = [tag('td', tag('strong', markup(word))), tag('td', text(' ('), ...)]
+
+and the tree is either materialised straight into the week's soup
+(to_soup) or serialized straight to text for the compiled renderer
+(render). Neither step runs a parser unless a data field actually holds
+markup: markup() keeps plain strings as text and only parses a value
+that contains '<' or '&'. Adjacent strings are merged, so the nodes and
+the bytes are the same as parsing the old f-string.
+
+Serialization follows bs4's minimal formatter, the one str(soup) uses:
+& < > are escaped in text, attributes are double-quoted unless the value
+contains a double quote, and void elements are written as <br/>.
+
+scripts/bench_fragments.py compares this against the per-row parse.
+"""
+from __future__ import annotations
+
+import copy
+
+from bs4 import NavigableString, Tag
+from bs4.formatter import HTMLFormatter
+
+from html_backend import parse_fragment
+
+_FORMATTER = HTMLFormatter.REGISTRY['minimal']
+_ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+_VOID = frozenset({'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                   'link', 'meta', 'source', 'track', 'wbr'})
+
+
+class Node:
+    """One element: name, attrs (ordered) and children.
+
+    Children are plain str (text), Node, or bs4 nodes parsed out of a data
+    field by markup(); to_soup() copies the latter, so a tree can be reused.
+    """
+    __slots__ = ('name', 'attrs', 'children')
+
+    def __init__(self, name, attrs, children):
+        self.name = name
+        self.attrs = attrs
+        self.children = children
+
+
+def _flatten(items):
+    """Children list with nested lists spliced in and adjacent text merged."""
+    out = []
+    stack = [iter(items)]
+    while stack:
+        try:
+            item = next(stack[-1])
+        except StopIteration:
+            stack.pop()
+            continue
+        if isinstance(item, list):
+            stack.append(iter(item))
+        elif item is None or item == '':
+            continue
+        elif type(item) is str or type(item) is NavigableString:
+            item = str(item)
+            if out and type(out[-1]) is str:
+                out[-1] += item
+            else:
+                out.append(item)
+        else:
+            out.append(item)
+    # bs4's tree builder turns whitespace-only strings into "\n" (if they
+    # contain a newline) or " " — do the same so output matches a parse.
+    for i, item in enumerate(out):
+        if type(item) is str and not item.strip(_ASCII_SPACES):
+            out[i] = '\n' if '\n' in item else ' '
+    return out
+
+
+def tag(name, *children, **attrs):
+    """An element. Keyword attrs keep their order; use class_ for `class`."""
+    if 'class_' in attrs:
+        attrs = {('class' if k == 'class_' else k): v for k, v in attrs.items()}
+    return Node(name, attrs, _flatten(children))
+
+
+def text(value):
+    """Literal text; escaped on output like `tag.string = value`."""
+    return str(value)
+
+
+def markup(value):
+    """A data field that may hold inline HTML (e.g. '<em>word</em>', '&amp;').
+
+    Plain strings stay text; anything with '<' or '&' is parsed once with
+    parse_fragment so entities and tags come out as the old f-string did.
+    The value is parsed on its own, so a malformed one (an unclosed tag)
+    stays inside its cell instead of swallowing the rest of the row.
+    """
+    value = str(value) if value is not None else 'None'
+    if '<' not in value and '&' not in value:
+        return value
+    return _flatten(list(parse_fragment(value).contents))
+
+
+def _render_into(out, nodes):
+    for node in nodes:
+        if type(node) is str:
+            out.append(_FORMATTER.substitute(node))
+        elif type(node) is Node:
+            out.append('<' + node.name)
+            for key, value in node.attrs.items():
+                out.append(f' {key}={_FORMATTER.quoted_attribute_value(_FORMATTER.attribute_value(value))}')
+            if node.name in _VOID and not node.children:
+                out.append('/>')
+                continue
+            out.append('>')
+            _render_into(out, node.children)
+            out.append(f'</{node.name}>')
+        elif isinstance(node, Tag):
+            out.append(node.decode())
+        else:
+            out.append(node.output_ready('minimal'))
+
+
+def render(nodes):
+    """Serializes a node list to the text str(soup) would produce for it."""
+    out = []
+    _render_into(out, _flatten([nodes]))
+    return ''.join(out)
+
+
+def to_soup(soup, nodes):
+    """Materialises a node list as bs4 nodes owned by `soup`, ready to append."""
+    result = []
+    for node in _flatten([nodes]):
+        if type(node) is str:
+            result.append(NavigableString(node))
+        elif type(node) is Node:
+            element = soup.new_tag(node.name, attrs=dict(node.attrs))
+            for child in to_soup(soup, node.children):
+                element.append(child)
+            result.append(element)
+        else:
+            result.append(copy.copy(node))
+    return result
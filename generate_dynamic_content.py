@@ -3,13 +3,18 @@ import json
 import random
 import re
 
+import json_loader
+
 def load_json(filepath):
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        data = json_loader.load_json(filepath)
     except Exception as e:
         print(f"Error loading {filepath}: {e}")
         return []
+    if data is None:
+        print(f"Error loading {filepath}: not found")
+        return []
+    return data
 
 def clean_article(text):
     """Removes leading 'a ' or 'an ' from text to avoid double articles."""
@@ -121,7 +126,7 @@ def generate_l2_content(week_data, vocab_data, week_num):
 
 def main():
     curriculum = load_json('master Curiculum.json')
-    vocab_plan = load_json('vocab_plan.json')
+    vocab_plan = json_loader.load_records('vocab_plan.json')
     
     vocab_map = {item['week']: item for item in vocab_plan}
     
@@ -0,0 +1,130 @@
+"""Pluggable HTML parser backend for the week generator.
+
+Every template and fragment parse in parse_data.py, template_renderer.py,
+audit_lesson_labels.py and precompute_content.py goes through
+parse_document() / parse_fragment() here instead of calling
+`BeautifulSoup(markup, 'html.parser')` directly. The result is always a
+BeautifulSoup tree, so find()/get_text()/str(soup) work unchanged whatever
+builds it.
+
+Backends:
+  html.parser    stdlib, pure Python. The default, and the reference
+                 output every other backend is compared against.
+  lxml           libxml2 via bs4's lxml tree builder      (pip install lxml)
+  html5-parser   gumbo/C parser building the soup directly (pip install html5-parser)
+
+Select with the IELTS_HTML_PARSER environment variable, or `--parser` on
+parse_data.py. `parse_data.py --check-parser lxml` renders every week with
+both html.parser and the named backend and diffs the bytes. Switch the
+default only once that reports every week identical.
+
+Fragments need care with the non-stdlib parsers. html.parser keeps a bare
+`<td>...</td><td>...</td>` row as is, but an HTML5 tree builder drops
+table cells outside a table and wraps everything in <html><body>. So
+table-part fragments are parsed inside a matching table context, and the
+context is stripped back off.
+"""
+from __future__ import annotations
+
+import os
+import re
+from contextlib import contextmanager
+
+from bs4 import BeautifulSoup
+
+BACKENDS = ('html.parser', 'lxml', 'html5-parser')
+DEFAULT_BACKEND = 'html.parser'
+
+_backend = os.environ.get('IELTS_HTML_PARSER', DEFAULT_BACKEND)
+
+# (leading tag pattern, wrapper template, selector for the node whose
+# children are the fragment)
+_TABLE_CONTEXTS = (
+    (re.compile(r'\s*<t[dh][\s>]', re.I), '<table><tbody><tr>{}</tr></tbody></table>', 'tr'),
+    (re.compile(r'\s*<tr[\s>]', re.I), '<table><tbody>{}</tbody></table>', 'tbody'),
+)
+
+
+class BackendUnavailable(RuntimeError):
+    """The selected parser backend isn't installed."""
+
+
+def available(name: str) -> bool:
+    try:
+        _check(name)
+    except BackendUnavailable:
+        return False
+    return True
+
+
+def _check(name: str) -> None:
+    if name not in BACKENDS:
+        raise BackendUnavailable(f"unknown HTML parser backend {name!r} (choose from {', '.join(BACKENDS)})")
+    if name == 'lxml':
+        try:
+            import lxml  # noqa: F401
+        except ImportError:
+            raise BackendUnavailable("lxml backend needs `pip install lxml`") from None
+    elif name == 'html5-parser':
+        try:
+            import html5_parser  # noqa: F401
+        except ImportError:
+            raise BackendUnavailable("html5-parser backend needs `pip install html5-parser`") from None
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def set_backend(name: str) -> None:
+    """Selects the backend for this process (call it in pool workers too)."""
+    global _backend
+    _check(name)
+    _backend = name
+
+
+@contextmanager
+def using(name: str):
+    """Temporarily switches backend, e.g. for a side-by-side conformance run."""
+    previous = _backend
+    set_backend(name)
+    try:
+        yield
+    finally:
+        set_backend(previous)
+
+
+def _build(markup: str) -> BeautifulSoup:
+    if _backend == 'html5-parser':
+        from html5_parser import parse
+        return parse(markup, treebuilder='soup')
+    return BeautifulSoup(markup, _backend)
+
+
+def parse_document(markup: str) -> BeautifulSoup:
+    """Parses a whole page (the canonical template, a Week_NN.html)."""
+    if _backend == 'html.parser':
+        return BeautifulSoup(markup, 'html.parser')
+    return _build(markup)
+
+
+def parse_fragment(markup: str) -> BeautifulSoup:
+    """Parses a snippet for tag.append() / get_text().
+
+    Like `BeautifulSoup(markup, 'html.parser')`: the returned soup's top-level
+    children are exactly the fragment's nodes, with no <html>/<body> added.
+    """
+    if _backend == 'html.parser':
+        return BeautifulSoup(markup, 'html.parser')
+
+    wrapper, container_name = '<body>{}</body>', 'body'
+    for pattern, context, name in _TABLE_CONTEXTS:
+        if pattern.match(markup):
+            wrapper, container_name = context, name
+            break
+    container = _build(wrapper.format(markup)).find(container_name)
+
+    fragment = BeautifulSoup('', 'html.parser')
+    if container is not None:
+        fragment.extend(list(container.contents))
+    return fragment
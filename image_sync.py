@@ -0,0 +1,126 @@
+"""Reference-aware sync of images/ next to the Interactive pages.
+
+make_interactive.py used to copy every file in images/ to
+Interactive/images/ on every run, stale variants included (e.g.
+course_pipeline_v4_pre-2026-05-02.jpg), and upload_to_oss.py uploaded
+all of them. Now only what the pages actually reference is shipped:
+
+  referenced_images(pages)   names behind `<img src="images/NAME">` in the
+                             pages, and the `srcset` entries of <img>/<source>
+  sync_images(src, dst, refs, also_from=())
+      puts each referenced file into dst, taken from src or else the first
+      of also_from that has it (image_variants.py's cache): skipped when dst
+      already has the same bytes (same inode, or same size and SHA-256),
+      otherwise hard-linked, reflinked where the filesystem can (Linux
+      FICLONE), or copied. Files in
+      dst that nothing references are reported, and deleted with prune=True.
+
+upload_to_oss.py uses the same reference set for the bucket's images/.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Iterable, NamedTuple
+from urllib.parse import unquote
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp", ".avif", ".svg", ".gif")
+_IMG_SRC_RE = re.compile(r"""<img\b[^>]*?\bsrc\s*=\s*["']images/([^"'?#/]+)""", re.IGNORECASE)
+_SRCSET_RE = re.compile(r"""<(?:img|source)\b[^>]*?\bsrcset\s*=\s*["']([^"']*)""", re.IGNORECASE)
+_SRCSET_URL_RE = re.compile(r"(?:^|,)\s*images/([^\s,?#/]+)")
+_FICLONE = 0x40049409  # linux/fs.h
+
+
+class SyncReport(NamedTuple):
+    linked: list[str]        # hard-linked or reflinked
+    copied: list[str]
+    unchanged: list[str]
+    missing: list[str]       # referenced but not in the source folder
+    unreferenced: list[str]  # in dst, referenced by no page (deleted when pruned)
+
+
+def referenced_images(pages: Iterable[Path]) -> set[str]:
+    """File names under images/ that the pages' <img> tags and srcsets point at."""
+    names = set()
+    for page in pages:
+        html = Path(page).read_text(encoding="utf-8")
+        names.update(unquote(name) for name in _IMG_SRC_RE.findall(html))
+        for srcset in _SRCSET_RE.findall(html):
+            names.update(unquote(name) for name in _SRCSET_URL_RE.findall(srcset))
+    return names
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def same_bytes(a: Path, b: Path) -> bool:
+    sa, sb = a.stat(), b.stat()
+    if (sa.st_dev, sa.st_ino) == (sb.st_dev, sb.st_ino):
+        return True
+    return sa.st_size == sb.st_size and _sha256(a) == _sha256(b)
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        return False
+    try:
+        with src.open("rb") as s, dst.open("wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        return True
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+
+
+def place(src: Path, dst: Path) -> str:
+    """dst becomes src's bytes: 'linked' (hard link / reflink) or 'copied'.
+
+    Built under a temporary name and moved over dst, so an existing dst is
+    replaced atomically.
+    """
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp)
+        how = "linked"
+    except OSError:  # other filesystem, no hard links (FAT, some shares)
+        if _reflink(src, tmp):
+            shutil.copystat(src, tmp)
+            how = "linked"
+        else:
+            shutil.copy2(src, tmp)
+            how = "copied"
+    os.replace(tmp, dst)
+    return how
+
+
+def sync_images(src_dir: Path, dst_dir: Path, referenced: set[str], prune: bool = False,
+                also_from: Iterable[Path] = ()) -> SyncReport:
+    report = SyncReport([], [], [], [], [])
+    dst_dir.mkdir(parents=True, exist_ok=True)
+    dirs = [src_dir, *also_from]
+    for name in sorted(referenced):
+        src = next((d / name for d in dirs if (d / name).is_file()), src_dir / name)
+        dst = dst_dir / name
+        if not src.is_file():
+            report.missing.append(name)
+        elif dst.is_file() and same_bytes(src, dst):
+            report.unchanged.append(name)
+        else:
+            getattr(report, place(src, dst)).append(name)
+    for path in sorted(dst_dir.iterdir()):
+        if path.is_file() and path.suffix.lower() in IMAGE_EXTS and path.name not in referenced:
+            report.unreferenced.append(path.name)
+            if prune:
+                path.unlink()
+    return report
@@ -0,0 +1,180 @@
+"""Resized AVIF/WebP/JPEG variants of the page images, and the markup to use them.
+
+The course_pipeline_v*.jpg images are 4000-5000 px wide and 700-950 KB,
+and every Interactive page sent that same file to every phone. Here each
+referenced image gets a set of variants:
+
+  variant_sets(src_dir, names)
+      for every image, WIDTHS (capped at the image's own width) in each
+      format of formats() that Pillow can write, named NAME-<width>w.<source hash>.<ext>.
+      Built once into .cache/images/ and reused while the source bytes
+      stay the same.
+  rewrite_images(html, sets)
+      turns each <img src="images/NAME"> with a set into a <picture>: one
+      <source srcset=... sizes=...> per modern format, and the <img> itself
+      with the JPEG srcset and explicit width/height. Its src stays the
+      original file, for browsers without srcset.
+
+make_interactive.py applies this to the Interactive pages only; the root
+Week_*.html pages that print to PDF keep the original images. The
+variant names contain the source hash, so a changed image is a new URL.
+Without Pillow (pip install pillow) there are no sets and the pages keep
+their plain <img> tags.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import re
+from pathlib import Path
+from typing import Iterable, NamedTuple
+from urllib.parse import quote, unquote
+
+try:
+    from PIL import Image, features
+    _HAVE_PIL = True
+except ImportError:
+    _HAVE_PIL = False
+
+CACHE_DIR = Path(__file__).resolve().parent / ".cache" / "images"
+VARIANTS_VERSION = 1
+
+WIDTHS = (480, 960, 1440, 1920)
+# Best first: a browser takes the first <source> whose type it supports.
+_ENCODERS = {
+    "avif": ("AVIF", "image/avif", {"quality": 50, "speed": 6}),
+    "webp": ("WEBP", "image/webp", {"quality": 78, "method": 6}),
+    "jpg": ("JPEG", "image/jpeg", {"quality": 80, "optimize": True, "progressive": True}),
+}
+SOURCE_EXTS = (".jpg", ".jpeg", ".png")
+# Page images span the text column: the A4 page less its 10 mm margins.
+SIZES = "(max-width: 210mm) 100vw, 190mm"
+
+# An <img> wrapped in a <picture> is no longer the box its parent lays
+# out: the <picture> is. These declarations of the <img>'s inline style
+# place that box (a flex item's margin-top: auto, say), so the <picture>
+# carries them too.
+_WRAPPER_PROPS = ("display", "margin", "margin-top", "margin-right", "margin-bottom", "margin-left",
+                  "align-self", "justify-self", "flex", "flex-grow", "flex-shrink", "flex-basis", "order")
+_STYLE_RE = re.compile(r"""\sstyle\s*=\s*(["'])(.*?)\1""", re.IGNORECASE | re.DOTALL)
+_IMG_RE = re.compile(r"""<img\b[^>]*?\bsrc\s*=\s*(["'])images/([^"'?#/]+)\1[^>]*>""", re.IGNORECASE)
+
+
+class ImageSet(NamedTuple):
+    name: str                                     # the source file in images/
+    width: int
+    height: int
+    variants: tuple[tuple[str, tuple[tuple[int, str], ...]], ...]   # (ext, ((width, file), ...))
+
+
+def available() -> bool:
+    return _HAVE_PIL
+
+
+def formats() -> tuple[str, ...]:
+    """Extensions of the variants this install can write, best first."""
+    if not _HAVE_PIL:
+        return ()
+    plugin = {"avif": "avif", "webp": "webp"}
+    return tuple(ext for ext in _ENCODERS if ext not in plugin or features.check(plugin[ext]))
+
+
+def _encode(image, ext: str) -> bytes:
+    fmt, _mime, options = _ENCODERS[ext]
+    if fmt == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    out = io.BytesIO()
+    image.save(out, fmt, **options)
+    return out.getvalue()
+
+
+def variant_set(src: Path) -> ImageSet:
+    """The variants of one image, building into CACHE_DIR whatever is missing."""
+    data = Path(src).read_bytes()
+    key = hashlib.sha256(data + f"v{VARIANTS_VERSION}".encode("utf-8")).hexdigest()[:10]
+    image = Image.open(io.BytesIO(data))
+    width, height = image.size
+    widths = sorted({min(w, width) for w in WIDTHS})
+    stem = Path(src).stem
+    # JPEG has no alpha: a transparent PNG only gets AVIF/WebP variants and
+    # keeps itself as the <img> fallback.
+    alpha = "A" in image.getbands() or "transparency" in image.info
+    variants = []
+    for ext in formats():
+        if ext == "jpg" and alpha:
+            continue
+        files = tuple((w, f"{stem}-{w}w.{key}.{ext}") for w in widths)
+        for w, name in files:
+            cached = CACHE_DIR / name
+            if cached.exists():
+                continue
+            image.load()
+            resized = image if w == width else image.resize((w, max(1, round(height * w / width))),
+                                                            Image.LANCZOS)
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = cached.with_name(f".{name}.{os.getpid()}.tmp")
+            tmp.write_bytes(_encode(resized, ext))
+            os.replace(tmp, cached)
+        variants.append((ext, files))
+    return ImageSet(Path(src).name, width, height, tuple(variants))
+
+
+def variant_sets(src_dir: Path, names: Iterable[str]) -> dict[str, ImageSet]:
+    """{name: ImageSet} for the named raster images in src_dir (empty without Pillow)."""
+    if not _HAVE_PIL:
+        return {}
+    return {name: variant_set(src_dir / name) for name in sorted(names)
+            if Path(name).suffix.lower() in SOURCE_EXTS and (src_dir / name).is_file()}
+
+
+def variant_files(sets: dict[str, ImageSet]) -> set[str]:
+    return {name for s in sets.values() for _ext, files in s.variants for _w, name in files}
+
+
+def _srcset(files) -> str:
+    return ", ".join(f"images/{quote(name)} {w}w" for w, name in files)
+
+
+def _wrapper_style(img_tag: str) -> str:
+    """The declarations of img_tag's style the <picture> around it takes over."""
+    m = _STYLE_RE.search(img_tag)
+    if not m:
+        return ""
+    kept = []
+    for declaration in m.group(2).split(";"):
+        prop, _, value = declaration.partition(":")
+        if prop.strip().lower() in _WRAPPER_PROPS and value.strip():
+            kept.append(f"{prop.strip().lower()}: {value.strip()}")
+    return "; ".join(kept)
+
+
+def picture(img_tag: str, image_set: ImageSet, sizes: str = SIZES) -> str:
+    """`img_tag` (an <img src="images/NAME">) as a <picture> over image_set.
+    The <picture> takes the <img>'s display, margins and flex/grid item
+    properties, so it sits where the <img> did."""
+    variants = dict(image_set.variants)
+    sources = "".join(f'<source type="{_ENCODERS[ext][1]}" srcset="{_srcset(files)}" sizes="{sizes}">'
+                      for ext, files in image_set.variants if ext != "jpg")
+    extra = f' width="{image_set.width}" height="{image_set.height}"'
+    if "jpg" in variants:
+        extra += f' srcset="{_srcset(variants["jpg"])}" sizes="{sizes}"'
+    end = len(img_tag) - (2 if img_tag.endswith("/>") else 1)
+    style = _wrapper_style(img_tag).replace('"', "&quot;")
+    opening = f'<picture style="{style}">' if style else "<picture>"
+    return f"{opening}{sources}{img_tag[:end].rstrip()}{extra}{img_tag[end:]}</picture>"
+
+
+def rewrite_images(html: str, sets: dict[str, ImageSet], sizes: str = SIZES) -> str:
+    """Every <img> of an image in `sets` becomes a <picture> (see picture())."""
+    if not sets:
+        return html
+
+    def repl(m: re.Match) -> str:
+        tag = m.group(0)
+        image_set = sets.get(unquote(m.group(2)))
+        if image_set is None or re.search(r"\s(?:srcset|width|height)\s*=", tag, re.IGNORECASE):
+            return tag
+        return picture(tag, image_set, sizes)
+
+    return _IMG_RE.sub(repl, html)
@@ -0,0 +1,212 @@
+"""Shared JSON loader for the course data files.
+
+Two entry points:
+
+  load_json(path)       one JSON document (master Curiculum.json, the
+                        *_dynamic_content.json dicts, ...). Strict: a decode
+                        error is raised, with line/column, as before.
+  load_records(path)    a file of week records that may be several arrays
+                        glued together (vocab_plan.json / homework_plan.json
+                        as the generators append them), possibly with junk
+                        between them. Tolerant: returns every record (JSON
+                        object) it can decode and reports every region it
+                        had to skip.
+
+Both try the whole file in one go first — with orjson when it is
+installed (pip install orjson), else the stdlib parser — so a clean file
+never goes near the recovery code.
+
+The recovery scanner replaces the old `load_concatenated_json` loops
+(parse_data.py, precompute_content.py). Those retried raw_decode at every
+next character after a failure: quadratic on a corrupted file, and
+silent. The scanner steps into arrays to decode their elements one by
+one, and after a failed decode skips the damaged value whole: it follows
+strings and brackets to the value's own closing bracket (or, when the
+value was cut short, to the ']' of the array around it or the next
+array or record starting a line), so the next record is found without
+ever retrying inside the damage. Nested objects
+of a damaged record never come back as records of their own, and
+top-level values that are not objects are skipped too. Work is linear in
+file size. Each skipped region is reported with its byte offset and line.
+"""
+from __future__ import annotations
+
+import json
+import re
+from typing import NamedTuple
+
+try:
+    import orjson
+except ImportError:  # optional accelerator
+    orjson = None
+
+_decoder = json.JSONDecoder()
+_SEPARATOR = re.compile(r'[\s,]*')   # between records: whitespace, commas
+_SYNTAX = re.compile(r'["\[\]{}]')   # the characters _value_end has to look at
+_STRING_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)   # after the opening '"'
+_CLOSER = {']': '[', '}': '{'}
+
+
+class SkippedRegion(NamedTuple):
+    """A stretch of a records file the recovery scanner could not decode."""
+    offset: int      # byte offset into the file
+    line: int        # 1-based
+    column: int      # 1-based, in characters
+    length: int      # in characters
+    reason: str      # the decoder's message
+    preview: str     # first characters of the skipped text
+
+    def describe(self, name='') -> str:
+        where = f"{name}: " if name else ''
+        return (f"{where}skipped {self.length} chars at byte {self.offset} "
+                f"(line {self.line}, col {self.column}): {self.reason} — {self.preview!r}")
+
+
+def loads(data: bytes):
+    """Parses one JSON document from bytes, with orjson when available."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # orjson is stricter (NaN, big ints, lone surrogates); let json decide
+    return json.loads(data.decode('utf-8'))
+
+
+def load_json(path, default=None):
+    """Parses one JSON document; returns `default` if the file doesn't exist."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return default
+    return loads(data)
+
+
+class _Locator:
+    """Line/column/byte offset of increasing positions in `text`, counted
+    from the previous position rather than from the start each time."""
+
+    def __init__(self, text):
+        self.text = text
+        self.pos = self.offset = self.line_start = 0
+        self.line = 1
+
+    def skipped(self, start, end, reason) -> SkippedRegion:
+        text = self.text
+        newlines = text.count('\n', self.pos, start)
+        if newlines:
+            self.line += newlines
+            self.line_start = text.rfind('\n', self.pos, start) + 1
+        self.offset += len(text[self.pos:start].encode('utf-8'))
+        self.pos = start
+        return SkippedRegion(offset=self.offset, line=self.line, column=start - self.line_start + 1,
+                             length=end - start, reason=reason, preview=text[start:min(end, start + 40)])
+
+
+def _value_end(text, pos, in_array):
+    """End of the value at `pos` as its strings and brackets tell: just past
+    its own closing bracket or, if it was cut short, at the ']' that closes
+    the array around it, at a '{' / '[' that starts a line (the next array
+    or record the generators appended: they never start a nested value in
+    column 1), or at the end of the text. A value that doesn't open with a
+    bracket (a scalar, or junk) ends at the next '{' / '['."""
+    stack = []
+    i = pos
+    while True:
+        m = _SYNTAX.search(text, i)
+        if m is None:
+            return len(text)
+        char, i = m.group(), m.end()
+        if char == '"':
+            string = _STRING_REST.match(text, i)
+            if string is None:
+                return len(text)   # unterminated string: the rest is damage
+            i = string.end()
+        elif char in '[{':
+            if m.start() > pos and (not stack or text[m.start() - 1] == '\n'):
+                return m.start()   # junk before the next value, or an appended one
+            stack.append(char)
+        elif _CLOSER[char] in stack:
+            while stack.pop() != _CLOSER[char]:
+                pass   # implicitly close whatever the damage left open
+            if not stack:
+                return i
+        elif in_array and char == ']':
+            return m.start()   # the enclosing array ends: the value was cut short
+
+
+def scan_records(text: str):
+    """Recovers records from concatenated/damaged JSON text.
+
+    Returns (records, skipped): the objects in top-level arrays, and
+    top-level objects, are the records; `skipped` lists the SkippedRegions
+    that were dropped — damaged values, and values that are not objects.
+    """
+    records, skipped = [], []
+    locate = _Locator(text)
+    pos, length, depth = 0, len(text), 0   # depth: arrays open around pos
+    while True:
+        pos = _SEPARATOR.match(text, pos).end()
+        if pos >= length:
+            break
+        if text[pos] == '[':   # decode an array's elements one by one
+            depth += 1
+            pos += 1
+            continue
+        if text[pos] == ']':   # (a stray ']' is ignored)
+            depth = max(depth - 1, 0)
+            pos += 1
+            continue
+        # Decode only the value's own span: a JSONDecodeError counts the
+        # lines of everything before it, which over the whole text would
+        # make each skip cost O(file size).
+        end = _value_end(text, pos, depth > 0)
+        try:
+            obj, used = _decoder.raw_decode(text[pos:end])
+        except json.JSONDecodeError as e:
+            skipped.append(locate.skipped(pos, end, e.msg))
+            pos = end
+            continue
+        end = pos + used
+        if isinstance(obj, dict):
+            records.append(obj)
+        else:
+            skipped.append(locate.skipped(pos, end, f"not a record ({type(obj).__name__})"))
+        pos = end
+    return records, skipped
+
+
+def loads_records(data: bytes, name='', report=print):
+    """Records from the bytes of an array-of-records file (see scan_records).
+
+    A clean file of records is parsed in one call; otherwise the recovery
+    scanner runs and each skipped region is passed to `report` as a one-line warning.
+    """
+    try:
+        obj = loads(data)
+    except (ValueError, UnicodeDecodeError):
+        pass
+    else:
+        records = obj if isinstance(obj, list) else [obj]
+        if all(isinstance(record, dict) for record in records):
+            return records
+        # else the scanner reports where the non-records are
+
+    records, skipped = scan_records(data.decode('utf-8', errors='replace'))
+    for region in skipped:
+        report(f"Warning: {region.describe(name)}")
+    return records
+
+
+def load_records(path, report=print):
+    """Loads a (possibly concatenated) array-of-records file.
+
+    A missing file is reported and returns [], as the old loader did.
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        report(f"Error: {path} not found.")
+        return []
+    return loads_records(data, str(path), report)
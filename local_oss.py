@@ -0,0 +1,314 @@
+"""A file-backed stand-in for the oss2.Bucket calls upload_to_oss.py makes.
+
+upload_to_oss.py could only be exercised against the real bucket in
+cn-beijing: credentials, network, and a publish that actually goes live.
+LocalBucket keeps the objects in a directory instead:
+
+  DIR/<key>                 the object body
+  DIR/.oss-meta/<key>.json  its headers (Content-Type, Cache-Control,
+                            Content-Encoding, Vary, x-oss-meta-*) and ETag
+
+and answers head_object, get_object, put_object(_from_file),
+copy_object, delete_object, batch_delete_objects, list_objects /
+list_objects_v2 (so oss2.ObjectIterator and ObjectIteratorV2 page through
+it), create_bucket, put/get_bucket_acl and put/get_bucket_website the way
+OSS does: the ETag is the quoted upper-case MD5 of the body, a missing key
+raises oss2.exceptions.NoSuchKey, and user metadata comes back
+lower-cased. serve(key) is what the website endpoint would return for a
+key once the routing rules' Internal rewrites are applied. The CNAME
+calls in bind_custom_domain.py and the FC admin routes (Node) are not
+covered.
+
+To load-test the concurrent and incremental upload paths, every request
+can be slowed and made to fail:
+
+  latency        seconds added to every request (plus up to `jitter` more)
+  bandwidth      bytes/second for PUT and GET bodies (None: unlimited)
+  failure_rate   probability that a request raises a transient error,
+                 RequestError (connection reset) or ServerError 503,
+                 after its latency and before it has any effect
+
+`calls` counts the requests by operation, which is how the tests and the
+benchmark check what a run cost. Run the uploader against it with
+
+  python scripts/upload_to_oss.py --local /tmp/bucket [--local-latency 0.08]
+"""
+from __future__ import annotations
+
+import collections
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from email.utils import formatdate
+from pathlib import Path
+from types import SimpleNamespace
+
+import oss2
+from oss2.models import (REDIRECT_TYPE_INTERNAL, BucketWebsite, Condition, Redirect, RoutingRule,
+                         SimplifiedObjectInfo)
+
+META_DIR = ".oss-meta"
+# Headers OSS stores with an object and returns from HEAD/GET.
+_STORED_HEADERS = ("content-type", "cache-control", "content-encoding", "content-disposition", "vary")
+
+
+class LocalBucket:
+    """oss2.Bucket look-alike over a directory. Thread-safe."""
+
+    def __init__(self, root, latency: float = 0.0, jitter: float = 0.0,
+                 bandwidth: float | None = None, failure_rate: float = 0.0, seed=None):
+        self.root = Path(root)
+        self.bucket_name = self.root.name
+        self.latency, self.jitter, self.bandwidth = latency, jitter, bandwidth
+        self.failure_rate = failure_rate
+        self.calls = collections.Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    # ---------- simulation ----------
+
+    def _request(self, op: str, body_bytes: int = 0) -> None:
+        with self._lock:
+            self.calls[op] += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.failure_rate
+            reset = self._random.random() < 0.5
+        if self.bandwidth and body_bytes:
+            delay += body_bytes / self.bandwidth
+        if delay:
+            time.sleep(delay)
+        if fail:
+            if reset:
+                raise oss2.exceptions.RequestError(ConnectionResetError(f"simulated reset ({op})"))
+            raise _error(oss2.exceptions.ServerError, 503, "ServiceUnavailable", f"simulated ({op})")
+
+    # ---------- storage ----------
+
+    def _body(self, key: str) -> Path:
+        if not key or key.startswith("/") or ".." in key.split("/") or key.split("/")[0] == META_DIR:
+            raise _error(oss2.exceptions.ServerError, 400, "InvalidObjectName", key)
+        return self.root / key
+
+    def _meta(self, key: str) -> Path:
+        return self.root / META_DIR / f"{key}.json"
+
+    def _read_meta(self, key: str) -> dict:
+        try:
+            return json.loads(self._meta(key).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            raise _error(oss2.exceptions.NoSuchKey, 404, "NoSuchKey", key) from None
+
+    def _write(self, key: str, data: bytes, headers) -> SimpleNamespace:
+        path = self._body(key)
+        stored = {k.lower(): str(v) for k, v in (headers or {}).items()
+                  if k.lower() in _STORED_HEADERS or k.lower().startswith("x-oss-meta-")}
+        etag = f'"{hashlib.md5(data).hexdigest().upper()}"'
+        meta = {"etag": etag, "headers": stored, "last_modified": time.time()}
+        for target, payload in ((path, data), (self._meta(key), json.dumps(meta).encode("utf-8"))):
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(payload)
+            os.replace(tmp, target)
+        return SimpleNamespace(status=200, etag=etag.strip('"'), headers={"etag": etag})
+
+    # ---------- bucket ----------
+
+    def exists(self) -> bool:
+        return (self.root / META_DIR).is_dir()
+
+    def create_bucket(self, permission=None, input=None, headers=None):
+        self._request("create_bucket")
+        (self.root / META_DIR).mkdir(parents=True, exist_ok=True)
+        if permission:
+            self._set_acl(permission)
+
+    def put_bucket_acl(self, permission):
+        self._request("put_bucket_acl")
+        if not self.exists():
+            raise _error(oss2.exceptions.NoSuchBucket, 404, "NoSuchBucket", str(self.root))
+        self._set_acl(permission)
+
+    def get_bucket_acl(self):
+        self._request("get_bucket_acl")
+        try:
+            acl = (self.root / META_DIR / "_acl").read_text(encoding="utf-8")
+        except FileNotFoundError:
+            acl = oss2.BUCKET_ACL_PRIVATE
+        return SimpleNamespace(acl=acl)
+
+    def _set_acl(self, permission) -> None:
+        (self.root / META_DIR / "_acl").write_text(permission, encoding="utf-8")
+
+    def put_bucket_website(self, input):
+        self._request("put_bucket_website")
+        rules = [{"prefix": rule.condition.key_prefix_equals,
+                  "type": rule.redirect.redirect_type,
+                  "replace_prefix": rule.redirect.replace_key_prefix_with}
+                 for rule in sorted(input.rules or [], key=lambda r: r.rule_num or 0)]
+        config = {"index": input.index_file, "error": input.error_file, "rules": rules}
+        (self.root / META_DIR / "_website").write_text(json.dumps(config), encoding="utf-8")
+
+    def get_bucket_website(self):
+        self._request("get_bucket_website")
+        config = self._website()
+        rules = [RoutingRule(rule_num=n, condition=Condition(key_prefix_equals=r["prefix"]),
+                             redirect=Redirect(redirect_type=r["type"],
+                                               replace_key_prefix_with=r["replace_prefix"]))
+                 for n, r in enumerate(config["rules"], 1)]
+        return BucketWebsite(config["index"], config["error"], rules)
+
+    def _website(self) -> dict:
+        try:
+            return json.loads((self.root / META_DIR / "_website").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            raise _error(oss2.exceptions.NoSuchWebsite, 404, "NoSuchWebsiteConfiguration",
+                         str(self.root)) from None
+
+    def serve(self, key: str) -> bytes:
+        """The body the website endpoint returns for `key` (no request counted);
+        without a website configuration, the object itself."""
+        try:
+            rules = self._website()["rules"]
+        except oss2.exceptions.NoSuchWebsite:
+            rules = []
+        for rule in rules:
+            if key.startswith(rule["prefix"] or "") and rule["type"] == REDIRECT_TYPE_INTERNAL:
+                key = rule["replace_prefix"] + key[len(rule["prefix"] or ""):]
+                break
+        self._read_meta(key)
+        return self._body(key).read_bytes()
+
+    # ---------- objects ----------
+
+    def put_object(self, key, data, headers=None, progress_callback=None):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        elif not isinstance(data, (bytes, bytearray)):
+            data = data.read()
+        self._request("put_object", len(data))
+        return self._write(key, bytes(data), headers)
+
+    def put_object_from_file(self, key, filename, headers=None, progress_callback=None):
+        data = Path(filename).read_bytes()
+        self._request("put_object", len(data))
+        return self._write(key, data, headers)
+
+    def head_object(self, key, headers=None, params=None):
+        self._request("head_object")
+        meta = self._read_meta(key)
+        size = self._body(key).stat().st_size
+        return SimpleNamespace(status=200, etag=meta["etag"].strip('"'), content_length=size,
+                               last_modified=int(meta["last_modified"]),
+                               headers={**meta["headers"], "etag": meta["etag"],
+                                        "content-length": str(size),
+                                        "last-modified": formatdate(meta["last_modified"], usegmt=True)})
+
+    def get_object(self, key, byte_range=None, headers=None, progress_callback=None, process=None,
+                   params=None):
+        try:
+            data = self._body(key).read_bytes()
+        except FileNotFoundError:
+            data = b""
+        self._request("get_object", len(data))
+        return _Body(data, self._read_meta(key))
+
+    def copy_object(self, source_bucket_name, source_key, target_key, headers=None, params=None):
+        """Server-side copy; like OSS's default COPY directive, the headers come along."""
+        self._request("copy_object")
+        if source_bucket_name != self.bucket_name:
+            raise _error(oss2.exceptions.NoSuchBucket, 404, "NoSuchBucket", source_bucket_name)
+        meta = self._read_meta(source_key)
+        return self._write(target_key, self._body(source_key).read_bytes(), meta["headers"])
+
+    def batch_delete_objects(self, key_list, headers=None):
+        self._request("batch_delete_objects")
+        if not key_list or len(key_list) > 1000:
+            raise _error(oss2.exceptions.ServerError, 400, "MalformedXML", "1-1000 keys per request")
+        for key in key_list:
+            self._delete(key)
+        return SimpleNamespace(status=200, deleted_keys=list(key_list))
+
+    def delete_object(self, key, params=None, headers=None):
+        self._request("delete_object")
+        self._delete(key)
+        return SimpleNamespace(status=204)
+
+    def _delete(self, key: str) -> None:
+        for path in (self._body(key), self._meta(key)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass  # OSS deletes idempotently
+
+    def object_exists(self, key, headers=None):
+        try:
+            self.head_object(key)
+        except oss2.exceptions.NoSuchKey:
+            return False
+        return True
+
+    # ---------- listing ----------
+
+    def _keys(self, prefix: str, after: str) -> list[SimplifiedObjectInfo]:
+        meta_root = self.root / META_DIR
+        infos = []
+        for meta in meta_root.rglob("*.json"):
+            key = meta.relative_to(meta_root).as_posix()[:-len(".json")]
+            if key.startswith(prefix) and key > after:
+                entry = json.loads(meta.read_text(encoding="utf-8"))
+                infos.append(SimplifiedObjectInfo(key, int(entry["last_modified"]), entry["etag"],
+                                                  "Normal", self._body(key).stat().st_size, "Standard"))
+        return sorted(infos, key=lambda info: info.key)
+
+    def _page(self, prefix, delimiter, after, max_keys):
+        entries, prefixes = [], []
+        for info in self._keys(prefix, after):
+            if delimiter and after.endswith(delimiter) and info.key.startswith(after):
+                continue   # under the common prefix the last page ended on
+            if len(entries) + len(prefixes) == max_keys:
+                return entries, prefixes, True
+            rest = info.key[len(prefix):]
+            if delimiter and delimiter in rest:
+                common = prefix + rest.split(delimiter, 1)[0] + delimiter
+                if common not in prefixes:
+                    prefixes.append(common)
+                continue
+            entries.append(info)
+        return entries, prefixes, False
+
+    def list_objects(self, prefix="", delimiter="", marker="", max_keys=100, headers=None):
+        self._request("list_objects")
+        entries, prefixes, truncated = self._page(prefix, delimiter, marker, max_keys)
+        last = max([e.key for e in entries] + prefixes) if truncated else ""
+        return SimpleNamespace(object_list=entries, prefix_list=prefixes, is_truncated=truncated,
+                               next_marker=last)
+
+    def list_objects_v2(self, prefix="", delimiter="", continuation_token="", start_after="",
+                        fetch_owner=False, encoding_type="url", max_keys=100, headers=None):
+        self._request("list_objects_v2")
+        entries, prefixes, truncated = self._page(prefix, delimiter,
+                                                  max(continuation_token, start_after), max_keys)
+        last = max([e.key for e in entries] + prefixes) if truncated else ""
+        return SimpleNamespace(object_list=entries, prefix_list=prefixes, is_truncated=truncated,
+                               next_continuation_token=last)
+
+
+class _Body:
+    """get_object()'s result: read() and the stored headers."""
+
+    def __init__(self, data: bytes, meta: dict):
+        self._data = data
+        self.etag = meta["etag"].strip('"')
+        self.headers = {**meta["headers"], "etag": meta["etag"]}
+        self.content_length = len(data)
+
+    def read(self, amt=None) -> bytes:
+        data, self._data = (self._data, b"") if amt is None else (self._data[:amt], self._data[amt:])
+        return data
+
+
+def _error(cls, status: int, code: str, message: str):
+    return cls(status, {}, b"", {"Code": code, "Message": message})
@@ -30,6 +30,8 @@ import shutil
 import sys
 from pathlib import Path
 
+import json_loader
+
 REPO_ROOT = Path(__file__).resolve().parent
 EXISTING_MASTER = REPO_ROOT / "master Curiculum.json"
 PER_WEEK_DIR = REPO_ROOT / ".recovered_curriculum" / "per_week"
@@ -60,8 +62,7 @@ def main() -> int:
         print(f"ERROR: per-week dir not found: {PER_WEEK_DIR}", file=sys.stderr)
         return 2
 
-    with EXISTING_MASTER.open("r", encoding="utf-8") as f:
-        existing = json.load(f)
+    existing = json_loader.load_json(EXISTING_MASTER)
 
     # Index existing by week number
     existing_by_week = {w["week"]: w for w in existing}
@@ -79,8 +80,7 @@ def main() -> int:
         # Try to load extracted per-week file.
         extracted_path = PER_WEEK_DIR / f"week_{week_num:02d}.json"
         if extracted_path.exists():
-            with extracted_path.open("r", encoding="utf-8") as f:
-                extracted = json.load(f)
+            extracted = json_loader.load_json(extracted_path)
             new_week = {
                 "week": week_num,
                 "theme": extracted.get("theme", existing_week["theme"]),
@@ -1,102 +1,26 @@
+import argparse
+import hashlib
 import json
 import re
 import os
 import time
 import random
-from bs4 import BeautifulSoup
-
-def load_concatenated_json(filepath):
-    """Loads concatenated JSON arrays from a file."""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except FileNotFoundError:
-        print(f"Error: {filepath} not found.")
-        return []
-    
-    data = []
-    decoder = json.JSONDecoder()
-    pos = 0
-    length = len(content)
-    
-    while pos < length:
-        # Skip whitespace, commas, and stray closing brackets
-        while pos < length and (content[pos].isspace() or content[pos] in ',]'):
-            pos += 1
-            
-        if pos == length:
-            break
-            
-        try:
-            # Decode directly from content at pos
-            obj, end = decoder.raw_decode(content, idx=pos)
-            
-            if isinstance(obj, list):
-                data.extend(obj)
-            else:
-                data.append(obj)
-            pos = end
-        except json.JSONDecodeError:
-            # Try to recover by skipping one char (if garbage)
-            pos += 1
-            
-    return data
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from html_backend import parse_document, parse_fragment
+import fragment_builder as fb
+import html_backend
+import pipeline_trace
+import week_selection
+import week_store
 
 def load_all_data():
-    """Loads all data files once."""
+    """Loads all data files once, indexed by week (see week_store.py)."""
     print("Loading all data files...")
-    
-    # Load Curriculum (Use the master merged file)
-    try:
-        with open('master Curiculum.json', 'r', encoding='utf-8') as f:
-            curriculum_data = json.load(f)
-    except FileNotFoundError:
-        print("Error: master Curiculum.json not found.")
-        curriculum_data = []
-        
-    vocab_data = load_concatenated_json('vocab_plan.json') # Changed to json ext based on file list
-    homework_data = load_concatenated_json('homework_plan.json')
-    
-    # Load AI content
-    try:
-        with open('ai_dynamic_content.json', 'r', encoding='utf-8') as f:
-            ai_data = json.load(f)
-    except FileNotFoundError:
-        ai_data = {}
-
-    # Load Peer Check Questions
-    try:
-        with open('peer_check_questions.json', 'r', encoding='utf-8') as f:
-            peer_data = json.load(f)
-    except FileNotFoundError:
-        print("Warning: peer_check_questions.json not found.")
-        peer_data = []
-
-    # Load Phrase Data
-    try:
-        with open('noun_or_verb_phrases_for_weekly_topics.json', 'r', encoding='utf-8') as f:
-            phrase_data = json.load(f)
-    except FileNotFoundError:
-        print("Warning: noun_or_verb_phrases_for_weekly_topics.json not found.")
-        phrase_data = []
-
-    # Load Teacher Dynamic Content
-    try:
-        with open('teacher_dynamic_content.json', 'r', encoding='utf-8') as f:
-            teacher_data = json.load(f)
-    except FileNotFoundError:
-        print("Warning: teacher_dynamic_content.json not found.")
-        teacher_data = {}
-        
-    return curriculum_data, vocab_data, homework_data, ai_data, teacher_data, peer_data, phrase_data
-
-def get_week_data(week_number, curriculum_data, vocab_data, homework_data):
-    """Extracts data for the specific week."""
-    week_curriculum = next((item for item in curriculum_data if item.get("week") == week_number), None)
-    week_vocab = next((item for item in vocab_data if item.get("week") == week_number), None)
-    week_homework = next((item for item in homework_data if item.get("week") == week_number), None)
-    return week_curriculum, week_vocab, week_homework
+    return week_store.load()
 
+@pipeline_trace.traced
 def process_cover_page(soup, week_number, week_data):
     """Updates the cover page with week number and theme."""
     # Update Title Tag
@@ -153,25 +77,96 @@ def process_cover_page(soup, week_number, week_data):
         footer_div = soup.new_tag('div', attrs={'class': 'cover-footer'})
         cover_div.append(footer_div)
 
-def process_teacher_plan(soup, week_number, week_data, teacher_content, phrase_data):
+# --- Content builders -------------------------------------------------------
+# Pure functions that turn week data into the text / HTML fragments the
+# process_* functions write into the soup. Kept separate from the DOM
+# surgery so template_renderer.py can fill the same content into its
+# precompiled slots.
+
+def _target_phrase(topic, week_phrase_data):
+    """Grammar target phrase for the week; falls back to the topic."""
+    if week_phrase_data:
+        return week_phrase_data.get('grammar_target_phrase', topic)
+    return topic
+
+def _week_tag_text(current, week_number, topic):
+    """New text for a header-bar week-tag, or None to leave it as is."""
+    if 'Lesson 1' in current:
+        return f"Week {week_number} • Lesson 1 • {topic}"
+    elif 'Lesson 2' in current:
+        return f"Week {week_number} • Lesson 2 • {topic} (Part 3)"
+    elif 'Self-Study' in current:
+        return f"Week {week_number} • Self-Study"
+    return None
+
+def _objective_items(objs, marker, replacement):
+    """<li> nodes for a Learning Objectives list; the objective containing
+    `marker` is swapped for `replacement`."""
+    return [fb.tag('li', replacement if marker in obj else fb.markup(obj)) for obj in objs]
+
+def _objective_replacement(label, sentence, target_phrase):
+    """'<strong>Grammar:</strong> Use ... for {target_phrase}.' as nodes."""
+    return [fb.tag('strong', label), f" {sentence} ", fb.markup(target_phrase), "."]
+
+def _band5_box(starter):
+    return [fb.tag('strong', "📉 Band 5.0 (Support)"), fb.tag('br'),
+            "• Sentence Starter: '", fb.markup(starter), "'", fb.tag('br'),
+            "• Peer Check: Specific personal questions"]
+
+def _band6_box(transitions, peer_check):
+    return [fb.tag('strong', "📈 Band 6.0+ (Stretch)"), fb.tag('br'),
+            "• Transitions: ", fb.markup(transitions), fb.tag('br'),
+            "• Peer Check: ", peer_check]
+
+def _l1_starter(b5_data, week_number, target_phrase):
+    """Smart Sentence Starter Logic"""
+    starter = b5_data.get('starter', '')
+    if starter.lower().startswith("i like") or starter.lower().startswith("i want") or week_number == 22:
+        starter = f"I like {target_phrase} because..."
+    return starter
+
+def _l1_lead_in_html(l1_data, target_phrase):
+    lead_in_info = l1_data.get('lead_in', {})
+    # UPDATED: Use plural-safe phrasing "What are your thoughts on..."
+    return f"<strong>Lead-in:</strong> Click Bilibili icon on Student Handout (Banner) to show 5-min warmup video (Search: {lead_in_info.get('search_term')}). Ask: 'What are your thoughts on {target_phrase}?'"
+
+def _l1_input_target_word(l1_data):
+    """The <em> word of the second L1 objective (Input row's "Highlight" target)."""
+    target_word = "Target Word"
+    try:
+        lo_html = l1_data.get('learning_objectives', [])[1]
+        match = re.search(r'<em>(.*?)</em>', lo_html)
+        if match:
+            target_word = match.group(1)
+    except:
+        pass
+    return target_word
+
+def _l2_intro_html(target_phrase):
+    # The static template says: "Intro: Click Bilibili icon... Explain that
+    # Part 3 is about 'World' not 'Self'." with no topic question, so we
+    # rewrite the cell with the standard text + a fixed-grammar question.
+    l2_lead_in_q = f"Ask: 'What is the impact of {target_phrase} on society?'"
+    return f"<strong>Intro:</strong> Click Bilibili icon on Student Handout (Banner) to show 5-min warmup video. Explain that Part 3 is about 'World' not 'Self'. {l2_lead_in_q}"
+
+def _bilibili_url(l1_data):
+    l1_link = l1_data.get('lead_in', {}).get('search_term', 'IELTS Speaking')
+    return f"https://search.bilibili.com/all?keyword={l1_link.replace(' ', '%20')}"
+
+@pipeline_trace.traced
+def process_teacher_plan(soup, week_number, week_data, teacher_content, week_phrase_data):
     """Updates Teacher Lesson Plan pages using pre-generated dynamic content."""
     topic = week_data.get('topic', '')
     
     # Get grammar phrase for this week
-    target_phrase = topic  # Default fallback
-    week_phrase_data = next((item for item in phrase_data if item.get("week") == week_number), None)
-    if week_phrase_data:
-        target_phrase = week_phrase_data.get('grammar_target_phrase', topic)
+    target_phrase = _target_phrase(topic, week_phrase_data)
 
     # Update Header Bars (Teacher L1, Student L1, Student Practice, Teacher L2, Student L2, Deep Dive, Rapid Fire)
     headers = soup.find_all('span', class_='week-tag')
     for header in headers:
-        if 'Lesson 1' in header.string:
-            header.string = f"Week {week_number} • Lesson 1 • {topic}"
-        elif 'Lesson 2' in header.string:
-            header.string = f"Week {week_number} • Lesson 2 • {topic} (Part 3)"
-        elif 'Self-Study' in header.string:
-            header.string = f"Week {week_number} • Self-Study"
+        new_text = _week_tag_text(header.string, week_number, topic)
+        if new_text is not None:
+            header.string = new_text
     
     # --- Lesson 1 Teacher Plan ---
     l1_data = teacher_content.get('lesson_1', {})
@@ -184,16 +179,9 @@ def process_teacher_plan(soup, week_number, week_data, teacher_content, phrase_d
             if ul:
                 ul.clear()
                 # Update Grammar Objective dynamically
-                objs = l1_data.get('learning_objectives', [])
-                new_objs = []
-                for obj in objs:
-                    if "Grammar:" in obj:
-                        new_objs.append(f"<strong>Grammar:</strong> Use narrative tenses or relevant grammar for {target_phrase}.")
-                    else:
-                        new_objs.append(obj)
-                
-                for obj_html in new_objs:
-                    ul.append(BeautifulSoup(f"<li>{obj_html}</li>", 'html.parser'))
+                ul.extend(fb.to_soup(soup, _objective_items(
+                    l1_data.get('learning_objectives', []), "Grammar:",
+                    _objective_replacement("Grammar:", "Use narrative tenses or relevant grammar for", target_phrase))))
         
         # Criteria
         criteria_h2 = l1_page.find('h4', string=re.compile(r'Criteria'))
@@ -201,7 +189,7 @@ def process_teacher_plan(soup, week_number, week_data, teacher_content, phrase_d
             criteria_div = criteria_h2.find_next_sibling('div')
             if criteria_div:
                 criteria_div.clear()
-                criteria_div.append(BeautifulSoup(l1_data.get('success_criteria', ''), 'html.parser'))
+                criteria_div.append(parse_fragment(l1_data.get('success_criteria', '')))
                 
         # Differentiation
         diff_card = l1_page.find('h4', string=re.compile(r'Differentiation')).parent
@@ -209,23 +197,21 @@ def process_teacher_plan(soup, week_number, week_data, teacher_content, phrase_d
             b5_data = l1_data.get('differentiation', {}).get('band_5', {})
             b6_data = l1_data.get('differentiation', {}).get('band_6', {})
             
-            # Smart Sentence Starter Logic
-            starter = b5_data.get('starter', '')
-            if starter.lower().startswith("i like") or starter.lower().startswith("i want") or week_number == 22:
-                starter = f"I like {target_phrase} because..."
+            starter = _l1_starter(b5_data, week_number, target_phrase)
 
             # Band 5 Box
             band5_div = diff_card.find('div', style=lambda x: x and 'background:#e8f8f5' in x)
             if band5_div:
                 band5_div.clear()
-                band5_div.append(BeautifulSoup(f"<strong>📉 Band 5.0 (Support)</strong><br>• Sentence Starter: '{starter}'<br>• Peer Check: Specific personal questions", 'html.parser'))
+                band5_div.extend(fb.to_soup(soup, _band5_box(starter)))
                 
             # Band 6 Box
             band6_div = diff_card.find('div', style=lambda x: x and 'background:#fef9e7' in x)
             if band6_div:
                 band6_div.clear()
                 # UPDATED: Use target_phrase for Peer Check template
-                band6_div.append(BeautifulSoup(f"<strong>📈 Band 6.0+ (Stretch)</strong><br>• Transitions: {b6_data.get('transitions', '')}<br>• Peer Check: Ask specific questions about {target_phrase}.", 'html.parser'))
+                band6_div.extend(fb.to_soup(soup, _band6_box(
+                    b6_data.get('transitions', ''), ["Ask specific questions about ", fb.markup(target_phrase), "."])))
 
         # Lead-in (Table)
         l1_table = l1_page.find('table', class_='lp-table')
@@ -237,33 +223,22 @@ def process_teacher_plan(soup, week_number, week_data, teacher_content, phrase_d
                     cell_text = cells[1].get_text()
                     
                     if "Lead-in" in cell_text:
-                        lead_in_info = l1_data.get('lead_in', {})
-                        # UPDATED: Use plural-safe phrasing "What are your thoughts on..."
-                        new_html = f"<strong>Lead-in:</strong> Click Bilibili icon on Student Handout (Banner) to show 5-min warmup video (Search: {lead_in_info.get('search_term')}). Ask: 'What are your thoughts on {target_phrase}?'"
                         cells[1].clear()
-                        cells[1].append(BeautifulSoup(new_html, 'html.parser'))
+                        cells[1].append(parse_fragment(_l1_lead_in_html(l1_data, target_phrase)))
                     
                     elif "Input" in cell_text:
-                        target_word = "Target Word"
-                        try:
-                            lo_html = l1_data.get('learning_objectives', [])[1]
-                            match = re.search(r'<em>(.*?)</em>', lo_html)
-                            if match:
-                                target_word = match.group(1)
-                        except:
-                            pass
-                            
+                        target_word = _l1_input_target_word(l1_data)
                         content = cells[1].decode_contents()
                         new_content = re.sub(r'Highlight "(.*?)"', f'Highlight "{target_word}"', content)
                         cells[1].clear()
-                        cells[1].append(BeautifulSoup(new_content, 'html.parser'))
+                        cells[1].append(parse_fragment(new_content))
 
                     elif "Vocab Drill" in cell_text:
                         content = cells[1].decode_contents()
                         if '"Thick and thin"' in content:
                             new_content = content.replace('"Thick and thin"', '"idioms"')
                             cells[1].clear()
-                            cells[1].append(BeautifulSoup(new_content, 'html.parser'))
+                            cells[1].append(parse_fragment(new_content))
 
     # --- Lesson 2 Teacher Plan ---
     l2_data = teacher_content.get('lesson_2', {})
@@ -277,16 +252,9 @@ def process_teacher_plan(soup, week_number, week_data, teacher_content, phrase_d
             ul = lo_card.find('ul')
             if ul:
                 ul.clear()
-                objs = l2_data.get('learning_objectives', [])
-                new_objs = []
-                for obj in objs:
-                    if "Speaking:" in obj:
-                        new_objs.append(f"<strong>Speaking:</strong> Discuss abstract ideas about {target_phrase}.")
-                    else:
-                        new_objs.append(obj)
-
-                for obj_html in new_objs:
-                    ul.append(BeautifulSoup(f"<li>{obj_html}</li>", 'html.parser'))
+                ul.extend(fb.to_soup(soup, _objective_items(
+                    l2_data.get('learning_objectives', []), "Speaking:",
+                    _objective_replacement("Speaking:", "Discuss abstract ideas about", target_phrase))))
         
         # Criteria
         criteria_h2 = l2_teacher_page.find('h4', string=re.compile(r'Criteria'))
@@ -294,7 +262,7 @@ def process_teacher_plan(soup, week_number, week_data, teacher_content, phrase_d
             criteria_div = criteria_h2.find_next_sibling('div')
             if criteria_div:
                 criteria_div.clear()
-                criteria_div.append(BeautifulSoup(l2_data.get('success_criteria', ''), 'html.parser'))
+                criteria_div.append(parse_fragment(l2_data.get('success_criteria', '')))
                 
         # Differentiation
         diff_card = l2_teacher_page.find('h4', string=re.compile(r'Differentiation')).parent
@@ -306,14 +274,16 @@ def process_teacher_plan(soup, week_number, week_data, teacher_content, phrase_d
             band5_div = diff_card.find('div', style=lambda x: x and 'background:#e8f8f5' in x)
             if band5_div:
                 band5_div.clear()
-                band5_div.append(BeautifulSoup(f"<strong>📉 Band 5.0 (Support)</strong><br>• Sentence Starter: '{b5_data.get('starter', '')}'<br>• Peer Check: Specific personal questions", 'html.parser'))
+                band5_div.extend(fb.to_soup(soup, _band5_box(b5_data.get('starter', ''))))
                 
             # Band 6 Box
             band6_div = diff_card.find('div', style=lambda x: x and 'background:#fef9e7' in x)
             if band6_div:
                 band6_div.clear()
                 # UPDATED: Use target_phrase for Peer Check template
-                band6_div.append(BeautifulSoup(f"<strong>📈 Band 6.0+ (Stretch)</strong><br>• Transitions: {b6_data.get('transitions', '')}<br>• Peer Check: Challenge questions about {target_phrase} (e.g., 'Is this always true?').", 'html.parser'))
+                band6_div.extend(fb.to_soup(soup, _band6_box(
+                    b6_data.get('transitions', ''),
+                    ["Challenge questions about ", fb.markup(target_phrase), " (e.g., 'Is this always true?')."])))
 
         # UPDATED: L2 Lead-in
         # Find L2 Lead-in table row (usually in a similar table structure)
@@ -325,34 +295,14 @@ def process_teacher_plan(soup, week_number, week_data, teacher_content, phrase_d
                 if len(cells) > 1:
                     cell_text = cells[1].get_text()
                     if "Intro:" in cell_text or "intro" in cell_text.lower():
-                        # We reconstruct the intro cell content to include the new question
-                        # "Click Bilibili icon... Explain that Part 3 is about 'World' not 'Self'."
-                        # But wait, the original template had "Ask: ..." sometimes?
-                        # The user requested fixing L2 Lead-in if grammar is bad.
-                        # The template in `teacher_dynamic_content` has "lead_in" data for Lesson 2.
-                        # However, the static template in `Week_1_Lesson_Plan.html` (which is loaded as template)
-                        # says: "Intro: Click Bilibili icon... Explain that Part 3 is about 'World' not 'Self'."
-                        # It DOES NOT usually have a specific topic question in the HTML template.
-                        # BUT, `process_teacher_plan` was previously *not* updating L2 Lead-in.
-                        # If I want to inject a question, I should append it.
-                        
-                        # Let's check `l2_data` (lesson_2 in json). It has a `lead_in` field.
-                        # "question": "How does family member you are proud of impact society?"
-                        
-                        # So I should update this cell to include that question, fixed.
-                        l2_lead_in_q = f"Ask: 'What is the impact of {target_phrase} on society?'"
-                        
-                        # Preserve existing text "Intro: Click Bilibili..."
-                        # But simpler: Just rewrite the cell with standard text + new question.
-                        
-                        new_html = f"<strong>Intro:</strong> Click Bilibili icon on Student Handout (Banner) to show 5-min warmup video. Explain that Part 3 is about 'World' not 'Self'. {l2_lead_in_q}"
+                        # Rewrite the cell with the standard intro text plus a
+                        # topic question built from the grammar target phrase.
                         cells[1].clear()
-                        cells[1].append(BeautifulSoup(new_html, 'html.parser'))
+                        cells[1].append(parse_fragment(_l2_intro_html(target_phrase)))
 
 
     # Bilibili Link (Student Handouts)
-    l1_link = l1_data.get('lead_in', {}).get('search_term', 'IELTS Speaking')
-    l1_url = f"https://search.bilibili.com/all?keyword={l1_link.replace(' ', '%20')}"
+    l1_url = _bilibili_url(l1_data)
     
     # Assuming same link for L2 or specific if needed. Template usually shares one link format.
     # We will update all buttons.
@@ -360,224 +310,175 @@ def process_teacher_plan(soup, week_number, week_data, teacher_content, phrase_d
     for btn in bili_btns:
         btn['href'] = l1_url # Using L1 search term for simplicity as requested "IELTS <Topic> Speaking"
 
+def _infer_pos(word, forms, lesson):
+    """Part of speech for a vocab headword that carries no "(Adj)" suffix.
+
+    Round 27 (2026-05-03): Round 26 extracted the first paren from `forms`,
+    but that turned out to be wrong 58% of the time. The forms field
+    describes RELATED morphological forms (e.g. word="Entrepreneurial" +
+    forms="Entrepreneur (N)" — the (N) refers to the noun cousin, NOT the
+    adjective headword). Suffix-based inference on the headword itself is
+    structurally correct and far more reliable.
+
+    `lesson` is 1 or 2; the two tables check suffixes in a different order
+    (see below). Returns '' when nothing matches.
+    """
+    pos = ''
+    wl = word.lower().strip()
+    if lesson == 1:
+        # Adverb (most specific — check first)
+        if wl.endswith('ly') and not wl.endswith('ily'):
+            pos = "Adv"
+        # Strong adjective suffixes
+        elif wl.endswith(('ous', 'able', 'ible', 'ical', 'ial',
+                          'ish', 'ive', 'ful', 'less', 'ent',
+                          'ant', 'ate', 'ic')):
+            pos = "Adj"
+        # -ing / -ed: in IELTS vocab tables these are nearly
+        # always taught as adjectival forms ("inspiring teacher",
+        # "devoted parent"), not as gerunds/past tenses.
+        elif wl.endswith(('ing', 'ed')):
+            pos = "Adj"
+        # -al that isn't -ial/-ical (caught above): "formal",
+        # "traditional", "cultural" → Adj. Rare exceptions like
+        # "arrival" / "approval" are nouns but the heuristic is
+        # still right >90% of the time for IELTS vocab.
+        elif wl.endswith('al'):
+            pos = "Adj"
+        # Verb-only suffixes
+        elif wl.endswith(('ize', 'ise', 'ify')):
+            pos = "V"
+        # Noun-only suffixes
+        elif wl.endswith(('tion', 'sion', 'ment', 'ity', 'ance',
+                          'ence', 'ness', 'ship', 'dom', 'ist',
+                          'ism')):
+            pos = "N"
+    else:
+        # Order matters: check longer/more-specific noun suffixes
+        # BEFORE shorter adjective suffixes. "Government" ends in
+        # -ent (Adj-ish) but really it's a -ment noun; "performance"
+        # ends in -ance (N) before -nt (Adj-ish), etc.
+        if wl.endswith('ly') and not wl.endswith('ily'):
+            pos = "Adv"
+        elif wl.endswith(('ize', 'ise', 'ify')):
+            pos = "V"
+        elif wl.endswith(('tion', 'sion', 'ment', 'ity', 'ance',
+                          'ence', 'ness', 'ship', 'dom', 'ist',
+                          'ism')):
+            pos = "N"
+        elif wl.endswith(('ous', 'able', 'ible', 'ical', 'ial',
+                          'ish', 'ive', 'ful', 'less', 'ent',
+                          'ant', 'ate', 'ic')):
+            pos = "Adj"
+        elif wl.endswith(('ing', 'ed')):
+            pos = "Adj"
+        elif wl.endswith('al'):
+            pos = "Adj"
+
+    if not pos:
+        # Fallback for the rare row where forms is bare like
+        # "Adjective" with no parens.
+        forms_lower = forms.lower().strip()
+        if forms_lower in ("adjective", "adj"):
+            pos = "Adj"
+        elif forms_lower in ("noun", "n"):
+            pos = "N"
+        elif forms_lower in ("verb", "v"):
+            pos = "V"
+        elif forms_lower in ("adverb", "adv"):
+            pos = "Adv"
+        elif "noun phrase" in forms_lower:
+            pos = "Noun Phrase"
+    return pos
+
+def _vocab_row_cells(word_item, lesson, mark_recycled=False):
+    """The three <td> cells of one vocab-table word row."""
+    word_raw = word_item.get('word', '')
+    word = word_raw.split('(')[0].strip()
+
+    # Try to get POS from the word field if present e.g. "Diligent (Adj)"
+    pos = word_raw.split('(')[1].replace(')', '') if '(' in word_raw else ''
+
+    forms = word_item.get('forms', word_item.get('Word Forms', ''))
+    meaning = word_item.get('meaning', '')
+
+    # If POS missing, infer from headword's morphological suffix.
+    if not pos:
+        pos = _infer_pos(word, forms, lesson)
+
+    headword = [fb.tag('strong', fb.markup(word))]
+    if pos:
+        headword += [" ", fb.tag('span', "(", fb.markup(pos), ")",
+                                 style='font-weight:normal; font-style:italic; font-size:0.9em;')]
+
+    if mark_recycled and word_item.get('recycled', False):
+        headword += [" ", fb.tag('span', "Recycled", class_='recycled-tag')]
+    return [fb.tag('td', headword),
+            fb.tag('td', fb.markup(forms)),
+            fb.tag('td', fb.tag('span', fb.markup(meaning), class_='vocab-cn'))]
+
+def _idiom_header_cells():
+    return [fb.tag('td', "🐎 Idioms", colspan='3', style='background:#eee; font-weight:bold; color:#555;')]
+
+def _idiom_rows(idiom_item):
+    """(info_row, example_row) <td> cells for one idiom; example_row is None
+    when the idiom has no example sentence."""
+    idiom = idiom_item.get('idiom', '')
+    usage = idiom_item.get('usage', '')
+    meaning = idiom_item.get('cn_idiom', '')
+    example = idiom_item.get('example_sentence', '')
+
+    # Row 1: Idiom Info
+    row1 = [fb.tag('td', fb.tag('strong', fb.markup(idiom))),
+            fb.tag('td', "(", fb.markup(usage), ")"),
+            fb.tag('td', fb.tag('span', fb.markup(meaning), class_='vocab-cn'))]
+    # Row 2: Example (if exists)
+    row2 = [fb.tag('td', '"', fb.markup(example), '"', colspan='3')] if example else None
+    return row1, row2
+
+def _vocab_table_rows(vocab_data, week_number, lesson):
+    """[(tr_class, cells)] for the L1 (lesson=1) or L2 (lesson=2) vocab table."""
+    rows = []
+    if lesson == 1:
+        # Add Words (Limit to 7 for Week 1) + Idioms (Limit 3)
+        words = vocab_data.get('l1_vocab', [])[:7]
+        idioms = vocab_data.get('l1_idioms', [])[:3]
+    else:
+        words = vocab_data.get('l2_vocab', [])
+        idioms = vocab_data.get('l2_idioms', [])
+
+    for word_item in words:
+        rows.append((None, _vocab_row_cells(word_item, lesson,
+                                            mark_recycled=lesson == 1 and week_number > 1)))
+
+    # Add Idioms Header
+    rows.append((None, _idiom_header_cells()))
+
+    for idiom_item in idioms:
+        row1, row2 = _idiom_rows(idiom_item)
+        rows.append((None, row1))
+        if row2:
+            rows.append(('vocab-example-row', row2))
+    return rows
+
+@pipeline_trace.traced
 def process_vocabulary(soup, week_number, vocab_data):
     """Injects vocabulary into L1 and L2 tables."""
-    # L1 Vocabulary
-    l1_vocab_list = vocab_data.get('l1_vocab', [])
-    l1_idioms_list = vocab_data.get('l1_idioms', [])
-    
-    # Find L1 Vocab Table (Page 2)
+    # Find vocab tables: first is L1 (Page 2), second is L2 (Page 5)
     vocab_tables = soup.find_all('table', class_='vocab-table')
-    
-    # Assuming first vocab table is L1 (Page 2)
-    if len(vocab_tables) >= 1:
-        l1_table = vocab_tables[0]
-        tbody = l1_table.find('tbody')
-        if tbody:
-            tbody.clear() # Clear existing rows
-            
-            # Add Words (Limit to 7 for Week 1)
-            count = 0
-            for word_item in l1_vocab_list:
-                if count >= 7: break
-                
-                word_raw = word_item.get('word', '')
-                word = word_raw.split('(')[0].strip()
-                
-                # Try to get POS from the word field if present e.g. "Diligent (Adj)"
-                pos = word_raw.split('(')[1].replace(')', '') if '(' in word_raw else ''
-                
-                forms = word_item.get('forms', word_item.get('Word Forms', ''))
-                meaning = word_item.get('meaning', '')
-                recycled = word_item.get('recycled', False)
-                
-                # If POS missing, infer from headword's morphological suffix.
-                # Round 27 (2026-05-03): Round 26 extracted the first paren
-                # from `forms`, but that turned out to be wrong 58% of the
-                # time. The forms field describes RELATED morphological forms
-                # (e.g. word="Entrepreneurial" + forms="Entrepreneur (N)" —
-                # the (N) refers to the noun cousin, NOT the adjective
-                # headword). Suffix-based inference on the headword itself
-                # is structurally correct and far more reliable.
-                if not pos:
-                    wl = word.lower().strip()
-                    # Adverb (most specific — check first)
-                    if wl.endswith('ly') and not wl.endswith('ily'):
-                        pos = "Adv"
-                    # Strong adjective suffixes
-                    elif wl.endswith(('ous', 'able', 'ible', 'ical', 'ial',
-                                      'ish', 'ive', 'ful', 'less', 'ent',
-                                      'ant', 'ate', 'ic')):
-                        pos = "Adj"
-                    # -ing / -ed: in IELTS vocab tables these are nearly
-                    # always taught as adjectival forms ("inspiring teacher",
-                    # "devoted parent"), not as gerunds/past tenses.
-                    elif wl.endswith(('ing', 'ed')):
-                        pos = "Adj"
-                    # -al that isn't -ial/-ical (caught above): "formal",
-                    # "traditional", "cultural" → Adj. Rare exceptions like
-                    # "arrival" / "approval" are nouns but the heuristic is
-                    # still right >90% of the time for IELTS vocab.
-                    elif wl.endswith('al'):
-                        pos = "Adj"
-                    # Verb-only suffixes
-                    elif wl.endswith(('ize', 'ise', 'ify')):
-                        pos = "V"
-                    # Noun-only suffixes
-                    elif wl.endswith(('tion', 'sion', 'ment', 'ity', 'ance',
-                                      'ence', 'ness', 'ship', 'dom', 'ist',
-                                      'ism')):
-                        pos = "N"
-
-                if not pos:
-                    # Fallback for the rare row where forms is bare like
-                    # "Adjective" with no parens.
-                    forms_lower = forms.lower().strip()
-                    if forms_lower in ("adjective", "adj"):
-                        pos = "Adj"
-                    elif forms_lower in ("noun", "n"):
-                        pos = "N"
-                    elif forms_lower in ("verb", "v"):
-                        pos = "V"
-                    elif forms_lower in ("adverb", "adv"):
-                        pos = "Adv"
-                    elif "noun phrase" in forms_lower:
-                        pos = "Noun Phrase"
-                
-                row_html = f"<td><strong>{word}</strong>"
-                if pos:
-                    row_html += f" <span style='font-weight:normal; font-style:italic; font-size:0.9em;'>({pos})</span>"
-                
-                if recycled and week_number > 1:
-                     row_html += " <span class='recycled-tag'>Recycled</span>"
-                row_html += f"</td><td>{forms}</td><td><span class='vocab-cn'>{meaning}</span></td>"
-                
-                tr = soup.new_tag('tr')
-                tr.append(BeautifulSoup(row_html, 'html.parser'))
-                tbody.append(tr)
-                count += 1
-            
-            # Add Idioms Header
-            idiom_header = soup.new_tag('tr')
-            idiom_header.append(BeautifulSoup("<td colspan='3' style='background:#eee; font-weight:bold; color:#555;'>🐎 Idioms</td>", 'html.parser'))
-            tbody.append(idiom_header)
-            
-            # Add Idioms (Limit 3)
-            i_count = 0
-            for idiom_item in l1_idioms_list:
-                if i_count >= 3: break
-                
-                idiom = idiom_item.get('idiom', '')
-                usage = idiom_item.get('usage', '')
-                meaning = idiom_item.get('cn_idiom', '')
-                example = idiom_item.get('example_sentence', '')
-                
-                # Row 1: Idiom Info
-                row1_html = f"<td><strong>{idiom}</strong></td><td>({usage})</td><td><span class='vocab-cn'>{meaning}</span></td>"
-                tr1 = soup.new_tag('tr')
-                tr1.append(BeautifulSoup(row1_html, 'html.parser'))
-                tbody.append(tr1)
-                
-                # Row 2: Example (if exists)
-                if example:
-                    row2_html = f"<td colspan='3'>\"{example}\"</td>"
-                    tr2 = soup.new_tag('tr', attrs={'class': 'vocab-example-row'})
-                    tr2.append(BeautifulSoup(row2_html, 'html.parser'))
-                    tbody.append(tr2)
-                
-                i_count += 1
 
-    # L2 Vocabulary (Page 5)
-    # Assuming second vocab table is L2 (Page 5)
-    if len(vocab_tables) >= 2:
-        l2_table = vocab_tables[1]
-        tbody = l2_table.find('tbody')
+    for lesson, table in zip((1, 2), vocab_tables):
+        tbody = table.find('tbody')
         if tbody:
-            tbody.clear()
-            
-            l2_vocab_list = vocab_data.get('l2_vocab', [])
-            l2_idioms_list = vocab_data.get('l2_idioms', [])
-            
-            for word_item in l2_vocab_list:
-                word_raw = word_item.get('word', '')
-                word = word_raw.split('(')[0].strip()
-                pos = word_raw.split('(')[1].replace(')', '') if '(' in word_raw else ''
-                
-                forms = word_item.get('forms', word_item.get('Word Forms', ''))
-                meaning = word_item.get('meaning', '')
-                
-                # Round 27 (2026-05-03): suffix-based POS inference on the
-                # headword. See the L1 block above for the rationale.
-                if not pos:
-                    wl = word.lower().strip()
-                    # Order matters: check longer/more-specific noun suffixes
-                    # BEFORE shorter adjective suffixes. "Government" ends in
-                    # -ent (Adj-ish) but really it's a -ment noun; "performance"
-                    # ends in -ance (N) before -nt (Adj-ish), etc.
-                    if wl.endswith('ly') and not wl.endswith('ily'):
-                        pos = "Adv"
-                    elif wl.endswith(('ize', 'ise', 'ify')):
-                        pos = "V"
-                    elif wl.endswith(('tion', 'sion', 'ment', 'ity', 'ance',
-                                      'ence', 'ness', 'ship', 'dom', 'ist',
-                                      'ism')):
-                        pos = "N"
-                    elif wl.endswith(('ous', 'able', 'ible', 'ical', 'ial',
-                                      'ish', 'ive', 'ful', 'less', 'ent',
-                                      'ant', 'ate', 'ic')):
-                        pos = "Adj"
-                    elif wl.endswith(('ing', 'ed')):
-                        pos = "Adj"
-                    elif wl.endswith('al'):
-                        pos = "Adj"
-
-                if not pos:
-                    forms_lower = forms.lower().strip()
-                    if forms_lower in ("adjective", "adj"):
-                        pos = "Adj"
-                    elif forms_lower in ("noun", "n"):
-                        pos = "N"
-                    elif forms_lower in ("verb", "v"):
-                        pos = "V"
-                    elif forms_lower in ("adverb", "adv"):
-                        pos = "Adv"
-                    elif "noun phrase" in forms_lower:
-                        pos = "Noun Phrase"
-                
-                row_html = f"<td><strong>{word}</strong>"
-                if pos:
-                    row_html += f" <span style='font-weight:normal; font-style:italic; font-size:0.9em;'>({pos})</span>"
-                row_html += f"</td><td>{forms}</td><td><span class='vocab-cn'>{meaning}</span></td>"
-                
-                tr = soup.new_tag('tr')
-                tr.append(BeautifulSoup(row_html, 'html.parser'))
+            tbody.clear() # Clear existing rows
+            for tr_class, cells in _vocab_table_rows(vocab_data, week_number, lesson):
+                tr = soup.new_tag('tr', attrs={'class': tr_class}) if tr_class else soup.new_tag('tr')
+                tr.extend(fb.to_soup(soup, cells))
                 tbody.append(tr)
-            
-            # Add Idioms Header
-            idiom_header = soup.new_tag('tr')
-            idiom_header.append(BeautifulSoup("<td colspan='3' style='background:#eee; font-weight:bold; color:#555;'>🐎 Idioms</td>", 'html.parser'))
-            tbody.append(idiom_header)
-            
-            for idiom_item in l2_idioms_list:
-                idiom = idiom_item.get('idiom', '')
-                usage = idiom_item.get('usage', '')
-                meaning = idiom_item.get('cn_idiom', '')
-                example = idiom_item.get('example_sentence', '')
-                
-                row1_html = f"<td><strong>{idiom}</strong></td><td>({usage})</td><td><span class='vocab-cn'>{meaning}</span></td>"
-                tr1 = soup.new_tag('tr')
-                tr1.append(BeautifulSoup(row1_html, 'html.parser'))
-                tbody.append(tr1)
-                
-                if example:
-                    row2_html = f"<td colspan='3'>\"{example}\"</td>"
-                    tr2 = soup.new_tag('tr', attrs={'class': 'vocab-example-row'})
-                    tr2.append(BeautifulSoup(row2_html, 'html.parser'))
-                    tbody.append(tr2)
 
 def format_bullet_text(html_content):
     """Formats 'You should say:' bullets: bold first word, inline, comma separated."""
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = parse_fragment(html_content)
     raw_str = soup.decode_contents() if soup.name else str(soup)
     
     parts = re.split(r'<br\s*/?>', raw_str)
@@ -603,7 +504,7 @@ def format_bullet_text(html_content):
 
     formatted_bullets = []
     for line in bullet_lines:
-        clean_line = BeautifulSoup(line, 'html.parser').get_text().strip()
+        clean_line = parse_fragment(line).get_text().strip()
         if not clean_line: continue
         
         words = clean_line.split(' ', 1)
@@ -614,6 +515,39 @@ def format_bullet_text(html_content):
     
     return f"{main_text} {', '.join(formatted_bullets)}"
 
+def _cue_card_parts(prompt_p):
+    """(question_text, bullets_html) for the L1 cue card, from the prompt <p>
+    of q1's html, or None if it has no "You should say:" split."""
+    p_content = prompt_p.decode_contents()
+    if "You should say:" not in p_content:
+        return None
+    parts = p_content.split("You should say:")
+    question_text = parse_fragment(parts[0]).get_text().strip()
+    bullets_raw = parts[1]
+
+    bullet_lines = re.split(r'<br\s*/?>', bullets_raw)
+    fmt_bullets = []
+    for line in bullet_lines:
+        txt = parse_fragment(line).get_text().strip()
+        if not txt: continue
+        words = txt.split(' ', 1)
+        if len(words) > 0:
+            first = words[0]
+            rest = " " + words[1] if len(words) > 1 else ""
+            fmt_bullets.append(f"<strong>{first}</strong>{rest}")
+
+    return question_text, "You should say: " + ", ".join(fmt_bullets)
+
+def _model_answer_html(q_soup):
+    """Model answer markup (second <p> of q1's html), or None if absent."""
+    ps = q_soup.find_all('p')
+    answer_p = ps[1] if len(ps) > 1 else None
+    if not answer_p:
+        return None
+    new_content = str(answer_p).replace('<p>', '').replace('</p>', '')
+    return new_content.replace('highlight-yellow', 'highlight-3clause')
+
+@pipeline_trace.traced
 def process_student_l1(soup, week_data):
     """Updates Student Lesson 1 (Page 2) content."""
     l1_data = week_data.get('lesson_1_part_2', {})
@@ -630,53 +564,36 @@ def process_student_l1(soup, week_data):
     if cue_card_div:
         h3 = cue_card_div.find('h3')
         q1_html = q1_data.get('html', '')
-        q1_soup = BeautifulSoup(q1_html, 'html.parser')
+        q1_soup = parse_fragment(q1_html)
         prompt_p = q1_soup.find('p')
         
         if prompt_p:
-            p_content = prompt_p.decode_contents()
+            cue_parts = _cue_card_parts(prompt_p)
             
-            if "You should say:" in p_content:
-                parts = p_content.split("You should say:")
-                question_text = BeautifulSoup(parts[0], 'html.parser').get_text().strip()
-                bullets_raw = parts[1] 
+            if cue_parts:
+                question_text, final_bullets_html = cue_parts
                 
                 if h3:
                     h3.string = f"📌 CUE CARD: {question_text}"
                 
-                bullet_lines = re.split(r'<br\s*/?>', bullets_raw)
-                fmt_bullets = []
-                for line in bullet_lines:
-                    txt = BeautifulSoup(line, 'html.parser').get_text().strip()
-                    if not txt: continue
-                    words = txt.split(' ', 1)
-                    if len(words) > 0:
-                        first = words[0]
-                        rest = " " + words[1] if len(words) > 1 else ""
-                        fmt_bullets.append(f"<strong>{first}</strong>{rest}")
-                
-                final_bullets_html = "You should say: " + ", ".join(fmt_bullets)
-                
                 bullets_div = cue_card_div.find('div', style=lambda x: x and 'color:#444' in x)
                 if bullets_div:
                     bullets_div.clear()
-                    bullets_div.append(BeautifulSoup(final_bullets_html, 'html.parser'))
+                    bullets_div.append(parse_fragment(final_bullets_html))
 
     # Update Model Answer
     model_div = soup.find('div', class_='model-box')
     if model_div:
         # Get answer part (usually second paragraph)
-        answer_p = q1_soup.find_all('p')[1] if len(q1_soup.find_all('p')) > 1 else None
-        if answer_p:
-            new_content = str(answer_p).replace('<p>', '').replace('</p>', '')
-            new_content = new_content.replace('highlight-yellow', 'highlight-3clause')
+        new_content = _model_answer_html(q1_soup)
+        if new_content is not None:
             model_div.clear()
-            model_div.append(BeautifulSoup(new_content, 'html.parser'))
+            model_div.append(parse_fragment(new_content))
 
 def extract_keyword(text):
     """Extracts a central keyword from the question text."""
     # Clean up text first
-    text = BeautifulSoup(text, 'html.parser').get_text().strip()
+    text = parse_fragment(text).get_text().strip()
     # Remove "You should say..." and everything after
     if "You should say" in text:
         text = text.split("You should say")[0]
@@ -803,7 +720,7 @@ def extract_cue_words(prompt_html):
     """
     if not prompt_html:
         return None
-    soup = BeautifulSoup(prompt_html, 'html.parser')
+    soup = parse_fragment(prompt_html)
 
     prompt_p = None
     for p in soup.find_all('p'):
@@ -821,7 +738,7 @@ def extract_cue_words(prompt_html):
 
     bullet_texts = []
     for line in bullet_lines:
-        text = BeautifulSoup(line, 'html.parser').get_text().strip()
+        text = parse_fragment(line).get_text().strip()
         if text:
             bullet_texts.append(text)
         if len(bullet_texts) == 4:
@@ -876,6 +793,7 @@ def _apply_cue_labels_and_hints(legs, cue_words, hints):
                     leg.contents[0].replace_with(hints[i])
 
 
+@pipeline_trace.traced
 def format_mind_maps(soup, week_data, ai_content):
     """Updates Mind Maps on Page 3."""
     l1_data = week_data.get('lesson_1_part_2', {})
@@ -893,7 +811,7 @@ def format_mind_maps(soup, week_data, ai_content):
     
     # 1. Main Brainstorming Map
     q1_html = q1.get('html', '')
-    q1_soup = BeautifulSoup(q1_html, 'html.parser')
+    q1_soup = parse_fragment(q1_html)
     
     # Extract keyword from Q1 if possible, or use Topic
     central_text = extract_keyword(q1_soup.get_text())
@@ -902,7 +820,7 @@ def format_mind_maps(soup, week_data, ai_content):
     spider_centers = soup.find_all('div', class_='spider-center')
     if len(spider_centers) > 0:
         spider_centers[0].clear()
-        spider_centers[0].append(BeautifulSoup(central_text, 'html.parser'))
+        spider_centers[0].append(parse_fragment(central_text))
         
     # Update Q1 Prompt
     l1_practice_page = soup.find_all('div', class_='l1')[2]
@@ -915,7 +833,7 @@ def format_mind_maps(soup, week_data, ai_content):
                 if q1_prompt_p:
                     fmt_html = format_bullet_text(q1_prompt_p.decode_contents())
                     prompt_div.clear()
-                    prompt_div.append(BeautifulSoup(fmt_html, 'html.parser'))
+                    prompt_div.append(parse_fragment(fmt_html))
 
     # Update Legs (Q1 / Map 1) — labels from prompt cues + hints from data.
     hints = q1.get('spider_diagram_hints', ["", "", "", ""])
@@ -928,7 +846,7 @@ def format_mind_maps(soup, week_data, ai_content):
     topic_a_card = soup.find('h3', string=re.compile(r'Part 2: Q2'))
     if topic_a_card:
         q2_html = q2.get('html', '')
-        q2_soup = BeautifulSoup(q2_html, 'html.parser')
+        q2_soup = parse_fragment(q2_html)
         q2_text = q2_soup.get_text()
         
         prompt_div = topic_a_card.find_next_sibling('div')
@@ -937,7 +855,7 @@ def format_mind_maps(soup, week_data, ai_content):
             if q2_prompt_p:
                 fmt_html = format_bullet_text(q2_prompt_p.decode_contents())
                 prompt_div.clear()
-                prompt_div.append(BeautifulSoup(fmt_html, 'html.parser'))
+                prompt_div.append(parse_fragment(fmt_html))
             
         spider_container = topic_a_card.find_next_sibling('div', class_='spider-container')
         if spider_container:
@@ -945,7 +863,7 @@ def format_mind_maps(soup, week_data, ai_content):
             if center:
                 center_text = extract_keyword(q2_text)
                 center.clear()
-                center.append(BeautifulSoup(center_text, 'html.parser'))
+                center.append(parse_fragment(center_text))
                 
             q2_hints = q2.get('spider_diagram_hints', [])
             legs = spider_container.find_all('div', class_='spider-leg')
@@ -955,7 +873,7 @@ def format_mind_maps(soup, week_data, ai_content):
     topic_b_card = soup.find('h3', string=re.compile(r'Part 2: Q3'))
     if topic_b_card:
         q3_html = q3.get('html', '')
-        q3_soup = BeautifulSoup(q3_html, 'html.parser')
+        q3_soup = parse_fragment(q3_html)
         q3_text = q3_soup.get_text()
         
         prompt_div = topic_b_card.find_next_sibling('div')
@@ -964,7 +882,7 @@ def format_mind_maps(soup, week_data, ai_content):
             if q3_prompt_p:
                 fmt_html = format_bullet_text(q3_prompt_p.decode_contents())
                 prompt_div.clear()
-                prompt_div.append(BeautifulSoup(fmt_html, 'html.parser'))
+                prompt_div.append(parse_fragment(fmt_html))
             
         spider_container = topic_b_card.find_next_sibling('div', class_='spider-container')
         if spider_container:
@@ -972,12 +890,42 @@ def format_mind_maps(soup, week_data, ai_content):
             if center:
                 center_text = extract_keyword(q3_text)
                 center.clear()
-                center.append(BeautifulSoup(center_text, 'html.parser'))
+                center.append(parse_fragment(center_text))
             
             q3_hints = q3.get('spider_diagram_hints', [])
             legs = spider_container.find_all('div', class_='spider-leg')
             _apply_cue_labels_and_hints(legs, cue_words_q3, q3_hints)
 
+def _part3_parts(data):
+    """(question_text, answer_html) for one Part 3 question's data entry."""
+    soup_frag = parse_fragment(data.get('html', ''))
+
+    q_tag = soup_frag.find('strong')
+    q_text = q_tag.get_text() if q_tag else ""
+
+    ps = soup_frag.find_all('p')
+    answer_html = ""
+    if len(ps) > 1:
+        answer_html = ''.join(map(str, ps[1].contents))
+        answer_html = answer_html.replace('highlight-yellow', 'highlight-3clause')
+    return q_text, answer_html
+
+_PEER_CHECK_STYLE = "font-size:0.7em; color:#7f8c8d; margin-bottom:0;"
+_PEER_CHECK_INDENT = "\n"
+
+def _peer_check_nodes(band_5_q, band_6_q):
+    # Newlines between the divs: what the old triple-quoted f-string came
+    # out as once bs4 collapsed its indentation runs to "\n". Kept so
+    # regenerated weeks stay byte-identical.
+    return [_PEER_CHECK_INDENT,
+            fb.tag('div', "📉 ", fb.tag('strong', "Band 5 Peer Check:"), " Ask: '", fb.markup(band_5_q), "'",
+                   style=_PEER_CHECK_STYLE),
+            _PEER_CHECK_INDENT,
+            fb.tag('div', "📈 ", fb.tag('strong', "Band 6 Peer Check:"), " Ask: '", fb.markup(band_6_q), "'",
+                   style=_PEER_CHECK_STYLE),
+            _PEER_CHECK_INDENT]
+
+@pipeline_trace.traced
 def process_student_l2(soup, week_data, ai_content, week_peer_data):
     """Updates Student Lesson 2 (Part 3) Q1-Q6."""
     l2_data = week_data.get('lesson_2_part_3', {})
@@ -987,17 +935,7 @@ def process_student_l2(soup, week_data, ai_content, week_peer_data):
 
     def update_q(q_id, q_key, container_id=None, container_elem=None):
         data = l2_data.get(q_key, {})
-        html = data.get('html', '')
-        soup_frag = BeautifulSoup(html, 'html.parser')
-        
-        q_tag = soup_frag.find('strong')
-        q_text = q_tag.get_text() if q_tag else ""
-        
-        ps = soup_frag.find_all('p')
-        answer_html = ""
-        if len(ps) > 1:
-            answer_html = ''.join(map(str, ps[1].contents))
-            answer_html = answer_html.replace('highlight-yellow', 'highlight-3clause')
+        q_text, answer_html = _part3_parts(data)
         
         if container_id:
             card = soup.find('div', id=container_id)
@@ -1012,7 +950,7 @@ def process_student_l2(soup, week_data, ai_content, week_peer_data):
             if mbox:
                 mbox.clear()
                 if answer_html:
-                    mbox.append(BeautifulSoup(answer_html, 'html.parser'))
+                    mbox.append(parse_fragment(answer_html))
                 
             hints = data.get('ore_hints', [])
             scaffold = card.find('ul', class_='scaffold-text')
@@ -1054,11 +992,7 @@ def process_student_l2(soup, week_data, ai_content, week_peer_data):
                 if peer_div:
                     peer_div.clear()
                     # Rebuild HTML
-                    html_content = f"""
-                    <div style="font-size:0.7em; color:#7f8c8d; margin-bottom:0;">📉 <strong>Band 5 Peer Check:</strong> Ask: '{band_5_q}'</div>
-                    <div style="font-size:0.7em; color:#7f8c8d; margin-bottom:0;">📈 <strong>Band 6 Peer Check:</strong> Ask: '{band_6_q}'</div>
-                    """
-                    peer_div.append(BeautifulSoup(html_content, 'html.parser'))
+                    peer_div.extend(fb.to_soup(soup, _peer_check_nodes(band_5_q, band_6_q)))
 
     # Q1 (Page 5)
     update_q(1, 'q1', container_id='p5-q1')
@@ -1077,6 +1011,53 @@ def process_student_l2(soup, week_data, ai_content, week_peer_data):
             update_q(5, 'q5', container_elem=compact_cards[1])
             update_q(6, 'q6', container_elem=compact_cards[2])
 
+def _homework_vocab_rows(week_number, vocab_review):
+    """<td> cells for each Vocabulary Review row: word + shuffled synonym option."""
+    # SHUFFLE LOGIC
+    # Separate Words from Synonyms
+    words_list = []
+    synonyms_list = []
+
+    for item in vocab_review:
+        words_list.append(item.get('word', ''))
+        synonyms_list.append({
+            "option": item.get('option', ''),
+            "synonym": item.get('synonym', '')
+        })
+
+    # Shuffle the Synonyms independently. Seeded per week so the
+    # shuffle is reproducible: a --jobs run, a serial run and a
+    # re-run all emit byte-identical files. The answer key stays
+    # valid either way because each option letter travels with
+    # its synonym.
+    random.Random(week_number).shuffle(synonyms_list)
+
+    # Combine them back for display
+    rows = []
+    for i in range(len(words_list)):
+        word = words_list[i]
+
+        # If we have fewer synonyms than words (shouldn't happen), handle gracefully
+        if i < len(synonyms_list):
+            option = synonyms_list[i]['option']
+            synonym = synonyms_list[i]['synonym']
+        else:
+            option = "?"
+            synonym = "?"
+
+        # Round 24 (2026-05-03): inline `padding: 10px 5px` removed —
+        # the `.hw .vocab-table td { padding: 4px 5px }` CSS rule in
+        # canonical Week 1 now controls cell spacing. Inline styles
+        # here would override the CSS without specificity escape and
+        # block per-page tuning. Middle TD keeps the inline border
+        # because it's a per-cell visual treatment (the "blank line"
+        # student writes Chinese translation on), not pure layout.
+        rows.append([fb.tag('td', f"{i+1}. ", fb.markup(word)),
+                     fb.tag('td', style='border-bottom:1px solid #eee;'),
+                     fb.tag('td', "( \xa0\xa0\xa0\xa0\xa0 ) ", fb.markup(option), ". ", fb.markup(synonym))])
+    return rows
+
+@pipeline_trace.traced
 def process_homework(soup, week_number, homework_data):
     """Updates Homework page."""
     
@@ -1088,44 +1069,9 @@ def process_homework(soup, week_number, homework_data):
         tbody = vocab_table.find('tbody')
         if tbody:
             tbody.clear()
-            
-            # SHUFFLE LOGIC
-            # Separate Words from Synonyms
-            words_list = []
-            synonyms_list = []
-            
-            for item in vocab_review:
-                words_list.append(item.get('word', ''))
-                synonyms_list.append({
-                    "option": item.get('option', ''),
-                    "synonym": item.get('synonym', '')
-                })
-                
-            # Shuffle the Synonyms independently
-            random.shuffle(synonyms_list)
-            
-            # Combine them back for display
-            for i in range(len(words_list)):
-                word = words_list[i]
-                
-                # If we have fewer synonyms than words (shouldn't happen), handle gracefully
-                if i < len(synonyms_list):
-                    option = synonyms_list[i]['option']
-                    synonym = synonyms_list[i]['synonym']
-                else:
-                    option = "?"
-                    synonym = "?"
-                
-                # Round 24 (2026-05-03): inline `padding: 10px 5px` removed —
-                # the `.hw .vocab-table td { padding: 4px 5px }` CSS rule in
-                # canonical Week 1 now controls cell spacing. Inline styles
-                # here would override the CSS without specificity escape and
-                # block per-page tuning. Middle TD keeps the inline border
-                # because it's a per-cell visual treatment (the "blank line"
-                # student writes Chinese translation on), not pure layout.
-                row_html = f"<td>{i+1}. {word}</td><td style='border-bottom:1px solid #eee;'></td><td>( &nbsp;&nbsp;&nbsp;&nbsp;&nbsp; ) {option}. {synonym}</td>"
+            for cells in _homework_vocab_rows(week_number, vocab_review):
                 tr = soup.new_tag('tr')
-                tr.append(BeautifulSoup(row_html, 'html.parser'))
+                tr.extend(fb.to_soup(soup, cells))
                 tbody.append(tr)
 
     # 2. Grammar Clinic
@@ -1154,6 +1100,7 @@ def process_homework(soup, week_number, homework_data):
 CONTENT_PAGES_PER_WEEK = 9  # IELTS Week 1: 1 cover-page + 9 content pages
 
 
+@pipeline_trace.traced
 def process_page_numbers(soup, week_number):
     """Inject cumulative page-number divs into every content `<div class="page">`.
 
@@ -1184,72 +1131,327 @@ def process_page_numbers(soup, week_number):
             page.append(new_div)
 
 
-def main():
-    print("Generating all 40 lesson plans...")
-    os.makedirs('lessons', exist_ok=True)
-    
+TEMPLATE_PATH = 'canonical/pdf-base/Week_01.html'
+OUTPUT_DIR = 'lessons'
+WEEKS = range(1, 41)
+RENDERERS = ('soup', 'compiled')
+
+# Incremental builds: <out>/.build_manifest.json maps each week to a hash of
+# its inputs. A week whose hash matches and whose output file still exists is
+# left alone, so unchanged files keep their bytes and mtime and the
+# skip-unchanged upload / CDN caches stay warm. --force rebuilds everything.
+MANIFEST_NAME = '.build_manifest.json'
+MANIFEST_VERSION = 1
+GENERATOR_SOURCES = ('parse_data.py', 'template_renderer.py', 'week_store.py', 'html_backend.py',
+                     'fragment_builder.py', 'json_loader.py')
+
+
+def render_week(template_html, week_number, week):
+    """Legacy renderer: parse the template and run every process_* pass over it."""
+    soup = parse_document(template_html)
+    process_cover_page(soup, week_number, week['curriculum'])
+    process_teacher_plan(soup, week_number, week['curriculum'], week['teacher'], week['phrase'])
+    process_vocabulary(soup, week_number, week['vocab'])
+    process_student_l1(soup, week['curriculum'])
+    format_mind_maps(soup, week['curriculum'], week['ai'])
+    process_student_l2(soup, week['curriculum'], week['ai'], week['peer'])
+    process_homework(soup, week_number, week['homework'])
+    process_page_numbers(soup, week_number)  # cumulative; covers skipped
+    return str(soup)
+
+
+def make_renderer(name, template_html):
+    """Returns render(week_number, week) -> html for --renderer NAME.
+
+    'soup' re-parses the template for every week. 'compiled' parses it once
+    (template_renderer.CompiledTemplate) and fills precomputed slots; it is
+    byte-identical to 'soup', which --check-renderer verifies.
+    """
+    if name == 'compiled':
+        from template_renderer import CompiledTemplate  # imports this module
+        return CompiledTemplate(template_html).render
+    return lambda week_number, week: render_week(template_html, week_number, week)
+
+
+def build_digest(template_html):
+    """Hash of what every week depends on: the template, the generator's own source
+    and the HTML parser backend."""
+    h = hashlib.sha256(f"v{MANIFEST_VERSION}:{html_backend.get_backend()}".encode('utf-8'))
+    h.update(template_html.encode('utf-8'))
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in GENERATOR_SOURCES:
+        with open(os.path.join(here, name), 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def week_hash(week_number, week, digest):
+    """Hash of one week's inputs (WeekStore.week_inputs) on top of build_digest()."""
+    payload = json.dumps([digest, week_number, week], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def load_manifest(output_dir):
+    """Week -> input hash from the last build into output_dir ({} if none/unreadable)."""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return {int(k): v for k, v in manifest.get('weeks', {}).items()}
+
+
+def save_manifest(output_dir, hashes):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION,
+                   'weeks': {str(k): v for k, v in sorted(hashes.items())}}, f, indent=1)
+    os.replace(tmp, path)
+
+
+# Per-process state for the --jobs pool. The data files and the template are
+# handed to each worker once via the pool initializer instead of being
+# pickled into every task; the compiled renderer is built once per worker.
+_worker_state = {}
+
+
+def _init_worker(store, template_html, output_dir, renderer='soup', digest=None, previous=None,
+                 parser=html_backend.DEFAULT_BACKEND):
+    html_backend.set_backend(parser)
+    _worker_state['data'] = store
+    _worker_state['render'] = make_renderer(renderer, template_html)
+    _worker_state['output_dir'] = output_dir
+    _worker_state['digest'] = digest
+    _worker_state['previous'] = previous or {}
+
+
+def generate_week(week_number, store, render, output_dir=OUTPUT_DIR, digest=None, previous_hash=None):
+    """Builds one week with `render` (see make_renderer) and writes it to output_dir.
+
+    With `digest` (see build_digest) the week's input hash is computed; if it
+    equals `previous_hash` and the output file exists, nothing is rendered or
+    written.
+
+    Returns (week_number, status, elapsed_seconds, log_lines, input_hash)
+    where status is 'ok', 'unchanged', 'skipped' (no curriculum entry) or
+    'error'. Log lines are returned rather than printed so a parallel run
+    can report them in week order.
+    """
+    log = [f"--- Generating Week {week_number} ---"]
+    t0 = time.perf_counter()
+    input_hash = None
+    try:
+        week = store.week_inputs(week_number)
+        if week is None:
+            log.append(f"Skipping Week {week_number}: No curriculum data found.")
+            return week_number, 'skipped', time.perf_counter() - t0, log, None
+
+        output_filename = f'{output_dir}/Week_{week_number:02d}.html'
+        if digest is not None:
+            input_hash = week_hash(week_number, week, digest)
+            if input_hash == previous_hash and os.path.exists(output_filename):
+                log.append(f"Unchanged {output_filename} (inputs match build manifest)")
+                return week_number, 'unchanged', time.perf_counter() - t0, log, input_hash
+
+        with pipeline_trace.scope(week=week_number), pipeline_trace.span('render_week') as trace_args:
+            html = render(week_number, week)
+            if pipeline_trace.enabled():
+                trace_args['bytes'] = len(html.encode('utf-8'))
+
+        # Save
+        with open(output_filename, 'w', encoding='utf-8') as f:
+            f.write(html)
+
+        log.append(f"Successfully generated {output_filename}")
+        return week_number, 'ok', time.perf_counter() - t0, log, input_hash
+
+    except Exception as e:
+        log.append(f"❌ Error generating Week {week_number}: {e}")
+        log.append(traceback.format_exc().rstrip())
+        return week_number, 'error', time.perf_counter() - t0, log, None
+
+
+def _generate_week_in_worker(week_number):
+    return generate_week(week_number, _worker_state['data'], _worker_state['render'],
+                         _worker_state['output_dir'], _worker_state['digest'],
+                         _worker_state['previous'].get(week_number))
+
+
+def _print_timing_table(results):
+    print("\nWeek  Status     Time")
+    for week_number, status, elapsed, *_ in results:
+        print(f"{week_number:>4}  {status:<9} {elapsed:6.3f}s")
+    total = sum(r[2] for r in results)
+    print(f"      total     {total:6.3f}s (sum of per-week times)")
+
+
+def compare_renders(store, reference, candidate, weeks=WEEKS):
+    """Renders every week two ways and compares the bytes.
+
+    reference / candidate are (label, render, parser_backend) triples; each
+    render runs under its own html_backend. Prints one line per week plus
+    each path's total time. Returns the week numbers whose output differs
+    (or fails in only one of the two).
+    """
+    sides = (reference, candidate)
+    times = [0.0, 0.0]
+    mismatched = []
+    for week_number in weeks:
+        week = store.week_inputs(week_number)
+        if week is None:
+            print(f"Week {week_number:>2}: skipped (no curriculum data)")
+            continue
+        outputs = []
+        for i, (_, render, backend) in enumerate(sides):
+            t = time.perf_counter()
+            try:
+                with html_backend.using(backend):
+                    outputs.append(render(week_number, week))
+            except Exception as e:
+                outputs.append(e)
+            times[i] += time.perf_counter() - t
+        expected, actual = outputs
+        ref_label, cand_label = reference[0], candidate[0]
+        if isinstance(expected, Exception) or isinstance(actual, Exception):
+            same = type(expected) is type(actual)
+            detail = f"{ref_label}: {expected!r} / {cand_label}: {actual!r}"
+        else:
+            same = expected == actual
+            offset = next((i for i, (a, b) in enumerate(zip(expected, actual)) if a != b),
+                          min(len(expected), len(actual)))
+            detail = (f"first difference at offset {offset}: "
+                      f"{ref_label} {expected[offset:offset + 60]!r} / {cand_label} {actual[offset:offset + 60]!r}")
+        if same:
+            print(f"Week {week_number:>2}: identical")
+        else:
+            mismatched.append(week_number)
+            print(f"Week {week_number:>2}: DIFFERS — {detail}")
+    print(f"\n{reference[0]} {times[0]:.2f}s, {candidate[0]} {times[1]:.2f}s")
+    return mismatched
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Fan out the canonical template into lessons/Week_NN.html × 40.")
+    ap.add_argument("--jobs", "-j", type=int, default=1,
+                    help="Number of worker processes (default 1 = serial). "
+                         "Output is byte-identical to a serial run.")
+    ap.add_argument("--out", default=OUTPUT_DIR,
+                    help="Output folder (default: lessons/)")
+    ap.add_argument("--renderer", choices=RENDERERS, default='soup',
+                    help="'soup' re-parses the template per week; 'compiled' parses it "
+                         "once and fills precomputed slots (same bytes, much faster)")
+    ap.add_argument("--parser", choices=html_backend.BACKENDS, default=html_backend.get_backend(),
+                    help="HTML parser backend for the template and fragment parses "
+                         "(default: $IELTS_HTML_PARSER or html.parser; see html_backend.py)")
+    ap.add_argument("--check-parser", choices=html_backend.BACKENDS, metavar="BACKEND",
+                    help="Render every week with html.parser and with BACKEND, report byte "
+                         "differences, write nothing. Exit 1 on any difference.")
+    ap.add_argument("--force", action="store_true",
+                    help=f"Rebuild every week even if its inputs match {MANIFEST_NAME}")
+    ap.add_argument("--check-renderer", action="store_true",
+                    help="Render every week with both renderers, report byte differences, "
+                         "write nothing. Exit 1 on any difference.")
+    week_selection.add_argument(ap)
+    pipeline_trace.add_argument(ap)
+    args = ap.parse_args(argv)
+    pipeline_trace.start_from_args(args.trace)
+    weeks = args.weeks or WEEKS
+    try:
+        html_backend.set_backend(args.parser)
+        if args.check_parser:
+            html_backend.set_backend(args.check_parser)
+            html_backend.set_backend(args.parser)
+    except html_backend.BackendUnavailable as e:
+        print(f"Error: {e}")
+        sys.exit(2)
+
     # Load all data
-    curriculum_data, vocab_data, homework_data, ai_data, teacher_data, peer_data, phrase_data = load_all_data()
-    
-    if not curriculum_data:
+    store = load_all_data()
+
+    if not store.curriculum:
         print("Failed to load curriculum data. Exiting.")
         return
 
     # Load Template (Week_1_Lesson_Plan.html)
-    with open('canonical/pdf-base/Week_01.html', 'r', encoding='utf-8') as f:
+    with open(TEMPLATE_PATH, 'r', encoding='utf-8') as f:
         template_html = f.read()
 
-    success_count = 0
-    errors = []
+    if args.check_renderer:
+        backend = html_backend.get_backend()
+        mismatched = compare_renders(store,
+                                     ('soup', make_renderer('soup', template_html), backend),
+                                     ('compiled', make_renderer('compiled', template_html), backend),
+                                     weeks)
+        if mismatched:
+            print(f"Renderers differ for weeks: {mismatched}")
+            sys.exit(1)
+        print("Renderers agree byte-for-byte on every week.")
+        return
 
-    for week_number in range(1, 41):
-        try:
-            print(f"--- Generating Week {week_number} ---")
-            
-            # Get data
-            week_curriculum, week_vocab, week_homework = get_week_data(week_number, curriculum_data, vocab_data, homework_data)
-            week_teacher_content = teacher_data.get(str(week_number), {})
-            
-            # Get Peer Data for this week
-            week_peer_data = next((item for item in peer_data if item.get("week") == week_number), None)
+    if args.check_parser:
+        with html_backend.using(html_backend.DEFAULT_BACKEND):
+            reference = make_renderer(args.renderer, template_html)
+        with html_backend.using(args.check_parser):
+            candidate = make_renderer(args.renderer, template_html)
+        mismatched = compare_renders(store,
+                                     (html_backend.DEFAULT_BACKEND, reference, html_backend.DEFAULT_BACKEND),
+                                     (args.check_parser, candidate, args.check_parser),
+                                     weeks)
+        if mismatched:
+            print(f"{args.check_parser} differs from {html_backend.DEFAULT_BACKEND} for weeks: {mismatched}")
+            sys.exit(1)
+        print(f"{args.check_parser} agrees byte-for-byte with {html_backend.DEFAULT_BACKEND} on every week.")
+        return
 
-            if not week_curriculum:
-                print(f"Skipping Week {week_number}: No curriculum data found.")
-                errors.append(week_number)
-                continue
+    if args.weeks:
+        print(f"Generating {len(weeks)} of 40 lesson plans (weeks {week_selection.to_spec(weeks)})...")
+    else:
+        print("Generating all 40 lesson plans...")
+    os.makedirs(args.out, exist_ok=True)
+    wall_t0 = time.perf_counter()
+
+    digest = build_digest(template_html)
+    previous = {} if args.force else load_manifest(args.out)
+
+    results = []
+    if args.jobs > 1:
+        # Workers finish out of order; pool.map hands results back in week
+        # order, so the log below reads the same as a serial run.
+        with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker,
+                                 initargs=(store, template_html, args.out, args.renderer,
+                                           digest, previous, args.parser)) as pool:
+            for result in pool.map(_generate_week_in_worker, weeks):
+                results.append(result)
+                print("\n".join(result[3]))
+    else:
+        render = make_renderer(args.renderer, template_html)
+        for week_number in weeks:
+            result = generate_week(week_number, store, render, args.out,
+                                   digest, previous.get(week_number))
+            results.append(result)
+            print("\n".join(result[3]))
 
-            # Reset soup
-            soup = BeautifulSoup(template_html, 'html.parser')
-            
-            # AI Content (Legacy/Fallback)
-            ai_content = ai_data.get(str(week_number), {})
-            
-            process_cover_page(soup, week_number, week_curriculum)
-            process_teacher_plan(soup, week_number, week_curriculum, week_teacher_content, phrase_data)
-            process_vocabulary(soup, week_number, week_vocab)
-            process_student_l1(soup, week_curriculum)
-            format_mind_maps(soup, week_curriculum, ai_content)
-            process_student_l2(soup, week_curriculum, ai_content, week_peer_data)
-            process_homework(soup, week_number, week_homework)
-            process_page_numbers(soup, week_number)  # cumulative; covers skipped
-            
-            # Save
-            output_filename = f'lessons/Week_{week_number:02d}.html'
-            with open(output_filename, 'w', encoding='utf-8') as f:
-                f.write(str(soup))
-                
-            print(f"Successfully generated {output_filename}")
-            success_count += 1
-            
-        except Exception as e:
-            print(f"❌ Error generating Week {week_number}: {e}")
-            import traceback
-            traceback.print_exc()
-            errors.append(week_number)
+    # Failed weeks drop out of the manifest so the next run retries them;
+    # weeks outside --weeks keep their entries from the last build.
+    hashes = {w: h for w, h in load_manifest(args.out).items() if w not in weeks}
+    hashes.update({r[0]: r[4] for r in results if r[1] in ('ok', 'unchanged')})
+    save_manifest(args.out, hashes)
+
+    success_count = sum(1 for r in results if r[1] in ('ok', 'unchanged'))
+    rebuilt_count = sum(1 for r in results if r[1] == 'ok')
+    errors = [r[0] for r in results if r[1] not in ('ok', 'unchanged')]
+
+    _print_timing_table(results)
 
     print("\n" + "="*30)
     print(f"Build Complete.")
-    print(f"Success: {success_count}/40")
+    print(f"Success: {success_count}/{len(weeks)} in {time.perf_counter() - wall_t0:.1f}s "
+          f"(jobs={args.jobs}, renderer={args.renderer}, parser={args.parser})")
+    print(f"Rebuilt: {rebuilt_count}, unchanged: {success_count - rebuilt_count}"
+          f"{' (--force)' if args.force else ''}")
     if errors:
         print(f"Failed Weeks: {errors}")
     else:
@@ -1257,4 +1459,4 @@ def main():
     print("="*30)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
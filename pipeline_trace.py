@@ -0,0 +1,189 @@
+"""Opt-in timeline tracing for the publish pipeline (Chrome trace format).
+
+Off by default, and a disabled span costs one flag check. Turn it on with
+either
+
+    IELTS_TRACE=out.json python scripts/publish.py
+    python scripts/publish.py --trace out.json     (also parse_data.py,
+                                                    make_interactive.py,
+                                                    upload_to_oss.py,
+                                                    batch_convert_pdf.py)
+
+and open out.json in https://ui.perfetto.dev or chrome://tracing: one row
+per process, with spans for every process_* pass in parse_data, every
+make_interactive rewrite (or insertion, when it falls back to the
+chain), every _smart_upload and every
+page render in batch_convert_pdf, each carrying its week number and byte
+sizes where they apply.
+
+One publish run is one trace. The process that turns tracing on owns the
+file: it exports IELTS_TRACE (plus IELTS_TRACE_OWNER) so sub-commands and
+--jobs workers append their events to the same file as JSON lines, and
+when it exits it rewrites the file as a {"traceEvents": [...]} document.
+Timestamps come from perf_counter, which is system-wide on Linux and
+Windows, so spans from different processes line up.
+
+Usage in code:
+  @pipeline_trace.traced                       # span per call, named after fn
+  def insertion_1_css(html): ...               # str in/out -> bytes_in/bytes_out
+
+  with pipeline_trace.scope(week=17):          # args inherited by nested spans
+      with pipeline_trace.span("render") as args:
+          html = render(...)
+          args["bytes"] = len(html)
+"""
+from __future__ import annotations
+
+import atexit
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+ENV_VAR = "IELTS_TRACE"
+_OWNER_ENV_VAR = "IELTS_TRACE_OWNER"
+
+_path = None          # trace file while tracing is on
+_fd = None
+_fd_pid = None        # pid that opened _fd / wrote the process_name record
+_fd_lock = threading.Lock()   # upload_to_oss.py traces from a thread pool
+_context = contextvars.ContextVar("pipeline_trace_context", default={})
+
+
+def enabled() -> bool:
+    return _path is not None
+
+
+def start(path) -> None:
+    """Turns tracing on for this process and everything it starts."""
+    global _path
+    if _path is not None:
+        return
+    _path = os.path.abspath(os.fspath(path))
+    owner = os.environ.get(_OWNER_ENV_VAR)
+    if owner is None or os.environ.get(ENV_VAR) != _path:
+        # First process of this run: truncate, export, finalize at exit.
+        with open(_path, "w", encoding="utf-8"):
+            pass
+        os.environ[ENV_VAR] = _path
+        os.environ[_OWNER_ENV_VAR] = str(os.getpid())
+        atexit.register(_finalize, os.getpid())
+
+
+def add_argument(ap) -> None:
+    """Adds `--trace FILE`; pass args.trace to start_from_args()."""
+    ap.add_argument("--trace", metavar="FILE",
+                    help=f"Write a Chrome/Perfetto trace of this run to FILE (or set ${ENV_VAR})")
+
+
+def start_from_args(trace_path) -> None:
+    if trace_path:
+        start(trace_path)
+
+
+def _emit(event: dict) -> None:
+    global _fd, _fd_pid
+    pid = os.getpid()
+    if _fd_pid != pid:  # first event in this process (or a forked worker)
+        with _fd_lock:
+            if _fd_pid != pid:
+                _fd = os.open(_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+                name = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "python"
+                _write_line({"name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+                             "args": {"name": f"{name} ({pid})"}})
+                _fd_pid = pid
+    _write_line(event)
+
+
+def _write_line(event: dict) -> None:
+    # One os.write per line on an O_APPEND fd: concurrent writers don't interleave.
+    os.write(_fd, (json.dumps(event, separators=(",", ":")) + "\n").encode("utf-8"))
+
+
+@contextlib.contextmanager
+def scope(**args):
+    """Args (e.g. week=17) added to every span opened inside the block."""
+    if _path is None:
+        yield
+        return
+    token = _context.set({**_context.get(), **args})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+@contextlib.contextmanager
+def span(name: str, cat: str = "pipeline", **args):
+    """Records a complete ('X') event around the block.
+
+    Yields the span's args dict; add to it inside the block (sizes, status).
+    """
+    if _path is None:
+        yield {}
+        return
+    merged = {**_context.get(), **args}
+    t0 = time.perf_counter_ns()
+    try:
+        yield merged
+    finally:
+        t1 = time.perf_counter_ns()
+        _emit({"name": name, "cat": cat, "ph": "X", "ts": t0 / 1000, "dur": (t1 - t0) / 1000,
+               "pid": os.getpid(), "tid": threading.get_native_id(), "args": merged})
+
+
+def traced(fn=None, *, name=None, args=None, result=None):
+    """Decorator: a span per call.
+
+    By default a str first argument is recorded as bytes_in and a str
+    return value as bytes_out. `args(*call_args, **kwargs)` and
+    `result(return_value)` return extra span args instead.
+    """
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            if _path is None:
+                return fn(*a, **kw)
+            extra = args(*a, **kw) if args else (
+                {"bytes_in": len(a[0].encode("utf-8"))} if a and isinstance(a[0], str) else {})
+            with span(label, **extra) as span_args:
+                value = fn(*a, **kw)
+                if result:
+                    span_args.update(result(value))
+                elif isinstance(value, str):
+                    span_args["bytes_out"] = len(value.encode("utf-8"))
+                return value
+        return wrapper
+    return decorate(fn) if fn is not None else decorate
+
+
+def _finalize(owner_pid: int) -> None:
+    """Owner process at exit: JSON lines -> {"traceEvents": [...]}."""
+    if os.getpid() != owner_pid or _path is None:
+        return
+    if _fd is not None and _fd_pid == owner_pid:
+        os.close(_fd)
+    events = []
+    with open(_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    pass  # a writer killed mid-line
+    tmp = _path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    os.replace(tmp, _path)
+    print(f"Trace: {len(events)} events -> {_path}", file=sys.stderr)
+
+
+if os.environ.get(ENV_VAR):
+    start(os.environ[ENV_VAR])
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Build-time Brotli/gzip variants of the text files we publish.
+
+The Interactive pages, index.html, pronunciations.json and the
+--external-assets CSS/JS went to OSS uncompressed, and OSS does not
+compress on the way out. This writes, next to each file:
+
+  NAME.br   Brotli, quality 11      (needs the brotli package; skipped without it)
+  NAME.gz   gzip, level 9, mtime 0  (same input, same bytes)
+
+Every variant is decompressed again and compared with the source before
+it is kept. A variant carries its source's mtime, so an up-to-date one is
+recognised by that and not recompressed on the next run.
+
+upload_to_oss.py uploads the smallest allowed variant under the plain
+name with a matching Content-Encoding header (best() / best_bytes()).
+
+Run:  python precompress.py                   # the default set below
+      python precompress.py Interactive/Week_01.html ...
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import os
+import sys
+from pathlib import Path
+from typing import Iterable
+
+try:
+    import brotli  # type: ignore
+    _HAVE_BROTLI = True
+except ImportError:
+    _HAVE_BROTLI = False
+
+REPO = Path(__file__).resolve().parent
+TEXT_EXTS = (".html", ".json", ".css", ".js", ".svg")
+SUFFIX = {"br": ".br", "gzip": ".gz"}
+
+
+def encodings() -> tuple[str, ...]:
+    """The Content-Encodings this install can produce, best first."""
+    return ("br", "gzip") if _HAVE_BROTLI else ("gzip",)
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11, mode=brotli.MODE_TEXT)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _decompress(data: bytes, encoding: str) -> bytes:
+    return brotli.decompress(data) if encoding == "br" else gzip.decompress(data)
+
+
+def compress_bytes(data: bytes, encoding: str) -> bytes:
+    """`data` compressed with `encoding`; raises ValueError if it doesn't round-trip."""
+    packed = _compress(data, encoding)
+    if _decompress(packed, encoding) != data:
+        raise ValueError(f"{encoding} round-trip mismatch")
+    return packed
+
+
+def variant_path(path: Path, encoding: str) -> Path:
+    return path.with_name(path.name + SUFFIX[encoding])
+
+
+def _fresh(variant: Path, src_stat: os.stat_result) -> bool:
+    try:
+        return variant.stat().st_mtime_ns == src_stat.st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def variants(path: Path) -> dict[str, Path]:
+    """{encoding: file} for `path`, (re)writing the variants that are stale."""
+    path = Path(path)
+    st = path.stat()
+    data = None
+    out = {}
+    for encoding in encodings():
+        variant = variant_path(path, encoding)
+        if not _fresh(variant, st):
+            if data is None:
+                data = path.read_bytes()
+            try:
+                packed = compress_bytes(data, encoding)
+            except ValueError as e:
+                raise ValueError(f"{path}: {e}") from None
+            tmp = variant.with_name(f".{variant.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(packed)
+            os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+            os.replace(tmp, variant)
+        out[encoding] = variant
+    return out
+
+
+def best(path: Path, allowed: Iterable[str]) -> tuple[Path, str | None]:
+    """The smallest of `path` and its allowed variants, with its encoding
+    (None: upload `path` as is). Non-text files are never compressed."""
+    path = Path(path)
+    allowed = set(allowed)
+    if not allowed or path.suffix.lower() not in TEXT_EXTS:
+        return path, None
+    choice, size = (path, None), path.stat().st_size
+    for encoding, variant in variants(path).items():
+        if encoding in allowed and variant.stat().st_size < size:
+            choice, size = (variant, encoding), variant.stat().st_size
+    return choice
+
+
+def best_bytes(data: bytes, allowed: Iterable[str]) -> tuple[bytes, str | None]:
+    """best() for a body built in memory (the admin page)."""
+    choice = (data, None)
+    for encoding in encodings():
+        if encoding in set(allowed):
+            packed = compress_bytes(data, encoding)
+            if len(packed) < len(choice[0]):
+                choice = (packed, encoding)
+    return choice
+
+
+def default_targets(repo: Path = REPO) -> list[Path]:
+    """Everything upload_to_oss.py sends that compresses."""
+    interactive = repo / "Interactive"
+    paths = sorted(interactive.glob("Week_*.html"))
+    assets = interactive / "assets"
+    if assets.is_dir():
+        paths += sorted(p for p in assets.iterdir() if p.is_file() and p.suffix in (".css", ".js"))
+    return paths + [p for p in (repo / "pronunciations.json", repo / "index.html") if p.exists()]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("paths", nargs="*", type=Path,
+                    help="Files to compress (default: Interactive pages and assets, "
+                         "pronunciations.json, index.html)")
+    args = ap.parse_args()
+    if not _HAVE_BROTLI:
+        print("note: brotli not installed (pip install brotli); writing .gz only", file=sys.stderr)
+
+    paths = args.paths or default_targets()
+    raw = packed = written = 0
+    for path in paths:
+        before = {e: _fresh(variant_path(path, e), path.stat()) for e in encodings()}
+        found = variants(path)
+        written += sum(not fresh for fresh in before.values())
+        raw += path.stat().st_size
+        packed += min(v.stat().st_size for v in found.values())
+    print(f"Precompressed {len(paths)} files ({written} variants written): "
+          f"{raw / 1e6:.1f} MB -> {packed / 1e6:.1f} MB ({', '.join(encodings())})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
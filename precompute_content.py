@@ -1,40 +1,8 @@
 import json
 import re
-from bs4 import BeautifulSoup
 
-def load_concatenated_json_robust(filepath):
-    """Robustly loads concatenated/messy JSON."""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except FileNotFoundError:
-        return []
-    
-    data = []
-    decoder = json.JSONDecoder()
-    pos = 0
-    length = len(content)
-    
-    while pos < length:
-        # Skip whitespace, commas, and stray closing brackets
-        while pos < length and (content[pos].isspace() or content[pos] in ',]'):
-            pos += 1
-            
-        if pos == length:
-            break
-            
-        try:
-            obj, end = decoder.raw_decode(content, idx=pos)
-            if isinstance(obj, list):
-                data.extend(obj)
-            else:
-                data.append(obj)
-            pos = end
-        except json.JSONDecodeError:
-            # Try to recover by skipping one char (if garbage)
-            pos += 1
-            
-    return data
+import json_loader
+from html_backend import parse_fragment
 
 def extract_keyword(text):
     # Logic from parse_data.py
@@ -66,8 +34,11 @@ def get_peer_questions(q_text, week_num):
     return {"b5": b5, "b6": b6}
 
 def main():
-    with open('curriculum.json', 'r', encoding='utf-8') as f:
-        curriculum = json.load(f)
+    # A missing input must not end in an empty ai_dynamic_content.json
+    # written over the generated one.
+    curriculum = json_loader.load_json('curriculum.json')
+    if curriculum is None:
+        raise SystemExit("Error: curriculum.json not found.")
     print(f"Loaded {len(curriculum)} weeks.")
     
     output = {}
@@ -79,7 +50,7 @@ def main():
         # Part 2 Keyword
         l1 = item.get('lesson_1_part_2', {})
         q1_html = l1.get('q1', {}).get('html', '')
-        q1_text = BeautifulSoup(q1_html, 'html.parser').get_text()
+        q1_text = parse_fragment(q1_html).get_text()
         keyword = extract_keyword(q1_text)
         
         # Part 3 Peer Questions
@@ -88,7 +59,7 @@ def main():
         for i in range(1, 7):
             q_data = l2.get(f'q{i}', {})
             q_html = q_data.get('html', '')
-            q_text = BeautifulSoup(q_html, 'html.parser').get_text()
+            q_text = parse_fragment(q_html).get_text()
             qs = get_peer_questions(q_text, week)
             peer_qs.append(qs)
             
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: per-row fragment parsing vs fragment_builder.
+
+Collects every vocab-table row and homework vocab row parse_data.py builds
+for the 40 weeks (real data), then times the two ways of getting each row
+into a tree and into text:
+
+  soup path      parse_fragment(row_html) + tr.append   vs  fb.to_soup + tr.extend
+  compiled path  parse_fragment(row_html).decode()      vs  fb.render
+
+`row_html` is the row's markup as the old f-string builders produced it
+(fb.render of the same cells), so both sides build identical rows — the
+script checks that before timing.
+
+Usage:
+  python scripts/bench_fragments.py
+  python scripts/bench_fragments.py --repeat 10
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+if hasattr(sys.stdout, "reconfigure"):
+    try:
+        sys.stdout.reconfigure(encoding="utf-8")
+    except Exception:
+        pass
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+
+import fragment_builder as fb  # noqa: E402
+import parse_data  # noqa: E402
+from html_backend import parse_document, parse_fragment  # noqa: E402
+
+
+def collect_rows(store) -> list:
+    rows = []
+    for week_number in parse_data.WEEKS:
+        week = store.week_inputs(week_number)
+        if week is None:
+            continue
+        for lesson in (1, 2):
+            rows.extend(cells for _, cells in parse_data._vocab_table_rows(week['vocab'], week_number, lesson))
+        rows.extend(parse_data._homework_vocab_rows(
+            week_number, week['homework'].get('vocab_review', [])))
+    return rows
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=5, help="Timing repeats; best is reported (default 5)")
+    args = ap.parse_args()
+
+    os.chdir(REPO)  # parse_data's data paths are relative to the repo root
+    store = parse_data.load_all_data()
+    rows = collect_rows(store)
+    row_htmls = [fb.render(cells) for cells in rows]
+    soup = parse_document("<table><tbody></tbody></table>")
+
+    def soup_parse():
+        out = []
+        for row_html in row_htmls:
+            tr = soup.new_tag('tr')
+            tr.append(parse_fragment(row_html))
+            out.append(tr)
+        return out
+
+    def soup_build():
+        out = []
+        for cells in rows:
+            tr = soup.new_tag('tr')
+            tr.extend(fb.to_soup(soup, cells))
+            out.append(tr)
+        return out
+
+    def text_parse():
+        return [parse_fragment(row_html).decode() for row_html in row_htmls]
+
+    def text_build():
+        return [fb.render(cells) for cells in rows]
+
+    if [tr.decode() for tr in soup_parse()] != [tr.decode() for tr in soup_build()]:
+        print("FATAL: fragment_builder rows differ from parsed rows")
+        return 1
+    if text_parse() != text_build():
+        print("FATAL: fragment_builder text differs from parsed text")
+        return 1
+
+    print(f"{len(rows)} rows (vocab + homework, 40 weeks), best of {args.repeat}\n")
+    print(f"{'path':<16}{'parse per row':>16}{'fragment_builder':>20}{'speedup':>10}")
+    for label, before, after in (("soup (tree)", soup_parse, soup_build),
+                                 ("compiled (text)", text_parse, text_build)):
+        t_before, t_after = _best(before, args.repeat), _best(after, args.repeat)
+        print(f"{label:<16}{len(rows) / t_before:>11,.0f} rows/s{len(rows) / t_after:>15,.0f} rows/s"
+              f"{t_before / t_after:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
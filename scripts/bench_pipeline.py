@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""Pipeline benchmark suite with a tracked JSON baseline.
+
+Times the hot paths of the build on stable fixtures — the canonical
+template (canonical/pdf-base/Week_01.html) and the real data files, all
+40 weeks:
+
+  parse_data.<process_*>        each pass of render_week, per week, on a fresh
+                                parse of the template (in render order, so
+                                every pass sees the soup it sees in a build)
+  parse_data.extract_cue_words  every Part 2 prompt (q1-q3) of every week
+  parse_data.extract_keyword    the same prompts' text
+  make_interactive.<insertion>  each insertion, in transform() order, on the
+                                40 pre-merge pages (the compiled renderer's
+                                output, so no lessons/ build is needed)
+  make_interactive.rewrite      all seven in one scan, on the same pages
+  upload_to_oss._smart_upload   the skip-unchanged decision for the 40
+                                Interactive pages against an in-memory fake
+                                bucket (half up to date, half missing)
+  upload_to_oss.upload_all.*    the 40 pages through the concurrent uploader
+                                (8 jobs) into local_oss.LocalBucket at 20 ms
+                                a request: `cold` into an empty bucket, `noop`
+                                a re-run with nothing changed
+
+Each case runs --repeat times; the best pass is recorded. Results are
+JSON ({"cases": {name: {"seconds", "ops"}}, "machine": ...}); the tracked
+baseline is scripts/bench_baseline.json.
+
+Usage:
+  python scripts/bench_pipeline.py run                   # print results
+  python scripts/bench_pipeline.py run --save            # ... and write them as the baseline
+  python scripts/bench_pipeline.py run --out new.json    # ... or to another file
+  python scripts/bench_pipeline.py compare               # run now, compare to the baseline
+  python scripts/bench_pipeline.py compare new.json      # compare a saved run instead
+  python scripts/bench_pipeline.py compare --threshold 0.5
+
+compare exits 1 when any case is slower than the baseline by more than
+--threshold (a fraction, default 0.25) and by more than --min-delta
+seconds (default 0.002 — keeps sub-millisecond cases out of the noise).
+Timings only compare meaningfully on the machine that wrote the baseline;
+compare says so when the machine fields differ.
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import gc
+import hashlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+if hasattr(sys.stdout, "reconfigure"):
+    try:
+        sys.stdout.reconfigure(encoding="utf-8")
+    except Exception:
+        pass
+
+REPO = Path(__file__).resolve().parent.parent
+SCRIPTS = REPO / "scripts"
+sys.path.insert(0, str(REPO))
+sys.path.insert(0, str(SCRIPTS))
+
+import make_interactive  # noqa: E402
+import parse_data  # noqa: E402
+import week_store  # noqa: E402
+from html_backend import parse_document  # noqa: E402
+
+try:
+    import oss2  # noqa: E402
+    import local_oss  # noqa: E402  (needs oss2)
+    import upload_to_oss  # noqa: E402
+except ImportError:
+    upload_to_oss = None
+
+BASELINE_PATH = SCRIPTS / "bench_baseline.json"
+RESULTS_VERSION = 1
+
+ENDPOINT = "https://bench.invalid"
+BUCKET_BASE = "https://bench.invalid/bucket"
+GATE_TITLE = "IELTS Speaking Course"
+UPLOAD_LATENCY = 0.02   # seconds per simulated OSS request
+UPLOAD_JOBS = 8
+
+# render_week's passes, in order: (name, call(soup, week_number, week))
+PROCESS_PASSES = (
+    ("process_cover_page", lambda s, n, w: parse_data.process_cover_page(s, n, w['curriculum'])),
+    ("process_teacher_plan", lambda s, n, w: parse_data.process_teacher_plan(
+        s, n, w['curriculum'], w['teacher'], w['phrase'])),
+    ("process_vocabulary", lambda s, n, w: parse_data.process_vocabulary(s, n, w['vocab'])),
+    ("process_student_l1", lambda s, n, w: parse_data.process_student_l1(s, w['curriculum'])),
+    ("format_mind_maps", lambda s, n, w: parse_data.format_mind_maps(s, w['curriculum'], w['ai'])),
+    ("process_student_l2", lambda s, n, w: parse_data.process_student_l2(
+        s, w['curriculum'], w['ai'], w['peer'])),
+    ("process_homework", lambda s, n, w: parse_data.process_homework(s, n, w['homework'])),
+    ("process_page_numbers", lambda s, n, w: parse_data.process_page_numbers(s, n)),
+)
+
+# transform()'s insertions, in order: (name, call(html, lesson_key))
+INSERTIONS = (
+    ("insertion_1_css", lambda h, k: make_interactive.insertion_1_css(h)),
+    ("insertion_2_draft_page", lambda h, k: make_interactive.insertion_2_draft_page(h)),
+    ("insertion_4_brainstorming_maps", lambda h, k: make_interactive.insertion_4_brainstorming_maps(h)),
+    ("insertion_5_q_writing", lambda h, k: make_interactive.insertion_5_q_writing(h)),
+    ("insertion_3_script", lambda h, k: make_interactive.insertion_3_script(h, ENDPOINT, BUCKET_BASE, k)),
+    ("insertion_6_body_class", lambda h, k: make_interactive.insertion_6_body_class(h)),
+    ("insertion_7_password_gate", lambda h, k: make_interactive.insertion_7_password_gate(
+        h, BUCKET_BASE, GATE_TITLE)),
+)
+
+
+class FakeBucket:
+    """Just enough of oss2.Bucket for _smart_upload: head_object + put_object_from_file."""
+
+    def __init__(self, objects: dict):
+        self.objects = dict(objects)  # key -> (md5, cache_control)
+
+    def head_object(self, key):
+        if key not in self.objects:
+            raise oss2.exceptions.NotFound(404, {}, b"", {})
+        md5, cc = self.objects[key]
+        return SimpleNamespace(etag=f'"{md5.upper()}"', headers={"Cache-Control": cc})
+
+    def put_object_from_file(self, key, filename, headers=None):
+        self.objects[key] = (hashlib.md5(Path(filename).read_bytes()).hexdigest(),
+                             (headers or {}).get("Cache-Control", ""))
+
+
+def _load_fixtures():
+    os.chdir(REPO)  # parse_data's data paths are relative to the repo root
+    store = week_store.load(verbose=False)
+    with open(parse_data.TEMPLATE_PATH, encoding="utf-8") as f:
+        template_html = f.read()
+    weeks = [(n, store.week_inputs(n)) for n in parse_data.WEEKS]
+    return template_html, [(n, w) for n, w in weeks if w is not None]
+
+
+def _bench_parse_data(template_html, weeks, repeat, cases):
+    best = {name: float("inf") for name, _ in PROCESS_PASSES}
+    for _ in range(repeat):
+        totals = dict.fromkeys(best, 0.0)
+        for week_number, week in weeks:
+            soup = parse_document(template_html)
+            for name, call in PROCESS_PASSES:
+                t0 = time.perf_counter()
+                call(soup, week_number, week)
+                totals[name] += time.perf_counter() - t0
+        for name, total in totals.items():
+            best[name] = min(best[name], total)
+    for name, _ in PROCESS_PASSES:
+        cases[f"parse_data.{name}"] = {"seconds": best[name], "ops": len(weeks)}
+
+    prompts = [w['curriculum'].get('lesson_1_part_2', {}).get(q, {}).get('html', '')
+               for _, w in weeks for q in ('q1', 'q2', 'q3')]
+    texts = [parse_document(p).get_text() for p in prompts]
+    for name, fn, inputs in (("extract_cue_words", parse_data.extract_cue_words, prompts),
+                             ("extract_keyword", parse_data.extract_keyword, texts)):
+        cases[f"parse_data.{name}"] = {"seconds": _best(lambda: [fn(x) for x in inputs], repeat),
+                                       "ops": len(inputs)}
+
+
+def _bench_make_interactive(pages, repeat, cases):
+    best = {name: float("inf") for name, _ in INSERTIONS}
+    for _ in range(repeat):
+        totals = dict.fromkeys(best, 0.0)
+        for week_number, html in pages:
+            key = f"Week_{week_number:02d}"
+            for name, call in INSERTIONS:
+                t0 = time.perf_counter()
+                html = call(html, key)
+                totals[name] += time.perf_counter() - t0
+        for name, total in totals.items():
+            best[name] = min(best[name], total)
+    for name, _ in INSERTIONS:
+        cases[f"make_interactive.{name}"] = {"seconds": best[name], "ops": len(pages)}
+
+    bundle = make_interactive.load_bundle()
+    inputs = [(html, f"Week_{week_number:02d}") for week_number, html in pages]
+
+    def rewrite_all():
+        for html, key in inputs:
+            make_interactive.rewrite(html, ENDPOINT, BUCKET_BASE, key, GATE_TITLE, bundle)
+
+    cases["make_interactive.rewrite"] = {"seconds": _best(rewrite_all, repeat), "ops": len(pages)}
+
+
+def _bench_upload(pages, repeat, cases):
+    if upload_to_oss is None:
+        print("note: oss2 not installed — skipping the upload planner case", file=sys.stderr)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for week_number, html in pages:
+            html = _transform(html, f"Week_{week_number:02d}")
+            path = Path(tmp) / f"Week_{week_number:02d}.html"
+            path.write_text(html, encoding="utf-8", newline="\n")
+            files.append(path)
+        cc = upload_to_oss.CACHE_CONTROL[".html"]
+        initial = {f.name: (hashlib.md5(f.read_bytes()).hexdigest(), cc) for f in files[::2]}
+
+        def plan():
+            bucket = FakeBucket(initial)
+            for f in files:
+                upload_to_oss._smart_upload(bucket, f.name, f, "Text/HTML; charset=utf-8")
+
+        cases["upload_to_oss._smart_upload"] = {"seconds": _best(plan, repeat), "ops": len(files)}
+
+        tasks = [upload_to_oss.UploadTask(f.name, f, "Text/HTML; charset=utf-8") for f in files]
+        runs = iter(range(1_000_000))
+
+        def publish(root):
+            bucket = local_oss.LocalBucket(root, latency=UPLOAD_LATENCY)
+            remote = upload_to_oss.RemoteIndex(bucket, "bench", path=root.with_suffix(".json"))
+            with contextlib.redirect_stdout(io.StringIO()):
+                upload_to_oss.upload_all(bucket, tasks, UPLOAD_JOBS, remote=remote)
+            remote.save()
+
+        cold = lambda: publish(Path(tmp) / f"bucket-{next(runs)}")
+        cases["upload_to_oss.upload_all.cold"] = {"seconds": _best(cold, repeat), "ops": len(files)}
+        publish(Path(tmp) / "bucket")
+        noop = lambda: publish(Path(tmp) / "bucket")
+        cases["upload_to_oss.upload_all.noop"] = {"seconds": _best(noop, repeat), "ops": len(files)}
+
+
+def _transform(html, key):
+    for _, call in INSERTIONS:
+        html = call(html, key)
+    return html
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _machine() -> dict:
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "processor": platform.machine(), "cpus": os.cpu_count()}
+
+
+def run(repeat: int) -> dict:
+    template_html, weeks = _load_fixtures()
+    cases = {}
+    # Like timeit: a collection landing inside one case's timer would be
+    # billed to whichever case happened to trigger it.
+    gc.collect()
+    gc.disable()
+    try:
+        _bench_parse_data(template_html, weeks, repeat, cases)
+        render = parse_data.make_renderer("compiled", template_html)
+        pages = [(n, render(n, w)) for n, w in weeks]
+        _bench_make_interactive(pages, repeat, cases)
+        _bench_upload(pages, repeat, cases)
+    finally:
+        gc.enable()
+    return {"version": RESULTS_VERSION,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "machine": _machine(), "repeat": repeat, "cases": cases}
+
+
+def print_results(results: dict) -> None:
+    print(f"{'case':<46}{'best total':>12}{'ops':>6}{'per op':>12}")
+    for name, case in results["cases"].items():
+        per_op = case["seconds"] / case["ops"] if case["ops"] else 0.0
+        print(f"{name:<46}{case['seconds'] * 1000:>10.2f}ms{case['ops']:>6}{per_op * 1e6:>10.1f}µs")
+
+
+def compare(baseline: dict, current: dict, threshold: float, min_delta: float) -> list:
+    """Prints a baseline-vs-current table; returns the names of regressed cases."""
+    if baseline.get("machine") != current.get("machine"):
+        print("note: baseline was recorded on a different machine/interpreter — "
+              "treat the comparison as indicative only")
+    regressions = []
+    print(f"{'case':<46}{'baseline':>11}{'current':>11}{'change':>9}")
+    for name in sorted(set(baseline["cases"]) | set(current["cases"])):
+        old, new = baseline["cases"].get(name), current["cases"].get(name)
+        if old is None or new is None:
+            print(f"{name:<46}{'—' if old is None else format(old['seconds'] * 1000, '9.2f') + 'ms':>11}"
+                  f"{'—' if new is None else format(new['seconds'] * 1000, '9.2f') + 'ms':>11}")
+            continue
+        change = (new["seconds"] - old["seconds"]) / old["seconds"] if old["seconds"] else 0.0
+        flag = ""
+        if change > threshold and new["seconds"] - old["seconds"] > min_delta:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<46}{old['seconds'] * 1000:>9.2f}ms{new['seconds'] * 1000:>9.2f}ms"
+              f"{change:>+8.0%}{flag}")
+    return regressions
+
+
+def _read(path: Path) -> dict:
+    with path.open(encoding="utf-8") as f:
+        results = json.load(f)
+    if results.get("version") != RESULTS_VERSION:
+        raise SystemExit(f"error: {path} is results version {results.get('version')}, "
+                         f"expected {RESULTS_VERSION} — re-run `run --save`")
+    return results
+
+
+def _write(path: Path, results: dict) -> None:
+    path.write_text(json.dumps(results, indent=1) + "\n", encoding="utf-8")
+    print(f"\nWrote {path}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+    run_p = sub.add_parser("run", help="Run the suite and print the results")
+    run_p.add_argument("--out", type=Path, help="Write the results JSON here")
+    run_p.add_argument("--save", action="store_true", help=f"Write the results as the baseline ({BASELINE_PATH.name})")
+    cmp_p = sub.add_parser("compare", help="Compare a run against the baseline")
+    cmp_p.add_argument("results", nargs="?", type=Path,
+                       help="Results JSON to compare (default: run the suite now)")
+    cmp_p.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    cmp_p.add_argument("--threshold", type=float, default=0.25,
+                       help="Allowed slowdown as a fraction of the baseline (default 0.25)")
+    cmp_p.add_argument("--min-delta", type=float, default=0.002,
+                       help="Ignore slowdowns smaller than this many seconds (default 0.002)")
+    for p in (run_p, cmp_p):
+        p.add_argument("--repeat", type=int, default=5, help="Timing repeats; best is kept (default 5)")
+    args = ap.parse_args()
+
+    if args.command == "run":
+        results = run(args.repeat)
+        print_results(results)
+        if args.out:
+            _write(args.out, results)
+        if args.save:
+            _write(BASELINE_PATH, results)
+        return 0
+
+    if not args.baseline.exists():
+        print(f"error: no baseline at {args.baseline} — create one with `run --save`", file=sys.stderr)
+        return 2
+    baseline = _read(args.baseline)
+    current = _read(args.results) if args.results else run(args.repeat)
+    regressions = compare(baseline, current, args.threshold, args.min_delta)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
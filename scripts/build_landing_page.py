@@ -21,12 +21,19 @@ from pathlib import Path
 
 REPO = Path(__file__).resolve().parents[1]
 FONT_DIR = REPO / "scripts" / "fonts"
+sys.path.insert(0, str(REPO))
+
+import font_subset  # noqa: E402
 
 WEEK_TAG_RE = re.compile(
     r'class="week-tag">\s*(?:Week\s+\d+\s*[•\-–—•]\s*Lesson\s+\d+\s*[•\-–—•]\s*)?([^<]+)<',
     re.IGNORECASE,
 )
 WEEK_NUM_RE = re.compile(r"Week_(\d+)\.html$")
+# The only elements set in Caveat (.hero h1, .week-num). The embedded font
+# is subset to exactly their characters.
+CAVEAT_TEXT_RE = re.compile(r'<h1>([^<]*)</h1>|<span class="week-num">([^<]*)</span>')
+_CAVEAT_FACE_SLOT = "/* caveat @font-face */"
 
 
 def extract_topic(html_text: str) -> str:
@@ -51,11 +58,13 @@ def collect_weeks() -> list[tuple[int, str]]:
     return weeks
 
 
-def caveat_b64() -> str:
+def caveat_b64(text: str | None = None) -> str:
+    """Caveat as base64 woff2; with `text`, subset to it (see font_subset.py)."""
     p = FONT_DIR / "Caveat-400.woff2"
     if not p.exists():
         return ""
-    return base64.b64encode(p.read_bytes()).decode("ascii")
+    data = p.read_bytes() if text is None else font_subset.subset_woff2(p, text)
+    return base64.b64encode(data).decode("ascii")
 
 
 def render_html(weeks: list[tuple[int, str]], bucket_base: str) -> str:
@@ -71,23 +80,15 @@ def render_html(weeks: list[tuple[int, str]], bucket_base: str) -> str:
             f'  </a>'
         )
     cards_html = "\n".join(cards)
-    caveat = caveat_b64()
-    caveat_face = (
-        f"@font-face {{\n"
-        f"  font-family: 'Caveat'; font-style: normal; font-weight: 400;\n"
-        f"  font-display: swap;\n"
-        f"  src: url(data:font/woff2;base64,{caveat}) format('woff2');\n"
-        f"}}\n"
-    ) if caveat else ""
 
-    return f"""<!DOCTYPE html>
+    doc = f"""<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="utf-8"/>
 <meta name="viewport" content="width=device-width, initial-scale=1.0"/>
 <title>IELTS 40-Week Speaking Class — Lesson Library</title>
 <style>
-  {caveat_face}
+  {_CAVEAT_FACE_SLOT}
 
   /* === Design tokens lifted from the lesson HTMLs === */
   :root {{
@@ -302,6 +303,17 @@ def render_html(weeks: list[tuple[int, str]], bucket_base: str) -> str:
 </html>
 """
 
+    caveat_text = "".join(html.unescape(a or b) for a, b in CAVEAT_TEXT_RE.findall(doc))
+    caveat = caveat_b64(caveat_text)
+    caveat_face = (
+        f"@font-face {{\n"
+        f"  font-family: 'Caveat'; font-style: normal; font-weight: 400;\n"
+        f"  font-display: swap;\n"
+        f"  src: url(data:font/woff2;base64,{caveat}) format('woff2');\n"
+        f"}}\n"
+    ) if caveat else ""
+    return doc.replace(_CAVEAT_FACE_SLOT, caveat_face, 1)
+
 
 def main() -> int:
     ap = argparse.ArgumentParser()
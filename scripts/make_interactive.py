@@ -8,7 +8,9 @@ Usage:
       --endpoint https://abc.fcapp.run \\
       --bucket-base http://8.168.22.242/storage/v1/object/public/ielts-interactive
 
-Idempotent — re-running with the same args overwrites the output. Originals
+Idempotent — re-running with the same args gives the same output, and files
+whose source and settings are unchanged are not rewritten at all (see
+.build_manifest.json under "Incremental bakes"; --force rebakes). Originals
 are NEVER modified; output always lands in --out.
 
 The script applies three insertions to each `Week_*.html`:
@@ -16,15 +18,44 @@ The script applies three insertions to each `Week_*.html`:
   2. Wraps the two `.draft-page` `<div class="lines">` elements in
      `<div class="lines-overlay-host">` along with the overlay UI snippets
   3. `<script>` block before `</body>` with build-time substitutions
+
+All seven insertions (see transform()) normally run as one scan of the page;
+`--check-rewriter` compares that against running them one by one and writes
+nothing.
+
+`--external-assets` writes the CSS, script and fonts once to <out>/assets/
+under content-hashed names (uploaded as immutable) and links them from
+each page instead of inlining them.
+
+The script is a small core plus lazily loaded modules (templates/lazy/:
+TTS player, correction diff, voice recorder) that the core fetches on
+first use; inline they ride along as inert text/plain blocks, with
+--external-assets they are assets/NAME.<hash>.js files.
+
+Every `<img src="images/NAME">` becomes a `<picture>` over resized
+AVIF/WebP/JPEG variants (image_variants.py; built once into .cache/images/
+and synced to <out>/images/ next to the originals). The root pages that
+print to PDF keep the original images. `--no-responsive-images` skips this.
+
+`--weeks 17,20-22` limits a folder run to those weeks (see week_selection.py);
+the other Interactive/Week_*.html files are left untouched. `--jobs N` bakes
+files in N worker processes; the report and exit code are the same as a
+serial run.
 """
 from __future__ import annotations
 
 import argparse
 import base64
+import concurrent.futures
+import functools
+import hashlib
+import json
+import os
 import re
 import sys
+import time
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, NamedTuple
 
 # Optional minification — saves ~40% on the JS+CSS bytes shipped per Week
 # HTML (~36 KB per file with current code). If rjsmin / rcssmin aren't
@@ -40,6 +71,14 @@ except ImportError:
 
 SENTINEL = "<!-- AI-INTERACTIVE-V1 -->"
 SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR.parent))
+
+import font_subset  # noqa: E402
+import image_sync  # noqa: E402
+import image_variants  # noqa: E402
+import pipeline_trace  # noqa: E402
+import week_selection  # noqa: E402
+
 TEMPLATE_DIR = SCRIPT_DIR / "templates"
 FONT_DIR = SCRIPT_DIR / "fonts"
 
@@ -48,13 +87,12 @@ class SkipFile(RuntimeError):
     """Raised when a single file's pattern-match fails — caller logs and continues."""
 
 
-def _files_to_process(in_path: Path) -> Iterable[Path]:
+def _files_to_process(in_path: Path, weeks=None) -> Iterable[Path]:
     if in_path.is_file():
         if re.fullmatch(r"Week_\d{2}\.html", in_path.name):
             yield in_path
         return
-    for p in sorted(in_path.glob("Week_*.html")):
-        yield p
+    yield from week_selection.filter_paths(sorted(in_path.glob("Week_*.html")), weeks)
 
 
 # ---------- Insertion 1: CSS block after the `.lines {}` rule ----------
@@ -65,29 +103,42 @@ LINES_RULE_RE = re.compile(
 )
 
 
+_FONTS = (
+    ("__CAVEAT_400_BASE64__", "Caveat-400.woff2"),
+    ("__INDIE_FLOWER_400_BASE64__", "IndieFlower-400.woff2"),
+)
+
+
+def _font_bytes(fname: str) -> bytes:
+    """The font as shipped: subset to font_subset.HANDWRITING_TEXT when fontTools is installed."""
+    path = FONT_DIR / fname
+    if not path.exists():
+        raise FileNotFoundError(
+            f"Font file missing: {path}. See scripts/fonts/ for expected files."
+        )
+    return font_subset.subset_woff2(path, font_subset.HANDWRITING_TEXT)
+
+
 def _load_fonts() -> dict[str, str]:
     """Return {placeholder_token: base64_woff2} for every embedded font."""
-    out: dict[str, str] = {}
-    for token, fname in (
-        ("__CAVEAT_400_BASE64__", "Caveat-400.woff2"),
-        ("__INDIE_FLOWER_400_BASE64__", "IndieFlower-400.woff2"),
-    ):
-        path = FONT_DIR / fname
-        if not path.exists():
-            raise FileNotFoundError(
-                f"Font file missing: {path}. See scripts/fonts/ for expected files."
-            )
-        out[token] = base64.b64encode(path.read_bytes()).decode("ascii")
-    return out
+    return {token: base64.b64encode(_font_bytes(fname)).decode("ascii") for token, fname in _FONTS}
 
 
-def _load_inserted_css(minify: bool = True) -> str:
+def _load_inserted_css(minify: bool = True, font_urls: dict[str, str] | None = None) -> str:
+    """The overlay CSS with its fonts inlined as base64, or with font_urls
+    ({placeholder_token: url}) referenced by URL instead."""
     css = (TEMPLATE_DIR / "inserted_css.css").read_text(encoding="utf-8")
-    fonts = _load_fonts()
-    for token, b64 in fonts.items():
+    if font_urls is None:
+        fonts = _load_fonts()
+    for token, _ in _FONTS:
         if token not in css:
             raise SkipFile(f"CSS template missing placeholder {token}.")
-        css = css.replace(token, b64, 1)
+        if font_urls is None:
+            css = css.replace(token, fonts[token], 1)
+        else:
+            css = css.replace(f"data:font/woff2;base64,{token}", font_urls[token], 1)
+            if token in css:
+                raise SkipFile(f"CSS template: {token} is not a data:font/woff2;base64 URL.")
     if minify and _HAVE_MINIFIERS:
         # Minify AFTER font substitution so the base64 strings are passed
         # through verbatim (cssmin treats data: URLs correctly).
@@ -95,9 +146,215 @@ def _load_inserted_css(minify: bool = True) -> str:
     return css
 
 
-def insertion_1_css(html: str, minify: bool = True) -> str:
-    css = _load_inserted_css(minify=minify)
-    block = f"\n    /* {SENTINEL} CSS */\n    {css}\n"
+# ---------- Asset bundle: templates + fonts, built once per run ----------
+#
+# Every insertion used to re-read its template for every file, so a run
+# base64-encoded both fonts, ran rcssmin over ~190 KB of CSS and rjsmin
+# over the 79 KB script forty times. The bundle holds everything that
+# doesn't depend on the lesson, built once and kept in memory for the run
+# and on disk under .cache/make_interactive/ keyed by the SHA-256 of every
+# template and font (plus the minify flag and minifier versions); editing
+# any of them rebuilds it. Per file, only the cheap substitutions are
+# left: __LESSON_KEY__, the endpoint/pronunciations URL and the gate's
+# URL/title.
+#
+# The script is minified with its __*__ placeholders still in place and
+# substituted afterwards. They sit inside string literals, which rjsmin
+# copies verbatim, so this is byte-identical to substituting first.
+#
+# The script is split: inserted_script.js is the core that runs at boot,
+# and the TTS player, the correction diff and the voice recorder are
+# modules under templates/lazy/ that the core loads on first use (see
+# "Lazy feature modules" in inserted_script.js). Inline, each module
+# follows the core as an inert <script type="text/plain"
+# data-ielts-module="NAME"> block, which the browser neither parses nor
+# runs until the core injects it. Only the core has placeholders.
+
+BUNDLE_VERSION = 3
+BUNDLE_CACHE_DIR = SCRIPT_DIR.parent / ".cache" / "make_interactive"
+_LAZY_MODULES = ("tts", "correct", "recorder")
+_BUNDLE_TEMPLATES = ("inserted_css.css", "inserted_script.js", "draft_section_overlay.html",
+                     "polished_section_overlay.html", "voice_recorder_widget_inline.html",
+                     "password_gate.html") + tuple(f"lazy/{name}.js" for name in _LAZY_MODULES)
+_BUNDLE_FONTS = tuple(fname for _, fname in _FONTS)
+
+
+class AssetBundle(NamedTuple):
+    css: str               # fonts inlined, minified
+    script: str            # minified, placeholders still in place
+    draft_overlay: str
+    polished_overlay: str
+    recorder_widget: str
+    gate_head: str         # __PWHASH_URL__ / __GATE_TITLE__ still in place
+    gate_body: str
+
+
+def _bundle_key(minify: bool) -> str:
+    h = hashlib.sha256(f"v{BUNDLE_VERSION}:minify={minify and _HAVE_MINIFIERS}".encode("utf-8"))
+    h.update(f":fonts={font_subset.signature(font_subset.HANDWRITING_TEXT)}".encode("utf-8"))
+    if minify and _HAVE_MINIFIERS:
+        h.update(f":rjsmin={rjsmin.__version__}:rcssmin={rcssmin.__version__}".encode("utf-8"))
+    for path in [TEMPLATE_DIR / n for n in _BUNDLE_TEMPLATES] + [FONT_DIR / n for n in _BUNDLE_FONTS]:
+        h.update(f"\0{path.name}\0".encode("utf-8"))
+        if path.exists():  # a missing font is reported by the build
+            h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def _script_parts(minify: bool) -> tuple[str, dict[str, str]]:
+    """The core script and the {name: source} of the lazy modules."""
+    core = (TEMPLATE_DIR / "inserted_script.js").read_text(encoding="utf-8")
+    modules = {name: (TEMPLATE_DIR / "lazy" / f"{name}.js").read_text(encoding="utf-8")
+               for name in _LAZY_MODULES}
+    for name, js in modules.items():
+        if "</script" in js.lower():
+            raise SkipFile(f"lazy/{name}.js must not contain '</script'.")
+    if minify and _HAVE_MINIFIERS:
+        # rjsmin is whitespace+comment minification only — it does NOT
+        # rename identifiers or reorder code, so it's safe for these
+        # IIFE-wrapped scripts that share only `window.__ielts.*`.
+        # Modern syntax (async/await, template literals, arrow functions)
+        # is preserved verbatim.
+        core = rjsmin.jsmin(core)
+        modules = {name: rjsmin.jsmin(js) for name, js in modules.items()}
+    return core, modules
+
+
+def _build_bundle(minify: bool) -> AssetBundle:
+    core, modules = _script_parts(minify)
+    # _script_block() wraps this in <script>…</script>, closing the last module.
+    js = core + "".join(f'\n</script>\n<script type="text/plain" data-ielts-module="{name}">\n{src}'
+                        for name, src in modules.items())
+    draft_overlay = _load_overlay("draft_section_overlay.html")
+    polished_overlay = _load_overlay("polished_section_overlay.html")
+    if "__ORIG_LINES__" not in draft_overlay:
+        raise SkipFile("draft_section_overlay.html missing __ORIG_LINES__ placeholder.")
+    if "__ORIG_LINES__" not in polished_overlay:
+        raise SkipFile("polished_section_overlay.html missing __ORIG_LINES__ placeholder.")
+    gate_head, gate_body = _split_password_gate()
+    return AssetBundle(
+        css=_load_inserted_css(minify=minify),
+        script=js,
+        draft_overlay=draft_overlay,
+        polished_overlay=polished_overlay,
+        recorder_widget=_load_overlay("voice_recorder_widget_inline.html"),
+        gate_head=gate_head,
+        gate_body=gate_body,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def load_bundle(minify: bool = True) -> AssetBundle:
+    """The run's AssetBundle: from .cache/ when its key matches, else built and saved."""
+    key = _bundle_key(minify)
+    path = BUNDLE_CACHE_DIR / f"bundle-{key[:16]}.json"
+    try:
+        cached = json.loads(path.read_text(encoding="utf-8"))
+        if cached.get("key") == key:
+            return AssetBundle(**cached["bundle"])
+    except (OSError, ValueError, TypeError, KeyError):
+        pass  # missing or unreadable cache → rebuild below
+    bundle = _build_bundle(minify)
+    try:
+        BUNDLE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"key": key, "bundle": bundle._asdict()}), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass  # read-only checkout: the in-memory bundle still serves this run
+    return bundle
+
+
+# ---------- External assets (--external-assets) ----------
+#
+# Inlined, the bundle is ~175 KB of every Interactive page (CSS with both
+# fonts as base64, the script, the gate), downloaded again with every page
+# and every 5 minutes (HTML is max-age=300). With --external-assets the CSS,
+# the script and the fonts go to <out>/assets/ under content-hashed names,
+# which upload_to_oss.py serves as immutable, and the page only links them:
+#
+#   insertion 1 closes the page's <style> after the `.lines {}` rule, adds
+#     the <link> and reopens it, so the overlay CSS keeps its place in the
+#     cascade;
+#   insertion 3 keeps a small inline <script> setting window.__ielts_build
+#     (the endpoint, pronunciations URL and lesson key, per page, and the
+#     URLs of the lazy modules) before the <script src> of the shared core
+#     script, which reads them from there.
+#
+# The gate and the recorder widgets stay inline: the gate must run before
+# first paint and the widgets are page markup. The insertions and
+# rewrite() are unchanged; only the bundle's css/script texts differ.
+
+ASSETS_DIR = "assets"
+_SCRIPT_VALUES = ("AI_ENDPOINT", "PRONUNCIATIONS_URL", "LESSON_KEY")
+
+
+def _hashed_name(name: str, data: bytes) -> str:
+    stem, ext = name.rsplit(".", 1)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}.{ext}"
+
+
+@functools.lru_cache(maxsize=None)
+def load_external_bundle(minify: bool = True) -> tuple[AssetBundle, dict[str, bytes]]:
+    """The bundle for --external-assets, and the {name: bytes} files for assets/."""
+    bundle = load_bundle(minify)
+    files: dict[str, bytes] = {}
+    font_urls = {}
+    for token, fname in _FONTS:
+        data = _font_bytes(fname)
+        font_urls[token] = _hashed_name(fname, data)  # relative to the CSS file
+        files[font_urls[token]] = data
+    css = _load_inserted_css(minify, font_urls).encode("utf-8")
+    css_name = _hashed_name("app.css", css)
+    files[css_name] = css
+
+    js, modules = _script_parts(minify)
+    for key in _SCRIPT_VALUES:
+        if js.count(f'"__{key}__"') != 1:
+            raise SkipFile(f'inserted_script.js must contain "__{key}__" exactly once.')
+        js = js.replace(f'"__{key}__"', f"window.__ielts_build.{key}")
+    js_bytes = js.encode("utf-8")
+    js_name = _hashed_name("app.js", js_bytes)
+    files[js_name] = js_bytes
+    module_urls = {}
+    for name, src in modules.items():
+        data = src.encode("utf-8")
+        module_urls[name] = f"{ASSETS_DIR}/{_hashed_name(f'{name}.js', data)}"
+        files[module_urls[name][len(ASSETS_DIR) + 1:]] = data
+
+    build_values = ", ".join([f'{key}: "__{key}__"' for key in _SCRIPT_VALUES]
+                             + [f"MODULES: {json.dumps(module_urls)}"])
+    return bundle._replace(
+        css=f'</style>\n<link rel="stylesheet" href="{ASSETS_DIR}/{css_name}">\n<style>',
+        script=(f"window.__ielts_build = {{{build_values}}};\n</script>\n"
+                f'<script src="{ASSETS_DIR}/{js_name}">'),
+    ), files
+
+
+def _bundle_for(minify: bool, external: bool) -> AssetBundle:
+    return load_external_bundle(minify)[0] if external else load_bundle(minify)
+
+
+def write_external_assets(dst: Path, minify: bool = True) -> int:
+    """Writes the --external-assets files to dst/assets/; returns how many changed."""
+    out = dst / ASSETS_DIR
+    out.mkdir(parents=True, exist_ok=True)
+    written = 0
+    for name, data in load_external_bundle(minify)[1].items():
+        path = out / name
+        if not path.exists() or path.read_bytes() != data:
+            path.write_bytes(data)
+            written += 1
+    return written
+
+
+def _css_block(css: str) -> str:
+    return f"\n    /* {SENTINEL} CSS */\n    {css}\n"
+
+
+@pipeline_trace.traced
+def insertion_1_css(html: str, minify: bool = True, bundle: AssetBundle | None = None) -> str:
+    block = _css_block((bundle or load_bundle(minify)).css)
     # Capture the matched rule as a closure variable so the replacement is a
     # plain string concatenation, not a regex template (avoids back-reference
     # interpretation of `\s` etc. inside the embedded base64 fonts).
@@ -123,7 +380,12 @@ def _load_overlay(name: str) -> str:
     return (TEMPLATE_DIR / name).read_text(encoding="utf-8")
 
 
-def insertion_2_draft_page(html: str) -> str:
+def _overlay_section(label: str, lines_div: str, overlay: str) -> str:
+    return f"{label}\n{overlay.replace('__ORIG_LINES__', lines_div, 1)}"
+
+
+@pipeline_trace.traced
+def insertion_2_draft_page(html: str, bundle: AssetBundle | None = None) -> str:
     """Augment the .draft-page Draft and Polished Rewrite sections in place.
 
     Per spec §6.2: the original `<div class="lines">` is KEPT in HTML so the
@@ -137,20 +399,14 @@ def insertion_2_draft_page(html: str) -> str:
     button-row sit OUTSIDE the lines area (next to the `<strong>Draft:</strong>`
     heading) while the original `.lines` stays in the markup.
     """
-    draft_overlay = _load_overlay("draft_section_overlay.html")
-    polished_overlay = _load_overlay("polished_section_overlay.html")
-    if "__ORIG_LINES__" not in draft_overlay:
-        raise SkipFile("draft_section_overlay.html missing __ORIG_LINES__ placeholder.")
-    if "__ORIG_LINES__" not in polished_overlay:
-        raise SkipFile("polished_section_overlay.html missing __ORIG_LINES__ placeholder.")
+    bundle = bundle or load_bundle()
+    draft_overlay, polished_overlay = bundle.draft_overlay, bundle.polished_overlay
 
     def wrap_draft(m: re.Match) -> str:
-        label, lines_div = m.group(1), m.group(2)
-        return f"{label}\n{draft_overlay.replace('__ORIG_LINES__', lines_div, 1)}"
+        return _overlay_section(m.group(1), m.group(2), draft_overlay)
 
     def wrap_polished(m: re.Match) -> str:
-        label, lines_div = m.group(1), m.group(2)
-        return f"{label}\n{polished_overlay.replace('__ORIG_LINES__', lines_div, 1)}"
+        return _overlay_section(m.group(1), m.group(2), polished_overlay)
 
     new_html, c1 = DRAFT_LINES_RE.subn(wrap_draft, html, count=1)
     if c1 != 1:
@@ -166,21 +422,18 @@ def insertion_2_draft_page(html: str) -> str:
 BODY_CLOSE_RE = re.compile(r"</body>", re.IGNORECASE)
 
 
-def insertion_3_script(html: str, endpoint: str, bucket_base: str, lesson_key: str,
-                       minify: bool = True) -> str:
-    js = (TEMPLATE_DIR / "inserted_script.js").read_text(encoding="utf-8")
+def _script_block(js: str, endpoint: str, bucket_base: str, lesson_key: str) -> str:
     pron_url = bucket_base.rstrip("/") + "/pronunciations.json"
     js = js.replace("__AI_ENDPOINT__", endpoint.rstrip("/"))
     js = js.replace("__PRONUNCIATIONS_URL__", pron_url)
     js = js.replace("__LESSON_KEY__", lesson_key)
-    if minify and _HAVE_MINIFIERS:
-        # rjsmin is whitespace+comment minification only — it does NOT
-        # rename identifiers or reorder code, so it's safe for this
-        # IIFE-wrapped script that exposes only `window.__ielts.*` from
-        # the outside. Modern syntax (async/await, template literals,
-        # arrow functions) is preserved verbatim.
-        js = rjsmin.jsmin(js)
-    block = f"\n<script>\n/* {SENTINEL} SCRIPT */\n{js}\n</script>\n"
+    return f"\n<script>\n/* {SENTINEL} SCRIPT */\n{js}\n</script>\n"
+
+
+@pipeline_trace.traced
+def insertion_3_script(html: str, endpoint: str, bucket_base: str, lesson_key: str,
+                       minify: bool = True, bundle: AssetBundle | None = None) -> str:
+    block = _script_block((bundle or load_bundle(minify)).script, endpoint, bucket_base, lesson_key)
     # Use a callable replacement so Python doesn't interpret JS regex escapes
     # (e.g. `/\s+/` inside the script) as back-references.
     replacement = block + "</body>"
@@ -211,7 +464,15 @@ SPIDER_CONTAINER_OPEN_RE = re.compile(
 )
 
 
-def insertion_4_brainstorming_maps(html: str) -> str:
+_LEG_EDITABLE = ' contenteditable="plaintext-only"'
+
+
+def _map_recorder(inline_template: str, n: int) -> str:
+    return inline_template.replace("__RECORDER_ID__", f"map-{n}", 1) + "\n"
+
+
+@pipeline_trace.traced
+def insertion_4_brainstorming_maps(html: str, bundle: AssetBundle | None = None) -> str:
     """Make spider-legs contenteditable + add a unique recorder per spider-container."""
     # Idempotency check: look for the actual SPIDER-LEG markup with the
     # contenteditable attribute applied — NOT just the bare attribute string,
@@ -222,7 +483,7 @@ def insertion_4_brainstorming_maps(html: str) -> str:
 
     # 1. spider-leg → contenteditable
     new_html, leg_count = SPIDER_LEG_OPEN_RE.subn(
-        lambda m: m.group(1) + ' contenteditable="plaintext-only"' + m.group(2),
+        lambda m: m.group(1) + _LEG_EDITABLE + m.group(2),
         html,
     )
     if leg_count == 0:
@@ -230,17 +491,15 @@ def insertion_4_brainstorming_maps(html: str) -> str:
         return html
 
     # 2. spider-container → inject recorder widget with unique recorder-id
-    inline_template = (TEMPLATE_DIR / "voice_recorder_widget_inline.html").read_text(encoding="utf-8")
+    inline_template = (bundle or load_bundle()).recorder_widget
     map_counter = {"n": 0}
 
     def inject_map_recorder(m: re.Match) -> str:
         map_counter["n"] += 1
-        recorder_id = f"map-{map_counter['n']}"
-        widget = inline_template.replace("__RECORDER_ID__", recorder_id, 1)
         # Inject BEFORE the spider-container opening tag so the recorder is a
         # sibling (anchored to the parent card's top-right via CSS), NOT a
         # child of the fixed-aspect spider grid which would clip it.
-        return widget + "\n" + m.group(1)
+        return _map_recorder(inline_template, map_counter["n"]) + m.group(1)
 
     new_html, _ = SPIDER_CONTAINER_OPEN_RE.subn(inject_map_recorder, new_html)
     return new_html
@@ -267,7 +526,24 @@ Q_WRITE_RE = re.compile(
 )
 
 
-def insertion_5_q_writing(html: str) -> str:
+def _q_write_host(inline_template: str, n: str, orig_lines: str) -> str:
+    recorder_id = f"q{n}"
+    recorder = inline_template.replace("__RECORDER_ID__", recorder_id, 1)
+    # Recorder is a SIBLING of .q-write-host (both children of the green
+    # writing-window card) so the textarea can fill .q-write-host without
+    # clashing with the recorder's bottom-right anchor.
+    return (
+        f'<div class="q-write-host">\n'
+        f'  <textarea class="q-write-textarea" data-q-id="{recorder_id}" '
+        f'spellcheck="false"></textarea>\n'
+        f'  {orig_lines}\n'
+        f'</div>\n'
+        f'{recorder}'
+    )
+
+
+@pipeline_trace.traced
+def insertion_5_q_writing(html: str, bundle: AssetBundle | None = None) -> str:
     """Convert each Q1-Q6 .lines div into a textarea+recorder-host."""
     # Idempotency check: look for an actual <div class="q-write-host"> in the
     # body — NOT the bare class name, which also appears in the injected CSS
@@ -275,27 +551,12 @@ def insertion_5_q_writing(html: str) -> str:
     if '<div class="q-write-host">' in html:
         return html
 
-    inline_template = (TEMPLATE_DIR / "voice_recorder_widget_inline.html").read_text(encoding="utf-8")
+    inline_template = (bundle or load_bundle()).recorder_widget
 
     def wrap(m: re.Match) -> str:
         head = m.group(1)
-        n = m.group(2)
         between = m.group(3)
-        orig_lines = m.group(4)
-        recorder_id = f"q{n}"
-        recorder = inline_template.replace("__RECORDER_ID__", recorder_id, 1)
-        # Recorder is a SIBLING of .q-write-host (both children of the green
-        # writing-window card) so the textarea can fill .q-write-host without
-        # clashing with the recorder's bottom-right anchor.
-        host = (
-            f'<div class="q-write-host">\n'
-            f'  <textarea class="q-write-textarea" data-q-id="{recorder_id}" '
-            f'spellcheck="false"></textarea>\n'
-            f'  {orig_lines}\n'
-            f'</div>\n'
-            f'{recorder}'
-        )
-        return f'{head}{between}{host}'
+        return f'{head}{between}{_q_write_host(inline_template, m.group(2), m.group(4))}'
 
     new_html, count = Q_WRITE_RE.subn(wrap, html)
     return new_html
@@ -335,8 +596,8 @@ _PWGATE_BODY_RE = re.compile(
 )
 
 
-def _load_password_gate_chunks(pwhash_url: str, gate_title: str) -> tuple[str, str]:
-    """Read password_gate.html, split into HEAD + BODY chunks, substitute tokens."""
+def _split_password_gate() -> tuple[str, str]:
+    """Read password_gate.html and split it into its HEAD + BODY chunks."""
     template = (TEMPLATE_DIR / "password_gate.html").read_text(encoding="utf-8")
 
     head_m = _PWGATE_HEAD_RE.search(template)
@@ -346,9 +607,15 @@ def _load_password_gate_chunks(pwhash_url: str, gate_title: str) -> tuple[str, s
             "password_gate.html is missing PWGATE_HEAD_BEGIN/END or "
             "PWGATE_BODY_BEGIN/END delimiter comments."
         )
+    return head_m.group(1), body_m.group(1)
+
 
-    head_chunk = head_m.group(1)
-    body_chunk = body_m.group(1)
+def _load_password_gate_chunks(pwhash_url: str, gate_title: str,
+                               bundle: AssetBundle | None = None) -> tuple[str, str]:
+    """The bundle's HEAD + BODY gate chunks with the URL and title substituted."""
+    bundle = bundle or load_bundle()
+    head_chunk = bundle.gate_head
+    body_chunk = bundle.gate_body
 
     for chunk in (head_chunk, body_chunk):
         # Cheap defensive escaping: gate_title is rendered into HTML, never
@@ -367,7 +634,17 @@ def _load_password_gate_chunks(pwhash_url: str, gate_title: str) -> tuple[str, s
     return head_chunk.strip() + "\n", body_chunk.strip() + "\n"
 
 
-def insertion_7_password_gate(html: str, bucket_base: str, gate_title: str) -> str:
+def _gate_head_block(head_chunk: str) -> str:
+    return f"\n<!-- pwgate (head) -->\n{head_chunk}"
+
+
+def _gate_body_block(body_chunk: str) -> str:
+    return f"\n<!-- pwgate (body) -->\n{body_chunk}"
+
+
+@pipeline_trace.traced
+def insertion_7_password_gate(html: str, bucket_base: str, gate_title: str,
+                              bundle: AssetBundle | None = None) -> str:
     """Inject the rotating-password gate's HEAD chunk before </head> and BODY
     chunk immediately after the <body ...> opening tag. Idempotent — skips if
     already inserted (detected by the gate's stable element id)."""
@@ -378,11 +655,11 @@ def insertion_7_password_gate(html: str, bucket_base: str, gate_title: str) -> s
         return html
 
     pwhash_url = bucket_base.rstrip("/") + "/_pwhash.json"
-    head_chunk, body_chunk = _load_password_gate_chunks(pwhash_url, gate_title)
+    head_chunk, body_chunk = _load_password_gate_chunks(pwhash_url, gate_title, bundle)
 
     # Insert head chunk just before </head>.
     new_html, head_count = HEAD_CLOSE_RE.subn(
-        lambda _m: f"\n<!-- pwgate (head) -->\n{head_chunk}</head>",
+        lambda _m: _gate_head_block(head_chunk) + "</head>",
         html, count=1,
     )
     if head_count != 1:
@@ -391,7 +668,7 @@ def insertion_7_password_gate(html: str, bucket_base: str, gate_title: str) -> s
     # Insert body chunk immediately after the real <body ...> opening tag
     # (the one that follows </head>, not any CSS-comment ghost match).
     new_html, body_count = HEAD_TO_BODY_RE.subn(
-        lambda m: m.group(1) + f"\n<!-- pwgate (body) -->\n{body_chunk}",
+        lambda m: m.group(1) + _gate_body_block(body_chunk),
         new_html, count=1,
     )
     if body_count != 1:
@@ -403,6 +680,7 @@ def insertion_7_password_gate(html: str, bucket_base: str, gate_title: str) -> s
 _BODY_CLASS_RE = re.compile(r'<body\b([^>]*)>', re.IGNORECASE)
 
 
+@pipeline_trace.traced
 def insertion_6_body_class(html: str) -> str:
     """Add `is-interactive` to <body class="..."> so interactive-only CSS
     rules (e.g. `.email-recordings-btn` visibility) can target the
@@ -412,9 +690,16 @@ def insertion_6_body_class(html: str) -> str:
     m = _BODY_CLASS_RE.search(html)
     if not m:
         return html
-    attrs = m.group(1)
-    if 'is-interactive' in attrs:
+    new_tag = _interactive_body_tag(m.group(1))
+    if new_tag is None:
         return html  # already added
+    return html[:m.start()] + new_tag + html[m.end():]
+
+
+def _interactive_body_tag(attrs: str) -> str | None:
+    """`<body{attrs}>` with is-interactive added, or None if it's already there."""
+    if 'is-interactive' in attrs:
+        return None
     if re.search(r'\bclass\s*=', attrs, re.IGNORECASE):
         # Append to existing class list
         new_attrs = re.sub(
@@ -431,22 +716,301 @@ def insertion_6_body_class(html: str) -> str:
             )
     else:
         new_attrs = attrs + ' class="is-interactive"'
-    return html[:m.start()] + f'<body{new_attrs}>' + html[m.end():]
+    return f'<body{new_attrs}>'
+
+
+# ---------- Single-pass rewriter ----------
+#
+# The seven insertions above each scan and copy the whole page (200-390 KB),
+# and Q_WRITE_RE's DOTALL span rescans large regions. rewrite() finds every
+# anchor they use in ONE left-to-right scan of the original page and splices
+# all the edits in a single join. The insertion functions stay the reference:
+# rewrite() returns None whenever it can't guarantee the chain's exact bytes
+# (page already interactive, anchors missing or nested inside other anchors,
+# anchors inside the inserted assets — e.g. the --no-minify CSS comment
+# quoted at HEAD_TO_BODY_RE), and transform() then runs the chain.
+# `make_interactive.py --check-rewriter` diffs the two paths per file.
+
+# kind -> (first character, rest of the pattern, number of "<" in a
+# well-formed match). Every alternative starting with a plain character
+# lets `re` skip straight to the next "." or "<" instead of trying all of
+# them at every offset (~50x faster here). The "<" count catches anchors
+# hidden inside another anchor's attributes, which the scan would consume
+# but the chain's independent searches would still find.
+_SCAN_TOKENS = {
+    "rule": (".", r"lines\s*\{[^}]*\}", 0),
+    "draft": ("<", r'(?i:(?P<draft_label>strong>Draft:</strong>)\s*'
+                   r'(?P<draft_lines><div class="lines"[^>]*></div>))', 4),
+    "polished": ("<", r'(?i:(?P<polished_label>strong>Polished Rewrite:</strong>)\s*'
+                      r'(?P<polished_lines><div class="lines"[^>]*></div>))', 4),
+    "leg": ("<", r'div class="spider-leg"(?=[\s>])', 1),
+    "container": ("<", r'div class="spider-container"[^>]*>', 1),
+    "q": ("<", r"h3[^>]*>Q(?P<qn>\d+):", 1),
+    "lines": ("<", r'div class="lines"[^>]*></div>', 2),
+    # Before head_close so a `</head>` that opens the body is taken whole.
+    "head_body": ("<", r"(?i:/head>\s*(?P<hb_tag><body\b(?P<hb_attrs>[^>]*)>))", 2),
+    "head_close": ("<", r"(?i:/head>)", 1),
+    "body_open": ("<", r"(?i:body\b(?P<bo_attrs>[^>]*)>)", 1),
+    "body_close": ("<", r"(?i:/body>)", 1),
+}
+# Only the first match of these is edited; they leave the scan once found.
+_FIRST_ONLY = {"rule", "draft", "polished", "head_body", "head_close", "body_open", "body_close"}
+# Markers of an already-interactive page (the idempotency checks in insertions 4, 5, 7).
+_DONE_MARKERS = ('<div class="q-write-host">', 'id="aischool-pwgate', "contenteditable")
+# The same for inserted assets; the CSS legitimately mentions contenteditable.
+_ASSET_MARKERS = ('<div class="q-write-host">', 'id="aischool-pwgate', '<div class="spider-leg"')
+
+
+@functools.lru_cache(maxsize=None)
+def _scanner(kinds: frozenset) -> re.Pattern:
+    return re.compile("|".join(f"{re.escape(lead)}(?P<{kind}>{rest})"
+                               for kind, (lead, rest, _) in _SCAN_TOKENS.items() if kind in kinds))
+
+
+def _inert(text: str, kinds) -> bool:
+    return (_scanner(frozenset(kinds)).search(text) is None
+            and not any(marker in text for marker in _ASSET_MARKERS))
+
+
+@functools.lru_cache(maxsize=8)
+def _bundle_inert(bundle: AssetBundle) -> bool:
+    """No later insertion's anchor occurs in any asset an earlier one inserts."""
+    after_css = set(_SCAN_TOKENS) - {"rule"}
+    return (all(_inert(text, after_css) for text in
+                (bundle.css, bundle.draft_overlay, bundle.polished_overlay, bundle.recorder_widget))
+            and _inert(bundle.script, ("head_body", "head_close", "body_open"))
+            and _scanner(frozenset({"head_body"})).search(bundle.gate_head) is None)
+
+
+def rewrite(html: str, endpoint: str, bucket_base: str, lesson_key: str,
+            gate_title: str, bundle: AssetBundle) -> str | None:
+    """transform()'s seven insertions in one scan, or None to use the chain."""
+    if any(marker in html for marker in _DONE_MARKERS) or not _bundle_inert(bundle):
+        return None
+    if any(c in value for value in (endpoint, bucket_base, lesson_key) for c in "<>"):
+        return None  # substituted into the script/gate, so could form an anchor there
+
+    edits: list[tuple[int, int, str]] = []   # (start, end, replacement)
+    maps: list[int] = []                     # spider-container starts
+    first: dict[str, re.Match] = {}
+    body_tag = None                          # (start, end, attrs) of the first <body>
+    head_close = None                        # start of the first </head>
+    q_pending = None                         # QN heading still waiting for its .lines
+    legs = 0
+
+    kinds = set(_SCAN_TOKENS)
+    scan = _scanner(frozenset(kinds))
+    pos = 0
+    while (m := scan.search(html, pos)) is not None:
+        kind, text = m.lastgroup, m.group()
+        pos = m.end()
+        if text.count("<") != _SCAN_TOKENS[kind][2]:
+            return None
+        if "rule" not in first and kind != "rule" and ".lines" in text:
+            return None
+        if kind in _FIRST_ONLY:
+            first[kind] = m
+            kinds.discard(kind)
+            scan = _scanner(frozenset(kinds))
+
+        if kind == "rule":
+            edits.append((m.start(), pos, text + _css_block(bundle.css)))
+        elif kind in ("draft", "polished"):
+            if q_pending is not None:
+                return None  # the chain would wrap this .lines as a Q box after overlaying it
+            overlay = bundle.draft_overlay if kind == "draft" else bundle.polished_overlay
+            label = html[m.start():m.end(f"{kind}_label")]
+            edits.append((m.start(), pos, _overlay_section(label, m.group(f"{kind}_lines"), overlay)))
+        elif kind == "leg":
+            legs += 1
+            edits.append((m.start(), pos, text + _LEG_EDITABLE))
+        elif kind == "container":
+            maps.append(m.start())
+        elif kind == "q":
+            if q_pending is None:
+                q_pending = m.group("qn")
+        elif kind == "lines":
+            if q_pending is not None:
+                edits.append((m.start(), pos, _q_write_host(bundle.recorder_widget, q_pending, text)))
+                q_pending = None
+        elif kind == "head_body":
+            if head_close is None:
+                head_close = m.start()
+                kinds.discard("head_close")
+                scan = _scanner(frozenset(kinds))
+            if body_tag is None:
+                body_tag = (m.start("hb_tag"), pos, m.group("hb_attrs"))
+                kinds.discard("body_open")
+                scan = _scanner(frozenset(kinds))
+        elif kind == "head_close":
+            head_close = m.start()
+        elif kind == "body_open":
+            body_tag = (m.start(), pos, m.group("bo_attrs"))
+        elif kind == "body_close":
+            edits.append((m.start(), m.start(),
+                          _script_block(bundle.script, endpoint, bucket_base, lesson_key)))
+
+    if not {"rule", "draft", "polished", "body_close", "head_body"} <= first.keys():
+        return None  # the chain raises the matching SkipFile
+
+    if legs:
+        widget = bundle.recorder_widget
+        edits.extend((start, start, _map_recorder(widget, n)) for n, start in enumerate(maps, 1))
+
+    pwhash_url = bucket_base.rstrip("/") + "/_pwhash.json"
+    head_chunk, body_chunk = _load_password_gate_chunks(pwhash_url, gate_title, bundle)
+    edits.append((head_close, head_close, _gate_head_block(head_chunk)))
+
+    # Insertion 6 rewrites the first <body>; insertion 7 appends after the one
+    # following </head>. Usually that is the same tag: one edit for both.
+    start, end, attrs = body_tag
+    new_tag = _interactive_body_tag(attrs) or html[start:end]
+    gate_tag = first["head_body"]
+    if start == gate_tag.start("hb_tag"):
+        edits.append((start, end, new_tag + _gate_body_block(body_chunk)))
+    else:
+        edits.append((start, end, new_tag))
+        edits.append((gate_tag.start("hb_tag"), gate_tag.end(),
+                      gate_tag.group("hb_tag") + _gate_body_block(body_chunk)))
+
+    # A pure insertion at p sorts before a replacement starting at p, which is
+    # where the chain puts it (every insertion goes *before* its anchor).
+    edits.sort(key=lambda e: (e[0], e[1]))
+    out = []
+    pos = 0
+    for start, end, text in edits:
+        if start < pos:
+            return None
+        out.append(html[pos:start])
+        out.append(text)
+        pos = end
+    out.append(html[pos:])
+    return "".join(out)
 
 
 def transform(orig_path: Path, endpoint: str, bucket_base: str,
-              gate_title: str, minify: bool = True) -> str:
-    """Apply the seven insertions and return the new HTML."""
+              gate_title: str, minify: bool = True, single_pass: bool = True,
+              external: bool = False, images: dict | None = None) -> str:
+    """Apply the seven insertions and return the new HTML.
+
+    single_pass=False skips rewrite() and always runs the insertion chain;
+    external=True links the shared assets/ files (see load_external_bundle);
+    images ({name: ImageSet}, see image_variants.variant_sets) turns those
+    images' <img> tags into <picture> markup.
+    """
     html = orig_path.read_text(encoding="utf-8")
-    html = insertion_1_css(html, minify=minify)
-    html = insertion_2_draft_page(html)
-    html = insertion_4_brainstorming_maps(html)
-    html = insertion_5_q_writing(html)
-    html = insertion_3_script(html, endpoint, bucket_base, orig_path.stem,
-                              minify=minify)
-    html = insertion_6_body_class(html)
-    html = insertion_7_password_gate(html, bucket_base, gate_title)
-    return html
+    bundle = _bundle_for(minify, external)
+    lesson_key = orig_path.stem
+    with pipeline_trace.scope(week=week_selection.week_of(orig_path)):
+        new_html = None
+        if single_pass:
+            with pipeline_trace.span("rewrite", bytes_in=len(html)) as trace_args:
+                new_html = rewrite(html, endpoint, bucket_base, lesson_key, gate_title, bundle)
+                trace_args["fallback"] = new_html is None
+        if new_html is None:
+            html = insertion_1_css(html, bundle=bundle)
+            html = insertion_2_draft_page(html, bundle)
+            html = insertion_4_brainstorming_maps(html, bundle)
+            html = insertion_5_q_writing(html, bundle)
+            html = insertion_3_script(html, endpoint, bucket_base, lesson_key, bundle=bundle)
+            html = insertion_6_body_class(html)
+            new_html = insertion_7_password_gate(html, bucket_base, gate_title, bundle)
+    return image_variants.rewrite_images(new_html, images) if images else new_html
+
+
+# ---------- Incremental bakes ----------
+#
+# <out>/.build_manifest.json records, per output, a hash of its source page
+# and a digest of everything else it's made from: the asset bundle key
+# (templates, fonts, minifier versions), the endpoint, bucket base, gate
+# title, --no-minify / --external-assets, the responsive image sets and
+# this script's own source. An
+# output whose source hash and digest both match, and which still exists,
+# is reused as is: no read of the bundle, no transform, no write, so its
+# bytes and mtime stay put for the skip-unchanged upload. --force rebakes
+# everything. Same scheme as parse_data.py's lessons/ manifest.
+
+MANIFEST_NAME = ".build_manifest.json"
+MANIFEST_VERSION = 1
+GENERATOR_SOURCES = (SCRIPT_DIR / "make_interactive.py", SCRIPT_DIR.parent / "font_subset.py",
+                     SCRIPT_DIR.parent / "image_variants.py")
+
+
+def build_digest(endpoint: str, bucket_base: str, gate_title: str, minify: bool,
+                 external: bool, images: dict | None = None) -> str:
+    """Hash of what every output depends on besides its own source page."""
+    h = hashlib.sha256(f"v{MANIFEST_VERSION}:{_bundle_key(minify)}".encode("utf-8"))
+    h.update(json.dumps([endpoint, bucket_base, gate_title, minify, external,
+                         sorted((images or {}).values())]).encode("utf-8"))
+    for path in GENERATOR_SOURCES:
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def load_manifest(dst: Path) -> dict[str, dict]:
+    """Output name -> {"source": sha256, "build": digest} from the last bake into dst."""
+    try:
+        manifest = json.loads((dst / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("files", {})
+
+
+def save_manifest(dst: Path, entries: dict[str, dict]) -> None:
+    path = dst / MANIFEST_NAME
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"version": MANIFEST_VERSION, "files": dict(sorted(entries.items()))},
+                              indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _bake_one(orig_path: Path, dst: Path, endpoint: str, bucket_base: str,
+              gate_title: str, minify: bool, external: bool = False,
+              images: dict | None = None) -> str | None:
+    """Transform one file into dst. Returns None, or the SkipFile reason.
+
+    Module-level so --jobs workers can run it; any other exception
+    propagates to main(), which reports it with the file name.
+    """
+    try:
+        new_html = transform(orig_path, endpoint, bucket_base,
+                             gate_title=gate_title, minify=minify, external=external,
+                             images=images)
+    except SkipFile as e:
+        return str(e)
+    out_path = dst / orig_path.name
+    out_path.write_text(new_html, encoding="utf-8", newline="\n")
+    return None
+
+
+def _check_rewriter(files: list[Path], args) -> int:
+    """--check-rewriter: rewrite() vs the insertion chain, file by file."""
+    diffs = fallbacks = 0
+    for orig_path in files:
+        html = orig_path.read_text(encoding="utf-8")
+        try:
+            bundle = _bundle_for(args.minify, args.external_assets)
+            expected = transform(orig_path, args.endpoint, args.bucket_base,
+                                 gate_title=args.gate_title, minify=args.minify, single_pass=False,
+                                 external=args.external_assets)
+        except SkipFile as e:
+            print(f"  [skip] {orig_path.name}: {e}")
+            continue
+        got = rewrite(html, args.endpoint, args.bucket_base, orig_path.stem, args.gate_title, bundle)
+        if got is None:
+            fallbacks += 1
+            print(f"  [chain] {orig_path.name}")
+        elif got != expected:
+            diffs += 1
+            at = next((i for i, (a, b) in enumerate(zip(got, expected)) if a != b),
+                      min(len(got), len(expected)))
+            print(f"  [DIFF] {orig_path.name}: first difference at offset {at}")
+        else:
+            print(f"  [same] {orig_path.name}")
+    print(f"\nChecked: {len(files)}, differences: {diffs}, chain fallbacks: {fallbacks}")
+    return 1 if diffs else 0
 
 
 def main() -> int:
@@ -467,58 +1031,149 @@ def main() -> int:
                     help="Skip JS+CSS minification (useful for debugging — produces "
                          "readable output but ~40%% larger files).")
     ap.set_defaults(minify=True)
+    ap.add_argument("--jobs", "-j", type=int, default=1,
+                    help="Worker processes for the per-file transforms (default 1 = serial). "
+                         "Output and report are identical to a serial run.")
+    ap.add_argument("--external-assets", action="store_true",
+                    help="Write the overlay CSS, script and fonts once to <out>/assets/ under "
+                         "content-hashed names and link them from every page instead of "
+                         "inlining ~175 KB per page.")
+    ap.add_argument("--no-responsive-images", dest="responsive_images", action="store_false",
+                    help="Keep the plain <img> tags instead of <picture> markup over "
+                         "resized AVIF/WebP/JPEG variants.")
+    ap.add_argument("--force", action="store_true",
+                    help=f"Rebake every file even if its fingerprint matches {MANIFEST_NAME}")
+    ap.add_argument("--prune-images", action="store_true",
+                    help="Delete files in <out>/images/ that no page references "
+                         "(they are always listed)")
+    ap.add_argument("--check-rewriter", action="store_true",
+                    help="Write nothing; compare the single-pass rewriter against the "
+                         "insertion chain for every file and exit 1 on any difference.")
+    week_selection.add_argument(ap)
+    pipeline_trace.add_argument(ap)
     args = ap.parse_args()
+    pipeline_trace.start_from_args(args.trace)
 
     if args.minify and not _HAVE_MINIFIERS:
         print("note: rjsmin/rcssmin not installed — emitting unminified output. "
               "Install with `pip install rjsmin rcssmin` for ~40%% smaller files.",
               file=sys.stderr)
+    if not font_subset.available():
+        print("note: fontTools not installed — embedding the full handwriting fonts. "
+              "Install with `pip install fonttools brotli` to subset them.",
+              file=sys.stderr)
+
+    if args.responsive_images and not image_variants.available():
+        print("note: Pillow not installed — pages keep the full-size images. "
+              "Install with `pip install pillow` for resized AVIF/WebP/JPEG variants.",
+              file=sys.stderr)
 
     if not args.src.exists():
         print(f"error: --in path does not exist: {args.src}", file=sys.stderr)
         return 2
+    if args.check_rewriter:
+        return _check_rewriter(list(_files_to_process(args.src, args.weeks)), args)
     args.dst.mkdir(parents=True, exist_ok=True)
 
     processed: list[str] = []
+    reused: list[str] = []
     skipped: list[tuple[str, str]] = []
+    files = list(_files_to_process(args.src, args.weeks))
+    t0 = time.perf_counter()
 
-    for orig_path in _files_to_process(args.src):
-        try:
-            new_html = transform(orig_path, args.endpoint, args.bucket_base,
-                                 gate_title=args.gate_title,
-                                 minify=args.minify)
-            out_path = args.dst / orig_path.name
-            out_path.write_text(new_html, encoding="utf-8", newline="\n")
-            processed.append(orig_path.name)
-        except SkipFile as e:
-            skipped.append((orig_path.name, str(e)))
-        except Exception as e:  # unexpected — fail loudly with file context
-            print(f"FATAL while processing {orig_path.name}: {e}", file=sys.stderr)
-            raise
+    src_images = args.src / "images" if args.src.is_dir() else args.src.parent / "images"
+    images = {}
+    if args.responsive_images and src_images.is_dir():
+        images = image_variants.variant_sets(src_images, image_sync.referenced_images(files))
+    bake_args = (args.dst, args.endpoint, args.bucket_base, args.gate_title, args.minify,
+                 args.external_assets, images)
+
+    try:
+        # Build (or load) the asset bundle before any worker starts, so forked
+        # workers inherit it instead of each building their own. A broken
+        # template is left to _bake_one, which skips every file with the reason.
+        load_bundle(args.minify)
+        if args.external_assets:
+            written = write_external_assets(args.dst, args.minify)
+            print(f"Assets: {len(load_external_bundle(args.minify)[1])} in "
+                  f"{args.dst / ASSETS_DIR} ({written} written)")
+    except SkipFile:
+        pass
+
+    digest = build_digest(args.endpoint, args.bucket_base, args.gate_title, args.minify,
+                          args.external_assets, images)
+    old_manifest = load_manifest(args.dst)
+    previous = {} if args.force else old_manifest
+    manifest = {name: entry for name, entry in old_manifest.items()
+                if name not in {f.name for f in files}}
+    fingerprints = {f.name: {"source": hashlib.sha256(f.read_bytes()).hexdigest(), "build": digest}
+                    for f in files}
+    stale = []
+    for orig_path in files:
+        if previous.get(orig_path.name) == fingerprints[orig_path.name] \
+                and (args.dst / orig_path.name).exists():
+            reused.append(orig_path.name)
+            manifest[orig_path.name] = fingerprints[orig_path.name]
+        else:
+            stale.append(orig_path)
+    files = stale
+
+    # Results are collected in file order whatever order workers finish in,
+    # so the report below reads the same as a serial run.
+    if args.jobs > 1 and len(files) > 1:
+        pool = concurrent.futures.ProcessPoolExecutor(max_workers=min(args.jobs, len(files)))
+        outcomes = [pool.submit(_bake_one, orig_path, *bake_args) for orig_path in files]
+    else:
+        pool = None
+        outcomes = [functools.partial(_bake_one, orig_path, *bake_args) for orig_path in files]
+    try:
+        for orig_path, outcome in zip(files, outcomes):
+            try:
+                reason = outcome.result() if pool else outcome()
+            except Exception as e:  # unexpected — fail loudly with file context
+                print(f"FATAL while processing {orig_path.name}: {e}", file=sys.stderr)
+                raise
+            if reason is None:
+                processed.append(orig_path.name)
+                manifest[orig_path.name] = fingerprints[orig_path.name]
+            else:
+                skipped.append((orig_path.name, reason))
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+        # Skipped and unfinished files drop out, so the next run retries them;
+        # files outside --weeks keep their entries.
+        save_manifest(args.dst, manifest)
+    elapsed = time.perf_counter() - t0
 
     # Sync images/ alongside the generated HTMLs so relative paths like
     # `<img src="images/foo.png">` resolve when a user opens any
     # Interactive/Week_NN.html locally OR via OSS root deployment.
     # Without this step, all Interactive HTMLs render with broken-image
     # placeholders even though the canonical references are correct.
-    src_images = args.src / "images" if args.src.is_dir() else args.src.parent / "images"
+    # Only images some page in --out references are synced (image_sync.py),
+    # the responsive variants among them from image_variants' cache.
     dst_images = args.dst / "images"
     if src_images.is_dir():
-        import shutil
-        dst_images.mkdir(exist_ok=True)
-        copied = 0
-        for img in src_images.iterdir():
-            if img.is_file() and img.suffix.lower() in (".png", ".jpg", ".jpeg", ".webp", ".svg", ".gif"):
-                shutil.copy2(img, dst_images / img.name)
-                copied += 1
-        if copied:
-            print(f"Synced {copied} image(s) from {src_images} -> {dst_images}")
+        referenced = image_sync.referenced_images(sorted(args.dst.glob("Week_*.html")))
+        sync = image_sync.sync_images(src_images, dst_images, referenced, prune=args.prune_images,
+                                      also_from=[image_variants.CACHE_DIR])
+        if referenced:
+            print(f"Images: {len(referenced)} referenced — {len(sync.linked)} linked, "
+                  f"{len(sync.copied)} copied, {len(sync.unchanged)} unchanged "
+                  f"({src_images} -> {dst_images})")
+        for name in sync.missing:
+            print(f"warning: images/{name} is referenced but not in {src_images}", file=sys.stderr)
+        if sync.unreferenced:
+            action = "deleted" if args.prune_images else "not referenced (--prune-images deletes)"
+            print(f"Images {action} in {dst_images}: {', '.join(sync.unreferenced)}")
     else:
         print(f"note: no images/ folder at {src_images} — Interactive HTMLs may show "
               f"broken-image placeholders for embedded <img> tags",
               file=sys.stderr)
 
-    print(f"Processed: {len(processed)}")
+    print(f"Processed: {len(processed)} rebuilt, {len(reused)} reused "
+          f"in {elapsed:.2f}s (jobs={args.jobs})")
     for n in processed:
         print(f"  [ok] {n}")
     if skipped:
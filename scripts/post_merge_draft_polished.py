@@ -36,13 +36,14 @@ build_landing_page.py and upload_to_oss.py), or as part of make_interactive.py
 post-processing. The publish.py wire-up handles the ordering.
 
 Idempotent: detects if the merge already happened and skips. Safe to
-run multiple times.
+run multiple times. `--weeks 17,20-22` limits the run to those weeks.
 
 Exit codes:
   0 : success (all weeks processed or already merged)
   1 : at least one file failed (anchor not found, etc.)
 """
 from __future__ import annotations
+import argparse
 import re
 import sys
 from pathlib import Path
@@ -55,6 +56,9 @@ if hasattr(sys.stdout, "reconfigure"):
         pass
 
 REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+
+import week_selection  # noqa: E402
 
 # Banner heading on the writing-homework page.
 BANNER_OLD = "Writing Homework: Draft &amp; Polished Rewrite"
@@ -112,9 +116,15 @@ def merge_one(html: str) -> tuple[str, str]:
 
 
 def main() -> int:
-    week_files = sorted(REPO.glob("Week_*.html"))
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    week_selection.add_argument(ap)
+    args = ap.parse_args()
+
+    week_files = week_selection.filter_paths(sorted(REPO.glob("Week_*.html")), args.weeks)
     if not week_files:
-        print(f"FATAL: no Week_*.html files at {REPO}")
+        print(f"FATAL: no Week_*.html files at {REPO}"
+              + (f" for weeks {week_selection.to_spec(args.weeks)}" if args.weeks else ""))
         return 1
 
     ok = skipped = failed = 0
@@ -14,8 +14,11 @@ Runs the full pipeline in order:
                                       Asymmetric merge, same pattern as IGCSE's
                                       post_merge_section_7_8.py.
   5. build_landing_page.py         — refresh index.html
+     precompress.py                — .br/.gz variants of the text files
+                                      (only stale ones are recompressed)
   6. upload_to_oss.py              — push everything to aischool-ielts-bj
-                                      with cache headers + skip-unchanged
+                                      with cache headers + skip-unchanged,
+                                      text files precompressed
   7. check_cert_expiry.py          — non-fatal: warn if SSL cert <30 days
   8. verify_no_drift.py            — non-fatal: confirm Week_05 / 22 / 38
                                       share canonical Week_01's static blocks
@@ -28,9 +31,21 @@ Usage:
   python scripts/publish.py
   python scripts/publish.py --quiet
   python scripts/publish.py --skip-fanout    # only upload (no regen)
+  python scripts/publish.py --jobs 8         # fan out weeks (and the bake) across 8 processes
+  python scripts/publish.py --force          # rebuild all 40 weeks, not just changed ones
+  python scripts/publish.py --weeks 17,20-22 # only these weeks in every per-week step
+  python scripts/publish.py --stage parse,promote   # only these steps
+  python scripts/publish.py --external-assets        # pages link shared assets/ (make_interactive.py)
+  python scripts/publish.py --trace out.json # timeline of the whole run (pipeline_trace.py)
+
+--weeks is passed through to parse_data, make_interactive,
+post_merge_draft_polished and upload_to_oss (see week_selection.py); the
+other weeks' files are not touched. --stage picks steps by name from
+STAGES; post-publish checks run only when the upload does.
 """
 from __future__ import annotations
 import argparse
+import os
 import shutil
 import subprocess
 import sys
@@ -48,6 +63,10 @@ if hasattr(sys.stdout, "reconfigure"):
 
 REPO = Path(__file__).resolve().parent.parent
 SCRIPTS = REPO / "scripts"
+sys.path.insert(0, str(REPO))
+
+import pipeline_trace  # noqa: E402
+import week_selection  # noqa: E402
 
 # Configuration — would normally live in pipeline.yaml; loading the
 # YAML adds a dependency, so we mirror the bucket/endpoint values here.
@@ -55,6 +74,18 @@ SCRIPTS = REPO / "scripts"
 BUCKET_BASE = "https://ielts.aischool.studio"
 FC_ENDPOINT = "https://ielts-arrection-nafrghqpzj.cn-beijing.fcapp.run"
 
+# Pipeline steps in run order, as accepted by --stage.
+STAGES = ("parse", "promote", "interactive", "merge", "landing", "compress", "upload")
+
+
+def _stage_list(value: str) -> tuple:
+    stages = tuple(s.strip() for s in value.split(",") if s.strip())
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown or not stages:
+        raise argparse.ArgumentTypeError(
+            f"unknown stage(s) {', '.join(unknown) or value!r}; choose from {', '.join(STAGES)}")
+    return stages
+
 
 def _step(label: str, cmd: list, *, quiet: bool, cwd: Path = REPO) -> None:
     print(f"\n{'-' * 60}")
@@ -62,12 +93,13 @@ def _step(label: str, cmd: list, *, quiet: bool, cwd: Path = REPO) -> None:
     print(f"  $ {' '.join(str(c) for c in cmd)}")
     print(f"{'-' * 60}")
     t0 = time.time()
-    result = subprocess.run(
-        cmd,
-        cwd=str(cwd),
-        capture_output=quiet,
-        text=True,
-    )
+    with pipeline_trace.span(label, cat="step"):
+        result = subprocess.run(
+            cmd,
+            cwd=str(cwd),
+            capture_output=quiet,
+            text=True,
+        )
     elapsed = time.time() - t0
     if result.returncode != 0:
         print(f"\n[FAIL] after {elapsed:.1f}s")
@@ -88,13 +120,38 @@ def main() -> int:
                     help="Suppress sub-command stdout (still prints on failure)")
     ap.add_argument("--skip-fanout", action="store_true",
                     help="Skip parse_data + make_interactive; only upload existing files")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                    help="Worker processes for the parse_data.py fan-out and the "
+                         "make_interactive.py bake (default: CPU count; output is "
+                         "identical to a serial run)")
+    ap.add_argument("--force", action="store_true",
+                    help="Rebuild and rebake every week, ignoring the build manifests "
+                         "of parse_data and make_interactive")
+    ap.add_argument("--external-assets", action="store_true",
+                    help="Bake Interactive pages that link shared, content-hashed "
+                         "assets/ files (uploaded as immutable) instead of inlining them")
+    ap.add_argument("--stage", type=_stage_list, default=STAGES, metavar="LIST",
+                    help=f"Comma-separated steps to run (default: all of {','.join(STAGES)})")
+    week_selection.add_argument(ap)
+    pipeline_trace.add_argument(ap)
     args = ap.parse_args()
+    pipeline_trace.start_from_args(args.trace)
+    stages = ("upload",) if args.skip_fanout else args.stage
+    weeks_args = ["--weeks", week_selection.to_spec(args.weeks)] if args.weeks else []
 
     print(f"\n{'=' * 60}")
     print(f"  IELTS PUBLISH — full deploy to {BUCKET_BASE}")
     print(f"{'=' * 60}")
 
-    if not args.skip_fanout:
+    if args.weeks:
+        print(f"  weeks: {week_selection.to_spec(args.weeks)}")
+    if stages != STAGES:
+        print(f"  stages: {','.join(stages)}")
+
+    if args.skip_fanout:
+        print("\n[--skip-fanout] Skipping regeneration; uploading existing files.")
+
+    if "parse" in stages:
         # 0. Preflight: validate homework_plan.json shape (warn-only).
         #    Catches data drift like a stray 6th grammar item that pushes
         #    the answer-key footer off the homework page (Week 2 bug
@@ -112,56 +169,72 @@ def main() -> int:
 
         # 1. Regenerate Weeks 2-40 from canonical
         _step("1/5  parse_data.py — fan out canonical → Weeks 2-40",
-              [sys.executable, "parse_data.py"], quiet=args.quiet)
-
-        # 2. Promote lessons/ → root + cleanup
-        lessons_dir = REPO / "lessons"
-        if lessons_dir.is_dir():
-            print(f"\n{'-' * 60}")
-            print(f"▶ 2/5  Promote lessons/ → repo root")
-            for f in sorted(lessons_dir.glob("Week_*.html")):
-                shutil.copy2(f, REPO / f.name)
-            # Round 28b (2026-05-03): on Windows + OneDrive the directory
-            # often holds a file-system lock for a few seconds after the
-            # last file inside it is copied/moved, causing
-            # `shutil.rmtree` to raise PermissionError [WinError 5] even
-            # though the directory is empty. Don't let that abort the
-            # publish — the empty dir is harmless and the next parse_data
-            # run will repopulate it. ignore_errors=True swallows the
-            # transient lock; if it's a real issue (read-only mount),
-            # the next step will surface it.
-            shutil.rmtree(lessons_dir, ignore_errors=True)
-            print(f"  Copied {len(list(REPO.glob('Week_*.html')))} weeks; "
-                  f"lessons/ removed={'no (file lock)' if lessons_dir.exists() else 'yes'}")
-            print(f"✓ done")
+              [sys.executable, "parse_data.py", "--jobs", str(args.jobs)]
+              + (["--force"] if args.force else []) + weeks_args,
+              quiet=args.quiet)
+
+    lessons_dir = REPO / "lessons"
+    if "promote" in stages and lessons_dir.is_dir():
+        # 2. Promote lessons/ → root
+        #    lessons/ is parse_data.py's incremental build cache (its
+        #    .build_manifest.json only helps if the outputs survive), so it
+        #    is kept rather than removed after promotion (the old Round 28b
+        #    rmtree). Every selected week is copied, unchanged or not: the
+        #    merge stage rewrites the root pages in place, so a root copy
+        #    newer than its lessons/ source is a merged page, not a fresh
+        #    one, and make_interactive must never bake from that.
+        print(f"\n{'-' * 60}")
+        print(f"▶ 2/5  Promote lessons/ → repo root")
+        candidates = week_selection.filter_paths(sorted(lessons_dir.glob("Week_*.html")), args.weeks)
+        for f in candidates:
+            shutil.copy2(f, REPO / f.name)
+        print(f"  Copied {len(candidates)} weeks")
+        print(f"✓ done")
 
+    if "interactive" in stages:
         # 3. Build Interactive layer
         _step("3/6  make_interactive.py — bake Interactive/Week_*.html",
               [sys.executable, str(SCRIPTS / "make_interactive.py"),
                "--in", ".", "--out", "Interactive",
                "--endpoint", FC_ENDPOINT,
-               "--bucket-base", BUCKET_BASE],
+               "--bucket-base", BUCKET_BASE,
+               "--jobs", str(args.jobs)]
+              + (["--external-assets"] if args.external_assets else [])
+              + (["--force"] if args.force else []) + weeks_args,
               quiet=args.quiet)
 
+    if "merge" in stages:
         # 4. Asymmetric merge: combine Draft + Polished Rewrite into a single
         #    "AI corrected" box on the printable PDF base files (root Week_*.html).
         #    Runs AFTER make_interactive.py so the Interactive layer keeps the
         #    separate Draft + Polished structure (with AI overlay). Same pattern
         #    as IGCSE's post_merge_section_7_8.py.
         _step("4/6  post_merge_draft_polished.py — combine D+P boxes in PDF base",
-              [sys.executable, str(SCRIPTS / "post_merge_draft_polished.py")],
+              [sys.executable, str(SCRIPTS / "post_merge_draft_polished.py")] + weeks_args,
               quiet=args.quiet)
 
+    if "landing" in stages:
         # 5. Build landing page
         _step("5/6  build_landing_page.py — refresh index.html",
               [sys.executable, str(SCRIPTS / "build_landing_page.py")],
               quiet=args.quiet)
-    else:
-        print("\n[--skip-fanout] Skipping regeneration; uploading existing files.")
+
+    if "compress" in stages:
+        # 5b. Brotli/gzip variants for upload_to_oss.py. Runs after the bake
+        #     and the landing page; unchanged files keep their variants.
+        _step("5b/6 precompress.py — .br/.gz variants of the text files",
+              [sys.executable, "precompress.py"],
+              quiet=args.quiet)
+
+    if "upload" not in stages:
+        print(f"\n{'=' * 60}")
+        print(f"  DONE — stages {','.join(stages)} (nothing uploaded)")
+        print(f"{'=' * 60}\n")
+        return 0
 
     # 6. Upload to OSS
     _step("6/6  upload_to_oss.py — push to aischool-ielts-bj",
-          [sys.executable, str(SCRIPTS / "upload_to_oss.py")],
+          [sys.executable, str(SCRIPTS / "upload_to_oss.py")] + weeks_args,
           quiet=args.quiet)
 
     # 6. Cert expiry sanity check — non-fatal, warn-only.
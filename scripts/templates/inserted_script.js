@@ -10,506 +10,105 @@
   const ns = (window.__ielts = window.__ielts || {});
 
   // ====================================================================
-  // TTS subsystem — Web Speech API with voice waterfall + karaoke
+  // Lazy feature modules
   // ====================================================================
+  // This block is the boot path: draft persistence, word count, the
+  // listen-button and vocab wiring, the health badge. The heavy features
+  // live in scripts/templates/lazy/ and are only parsed and run when first
+  // needed:
+  //   tts       sentence-paced TTS player + karaoke
+  //   correct   AI correction client (retry/backoff) + red-pen diff renderer
+  //   recorder  voice recorder, IndexedDB quota manager, email-as-zip
+  // make_interactive.py ships each one either inline, as an inert
+  // <script type="text/plain" data-ielts-module="NAME"> block, or with
+  // --external-assets as assets/NAME.<hash>.js, listed in
+  // window.__ielts_build.MODULES. A module reads what it needs from
+  // ns.__core and hands its exports to ns.__define(name, exports).
+  // The first pointerdown / keydown on the page starts loading the modules
+  // the page uses, so they are usually ready by the time the click lands.
+
+  const _modules = {};
+  const _defined = {};
+
+  ns.__define = function (name, exports) {
+    if (_defined[name]) _defined[name](exports || {});
+  };
 
-  // Common female-neural voice names across Edge/Chrome (Windows), Safari/iOS,
-  // and Android system voices. The regex covers both modern Edge "Natural"
-  // voices and legacy macOS / iOS / Android voices known to sound natural.
-  const FEMALE_NEURAL_UK = /Sonia|Libby|Mia|Maisie|Kate|Serena|Sienna|Tessa|Karen|Hazel|Susan|Stephanie/i;
-  const MALE_NEURAL_UK   = /Ryan|Thomas.*GB|Noah|Daniel|George|Oliver/i;
-  const FEMALE_NEURAL_US = /Aria|Jenny|Ana|Michelle|Emma|Samantha|Allison|Ava|Joanna|Salli|Kendra|Kimberly|Ivy|Nora|Susan.*US|Zira/i;
-  const MALE_NEURAL_US   = /Guy|Tony|Jason|Eric|Davis|Alex|Aaron|Brandon|Steffan|Roger/i;
-
-  // Speech rates. Tuned for Chinese L2 listeners — 0.85 is the comfortable
-  // default (matches what was previously the "slow" button rate); 0.72 is
-  // the new "slow" — about 15% slower than the new default, useful when a
-  // student wants to copy pronunciation word-by-word.
-  const DEFAULT_RATE = 0.85;
-  const SLOW_RATE    = 0.72;
-
-  // ====================================================================
-  // AI fetch — jitter + exponential backoff retry
-  // ====================================================================
-  // Designed for the start-of-class scenario: 200 students click "Correct
-  // with AI" within the same second. Without intervention, the FC instance
-  // pool (default ~100 concurrent) queues half the requests and Zhipu's
-  // rate limiter rejects the herd. With this helper:
-  //   - Pre-request jitter (0..500ms) spreads the herd across half a second,
-  //     enough to fit under typical FC concurrency caps.
-  //   - On 429/503/5xx or network error, retry with exponential backoff
-  //     (1s, 2s, 4s) plus per-retry jitter so retries don't re-stampede.
-  //   - Per-attempt AbortController timeout (45s) prevents a hung TCP
-  //     connection from leaving the user stuck on an infinite spinner.
-  //   - Max 3 attempts total — beyond that, we surface the error to the
-  //     user rather than retry forever (Zhipu rarely recovers within 10s+
-  //     and the student would rather know).
-  const AI_FETCH_MAX_ATTEMPTS = 3;
-  const AI_FETCH_BASE_BACKOFF_MS = 1000;
-  const AI_FETCH_JITTER_MS = 500;
-  const AI_FETCH_TIMEOUT_MS = 45000;
-
-  function _aiSleep(ms) { return new Promise(r => setTimeout(r, ms)); }
-  function _aiJitter() { return Math.floor(Math.random() * AI_FETCH_JITTER_MS); }
-
-  async function aiCorrectFetchWithRetry(draftText) {
-    let lastErr = null;
-    // Pre-request jitter — spreads the start-of-class herd.
-    await _aiSleep(_aiJitter());
-
-    for (let attempt = 0; attempt < AI_FETCH_MAX_ATTEMPTS; attempt++) {
-      const ctrl = new AbortController();
-      const timer = setTimeout(() => ctrl.abort(), AI_FETCH_TIMEOUT_MS);
-      try {
-        const resp = await fetch(AI_ENDPOINT, {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ draft: draftText }),
-          signal: ctrl.signal,
-        });
-        clearTimeout(timer);
-        // Treat 429 (Zhipu / FC rate-limited), 503 (FC saturated), and any
-        // 5xx as retriable. 4xx other than 429 are NOT retried — they
-        // indicate a client-side problem (bad input, missing field, etc.)
-        // that won't fix itself by waiting.
-        if (resp.status === 429 || resp.status === 503 || resp.status >= 500) {
-          lastErr = new Error(`server ${resp.status}`);
-          // fall through to backoff
-        } else {
-          return resp;  // success or non-retriable error — caller handles body
-        }
-      } catch (e) {
-        clearTimeout(timer);
-        lastErr = e;
-        // Network errors (DNS, TLS, abort) are retriable.
+  /** Promise of module `name`'s exports; loads it once. The promise
+   *  rejects if the module fails to load, or throws (or otherwise never
+   *  calls ns.__define) while it runs; a later call then tries again. */
+  ns.__load = function (name) {
+    if (_modules[name]) return _modules[name];
+    const loading = new Promise((resolve, reject) => {
+      let defined = false;
+      _defined[name] = (exports) => {
+        defined = true;
+        delete _defined[name];
+        resolve(exports);
+      };
+      const fail = (why) => {
+        if (defined) return;
+        delete _defined[name];
+        reject(new Error(`module ${name} ${why}`));
+      };
+      const s = document.createElement('script');
+      const inline = document.querySelector(`script[data-ielts-module="${name}"]`);
+      const urls = (window.__ielts_build && window.__ielts_build.MODULES) || {};
+      if (inline) {
+        s.textContent = inline.textContent;   // runs on insertion, synchronously
+      } else if (urls[name]) {
+        s.src = urls[name];
+        s.onerror = () => fail('failed to load');
+        // load fires after the script ran, whether or not it threw
+        s.onload = () => fail('failed while running (see the error above)');
+      } else {
+        fail('failed to load');
+        return;
       }
-      // Exponential backoff with jitter: 1s, 2s, 4s + 0-500ms each.
-      const backoff = AI_FETCH_BASE_BACKOFF_MS * Math.pow(2, attempt) + _aiJitter();
-      if (attempt < AI_FETCH_MAX_ATTEMPTS - 1) await _aiSleep(backoff);
-    }
-    throw lastErr || new Error('AI fetch failed after retries');
-  }
-
-  // Score-based picker: prefers high-quality engines (Edge "Online (Natural)",
-  // Google network voices, macOS Premium/Enhanced) over legacy local voices.
-  // Without scoring, browsers like Chrome on Windows often surface the older
-  // "Microsoft Hazel" (low-quality concatenative) ahead of "Microsoft Sonia
-  // Online (Natural)" — and Array.find() would return Hazel even though both
-  // names match the female regex.
-  function pickVoice(lang) {
-    if (!('speechSynthesis' in window)) return null;
-    const all = window.speechSynthesis.getVoices();
-    if (!all.length) return null;
-
-    const langPrefix = lang === 'en-GB' ? 'en-GB' : 'en-US';
-    let pool = all.filter(v => v.lang === langPrefix);
-    if (!pool.length) pool = all.filter(v => v.lang && v.lang.startsWith('en'));
-    if (!pool.length) return all[0];
-
-    const female = lang === 'en-GB' ? FEMALE_NEURAL_UK : FEMALE_NEURAL_US;
-    const male   = lang === 'en-GB' ? MALE_NEURAL_UK   : MALE_NEURAL_US;
+      document.head.appendChild(s);
+      if (inline) fail('failed while running (see the error above)');
+    });
+    // Forget a failure (asynchronously: fail() may run before the
+    // assignment below), so a later call retries — flaky network, or a
+    // transient error in the module.
+    loading.catch(() => {
+      if (_modules[name] === loading) delete _modules[name];
+    });
+    _modules[name] = loading;
+    return loading;
+  };
 
-    const score = (v) => {
-      const tag = (v.name || '') + ' ' + (v.voiceURI || '');
-      let s = 0;
-      if (/Natural/i.test(tag))           s += 100;  // Edge neural voices (best)
-      if (/Online/i.test(tag))            s +=  80;  // Microsoft cloud voices
-      if (/Google/i.test(tag))            s +=  60;  // Google network voices
-      if (/Premium|Enhanced/i.test(tag))  s +=  50;  // macOS / iOS premium
-      if (!v.localService)                s +=  30;  // network > local generally
-      if (female.test(v.name))            s +=  25;  // female preference
-      else if (male.test(v.name))         s +=   5;  // male as fallback
-      if (v.lang === langPrefix)          s +=  10;  // exact lang > prefix match
-      return s;
+  /** A stand-in for ns[method] that loads `module`, which replaces it, then calls it. */
+  function lazyMethod(module, method) {
+    const stub = function (...args) {
+      return ns.__load(module).then(() => {
+        if (ns[method] === stub) throw new Error(`module ${module} did not define ${method}`);
+        return ns[method](...args);
+      });
     };
-
-    return pool.slice().sort((a, b) => score(b) - score(a))[0];
-  }
-
-  function isWeChatBrowser() {
-    return /MicroMessenger/i.test(navigator.userAgent || '');
+    ns[method] = stub;
   }
 
-  function wechatFallbackAlert() {
-    alert("微信浏览器不支持语音播放，请用 Safari 或 Chrome 打开本页 / WeChat browser doesn't support audio playback. Please open this page in Safari or Chrome.");
-  }
-
-  // === Sentence-paced TTS state ============================================
-  //
-  // Pedagogical model: TTS plays ONE sentence at a time and auto-pauses on
-  // completion. Students press transport buttons (Replay / Prev / Next /
-  // Slow) to advance, repeat, or slow-down the current sentence. This is
-  // the standard listen-and-repeat shadowing flow used in language classes.
-  //
-  // Per-row state (sentence list + index + accent + karaoke spans) is kept
-  // in a WeakMap keyed by the .listen-row DOM element. Multiple rows on
-  // the same page each retain their own independent state — pressing Next
-  // on row A and then returning to row B picks up where row B left off.
-  //
-  // _currentRow is the SINGLE row producing audio right now (only one mic
-  // can play at a time across the whole page). It's just a pointer to
-  // whichever WeakMap entry owns the in-flight utterance.
+  ['speakText', 'speakElement', 'speakElementById', 'listenPolished', 'replaySentence',
+   'nextSentence', 'prevSentence', 'stopSpeaking', 'pauseSpeaking']
+    .forEach(m => lazyMethod('tts', m));
+  lazyMethod('recorder', 'emailLessonRecordings');
 
-  const _rowState = new WeakMap();
-  let   _currentRow = null;
-
-  function getRowState(rowEl) {
-    if (!rowEl) return null;
-    let s = _rowState.get(rowEl);
-    if (!s) {
-      s = {
-        sentences:    [],          // string[] — one entry per sentence
-        sourceText:   '',          // original full text, pre-normalize
-        currentIndex: 0,           // 0-based index into sentences
-        lang:         'en-GB',     // 'en-GB' | 'en-US' — last-selected accent
-        rate:         DEFAULT_RATE,// inherited from initial play; overridden by 🐢
-        // Karaoke (only populated for sentence-paced playback over an
-        // element that's been word-wrapped, e.g. #polished-output):
-        targetEl:     null,
-        spans:        null,
-        offsets:      null,        // [{ span, start, end }] over wrappedText
-        wrappedText:  null,        // the text snapshot that spans correspond to
-      };
-      _rowState.set(rowEl, s);
-    }
-    return s;
-  }
-
-  // Char index where sentence i begins in the joined source. Trimmed
-  // sentences plus single-space joins matches the normalize() output of
-  // splitSentences(), so karaoke offsets line up.
-  function sentenceCharStart(sentences, i) {
-    let n = 0;
-    for (let k = 0; k < i; k++) n += sentences[k].length + 1;
-    return n;
-  }
-
-  /** Pragmatic sentence splitter — punctuation lookbehind + capital
-   *  lookahead. Imperfect on abbreviations like "Mr. Smith" or "U.S.A."
-   *  but the IELTS / IGCSE model-answer corpus rarely uses them. */
-  function splitSentences(text) {
-    const norm = String(text || '').replace(/\s+/g, ' ').trim();
-    if (!norm) return [];
-    return norm
-      .split(/(?<=[.!?])\s+(?=[A-Z"'(])/)
-      .map(s => s.trim())
-      .filter(Boolean);
-  }
-  ns.__splitSentences = splitSentences;  // exposed for tests
-
-  /** Mark a single .listen-row as the one currently speaking (for the
-   *  pulsing indicator). Pass `null` to clear. */
-  function setSpeakingRow(rowEl) {
-    document.querySelectorAll('.listen-row.speaking-now, .button-row.speaking-now')
-      .forEach(r => r.classList.remove('speaking-now'));
-    if (rowEl) rowEl.classList.add('speaking-now');
-  }
-
-  /** Sync transport-button enabled state + sentence counter for a row. */
-  function updateTransportButtons(rowEl) {
-    if (!rowEl) return;
-    const st = getRowState(rowEl);
-    const total = st.sentences ? st.sentences.length : 0;
-    const idx   = st.currentIndex || 0;
-    const prev   = rowEl.querySelector('.tts-btn.prev');
-    const next   = rowEl.querySelector('.tts-btn.next');
-    const slow   = rowEl.querySelector('.tts-btn.slow');
-    const replay = rowEl.querySelector('.tts-btn.replay');
-    const counter = rowEl.querySelector('.sentence-counter');
-    if (slow)   slow.disabled   = (total === 0);
-    if (replay) replay.disabled = (total === 0);
-    if (prev)   prev.disabled   = (idx <= 0 || total === 0);
-    if (next)   next.disabled   = (idx + 1 >= total || total === 0);
-    if (counter) counter.textContent = total > 0 ? `${idx + 1}/${total}` : '';
-  }
-
-  function setActiveAccent(rowEl, lang) {
-    if (!rowEl) return;
-    rowEl.querySelectorAll('.tts-btn.uk, .tts-btn.us').forEach(b => b.classList.remove('active'));
-    const sel = lang === 'en-US' ? '.tts-btn.us' : '.tts-btn.uk';
-    const btn = rowEl.querySelector(sel);
-    if (btn) btn.classList.add('active');
-  }
-
-  /** Internal: speak the current sentence of the row. On end, do NOT
-   *  advance — the student decides what comes next. */
-  function _playCurrentSentence(rowEl, rateOverride) {
-    if (!rowEl) return;
-    const st = getRowState(rowEl);
-    if (!st.sentences || !st.sentences.length) return;
-    if (st.currentIndex < 0) st.currentIndex = 0;
-    if (st.currentIndex >= st.sentences.length) return;
-
-    if ('speechSynthesis' in window) speechSynthesis.cancel();
-    _currentRow = rowEl;
-    setSpeakingRow(rowEl);
-
-    const sentence      = st.sentences[st.currentIndex];
-    const sentenceStart = sentenceCharStart(st.sentences, st.currentIndex);
-
-    const u = new SpeechSynthesisUtterance(sentence);
-    u.lang = st.lang;
-    u.rate = rateOverride || st.rate || DEFAULT_RATE;
-    const v = pickVoice(st.lang);
-    if (v) u.voice = v;
-
-    // Karaoke: only when this row owns word-wrapped spans (polished-output path).
-    const activeOffsets = (st.spans && st.offsets)
-      ? st.offsets.filter(o => o.start >= sentenceStart && o.end <= sentenceStart + sentence.length)
-      : null;
-
-    u.onstart = () => setSpeakingRow(rowEl);
-    u.onboundary = (ev) => {
-      if (ev.name && ev.name !== 'word') return;
-      if (!activeOffsets) return;
-      activeOffsets.forEach(o => o.span.classList.remove('speaking'));
-      const globalIdx = sentenceStart + ev.charIndex;
-      const hit = activeOffsets.find(o => globalIdx >= o.start && globalIdx < o.end);
-      if (hit) hit.span.classList.add('speaking');
-    };
-    u.onend = () => {
-      if (activeOffsets) activeOffsets.forEach(o => o.span.classList.remove('speaking'));
-      // Auto-pause: leave currentIndex where it is; clear pulse; refresh buttons.
-      if (_currentRow === rowEl) _currentRow = null;
-      setSpeakingRow(null);
-      updateTransportButtons(rowEl);
+  function warmModulesOnFirstInteraction() {
+    const warm = () => {
+      ['pointerdown', 'keydown'].forEach(t => document.removeEventListener(t, warm, true));
+      ns.__load('tts').catch(() => {});
+      if (document.getElementById('student-draft')) ns.__load('correct').catch(() => {});
     };
-
-    speechSynthesis.speak(u);
-    updateTransportButtons(rowEl);
+    ['pointerdown', 'keydown'].forEach(t => document.addEventListener(t, warm, true));
   }
 
-  ns.speakText = function (text, lang = 'en-GB', rate = DEFAULT_RATE, rowEl = null) {
-    if (isWeChatBrowser()) { wechatFallbackAlert(); return; }
-    if (!('speechSynthesis' in window)) return;
-    if (!text || !String(text).trim()) return;
-
-    // No row → vocab-click / single-shot path. Speak as one utterance,
-    // no sentence pacing, no row state. Matches old behaviour for
-    // attachWordClicks().
-    if (!rowEl) {
-      speechSynthesis.cancel();
-      const u = new SpeechSynthesisUtterance(String(text));
-      u.lang = lang;
-      u.rate = rate;
-      const v = pickVoice(lang);
-      if (v) u.voice = v;
-      speechSynthesis.speak(u);
-      return;
-    }
-
-    // Row-bound → split into sentences, store state, play sentence 0.
-    const st = getRowState(rowEl);
-    st.sentences   = splitSentences(text);
-    st.sourceText  = String(text);
-    st.currentIndex = 0;
-    st.lang  = lang;
-    st.rate  = rate || DEFAULT_RATE;
-    st.targetEl    = null;
-    st.spans       = null;
-    st.offsets     = null;
-    st.wrappedText = null;
-    setActiveAccent(rowEl, lang);
-    _playCurrentSentence(rowEl);
-  };
-
-  /** Replay the current sentence. `slow=true` → SLOW_RATE for this one
-   *  utterance only; the row's stored rate is unchanged. */
-  ns.replaySentence = function (rowEl, slow) {
-    if (!rowEl) return;
-    const st = getRowState(rowEl);
-    if (!st.sentences || !st.sentences.length) return;
-    _playCurrentSentence(rowEl, slow ? SLOW_RATE : st.rate);
-  };
-
-  ns.nextSentence = function (rowEl) {
-    if (!rowEl) return;
-    const st = getRowState(rowEl);
-    if (!st.sentences || st.currentIndex + 1 >= st.sentences.length) return;
-    st.currentIndex++;
-    _playCurrentSentence(rowEl);
-  };
-
-  ns.prevSentence = function (rowEl) {
-    if (!rowEl) return;
-    const st = getRowState(rowEl);
-    if (!st.sentences || st.currentIndex <= 0) return;
-    st.currentIndex--;
-    _playCurrentSentence(rowEl);
-  };
-
-  // Markup-preserving variant of speakElement's wrapping logic. Walks the
-  // text-node descendants of `el` and replaces each text node with a
-  // fragment that splits the text into per-word <span>s (for karaoke
-  // highlighting) while LEAVING element children (e.g. <strong> for vocab,
-  // <em> for emphasis) intact. Skips Chinese-gloss / marker-badge /
-  // listen-row subtrees so wrapped spans align with what the TTS engine
-  // actually speaks.
-  //
-  // Added 2026 (issue A2): the polished-output element is plain text and
-  // the original speakElement could safely innerHTML='' it. Model-answer
-  // boxes (Section 7) contain <strong>vocab</strong> highlights and
-  // Chinese gloss spans; destroying their innerHTML would lose both.
-  // This helper provides a non-destructive wrap path for markup-rich
-  // elements. Returns { spans, offsets } with the same shape that the
-  // original wrap path produces.
-  function wrapTextNodesInElement(el) {
-    const spans = [];
-    const offsets = [];
-    let charIdx = 0;
-
-    function walk(node) {
-      if (!node) return;
-      if (node.nodeType === Node.TEXT_NODE) {
-        const t = node.textContent;
-        if (!t) return;
-        const tokens = t.split(/(\s+)/);
-        const frag = document.createDocumentFragment();
-        tokens.forEach(tok => {
-          if (!tok) return;
-          if (/^\s+$/.test(tok)) {
-            frag.appendChild(document.createTextNode(tok));
-          } else {
-            const s = document.createElement('span');
-            s.textContent = tok;
-            offsets.push({ span: s, start: charIdx, end: charIdx + tok.length });
-            spans.push(s);
-            frag.appendChild(s);
-          }
-          charIdx += tok.length;
-        });
-        node.parentNode.replaceChild(frag, node);
-        return;
-      }
-      if (node.nodeType !== Node.ELEMENT_NODE) return;
-      if (isChineseGloss(node)) return;
-      if (isMarkerBadge(node)) return;
-      if (node.classList && node.classList.contains('listen-row')) return;
-      // Snapshot childNodes — we'll be replacing some during the walk.
-      Array.from(node.childNodes).forEach(walk);
-    }
-    walk(el);
-    return { spans, offsets };
-  }
-
-  // speakElement / speakElementById — wrap words in <span> for karaoke,
-  // split text into sentences, and play sentence 0. Subsequent transport
-  // commands (replay / next / prev / slow) re-use the wrapped spans.
-  // The optional `rowElOverride` arg lets callers pin the WeakMap state
-  // to a specific .listen-row element (used by injectListenButtons so
-  // its prev/next/replay/slow buttons share state with the speaking text).
-  ns.speakElement = function (el, lang = 'en-GB', rate = DEFAULT_RATE, rowElOverride = null) {
-    if (isWeChatBrowser()) { wechatFallbackAlert(); return; }
-    if (!('speechSynthesis' in window)) return;
-    if (!el) return;
-
-    // For markup-rich elements (model answers with <strong>/Chinese gloss),
-    // compute the readable text using extractReadableText so it matches
-    // what TTS speaks (skipping gloss). For plain-text elements (polished
-    // output) we can use textContent directly — same result, less work.
-    const hasMarkup = el.children.length > 0;
-    const text = (hasMarkup
-      ? stripChineseGloss(extractReadableText(el))
-      : el.textContent
-    ).trim();
-    if (!text) return;
-
-    // The polished overlay's listen-row is the natural row for el.id === 'polished-output'.
-    // injectListenButtons passes the model-box's .listen-row as the override.
-    // For everything else, fall back to using `el` itself as the WeakMap key.
-    const rowEl = rowElOverride
-      || (el.id === 'polished-output'
-          ? document.getElementById('polished-listen-row')
-          : el);
-
-    const st = getRowState(rowEl);
-
-    // Re-wrap only if text changed AND the element isn't already wrapped.
-    // The data-karaoke-wrapped flag stops a second click from destroying
-    // our own spans (which would be st.wrappedText !== text after a wrap
-    // reduces all whitespace runs to single spaces).
-    if (st.wrappedText !== text || !el.dataset.karaokeWrapped) {
-      let spans, offsets;
-      if (hasMarkup) {
-        // Non-destructive: preserves <strong> vocab highlights, skips gloss.
-        const result = wrapTextNodesInElement(el);
-        spans = result.spans;
-        offsets = result.offsets;
-      } else {
-        // Plain-text path (original behaviour, used for polished-output).
-        const tokens = text.split(/(\s+)/);
-        el.innerHTML = '';
-        spans = [];
-        offsets = [];
-        let charIdx = 0;
-        tokens.forEach(tok => {
-          if (/^\s+$/.test(tok)) {
-            el.appendChild(document.createTextNode(tok));
-          } else if (tok.length) {
-            const s = document.createElement('span');
-            s.textContent = tok;
-            offsets.push({ span: s, start: charIdx, end: charIdx + tok.length });
-            spans.push(s);
-            el.appendChild(s);
-          }
-          charIdx += tok.length;
-        });
-      }
-      el.dataset.karaokeWrapped = '1';
-      st.wrappedText = text;
-      st.spans = spans;
-      st.offsets = offsets;
-      st.sentences = splitSentences(text);
-    } else {
-      // Same text — just re-split in case the splitter logic was upgraded.
-      st.sentences = splitSentences(text);
-    }
-    st.sourceText  = text;
-    st.targetEl    = el;
-    st.currentIndex = 0;
-    st.lang = lang;
-    st.rate = rate || DEFAULT_RATE;
-    setActiveAccent(rowEl, lang);
-    _playCurrentSentence(rowEl);
-  };
-
-  ns.speakElementById = function (id, lang = 'en-GB', rate = DEFAULT_RATE) {
-    const el = document.getElementById(id);
-    if (el) ns.speakElement(el, lang, rate);
-  };
-
-  /** Polished-output button router. Six modes: en-GB / en-US (start over
-   *  in chosen accent), slow / replay (re-speak current sentence), prev /
-   *  next (sentence navigation). */
-  ns.listenPolished = function (which) {
-    const row = document.getElementById('polished-listen-row');
-    if (!row) return;
-    switch (which) {
-      case 'en-GB':
-      case 'en-US':
-        ns.speakElementById('polished-output', which, DEFAULT_RATE);
-        break;
-      case 'slow':   ns.replaySentence(row, true);  break;
-      case 'replay': ns.replaySentence(row, false); break;
-      case 'prev':   ns.prevSentence(row);          break;
-      case 'next':   ns.nextSentence(row);          break;
-    }
-  };
-
-  // Compat stubs — nothing in the new UI calls these, but preserving them
-  // keeps any older injected snippet, browser-extension shortcut, or
-  // user script from throwing if it references the old API.
-  ns.stopSpeaking = function () {
-    if ('speechSynthesis' in window) speechSynthesis.cancel();
-    document.querySelectorAll('.speaking').forEach(s => s.classList.remove('speaking'));
-    _currentRow = null;
-    setSpeakingRow(null);
-  };
-  ns.pauseSpeaking = function () {
-    // No-op in sentence-paced mode (sentences auto-pause). Provided for
-    // backwards compatibility with anything that still references it.
-    ns.stopSpeaking();
-  };
+  // Speech rates. Tuned for Chinese L2 listeners — 0.85 is the comfortable
+  // default (matches what was previously the "slow" button rate); 0.72 is
+  // the new "slow" — about 15% slower than the new default, useful when a
+  // student wants to copy pronunciation word-by-word.
+  const DEFAULT_RATE = 0.85;
+  const SLOW_RATE    = 0.72;
 
   // Voice list loads asynchronously on Chrome. Touching it here primes the cache
   // so the first user click already has voices available.
@@ -625,130 +224,6 @@
       .forEach(b => { b.disabled = true; });
   }
 
-  // ====================================================================
-  // Diff engine — mirrors scripts/templates/diff_engine.mjs (tested separately)
-  // Spec §8.5: 5 correction shapes (delete / insert / replace / suffix-add / prefix-add)
-  // ====================================================================
-
-  function wordDiff(a, b) {
-    const aw = a.split(/\s+/).filter(Boolean);
-    const bw = b.split(/\s+/).filter(Boolean);
-    const m = aw.length, n = bw.length;
-    const dp = Array.from({ length: m + 1 }, () => new Int32Array(n + 1));
-    for (let i = m - 1; i >= 0; i--) {
-      for (let j = n - 1; j >= 0; j--) {
-        if (aw[i] === bw[j]) dp[i][j] = dp[i + 1][j + 1] + 1;
-        else dp[i][j] = Math.max(dp[i + 1][j], dp[i][j + 1]);
-      }
-    }
-    const out = [];
-    let i = 0, j = 0;
-    while (i < m && j < n) {
-      if (aw[i] === bw[j]) { out.push({ op: 'keep', word: aw[i] }); i++; j++; }
-      else if (dp[i + 1][j] >= dp[i][j + 1]) { out.push({ op: 'delete', word: aw[i] }); i++; }
-      else { out.push({ op: 'insert', word: bw[j] }); j++; }
-    }
-    while (i < m) out.push({ op: 'delete', word: aw[i++] });
-    while (j < n) out.push({ op: 'insert', word: bw[j++] });
-    return out;
-  }
-
-  // Merge consecutive same-op `delete`/`insert` segments into one multi-word
-  // segment so phrase-level rewrites render as a single replace-pair instead
-  // of multiple fragments. See diff_engine.mjs comments for the rationale.
-  function coalesceAdjacentSameOp(segs) {
-    const out = [];
-    for (const s of segs) {
-      const last = out[out.length - 1];
-      if (last && last.op === s.op && (s.op === 'delete' || s.op === 'insert')) {
-        last.word = last.word + ' ' + s.word;
-      } else {
-        out.push({ op: s.op, word: s.word });
-      }
-    }
-    return out;
-  }
-
-  // Longest common prefix of two strings (case-sensitive). Used by Case H
-  // (stem-change) to detect word-form transformations like tired→tiring.
-  function longestCommonPrefix(a, b) {
-    let i = 0;
-    while (i < a.length && i < b.length && a[i] === b[i]) i++;
-    return a.slice(0, i);
-  }
-
-  function classifyPairs(segs) {
-    const out = [];
-    let i = 0;
-    while (i < segs.length) {
-      const cur = segs[i];
-      const next = segs[i + 1];
-      if (cur.op === 'delete' && next && next.op === 'insert') {
-        const x = cur.word, y = next.word;
-        if (y !== x && y.startsWith(x)) {
-          out.push({ op: 'suffix-add', kept: x, added: y.slice(x.length) });
-        } else if (y !== x && y.endsWith(x)) {
-          out.push({ op: 'prefix-add', added: y.slice(0, y.length - x.length), kept: x });
-        } else if (y !== x && x.startsWith(y)) {
-          // F. suffix-delete — understanding → understand
-          out.push({ op: 'suffix-delete', kept: y, deleted: x.slice(y.length) });
-        } else if (y !== x && x.endsWith(y)) {
-          // G. prefix-delete — ago → go
-          out.push({ op: 'prefix-delete', deleted: x.slice(0, x.length - y.length), kept: y });
-        } else {
-          const lcp = longestCommonPrefix(x, y);
-          const xTail = x.slice(lcp.length);
-          const yTail = y.slice(lcp.length);
-          if (lcp.length >= 3
-              && xTail.length >= 1 && xTail.length <= 5
-              && yTail.length >= 1 && yTail.length <= 5) {
-            // H. stem-change — tired→tiring, heavy→heavily, make→making
-            out.push({ op: 'stem-change', kept: lcp, deleted: xTail, inserted: yTail });
-          } else {
-            out.push({ op: 'replace', deleted: x, inserted: y });
-          }
-        }
-        i += 2;
-      } else {
-        out.push(cur);
-        i += 1;
-      }
-    }
-    return out;
-  }
-
-  function escHtml(s) {
-    return String(s).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
-  }
-
-  function renderMarkup(classified) {
-    const parts = [];
-    classified.forEach((seg, idx) => {
-      const space = idx > 0 ? ' ' : '';
-      switch (seg.op) {
-        case 'keep':
-          parts.push(`${space}${escHtml(seg.word)}`); break;
-        case 'delete':
-          parts.push(`${space}<del class="del">${escHtml(seg.word)}</del>`); break;
-        case 'insert':
-          parts.push(`${space}<span class="gap-anchor"><ins class="ins-above">${escHtml(seg.word)}</ins></span>`); break;
-        case 'replace':
-          parts.push(`${space}<span class="replace-pair"><del class="del">${escHtml(seg.deleted)}</del><ins class="ins-above">${escHtml(seg.inserted)}</ins></span>`); break;
-        case 'suffix-add':
-          parts.push(`${space}${escHtml(seg.kept)}<ins class="ins-suffix">${escHtml(seg.added)}</ins>`); break;
-        case 'prefix-add':
-          parts.push(`${space}<ins class="ins-prefix">${escHtml(seg.added)}</ins>${escHtml(seg.kept)}`); break;
-        case 'suffix-delete':
-          parts.push(`${space}${escHtml(seg.kept)}<del class="del-suffix">${escHtml(seg.deleted)}</del>`); break;
-        case 'prefix-delete':
-          parts.push(`${space}<del class="del-prefix">${escHtml(seg.deleted)}</del>${escHtml(seg.kept)}`); break;
-        case 'stem-change':
-          parts.push(`${space}${escHtml(seg.kept)}<span class="stem-change-pair"><del class="del-suffix">${escHtml(seg.deleted)}</del><ins class="ins-above">${escHtml(seg.inserted)}</ins></span>`); break;
-      }
-    });
-    return parts.join('');
-  }
-
   // ====================================================================
   // correctEssay flow + status messages + edit-again  (spec §8.4, §8.10)
   // ====================================================================
@@ -785,9 +260,10 @@
     correctBtn.disabled = true;
     setStatus('<span class="spinner"></span>正在修改 / Correcting…');
 
-    let resp;
+    let correct, resp;
     try {
-      resp = await aiCorrectFetchWithRetry(text);
+      correct = await ns.__load('correct');
+      resp = await correct.aiCorrectFetchWithRetry(text);
     } catch (e) {
       setStatus('网络错误 / Network error. ' + (e && e.message ? e.message : ''), 'error');
       correctBtn.disabled = false;
@@ -820,10 +296,10 @@
     // step collapses runs of consecutive deletes/inserts into multi-word
     // segments — without it, phrase-level rewrites fragment into multiple
     // visual elements (chevron clusters, split corrections).
-    const segs = wordDiff(text, corrected);
-    const coalesced = coalesceAdjacentSameOp(segs);
-    const classified = classifyPairs(coalesced);
-    markup.innerHTML = renderMarkup(classified);
+    const segs = correct.wordDiff(text, corrected);
+    const coalesced = correct.coalesceAdjacentSameOp(segs);
+    const classified = correct.classifyPairs(coalesced);
+    markup.innerHTML = correct.renderMarkup(classified);
     markup.hidden = false;
     draft.style.display = 'none';
     correctBtn.hidden = true;
@@ -1068,819 +544,41 @@
     injectListenButtons();
     attachWordClicks();
     checkHealth();
-    initVoiceRecorder();  // no-op if no .voice-recorder-container on the page
+    bootVoiceRecorder();  // no-op if no .voice-recorder-container on the page
+    warmModulesOnFirstInteraction();
   };
 
-  // ====================================================================
-  // Voice recorder — feature-flagged by .voice-recorder-container presence
-  // in DOM. Records via MediaRecorder, persists Blob to IndexedDB keyed by
-  // lesson, supports record/pause/resume/stop/play/re-record with a 3-min
-  // hard cap. The IELTS DB name is "ielts-recordings"; the IGCSE port uses
-  // "igcse-recordings" — different DBs so the two courses can coexist on
-  // the same browser origin without colliding.
-  // ====================================================================
-
-  const VR_DB_NAME    = 'ielts-recordings';
-  const VR_STORE      = 'recordings';
-  const VR_MAX_MS     = 3 * 60 * 1000;
-
-  // Singleton recording state — only one mic recording at a time.
-  // `_activeContainer` tracks WHICH container is currently recording so we
-  // know where to save the blob and update the UI on stop.
-  let _vrMediaRecorder = null;
-  let _vrChunks        = [];
-  let _vrStartedAt     = 0;
-  let _vrPausedTotal   = 0;
-  let _vrPausedAt      = 0;
-  let _vrTimerId       = 0;
-  let _vrStream        = null;
-  let _activeContainer = null;
-
-  // Per-container blob URL for playback (keep separate per widget so
-  // pressing ▶ on Q1 plays Q1's recording, not whichever was last loaded).
-  const _vrSavedBlobUrls = new WeakMap();
-
-  // IndexedDB key per container. Each .voice-recorder-container needs a
-  // `data-recorder-id` attribute (e.g. "polished", "q1", "map-1") so its
-  // recording is stored at a unique key like "Week_01:q1".
-  // Falls back to "default" for backward compatibility with old widgets.
-  function vrKey(container) {
-    const id = (container && container.dataset && container.dataset.recorderId) || 'default';
-    return `${LESSON_KEY}:${id}`;
-  }
-
-  function vrOpenDB() {
-    return new Promise((resolve, reject) => {
-      const req = indexedDB.open(VR_DB_NAME, 1);
-      req.onupgradeneeded = () => req.result.createObjectStore(VR_STORE);
-      req.onsuccess = () => resolve(req.result);
-      req.onerror = () => reject(req.error);
-    });
-  }
-
-  // === Quota management — one-and-done LRU eviction ============================
-  // Goal: never blow past the browser's IndexedDB quota even if a viral cohort
-  // of students records 3-min answers in every recorder of every Week. Two
-  // belt-and-suspenders mechanisms run together:
-  //
-  //  1. Persistent storage request: tells the browser "don't auto-evict our
-  //     data when disk fills up." Granted automatically in most cases on
-  //     desktop Chrome; iOS Safari ignores it but it's still cheap to ask.
-  //  2. LRU eviction: enforced via TWO ceilings — a HARD COUNT cap (always
-  //     in effect) and a SOFT QUOTA cap (kicks in when the browser tells us
-  //     usage is approaching its quota). On iOS Safari (~1 GB origin cap),
-  //     the quota ceiling protects against the cap; on Chrome desktop (~60%
-  //     of disk), the count cap keeps things tidy regardless.
-  //
-  // Eviction is FIFO by `createdAt` (oldest recording removed first). The
-  // student never sees an error — recordings just silently disappear in age
-  // order, which is the right UX for a long-running classroom course.
-  const VR_MAX_RECORDINGS = 60;          // hard cap — never exceed this regardless of free quota
-  const VR_QUOTA_HEADROOM = 0.20;        // start evicting when free quota < 20% of usable
-  let _vrPersistRequested = false;
-
-  async function vrRequestPersistentStorage() {
-    if (_vrPersistRequested) return;
-    _vrPersistRequested = true;
-    try {
-      if (navigator.storage && typeof navigator.storage.persist === 'function') {
-        await navigator.storage.persist();
-      }
-    } catch (e) {
-      // Older Safari / Firefox quirks — ignore, we have LRU as the safety net.
-    }
-  }
-
-  // Walk every entry in the store and return [{key, createdAt}, ...] sorted
-  // ascending so index 0 is the OLDEST recording (first to evict).
-  async function vrListEntriesByAge(db) {
-    return new Promise((resolve, reject) => {
-      const tx = db.transaction(VR_STORE, 'readonly');
-      const req = tx.objectStore(VR_STORE).openCursor();
-      const out = [];
-      req.onsuccess = () => {
-        const cur = req.result;
-        if (cur) {
-          const v = cur.value || {};
-          out.push({ key: cur.key, createdAt: v.createdAt || 0 });
-          cur.continue();
-        } else {
-          out.sort((a, b) => a.createdAt - b.createdAt);
-          resolve(out);
-        }
-      };
-      req.onerror = () => reject(req.error);
-    });
-  }
-
-  async function vrDeleteByKey(db, key) {
-    return new Promise((resolve, reject) => {
-      const tx = db.transaction(VR_STORE, 'readwrite');
-      tx.objectStore(VR_STORE).delete(key);
-      tx.oncomplete = () => resolve();
-      tx.onerror = () => reject(tx.error);
-    });
-  }
-
-  // Returns a number 0..1 representing fraction of quota currently in use,
-  // or null if the API isn't available (fallback: rely solely on count cap).
-  async function vrQuotaUsageRatio() {
-    try {
-      if (navigator.storage && typeof navigator.storage.estimate === 'function') {
-        const { usage, quota } = await navigator.storage.estimate();
-        if (quota && quota > 0) return usage / quota;
-      }
-    } catch (e) { /* ignore */ }
-    return null;
-  }
-
-  // Run BEFORE saving a new recording. Evicts oldest recordings until BOTH
-  // the hard count cap and the soft quota cap are satisfied. Skips the
-  // currently-active container's existing key (which the upcoming put() will
-  // overwrite anyway — no point evicting it just to write it).
-  async function vrEvictIfNeeded(db, exemptKey) {
-    let entries = await vrListEntriesByAge(db);
-    let evicted = 0;
-
-    // Pass 1 — hard count cap.
-    while (entries.length > VR_MAX_RECORDINGS) {
-      const oldest = entries.shift();
-      if (oldest.key === exemptKey) continue;
-      await vrDeleteByKey(db, oldest.key);
-      evicted++;
-    }
-
-    // Pass 2 — soft quota cap (only if API tells us we're tight).
-    let ratio = await vrQuotaUsageRatio();
-    while (ratio !== null && ratio > (1 - VR_QUOTA_HEADROOM) && entries.length > 1) {
-      const oldest = entries.shift();
-      if (oldest.key === exemptKey) continue;
-      await vrDeleteByKey(db, oldest.key);
-      evicted++;
-      ratio = await vrQuotaUsageRatio();
-    }
-
-    if (evicted > 0) {
-      try { console.info(`[recorder] LRU evicted ${evicted} oldest recording(s) to stay under quota.`); } catch {}
-    }
-  }
-
-  // Kick off persistent-storage request once at module load — non-blocking.
-  vrRequestPersistentStorage();
-  // ============================================================================
-
-  async function vrSaveBlob(container, blob, durationMs) {
-    const db = await vrOpenDB();
-    // Evict before write so a near-full quota doesn't reject our put().
-    try { await vrEvictIfNeeded(db, vrKey(container)); } catch (e) { console.warn('vrEvict', e); }
-    return new Promise((resolve, reject) => {
-      const tx = db.transaction(VR_STORE, 'readwrite');
-      tx.objectStore(VR_STORE).put({ blob, duration: durationMs, createdAt: Date.now() }, vrKey(container));
-      tx.oncomplete = () => resolve();
-      tx.onerror = () => reject(tx.error);
-    });
-  }
-  async function vrLoadBlob(container) {
-    const db = await vrOpenDB();
-    return new Promise((resolve, reject) => {
-      const tx = db.transaction(VR_STORE, 'readonly');
-      const req = tx.objectStore(VR_STORE).get(vrKey(container));
-      req.onsuccess = () => resolve(req.result || null);
-      req.onerror = () => reject(req.error);
-    });
-  }
-  async function vrDeleteBlob(container) {
-    const db = await vrOpenDB();
-    return new Promise((resolve, reject) => {
-      const tx = db.transaction(VR_STORE, 'readwrite');
-      tx.objectStore(VR_STORE).delete(vrKey(container));
-      tx.oncomplete = () => resolve();
-      tx.onerror = () => reject(tx.error);
-    });
-  }
-
-  function vrFormatTime(ms) {
-    const total = Math.floor(ms / 1000);
-    return `${Math.floor(total / 60)}:${String(total % 60).padStart(2, '0')}`;
-  }
-
-  function vrSetState(container, state) {
-    const $ = (sel) => container.querySelector(sel);
-    const btnRec    = $('.vr-record');
-    const btnPause  = $('.vr-pause');
-    const btnStop   = $('.vr-stop');
-    const btnPlay   = $('.vr-play');
-    const btnDelete = $('.vr-delete');
-    const label    = $('.vr-label');  // optional — inline widgets omit it
-
-    // `has-recording` is a discrete visual indicator (small green dot via
-    // CSS ::after) showing students at-a-glance whether a saved recording
-    // exists for this section. Toggled here so every state transition
-    // updates the indicator atomically.
-    container.classList.toggle('has-recording', state === 'saved');
-
-    [btnRec, btnPause, btnStop, btnPlay, btnDelete].forEach(b => b && (b.hidden = true));
-    if (btnRec) btnRec.classList.remove('recording');
-    if (btnPause) btnPause.classList.remove('paused');
-    if (label) label.classList.remove('error');
-
-    if (state === 'idle') {
-      if (btnRec) { btnRec.hidden = false; btnRec.disabled = false; }
-      if (label) label.textContent = 'Click ⏺ to record (3:00 max)';
-    } else if (state === 'recording') {
-      if (btnRec) { btnRec.hidden = false; btnRec.classList.add('recording'); btnRec.disabled = true; }
-      if (btnPause) btnPause.hidden = false;
-      if (btnStop) btnStop.hidden = false;
-      if (label) label.textContent = 'Recording…';
-    } else if (state === 'paused') {
-      if (btnRec) { btnRec.hidden = false; btnRec.classList.add('recording'); btnRec.disabled = true; }
-      if (btnPause) { btnPause.hidden = false; btnPause.classList.add('paused'); btnPause.title = 'Resume'; btnPause.textContent = '▶'; }
-      if (btnStop) btnStop.hidden = false;
-      if (label) label.textContent = 'Paused — tap ▶ to resume';
-    } else if (state === 'saved') {
-      if (btnRec) { btnRec.hidden = false; btnRec.disabled = false; }
-      if (btnPlay) btnPlay.hidden = false;
-      if (btnDelete) btnDelete.hidden = false;
-      if (btnPause) { btnPause.textContent = '⏸'; btnPause.title = 'Pause / resume'; }
-      if (label) label.textContent = 'Saved — tap ▶ to play, 🗑 to re-record';
-    } else if (state === 'error') {
-      if (btnRec) { btnRec.hidden = false; btnRec.disabled = true; }
-      if (label) label.classList.add('error');
-    }
-  }
-
-  function vrUpdateTimer(container) {
-    if (_activeContainer !== container) return;
-    const elapsed = Date.now() - _vrStartedAt - _vrPausedTotal -
-                    (_vrPausedAt ? (Date.now() - _vrPausedAt) : 0);
-    const timeEl = container.querySelector('.vr-time');
-    if (timeEl) timeEl.textContent = `${vrFormatTime(elapsed)} / 3:00`;
-    if (elapsed >= VR_MAX_MS) {
-      if (timeEl) timeEl.classList.add('over');
-      vrStop(container);
-    }
-  }
-
-  async function vrStart(container) {
-    // If another widget is recording, stop it first so we don't get two
-    // active MediaRecorder instances (the browser only allows one anyway).
-    if (_activeContainer && _activeContainer !== container && _vrMediaRecorder
-        && _vrMediaRecorder.state !== 'inactive') {
-      _vrMediaRecorder.stop();
-    }
-    try {
-      _vrStream = await navigator.mediaDevices.getUserMedia({ audio: true });
-    } catch (err) {
-      const label = container.querySelector('.vr-label');
-      if (label) label.textContent = 'Microphone permission denied / 麦克风权限被拒绝';
-      vrSetState(container, 'error');
-      return;
-    }
-    _activeContainer = container;
-    _vrChunks = [];
-    _vrStartedAt = Date.now();
-    _vrPausedTotal = 0;
-    _vrPausedAt = 0;
-    _vrMediaRecorder = new MediaRecorder(_vrStream);
-    _vrMediaRecorder.ondataavailable = (e) => { if (e.data.size > 0) _vrChunks.push(e.data); };
-    _vrMediaRecorder.onstop = async () => {
-      const blob = new Blob(_vrChunks, { type: _vrMediaRecorder.mimeType || 'audio/webm' });
-      const elapsed = Date.now() - _vrStartedAt - _vrPausedTotal;
-      // Round 22 (2026-05-03): show explicit save-confirmation toast.
-      // Previously the save was silent; users couldn't tell whether ⏹
-      // had actually persisted the recording before they navigated away.
-      let saved = false;
-      try {
-        await vrSaveBlob(container, blob, elapsed);
-        saved = true;
-      } catch (e) {
-        console.error('vrSave', e);
-        _showEmailToast('⚠ Save failed — check browser storage', 3500);
-      }
-      if (saved) _showEmailToast('Recording saved ✓', 1800);
-      if (_vrStream) { _vrStream.getTracks().forEach(t => t.stop()); _vrStream = null; }
-      clearInterval(_vrTimerId); _vrTimerId = 0;
-      _activeContainer = null;
-      vrLoadIntoUi(container);
-    };
-    _vrMediaRecorder.start();
-    _vrTimerId = setInterval(() => vrUpdateTimer(container), 250);
-    vrSetState(container, 'recording');
-  }
-
-  function vrPauseToggle(container) {
-    if (!_vrMediaRecorder || _activeContainer !== container) return;
-    if (_vrMediaRecorder.state === 'recording') {
-      _vrMediaRecorder.pause();
-      _vrPausedAt = Date.now();
-      vrSetState(container, 'paused');
-    } else if (_vrMediaRecorder.state === 'paused') {
-      _vrPausedTotal += Date.now() - _vrPausedAt;
-      _vrPausedAt = 0;
-      _vrMediaRecorder.resume();
-      vrSetState(container, 'recording');
-    }
-  }
-
-  function vrStop(container) {
-    if (!_vrMediaRecorder || _activeContainer !== container) return;
-    if (_vrMediaRecorder.state !== 'inactive') _vrMediaRecorder.stop();
-  }
-
-  async function vrLoadIntoUi(container) {
-    const rec = await vrLoadBlob(container);
-    const audioEl = container.querySelector('audio');
-    // Per-widget blob URL — revoke ONLY this container's old URL.
-    const oldUrl = _vrSavedBlobUrls.get(container);
-    if (oldUrl) { URL.revokeObjectURL(oldUrl); _vrSavedBlobUrls.delete(container); }
-    if (rec && rec.blob) {
-      const url = URL.createObjectURL(rec.blob);
-      _vrSavedBlobUrls.set(container, url);
-      if (audioEl) audioEl.src = url;
-      const timeEl = container.querySelector('.vr-time');
-      if (timeEl) {
-        timeEl.textContent = vrFormatTime(rec.duration || 0);
-        timeEl.classList.remove('over');
-      }
-      vrSetState(container, 'saved');
-    } else {
-      const timeEl = container.querySelector('.vr-time');
-      if (timeEl) {
-        timeEl.textContent = '--:--';
-        timeEl.classList.remove('over');
-      }
-      vrSetState(container, 'idle');
-    }
-  }
-
-  async function vrDelete(container) {
-    if (!confirm('Delete recording? / 删除录音？')) return;
-    await vrDeleteBlob(container);
-    const oldUrl = _vrSavedBlobUrls.get(container);
-    if (oldUrl) { URL.revokeObjectURL(oldUrl); _vrSavedBlobUrls.delete(container); }
-    vrLoadIntoUi(container);
-  }
-
-  function vrPlay(container) {
-    const audioEl = container.querySelector('audio');
-    if (audioEl && audioEl.src) audioEl.play();
-  }
-
-  function initVoiceRecorder() {
+  // The recorder widgets show whether a recording is already saved, so the
+  // recorder module is loaded once the page is idle rather than waiting for
+  // an interaction. A click on a widget button before then is replayed once
+  // the module has wired the buttons.
+  function bootVoiceRecorder() {
     if (!('mediaDevices' in navigator) || !window.MediaRecorder) return;
-    document.querySelectorAll('.voice-recorder-container').forEach((container) => {
-      const q = (sel) => container.querySelector(sel);
-      const onIf = (sel, handler) => { const el = q(sel); if (el) el.onclick = handler; };
-      onIf('.vr-record', () => vrStart(container));
-      onIf('.vr-pause',  () => vrPauseToggle(container));
-      onIf('.vr-stop',   () => vrStop(container));
-      onIf('.vr-play',   () => vrPlay(container));
-      onIf('.vr-delete', () => vrDelete(container));
-      vrLoadIntoUi(container);
-    });
-  }
-
-  // ====================================================================
-  // EMAIL RECORDINGS — gather all IndexedDB recordings for THIS lesson,
-  // ZIP them client-side, trigger a download, and open the user's email
-  // client via mailto: with a pre-filled subject + body. Student attaches
-  // the zip manually in their mail client.
-  //
-  // Public API: ns.emailLessonRecordings()
-  // No backend / no network. All client-side.
-  // ====================================================================
-
-  const _EMAIL_LS_KEY = 'lessonEmailRecipient';
-  const _EMAIL_VALID_RE = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
-
-  // Pretty week number from LESSON_KEY (e.g. "Week_05" -> 5).
-  function _emailWeekNumber() {
-    const m = /^Week_?(\d+)/i.exec(LESSON_KEY || '');
-    return m ? parseInt(m[1], 10) : null;
-  }
-
-  // Course label for subject line — IELTS vs IGCSE based on hostname.
-  function _emailCourseLabel() {
-    const host = (location && location.hostname) || '';
-    if (host.indexOf('igcse') !== -1) return 'IGCSE';
-    return 'IELTS';
-  }
-
-  // Walk all IndexedDB recordings for THIS lesson (keys "Week_NN:<id>")
-  // and return [{recorderId, blob, createdAt}] sorted by createdAt asc.
-  async function _emailEnumerateRecordings() {
-    const db = await vrOpenDB();
-    const prefix = `${LESSON_KEY}:`;
-    // Round 22 (2026-05-03): debug logging — surfaces what the email
-    // function actually sees in IndexedDB. Open DevTools → Console
-    // before clicking the email button to see what's matched/skipped.
-    console.info('[email] enumerate: LESSON_KEY=%s prefix=%s', LESSON_KEY, prefix);
-    return new Promise((resolve, reject) => {
-      const tx = db.transaction(VR_STORE, 'readonly');
-      const store = tx.objectStore(VR_STORE);
-      const req = store.openCursor();
-      const out = [];
-      const skipped = [];
-      req.onsuccess = () => {
-        const cur = req.result;
-        if (cur) {
-          const key = String(cur.key || '');
-          if (key.startsWith(prefix)) {
-            const v = cur.value || {};
-            if (v.blob) {
-              out.push({
-                recorderId: key.slice(prefix.length),
-                blob: v.blob,
-                createdAt: v.createdAt || 0,
-              });
-            }
-          } else {
-            skipped.push(key);
-          }
-          cur.continue();
-        } else {
-          out.sort((a, b) => a.createdAt - b.createdAt);
-          console.info('[email] enumerate: matched %d recording(s):',
-            out.length,
-            out.map(r => `${r.recorderId} (${new Date(r.createdAt).toISOString().slice(0,10)})`));
-          if (skipped.length) {
-            console.info('[email] enumerate: skipped %d non-matching key(s) (other lessons):',
-              skipped.length, skipped);
-          }
-          resolve(out);
-        }
-      };
-      req.onerror = () => reject(req.error);
-    });
-  }
-
-  // Filename: <LESSON_KEY>_<recorderId>_YYYY-MM-DD.webm
-  // Sanitizes recorderId so weird chars don't break filesystems.
-  function _emailFilenameFor(rec) {
-    const d = new Date(rec.createdAt || Date.now());
-    const yyyy = d.getFullYear();
-    const mm = String(d.getMonth() + 1).padStart(2, '0');
-    const dd = String(d.getDate()).padStart(2, '0');
-    const safeId = String(rec.recorderId || 'unknown').replace(/[^a-zA-Z0-9_-]/g, '_');
-    return `${LESSON_KEY}_${safeId}_${yyyy}-${mm}-${dd}.webm`;
-  }
-
-  // Get recipient: first call prompts; subsequent reads from localStorage.
-  // Returns null if user cancels.
-  function _emailGetRecipient() {
-    let saved = '';
-    try { saved = localStorage.getItem(_EMAIL_LS_KEY) || ''; } catch (_) { /* private mode */ }
-    if (saved && _EMAIL_VALID_RE.test(saved)) return saved;
-    let attempts = 0;
-    while (attempts++ < 3) {
-      const msg = attempts === 1
-        ? "Enter the email address to send your recordings to:"
-        : "That doesn't look like a valid email. Please try again (or Cancel to abort):";
-      const entry = window.prompt(msg, saved);
-      if (entry === null) return null; // user cancelled
-      const trimmed = entry.trim();
-      if (_EMAIL_VALID_RE.test(trimmed)) {
-        try { localStorage.setItem(_EMAIL_LS_KEY, trimmed); } catch (_) {}
-        return trimmed;
-      }
-      saved = trimmed; // keep for next prompt
-    }
-    return null;
-  }
-
-  // ----- ZIP encoder (STORED-mode, no compression) -----
-  // Audio is already Opus-compressed; DEFLATE adds ~1-2%, not worth the
-  // 95KB JSZip dependency. Format ref: PKWARE APPNOTE.TXT 4.5.
-
-  let _crcTable = null;
-  function _ensureCrcTable() {
-    if (_crcTable) return _crcTable;
-    const t = new Uint32Array(256);
-    for (let n = 0; n < 256; n++) {
-      let c = n;
-      for (let k = 0; k < 8; k++) c = (c & 1) ? (0xEDB88320 ^ (c >>> 1)) : (c >>> 1);
-      t[n] = c >>> 0;
-    }
-    _crcTable = t;
-    return t;
-  }
-  function _crc32(bytes) {
-    const t = _ensureCrcTable();
-    let crc = 0xFFFFFFFF;
-    for (let i = 0; i < bytes.length; i++) {
-      crc = (t[(crc ^ bytes[i]) & 0xFF] ^ (crc >>> 8)) >>> 0;
-    }
-    return (crc ^ 0xFFFFFFFF) >>> 0;
-  }
-
-  // entries: [{name: string, data: Uint8Array}] -> Blob('application/zip')
-  async function _emailBuildZip(entries) {
-    const enc = new TextEncoder();
-    const parts = [];
-    const central = [];
-    let offset = 0;
-
-    const now = new Date();
-    const dosTime = ((now.getHours() & 0x1F) << 11)
-                  | ((now.getMinutes() & 0x3F) << 5)
-                  | ((now.getSeconds() >> 1) & 0x1F);
-    const dosDate = (((now.getFullYear() - 1980) & 0x7F) << 9)
-                  | (((now.getMonth() + 1) & 0x0F) << 5)
-                  | (now.getDate() & 0x1F);
-
-    for (const e of entries) {
-      const nameBytes = enc.encode(e.name);
-      const data = e.data;
-      const crc = _crc32(data);
-      const sz = data.length;
-
-      // Local file header
-      const lfh = new Uint8Array(30 + nameBytes.length);
-      const lv = new DataView(lfh.buffer);
-      lv.setUint32(0, 0x04034b50, true);
-      lv.setUint16(4, 20, true);
-      lv.setUint16(6, 0, true);
-      lv.setUint16(8, 0, true);  // STORED
-      lv.setUint16(10, dosTime, true);
-      lv.setUint16(12, dosDate, true);
-      lv.setUint32(14, crc, true);
-      lv.setUint32(18, sz, true);
-      lv.setUint32(22, sz, true);
-      lv.setUint16(26, nameBytes.length, true);
-      lv.setUint16(28, 0, true);
-      lfh.set(nameBytes, 30);
-      parts.push(lfh, data);
-
-      // Central directory entry
-      const cdh = new Uint8Array(46 + nameBytes.length);
-      const cv = new DataView(cdh.buffer);
-      cv.setUint32(0, 0x02014b50, true);
-      cv.setUint16(4, 20, true);
-      cv.setUint16(6, 20, true);
-      cv.setUint16(8, 0, true);
-      cv.setUint16(10, 0, true);
-      cv.setUint16(12, dosTime, true);
-      cv.setUint16(14, dosDate, true);
-      cv.setUint32(16, crc, true);
-      cv.setUint32(20, sz, true);
-      cv.setUint32(24, sz, true);
-      cv.setUint16(28, nameBytes.length, true);
-      cv.setUint16(30, 0, true);
-      cv.setUint16(32, 0, true);
-      cv.setUint16(34, 0, true);
-      cv.setUint16(36, 0, true);
-      cv.setUint32(38, 0, true);
-      cv.setUint32(42, offset, true);
-      cdh.set(nameBytes, 46);
-      central.push(cdh);
-
-      offset += lfh.length + sz;
-    }
-
-    const cdSize = central.reduce((s, c) => s + c.length, 0);
-    const cdOffset = offset;
-    const eocd = new Uint8Array(22);
-    const ev = new DataView(eocd.buffer);
-    ev.setUint32(0, 0x06054b50, true);
-    ev.setUint16(4, 0, true);
-    ev.setUint16(6, 0, true);
-    ev.setUint16(8, entries.length, true);
-    ev.setUint16(10, entries.length, true);
-    ev.setUint32(12, cdSize, true);
-    ev.setUint32(16, cdOffset, true);
-    ev.setUint16(20, 0, true);
-
-    return new Blob([...parts, ...central, eocd], { type: 'application/zip' });
-  }
-
-  // Programmatic <a download> click — works without a permission prompt
-  // because we're inside a user-gesture handler (the button click).
-  function _emailDownloadBlob(blob, filename) {
-    const url = URL.createObjectURL(blob);
-    const a = document.createElement('a');
-    a.href = url;
-    a.download = filename;
-    document.body.appendChild(a);
-    a.click();
-    setTimeout(() => {
-      try { document.body.removeChild(a); } catch (_) {}
-      URL.revokeObjectURL(url);
-    }, 1000);
-  }
-
-  // Open mailto: via a synchronous <a>.click() so the OS protocol handler
-  // intercepts before navigation. Avoids window.open() (which the popup
-  // blocker can silently kill if any setTimeout has broken the
-  // user-gesture chain). The current page does NOT navigate — the mail
-  // client just opens. If there's no registered mail client, the click
-  // is a no-op (the completion panel below provides a re-open button).
-  function _emailOpenMailto(url) {
-    const a = document.createElement('a');
-    a.href = url;
-    a.style.display = 'none';
-    document.body.appendChild(a);
-    a.click();
-    setTimeout(() => { try { document.body.removeChild(a); } catch (_) {} }, 200);
-  }
-
-  // Completion panel — shown after successful download + mailto trigger.
-  // Acts as a fallback for: (1) browsers that blocked the mailto, (2) users
-  // with no default mail client (very common — they use webmail). The
-  // "Re-open email" button retries the mailto in a fresh user gesture.
-  function _showEmailCompletionPanel(recipient, zipName, mailtoUrl) {
-    const existing = document.querySelector('.email-completion-panel');
-    if (existing) existing.remove();
-    const panel = document.createElement('div');
-    panel.className = 'email-completion-panel';
-    panel.innerHTML = ''
-      + '<div class="ecp-icon">✉️</div>'
-      + '<div class="ecp-content">'
-      +   '<div class="ecp-line"><strong>Downloaded:</strong> <span class="ecp-mono">' + _emailEsc(zipName) + '</span></div>'
-      +   '<div class="ecp-line"><strong>Send to:</strong> ' + _emailEsc(recipient) + '</div>'
-      +   '<div class="ecp-hint">Your email program should have opened. If not, click <em>Re-open email</em> below — or copy the details and paste into Gmail / Outlook web.</div>'
-      +   '<div class="ecp-actions">'
-      +     '<button class="ecp-reopen" type="button">Re-open email</button>'
-      +     '<button class="ecp-copy"   type="button">Copy details</button>'
-      +     '<button class="ecp-close"  type="button">Close</button>'
-      +   '</div>'
-      + '</div>';
-    document.body.appendChild(panel);
-    panel.querySelector('.ecp-close').onclick = () => panel.remove();
-    panel.querySelector('.ecp-reopen').onclick = () => _emailOpenMailto(mailtoUrl);
-    panel.querySelector('.ecp-copy').onclick = async (ev) => {
-      // Decode the mailto URL into copy-friendly text
-      const u = new URL(mailtoUrl);
-      const subject = decodeURIComponent((u.search.match(/[?&]subject=([^&]*)/) || [,''])[1]);
-      const body = decodeURIComponent((u.search.match(/[?&]body=([^&]*)/) || [,''])[1]);
-      const text = `To: ${recipient}\nSubject: ${subject}\n\n${body}`;
-      try {
-        await navigator.clipboard.writeText(text);
-        const btn = ev.currentTarget;
-        const orig = btn.textContent;
-        btn.textContent = '✓ Copied';
-        setTimeout(() => { btn.textContent = orig; }, 1600);
-      } catch (e) {
-        _showEmailToast('Copy failed — your browser blocked clipboard access.');
-      }
-    };
-    // Auto-dismiss after 90s in case the student forgets it's there
-    setTimeout(() => { if (panel.parentNode) panel.remove(); }, 90000);
-  }
-
-  function _emailEsc(s) {
-    return String(s).replace(/[&<>"']/g, c => ({
-      '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
-    })[c]);
-  }
-
-  function _emailComposeMailto(recipient, recordings, weekNum) {
-    const course = _emailCourseLabel();
-    const subject = `${course} Week ${weekNum} Speaking Recordings`;
-    const today = new Date().toISOString().slice(0, 10);
-    const lines = [
-      `Hi,`,
-      ``,
-      `Please find my Week ${weekNum} ${course} speaking recordings.`,
-      ``,
-      `Attached: ${LESSON_KEY}_recordings_${today}.zip (${recordings.length} recording${recordings.length === 1 ? '' : 's'})`,
-      ``,
-      `Filenames inside the zip:`,
-    ];
-    for (const r of recordings) lines.push(`  • ${_emailFilenameFor(r)}`);
-    lines.push('', '(Please attach the downloaded zip — your email program should have started a new message.)');
-    let body = lines.join('\n');
-    if (body.length > 1500) body = body.slice(0, 1500) + '\n…';
-    return `mailto:${encodeURIComponent(recipient)}?subject=${encodeURIComponent(subject)}&body=${encodeURIComponent(body)}`;
-  }
-
-  // Floating bottom-center toast.
-  function _showEmailToast(text, ms = 3000) {
-    let toast = document.querySelector('.email-toast');
-    if (!toast) {
-      toast = document.createElement('div');
-      toast.className = 'email-toast';
-      document.body.appendChild(toast);
-    }
-    toast.textContent = text;
-    requestAnimationFrame(() => toast.classList.add('visible'));
-    clearTimeout(toast._dismissTimer);
-    toast._dismissTimer = setTimeout(() => toast.classList.remove('visible'), ms);
-  }
-
-  // Round 22 (2026-05-03): preflight confirmation before zipping. Lists
-  // every recording that's about to be sent so users can spot stale ones
-  // from prior sessions BEFORE the zip download fires. Returns a Promise
-  // that resolves to true if user clicked Send, false if Cancel.
-  function _showEmailPreflightPanel(recordings) {
-    return new Promise((resolve) => {
-      // Remove any existing preflight panel
-      const existing = document.querySelector('.email-preflight-panel');
-      if (existing) existing.remove();
-
-      const panel = document.createElement('div');
-      panel.className = 'email-preflight-panel';
-
-      const heading = document.createElement('div');
-      heading.className = 'epp-heading';
-      const n = recordings.length;
-      heading.textContent = `Found ${n} recording${n === 1 ? '' : 's'} for this week:`;
-      panel.appendChild(heading);
-
-      const list = document.createElement('ul');
-      list.className = 'epp-list';
-      for (const r of recordings) {
-        const li = document.createElement('li');
-        const tick = document.createElement('span');
-        tick.className = 'epp-tick';
-        tick.textContent = '✓';
-        const id = document.createElement('strong');
-        id.textContent = r.recorderId;
-        const date = document.createElement('span');
-        date.className = 'epp-date';
-        const d = new Date(r.createdAt || Date.now());
-        date.textContent = `recorded ${d.toLocaleDateString(undefined, {month: 'short', day: 'numeric'})}`;
-        li.appendChild(tick);
-        li.appendChild(id);
-        li.appendChild(date);
-        list.appendChild(li);
-      }
-      panel.appendChild(list);
-
-      const hint = document.createElement('div');
-      hint.className = 'epp-hint';
-      hint.textContent = 'To remove an old recording: close this and use the 🗑 button on its widget.';
-      panel.appendChild(hint);
-
-      const actions = document.createElement('div');
-      actions.className = 'epp-actions';
-      const cancelBtn = document.createElement('button');
-      cancelBtn.type = 'button';
-      cancelBtn.className = 'epp-cancel';
-      cancelBtn.textContent = 'Cancel';
-      cancelBtn.onclick = () => { panel.remove(); resolve(false); };
-      const sendBtn = document.createElement('button');
-      sendBtn.type = 'button';
-      sendBtn.className = 'epp-send';
-      sendBtn.textContent = `Send all ${n}`;
-      sendBtn.onclick = () => { panel.remove(); resolve(true); };
-      actions.appendChild(cancelBtn);
-      actions.appendChild(sendBtn);
-      panel.appendChild(actions);
-
-      document.body.appendChild(panel);
-      sendBtn.focus();
-    });
-  }
-
-  ns.emailLessonRecordings = async function () {
-    let recordings;
-    try {
-      recordings = await _emailEnumerateRecordings();
-    } catch (e) {
-      console.error('emailLessonRecordings: enumerate failed', e);
-      _showEmailToast('Could not read recordings (browser storage error).');
-      return;
-    }
-    if (!recordings || recordings.length === 0) {
-      _showEmailToast('No recordings saved yet for this week.');
-      return;
-    }
-
-    // Round 22: preflight panel — let user see what's about to be sent
-    // (avoids the "I made 1 recording but 3 zipped" confusion when stale
-    // recordings from prior sessions are still in IndexedDB).
-    const proceed = await _showEmailPreflightPanel(recordings);
-    if (!proceed) return;
-
-    const recipient = _emailGetRecipient();
-    if (!recipient) return;
-
-    const entries = [];
-    for (const r of recordings) {
-      const ab = await r.blob.arrayBuffer();
-      entries.push({ name: _emailFilenameFor(r), data: new Uint8Array(ab) });
-    }
-
-    const zipBlob = await _emailBuildZip(entries);
-    const today = new Date().toISOString().slice(0, 10);
-    const zipName = `${LESSON_KEY}_recordings_${today}.zip`;
-    _emailDownloadBlob(zipBlob, zipName);
-
-    const weekNum = _emailWeekNumber();
-    const mailtoUrl = _emailComposeMailto(recipient, recordings, weekNum);
-    // Synchronous <a>.click() in the same user-gesture frame — no popup blocker.
-    _emailOpenMailto(mailtoUrl);
-    // Show completion panel with "Re-open email" + "Copy details" fallbacks
-    // for students whose Windows machine has no default mail client.
-    _showEmailCompletionPanel(recipient, zipName, mailtoUrl);
+    if (!document.querySelector('.voice-recorder-container')) return;
+    let started = null;
+    const start = () => started || (started = ns.__load('recorder')
+      .then(m => m.initVoiceRecorder())
+      .catch((e) => { started = null; throw e; }));
+    document.addEventListener('click', (ev) => {
+      const btn = ev.target.closest && ev.target.closest('.voice-recorder-container button');
+      if (!btn || btn.onclick) return;
+      ev.preventDefault();
+      ev.stopPropagation();
+      start().then(() => { if (btn.onclick) btn.click(); }, (e) => console.warn('recorder', e));
+    }, true);
+    const whenIdle = window.requestIdleCallback || ((cb) => setTimeout(cb, 1500));
+    whenIdle(() => start().catch((e) => console.warn('recorder', e)), { timeout: 4000 });
+  }
+
+  // Read by the lazy modules (see "Lazy feature modules" above).
+  ns.__core = {
+    AI_ENDPOINT, LESSON_KEY, DEFAULT_RATE, SLOW_RATE,
+    isChineseGloss, isMarkerBadge, stripChineseGloss, extractReadableText,
   };
 
-  // Test hooks (only used by Playwright/Node smoke tests)
-  ns.__emailBuildZip = _emailBuildZip;
-  ns.__emailFilenameFor = _emailFilenameFor;
 
   document.addEventListener('DOMContentLoaded', () => {
     if (typeof ns.__init === 'function') ns.__init();
   });
 
-})();
+})();
\ No newline at end of file
@@ -0,0 +1,445 @@
+/* === IELTS Interactive — lazy module: TTS player (sentence-paced speech + karaoke) === */
+/* Split out of inserted_script.js and loaded by its ns.__load('tts')
+   on first use; see "Lazy feature modules" there. */
+(function () {
+  'use strict';
+
+  const ns = window.__ielts;
+  const { DEFAULT_RATE, SLOW_RATE, isChineseGloss, isMarkerBadge, stripChineseGloss,
+          extractReadableText } = ns.__core;
+
+  // ====================================================================
+  // TTS subsystem — Web Speech API with voice waterfall + karaoke
+  // ====================================================================
+
+  // Common female-neural voice names across Edge/Chrome (Windows), Safari/iOS,
+  // and Android system voices. The regex covers both modern Edge "Natural"
+  // voices and legacy macOS / iOS / Android voices known to sound natural.
+  const FEMALE_NEURAL_UK = /Sonia|Libby|Mia|Maisie|Kate|Serena|Sienna|Tessa|Karen|Hazel|Susan|Stephanie/i;
+  const MALE_NEURAL_UK   = /Ryan|Thomas.*GB|Noah|Daniel|George|Oliver/i;
+  const FEMALE_NEURAL_US = /Aria|Jenny|Ana|Michelle|Emma|Samantha|Allison|Ava|Joanna|Salli|Kendra|Kimberly|Ivy|Nora|Susan.*US|Zira/i;
+  const MALE_NEURAL_US   = /Guy|Tony|Jason|Eric|Davis|Alex|Aaron|Brandon|Steffan|Roger/i;
+
+  // Score-based picker: prefers high-quality engines (Edge "Online (Natural)",
+  // Google network voices, macOS Premium/Enhanced) over legacy local voices.
+  // Without scoring, browsers like Chrome on Windows often surface the older
+  // "Microsoft Hazel" (low-quality concatenative) ahead of "Microsoft Sonia
+  // Online (Natural)" — and Array.find() would return Hazel even though both
+  // names match the female regex.
+  function pickVoice(lang) {
+    if (!('speechSynthesis' in window)) return null;
+    const all = window.speechSynthesis.getVoices();
+    if (!all.length) return null;
+
+    const langPrefix = lang === 'en-GB' ? 'en-GB' : 'en-US';
+    let pool = all.filter(v => v.lang === langPrefix);
+    if (!pool.length) pool = all.filter(v => v.lang && v.lang.startsWith('en'));
+    if (!pool.length) return all[0];
+
+    const female = lang === 'en-GB' ? FEMALE_NEURAL_UK : FEMALE_NEURAL_US;
+    const male   = lang === 'en-GB' ? MALE_NEURAL_UK   : MALE_NEURAL_US;
+
+    const score = (v) => {
+      const tag = (v.name || '') + ' ' + (v.voiceURI || '');
+      let s = 0;
+      if (/Natural/i.test(tag))           s += 100;  // Edge neural voices (best)
+      if (/Online/i.test(tag))            s +=  80;  // Microsoft cloud voices
+      if (/Google/i.test(tag))            s +=  60;  // Google network voices
+      if (/Premium|Enhanced/i.test(tag))  s +=  50;  // macOS / iOS premium
+      if (!v.localService)                s +=  30;  // network > local generally
+      if (female.test(v.name))            s +=  25;  // female preference
+      else if (male.test(v.name))         s +=   5;  // male as fallback
+      if (v.lang === langPrefix)          s +=  10;  // exact lang > prefix match
+      return s;
+    };
+
+    return pool.slice().sort((a, b) => score(b) - score(a))[0];
+  }
+
+  function isWeChatBrowser() {
+    return /MicroMessenger/i.test(navigator.userAgent || '');
+  }
+
+  function wechatFallbackAlert() {
+    alert("微信浏览器不支持语音播放，请用 Safari 或 Chrome 打开本页 / WeChat browser doesn't support audio playback. Please open this page in Safari or Chrome.");
+  }
+
+  // === Sentence-paced TTS state ============================================
+  //
+  // Pedagogical model: TTS plays ONE sentence at a time and auto-pauses on
+  // completion. Students press transport buttons (Replay / Prev / Next /
+  // Slow) to advance, repeat, or slow-down the current sentence. This is
+  // the standard listen-and-repeat shadowing flow used in language classes.
+  //
+  // Per-row state (sentence list + index + accent + karaoke spans) is kept
+  // in a WeakMap keyed by the .listen-row DOM element. Multiple rows on
+  // the same page each retain their own independent state — pressing Next
+  // on row A and then returning to row B picks up where row B left off.
+  //
+  // _currentRow is the SINGLE row producing audio right now (only one mic
+  // can play at a time across the whole page). It's just a pointer to
+  // whichever WeakMap entry owns the in-flight utterance.
+
+  const _rowState = new WeakMap();
+  let   _currentRow = null;
+
+  function getRowState(rowEl) {
+    if (!rowEl) return null;
+    let s = _rowState.get(rowEl);
+    if (!s) {
+      s = {
+        sentences:    [],          // string[] — one entry per sentence
+        sourceText:   '',          // original full text, pre-normalize
+        currentIndex: 0,           // 0-based index into sentences
+        lang:         'en-GB',     // 'en-GB' | 'en-US' — last-selected accent
+        rate:         DEFAULT_RATE,// inherited from initial play; overridden by 🐢
+        // Karaoke (only populated for sentence-paced playback over an
+        // element that's been word-wrapped, e.g. #polished-output):
+        targetEl:     null,
+        spans:        null,
+        offsets:      null,        // [{ span, start, end }] over wrappedText
+        wrappedText:  null,        // the text snapshot that spans correspond to
+      };
+      _rowState.set(rowEl, s);
+    }
+    return s;
+  }
+
+  // Char index where sentence i begins in the joined source. Trimmed
+  // sentences plus single-space joins matches the normalize() output of
+  // splitSentences(), so karaoke offsets line up.
+  function sentenceCharStart(sentences, i) {
+    let n = 0;
+    for (let k = 0; k < i; k++) n += sentences[k].length + 1;
+    return n;
+  }
+
+  /** Pragmatic sentence splitter — punctuation lookbehind + capital
+   *  lookahead. Imperfect on abbreviations like "Mr. Smith" or "U.S.A."
+   *  but the IELTS / IGCSE model-answer corpus rarely uses them. */
+  function splitSentences(text) {
+    const norm = String(text || '').replace(/\s+/g, ' ').trim();
+    if (!norm) return [];
+    return norm
+      .split(/(?<=[.!?])\s+(?=[A-Z"'(])/)
+      .map(s => s.trim())
+      .filter(Boolean);
+  }
+  ns.__splitSentences = splitSentences;  // exposed for tests
+
+  /** Mark a single .listen-row as the one currently speaking (for the
+   *  pulsing indicator). Pass `null` to clear. */
+  function setSpeakingRow(rowEl) {
+    document.querySelectorAll('.listen-row.speaking-now, .button-row.speaking-now')
+      .forEach(r => r.classList.remove('speaking-now'));
+    if (rowEl) rowEl.classList.add('speaking-now');
+  }
+
+  /** Sync transport-button enabled state + sentence counter for a row. */
+  function updateTransportButtons(rowEl) {
+    if (!rowEl) return;
+    const st = getRowState(rowEl);
+    const total = st.sentences ? st.sentences.length : 0;
+    const idx   = st.currentIndex || 0;
+    const prev   = rowEl.querySelector('.tts-btn.prev');
+    const next   = rowEl.querySelector('.tts-btn.next');
+    const slow   = rowEl.querySelector('.tts-btn.slow');
+    const replay = rowEl.querySelector('.tts-btn.replay');
+    const counter = rowEl.querySelector('.sentence-counter');
+    if (slow)   slow.disabled   = (total === 0);
+    if (replay) replay.disabled = (total === 0);
+    if (prev)   prev.disabled   = (idx <= 0 || total === 0);
+    if (next)   next.disabled   = (idx + 1 >= total || total === 0);
+    if (counter) counter.textContent = total > 0 ? `${idx + 1}/${total}` : '';
+  }
+
+  function setActiveAccent(rowEl, lang) {
+    if (!rowEl) return;
+    rowEl.querySelectorAll('.tts-btn.uk, .tts-btn.us').forEach(b => b.classList.remove('active'));
+    const sel = lang === 'en-US' ? '.tts-btn.us' : '.tts-btn.uk';
+    const btn = rowEl.querySelector(sel);
+    if (btn) btn.classList.add('active');
+  }
+
+  /** Internal: speak the current sentence of the row. On end, do NOT
+   *  advance — the student decides what comes next. */
+  function _playCurrentSentence(rowEl, rateOverride) {
+    if (!rowEl) return;
+    const st = getRowState(rowEl);
+    if (!st.sentences || !st.sentences.length) return;
+    if (st.currentIndex < 0) st.currentIndex = 0;
+    if (st.currentIndex >= st.sentences.length) return;
+
+    if ('speechSynthesis' in window) speechSynthesis.cancel();
+    _currentRow = rowEl;
+    setSpeakingRow(rowEl);
+
+    const sentence      = st.sentences[st.currentIndex];
+    const sentenceStart = sentenceCharStart(st.sentences, st.currentIndex);
+
+    const u = new SpeechSynthesisUtterance(sentence);
+    u.lang = st.lang;
+    u.rate = rateOverride || st.rate || DEFAULT_RATE;
+    const v = pickVoice(st.lang);
+    if (v) u.voice = v;
+
+    // Karaoke: only when this row owns word-wrapped spans (polished-output path).
+    const activeOffsets = (st.spans && st.offsets)
+      ? st.offsets.filter(o => o.start >= sentenceStart && o.end <= sentenceStart + sentence.length)
+      : null;
+
+    u.onstart = () => setSpeakingRow(rowEl);
+    u.onboundary = (ev) => {
+      if (ev.name && ev.name !== 'word') return;
+      if (!activeOffsets) return;
+      activeOffsets.forEach(o => o.span.classList.remove('speaking'));
+      const globalIdx = sentenceStart + ev.charIndex;
+      const hit = activeOffsets.find(o => globalIdx >= o.start && globalIdx < o.end);
+      if (hit) hit.span.classList.add('speaking');
+    };
+    u.onend = () => {
+      if (activeOffsets) activeOffsets.forEach(o => o.span.classList.remove('speaking'));
+      // Auto-pause: leave currentIndex where it is; clear pulse; refresh buttons.
+      if (_currentRow === rowEl) _currentRow = null;
+      setSpeakingRow(null);
+      updateTransportButtons(rowEl);
+    };
+
+    speechSynthesis.speak(u);
+    updateTransportButtons(rowEl);
+  }
+
+  ns.speakText = function (text, lang = 'en-GB', rate = DEFAULT_RATE, rowEl = null) {
+    if (isWeChatBrowser()) { wechatFallbackAlert(); return; }
+    if (!('speechSynthesis' in window)) return;
+    if (!text || !String(text).trim()) return;
+
+    // No row → vocab-click / single-shot path. Speak as one utterance,
+    // no sentence pacing, no row state. Matches old behaviour for
+    // attachWordClicks().
+    if (!rowEl) {
+      speechSynthesis.cancel();
+      const u = new SpeechSynthesisUtterance(String(text));
+      u.lang = lang;
+      u.rate = rate;
+      const v = pickVoice(lang);
+      if (v) u.voice = v;
+      speechSynthesis.speak(u);
+      return;
+    }
+
+    // Row-bound → split into sentences, store state, play sentence 0.
+    const st = getRowState(rowEl);
+    st.sentences   = splitSentences(text);
+    st.sourceText  = String(text);
+    st.currentIndex = 0;
+    st.lang  = lang;
+    st.rate  = rate || DEFAULT_RATE;
+    st.targetEl    = null;
+    st.spans       = null;
+    st.offsets     = null;
+    st.wrappedText = null;
+    setActiveAccent(rowEl, lang);
+    _playCurrentSentence(rowEl);
+  };
+
+  /** Replay the current sentence. `slow=true` → SLOW_RATE for this one
+   *  utterance only; the row's stored rate is unchanged. */
+  ns.replaySentence = function (rowEl, slow) {
+    if (!rowEl) return;
+    const st = getRowState(rowEl);
+    if (!st.sentences || !st.sentences.length) return;
+    _playCurrentSentence(rowEl, slow ? SLOW_RATE : st.rate);
+  };
+
+  ns.nextSentence = function (rowEl) {
+    if (!rowEl) return;
+    const st = getRowState(rowEl);
+    if (!st.sentences || st.currentIndex + 1 >= st.sentences.length) return;
+    st.currentIndex++;
+    _playCurrentSentence(rowEl);
+  };
+
+  ns.prevSentence = function (rowEl) {
+    if (!rowEl) return;
+    const st = getRowState(rowEl);
+    if (!st.sentences || st.currentIndex <= 0) return;
+    st.currentIndex--;
+    _playCurrentSentence(rowEl);
+  };
+
+  // Markup-preserving variant of speakElement's wrapping logic. Walks the
+  // text-node descendants of `el` and replaces each text node with a
+  // fragment that splits the text into per-word <span>s (for karaoke
+  // highlighting) while LEAVING element children (e.g. <strong> for vocab,
+  // <em> for emphasis) intact. Skips Chinese-gloss / marker-badge /
+  // listen-row subtrees so wrapped spans align with what the TTS engine
+  // actually speaks.
+  //
+  // Added 2026 (issue A2): the polished-output element is plain text and
+  // the original speakElement could safely innerHTML='' it. Model-answer
+  // boxes (Section 7) contain <strong>vocab</strong> highlights and
+  // Chinese gloss spans; destroying their innerHTML would lose both.
+  // This helper provides a non-destructive wrap path for markup-rich
+  // elements. Returns { spans, offsets } with the same shape that the
+  // original wrap path produces.
+  function wrapTextNodesInElement(el) {
+    const spans = [];
+    const offsets = [];
+    let charIdx = 0;
+
+    function walk(node) {
+      if (!node) return;
+      if (node.nodeType === Node.TEXT_NODE) {
+        const t = node.textContent;
+        if (!t) return;
+        const tokens = t.split(/(\s+)/);
+        const frag = document.createDocumentFragment();
+        tokens.forEach(tok => {
+          if (!tok) return;
+          if (/^\s+$/.test(tok)) {
+            frag.appendChild(document.createTextNode(tok));
+          } else {
+            const s = document.createElement('span');
+            s.textContent = tok;
+            offsets.push({ span: s, start: charIdx, end: charIdx + tok.length });
+            spans.push(s);
+            frag.appendChild(s);
+          }
+          charIdx += tok.length;
+        });
+        node.parentNode.replaceChild(frag, node);
+        return;
+      }
+      if (node.nodeType !== Node.ELEMENT_NODE) return;
+      if (isChineseGloss(node)) return;
+      if (isMarkerBadge(node)) return;
+      if (node.classList && node.classList.contains('listen-row')) return;
+      // Snapshot childNodes — we'll be replacing some during the walk.
+      Array.from(node.childNodes).forEach(walk);
+    }
+    walk(el);
+    return { spans, offsets };
+  }
+
+  // speakElement / speakElementById — wrap words in <span> for karaoke,
+  // split text into sentences, and play sentence 0. Subsequent transport
+  // commands (replay / next / prev / slow) re-use the wrapped spans.
+  // The optional `rowElOverride` arg lets callers pin the WeakMap state
+  // to a specific .listen-row element (used by injectListenButtons so
+  // its prev/next/replay/slow buttons share state with the speaking text).
+  ns.speakElement = function (el, lang = 'en-GB', rate = DEFAULT_RATE, rowElOverride = null) {
+    if (isWeChatBrowser()) { wechatFallbackAlert(); return; }
+    if (!('speechSynthesis' in window)) return;
+    if (!el) return;
+
+    // For markup-rich elements (model answers with <strong>/Chinese gloss),
+    // compute the readable text using extractReadableText so it matches
+    // what TTS speaks (skipping gloss). For plain-text elements (polished
+    // output) we can use textContent directly — same result, less work.
+    const hasMarkup = el.children.length > 0;
+    const text = (hasMarkup
+      ? stripChineseGloss(extractReadableText(el))
+      : el.textContent
+    ).trim();
+    if (!text) return;
+
+    // The polished overlay's listen-row is the natural row for el.id === 'polished-output'.
+    // injectListenButtons passes the model-box's .listen-row as the override.
+    // For everything else, fall back to using `el` itself as the WeakMap key.
+    const rowEl = rowElOverride
+      || (el.id === 'polished-output'
+          ? document.getElementById('polished-listen-row')
+          : el);
+
+    const st = getRowState(rowEl);
+
+    // Re-wrap only if text changed AND the element isn't already wrapped.
+    // The data-karaoke-wrapped flag stops a second click from destroying
+    // our own spans (which would be st.wrappedText !== text after a wrap
+    // reduces all whitespace runs to single spaces).
+    if (st.wrappedText !== text || !el.dataset.karaokeWrapped) {
+      let spans, offsets;
+      if (hasMarkup) {
+        // Non-destructive: preserves <strong> vocab highlights, skips gloss.
+        const result = wrapTextNodesInElement(el);
+        spans = result.spans;
+        offsets = result.offsets;
+      } else {
+        // Plain-text path (original behaviour, used for polished-output).
+        const tokens = text.split(/(\s+)/);
+        el.innerHTML = '';
+        spans = [];
+        offsets = [];
+        let charIdx = 0;
+        tokens.forEach(tok => {
+          if (/^\s+$/.test(tok)) {
+            el.appendChild(document.createTextNode(tok));
+          } else if (tok.length) {
+            const s = document.createElement('span');
+            s.textContent = tok;
+            offsets.push({ span: s, start: charIdx, end: charIdx + tok.length });
+            spans.push(s);
+            el.appendChild(s);
+          }
+          charIdx += tok.length;
+        });
+      }
+      el.dataset.karaokeWrapped = '1';
+      st.wrappedText = text;
+      st.spans = spans;
+      st.offsets = offsets;
+      st.sentences = splitSentences(text);
+    } else {
+      // Same text — just re-split in case the splitter logic was upgraded.
+      st.sentences = splitSentences(text);
+    }
+    st.sourceText  = text;
+    st.targetEl    = el;
+    st.currentIndex = 0;
+    st.lang = lang;
+    st.rate = rate || DEFAULT_RATE;
+    setActiveAccent(rowEl, lang);
+    _playCurrentSentence(rowEl);
+  };
+
+  ns.speakElementById = function (id, lang = 'en-GB', rate = DEFAULT_RATE) {
+    const el = document.getElementById(id);
+    if (el) ns.speakElement(el, lang, rate);
+  };
+
+  /** Polished-output button router. Six modes: en-GB / en-US (start over
+   *  in chosen accent), slow / replay (re-speak current sentence), prev /
+   *  next (sentence navigation). */
+  ns.listenPolished = function (which) {
+    const row = document.getElementById('polished-listen-row');
+    if (!row) return;
+    switch (which) {
+      case 'en-GB':
+      case 'en-US':
+        ns.speakElementById('polished-output', which, DEFAULT_RATE);
+        break;
+      case 'slow':   ns.replaySentence(row, true);  break;
+      case 'replay': ns.replaySentence(row, false); break;
+      case 'prev':   ns.prevSentence(row);          break;
+      case 'next':   ns.nextSentence(row);          break;
+    }
+  };
+
+  // Compat stubs — nothing in the new UI calls these, but preserving them
+  // keeps any older injected snippet, browser-extension shortcut, or
+  // user script from throwing if it references the old API.
+  ns.stopSpeaking = function () {
+    if ('speechSynthesis' in window) speechSynthesis.cancel();
+    document.querySelectorAll('.speaking').forEach(s => s.classList.remove('speaking'));
+    _currentRow = null;
+    setSpeakingRow(null);
+  };
+  ns.pauseSpeaking = function () {
+    // No-op in sentence-paced mode (sentences auto-pause). Provided for
+    // backwards compatibility with anything that still references it.
+    ns.stopSpeaking();
+  };
+
+  ns.__define('tts', {});
+})();
@@ -0,0 +1,48 @@
+"""Tests for the regression check in scripts/bench_pipeline.py.
+
+Run:  python -m unittest scripts.test_bench_pipeline  (from repo root)
+  or:  python scripts/test_bench_pipeline.py
+"""
+import contextlib
+import io
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import bench_pipeline  # noqa: E402
+
+
+def _results(**seconds):
+    return {"version": bench_pipeline.RESULTS_VERSION, "machine": {"cpus": 1},
+            "cases": {name: {"seconds": s, "ops": 40} for name, s in seconds.items()}}
+
+
+class TestBenchCompare(unittest.TestCase):
+    def _compare(self, baseline, current, threshold=0.15, min_delta=0.002):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            regressions = bench_pipeline.compare(baseline, current, threshold, min_delta)
+        return regressions, out.getvalue()
+
+    def test_flags_only_slowdowns_beyond_threshold_and_min_delta(self):
+        baseline = _results(slow=0.100, ok=0.100, tiny=0.001, faster=0.100)
+        current = _results(slow=0.130, ok=0.110, tiny=0.002, faster=0.050)
+        regressions, out = self._compare(baseline, current)
+        self.assertEqual(regressions, ["slow"])
+        self.assertIn("REGRESSION", out)
+
+    def test_added_and_removed_cases_are_listed_not_flagged(self):
+        regressions, out = self._compare(_results(old=0.1), _results(new=0.1))
+        self.assertEqual(regressions, [])
+        self.assertIn("old", out)
+        self.assertIn("new", out)
+
+    def test_baseline_file_is_current(self):
+        baseline = bench_pipeline._read(bench_pipeline.BASELINE_PATH)
+        self.assertIn("parse_data.process_cover_page", baseline["cases"])
+        self.assertIn("make_interactive.insertion_7_password_gate", baseline["cases"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""Tests for font_subset.py (glyph-subset handwriting fonts).
+
+Run:  python -m unittest scripts.test_font_subset  (from repo root)
+  or:  python scripts/test_font_subset.py
+"""
+import io
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+import font_subset  # noqa: E402
+
+CAVEAT = REPO / "scripts" / "fonts" / "Caveat-400.woff2"
+
+
+class TestFontSubset(unittest.TestCase):
+    def setUp(self):
+        if not font_subset.available():
+            self.skipTest("fontTools/brotli not installed")
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.object(font_subset, "CACHE_DIR", Path(tmp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_subset_covers_text_and_is_smaller(self):
+        from fontTools.ttLib import TTFont
+        data = font_subset.subset_woff2(CAVEAT, "Week 0123456789")
+        self.assertLess(len(data), CAVEAT.stat().st_size // 3)
+        cmap = TTFont(io.BytesIO(data))["cmap"].getBestCmap()
+        self.assertTrue({ord(c) for c in "Week 0123456789"} <= cmap.keys())
+        self.assertNotIn(ord("z"), cmap)
+        # Contextual alternates survive, so the handwriting looks the same
+        self.assertIn("calt", {r.FeatureTag for r in
+                               TTFont(io.BytesIO(data))["GSUB"].table.FeatureList.FeatureRecord})
+
+    def test_deterministic_and_cached(self):
+        first = font_subset.subset_woff2(CAVEAT, font_subset.HANDWRITING_TEXT)
+        self.assertEqual(len(list(font_subset.CACHE_DIR.glob("Caveat-400-*.woff2"))), 1)
+        for cached in font_subset.CACHE_DIR.iterdir():
+            cached.unlink()
+        self.assertEqual(font_subset.subset_woff2(CAVEAT, font_subset.HANDWRITING_TEXT), first)
+        # Order and repeats don't change the glyph set
+        self.assertEqual(font_subset.signature("abca"), font_subset.signature("cba"))
+        self.assertNotEqual(font_subset.signature("abc"), font_subset.signature("abd"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""Tests for fragment_builder.py: built rows must match parsing the markup.
+
+Run:  python -m unittest scripts.test_fragment_builder  (from repo root)
+  or:  python scripts/test_fragment_builder.py
+"""
+import sys
+import unittest
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+import fragment_builder as fb  # noqa: E402
+from html_backend import parse_document, parse_fragment  # noqa: E402
+
+# (data field value, as interpolated into "<td>{value} tail</td><td>{value}</td>")
+VALUES = ["a &amp; b", "<em>x</em> y", "\n  ", "plain > text", "&nbsp;", "x<br>y",
+          "'q' \"d\"", ""]
+
+
+class TestFragmentBuilder(unittest.TestCase):
+    def _check(self, nodes, source):
+        expected = parse_fragment(source).decode()
+        self.assertEqual(fb.render(nodes), expected, source)
+        soup = parse_document("<tr></tr>")
+        soup.tr.extend(fb.to_soup(soup, nodes))
+        self.assertEqual(soup.tr.decode_contents(), expected, source)
+
+    def test_data_fields_match_parsed_markup(self):
+        for value in VALUES:
+            self._check([fb.tag("td", fb.markup(value), " tail"), fb.tag("td", fb.markup(value))],
+                        f"<td>{value} tail</td><td>{value}</td>")
+
+    def test_attributes_and_void_elements(self):
+        self._check([fb.tag("td", "x", fb.tag("br"), "y", colspan="3", style="a:'b'"),
+                     fb.tag("span", 'say "hi"', class_="vocab-cn", title='say "hi"')],
+                    "<td colspan='3' style=\"a:'b'\">x<br>y</td>"
+                    "<span class='vocab-cn' title='say \"hi\"'>say \"hi\"</span>")
+
+    def test_tree_is_reusable(self):
+        nodes = [fb.tag("td", fb.markup("<em>x</em>"))]
+        soup = parse_document("<tr></tr><tr></tr>")
+        first, second = soup.find_all("tr")
+        first.extend(fb.to_soup(soup, nodes))
+        second.extend(fb.to_soup(soup, nodes))
+        self.assertEqual(first.decode(), second.decode())
+
+
+if __name__ == "__main__":
+    unittest.main()
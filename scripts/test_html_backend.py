@@ -0,0 +1,47 @@
+"""Tests for html_backend.py (pluggable parser for template + fragment parses).
+
+Run:  python -m unittest scripts.test_html_backend  (from repo root)
+  or:  python scripts/test_html_backend.py
+"""
+import sys
+import unittest
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+import html_backend  # noqa: E402
+
+# Fragment shapes parse_data.py appends: bare cells, rows, inline markup, list items
+FRAGMENTS = [
+    "<td><strong>resilient</strong> (adj)</td><td>/rɪˈzɪliənt/</td><td>able to recover</td>",
+    '<tr class="vocab-example-row"><td colspan="3">e.g. example</td></tr>',
+    "<strong>Band 5:</strong> Use the starter &amp; <em>one</em> linker.<br/>Then expand.",
+    "<li>Grammar: narrative tenses</li><li>Speaking: fluency</li>",
+    "plain text only",
+    "",
+]
+
+
+class TestHtmlBackend(unittest.TestCase):
+    def test_unknown_backend_rejected(self):
+        with self.assertRaises(html_backend.BackendUnavailable):
+            html_backend.set_backend("nope")
+        self.assertEqual(html_backend.get_backend(), html_backend.DEFAULT_BACKEND)
+
+    def test_fragments_match_html_parser(self):
+        others = [b for b in html_backend.BACKENDS
+                  if b != html_backend.DEFAULT_BACKEND and html_backend.available(b)]
+        if not others:
+            self.skipTest("no alternative parser backend installed")
+        for backend in others:
+            for markup in FRAGMENTS:
+                expected = html_backend.parse_fragment(markup).decode()
+                with html_backend.using(backend):
+                    actual = html_backend.parse_fragment(markup).decode()
+                self.assertEqual(actual, expected, f"{backend}: {markup!r}")
+        self.assertEqual(html_backend.get_backend(), html_backend.DEFAULT_BACKEND)
+
+
+if __name__ == "__main__":
+    unittest.main()
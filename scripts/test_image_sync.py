@@ -0,0 +1,61 @@
+"""Tests for image_sync.py (reference-aware images/ sync).
+
+Run:  python -m unittest scripts.test_image_sync  (from repo root)
+  or:  python scripts/test_image_sync.py
+"""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+import image_sync  # noqa: E402
+
+
+class TestImageSync(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.src = self.tmp / "images"
+        self.src.mkdir()
+        for name, data in (("a.png", b"A" * 10), ("b%20c.jpg", b"B"), ("b c.jpg", b"BC"), ("old.jpg", b"O")):
+            (self.src / name).write_bytes(data)
+        self.page = self.tmp / "Week_01.html"
+        self.page.write_text(
+            '<p><img class="x" src="images/a.png" alt=""/> <IMG SRC=\'images/b%20c.jpg\'>'
+            '<img src="images/gone.png"><img src="https://cdn/images/remote.png">'
+            '<a href="images/old.jpg">not an img</a></p>', encoding="utf-8")
+
+    def test_referenced_images(self):
+        self.assertEqual(image_sync.referenced_images([self.page]), {"a.png", "b c.jpg", "gone.png"})
+
+    def test_sync_links_skips_and_prunes(self):
+        dst = self.tmp / "out" / "images"
+        refs = image_sync.referenced_images([self.page])
+        first = image_sync.sync_images(self.src, dst, refs)
+        self.assertEqual(sorted(first.linked + first.copied), ["a.png", "b c.jpg"])
+        self.assertEqual(first.missing, ["gone.png"])
+        self.assertEqual((dst / "b c.jpg").read_bytes(), b"BC")
+
+        (dst / "old.jpg").write_bytes(b"O")
+        (dst / "a.png").unlink()
+        (dst / "a.png").write_bytes(b"A" * 10)   # same bytes, separate file
+        second = image_sync.sync_images(self.src, dst, refs)
+        self.assertEqual(second.unchanged, ["a.png", "b c.jpg"])
+        self.assertEqual(second.unreferenced, ["old.jpg"])
+        self.assertTrue((dst / "old.jpg").exists())
+
+        (self.src / "a.png").write_bytes(b"Z" * 10)   # same size, new bytes
+        (dst / "a.png").write_bytes(b"A" * 10)
+        third = image_sync.sync_images(self.src, dst, refs, prune=True)
+        self.assertIn("a.png", third.linked + third.copied)
+        self.assertEqual((dst / "a.png").read_bytes(), b"Z" * 10)
+        self.assertFalse((dst / "old.jpg").exists())
+        self.assertEqual(sorted(p.name for p in dst.iterdir()), ["a.png", "b c.jpg"])
+
+
+if __name__ == "__main__":
+    unittest.main()
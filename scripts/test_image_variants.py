@@ -0,0 +1,93 @@
+"""Tests for image_variants.py (responsive AVIF/WebP/JPEG variants).
+
+Run:  python -m unittest scripts.test_image_variants  (from repo root)
+  or:  python scripts/test_image_variants.py
+"""
+import re
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+import image_sync  # noqa: E402
+import image_variants  # noqa: E402
+
+
+class TestImageVariants(unittest.TestCase):
+    def setUp(self):
+        if not image_variants.available():
+            self.skipTest("Pillow not installed")
+        from PIL import Image
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        patcher = mock.patch.object(image_variants, "CACHE_DIR", self.tmp / "cache")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.src = self.tmp / "images"
+        self.src.mkdir()
+        Image.new("RGB", (1200, 300), (200, 40, 40)).save(self.src / "chart v1.jpg", quality=95)
+        (self.src / "logo.svg").write_text("<svg/>", encoding="utf-8")
+
+    def test_variant_set_caps_widths_and_is_cached(self):
+        sets = image_variants.variant_sets(self.src, {"chart v1.jpg", "logo.svg", "gone.png"})
+        self.assertEqual(list(sets), ["chart v1.jpg"])
+        image_set = sets["chart v1.jpg"]
+        self.assertEqual((image_set.width, image_set.height), (1200, 300))
+        variants = dict(image_set.variants)
+        self.assertEqual(tuple(variants), image_variants.formats())
+        self.assertEqual([w for w, _ in variants["jpg"]], [480, 960, 1200])
+        files = image_variants.variant_files(sets)
+        self.assertEqual({p.name for p in image_variants.CACHE_DIR.iterdir()}, files)
+        big = (image_variants.CACHE_DIR / variants["jpg"][-1][1]).stat().st_size
+        self.assertLess((image_variants.CACHE_DIR / variants["jpg"][0][1]).stat().st_size, big)
+
+        mtimes = {p: p.stat().st_mtime_ns for p in image_variants.CACHE_DIR.iterdir()}
+        self.assertEqual(image_variants.variant_sets(self.src, {"chart v1.jpg"}), sets)
+        self.assertEqual({p: p.stat().st_mtime_ns for p in image_variants.CACHE_DIR.iterdir()}, mtimes)
+        # New source bytes, new file names
+        from PIL import Image
+        Image.new("RGB", (1200, 300), (0, 0, 0)).save(self.src / "chart v1.jpg")
+        again = image_variants.variant_sets(self.src, {"chart v1.jpg"})
+        self.assertFalse(image_variants.variant_files(again) & files)
+
+    def test_rewrite_images_and_references(self):
+        sets = image_variants.variant_sets(self.src, {"chart v1.jpg"})
+        html = ('<p><img alt="x" src="images/chart%20v1.jpg" style="width: 100%"/>'
+                '<img src="images/logo.svg"></p>')
+        out = image_variants.rewrite_images(html, sets)
+        self.assertTrue(out.startswith('<p><picture><source type="image/'))
+        self.assertIn('src="images/chart%20v1.jpg" style="width: 100%" width="1200" height="300" '
+                      'srcset="images/chart%20v1-480w.', out)
+        self.assertIn(f'sizes="{image_variants.SIZES}"/></picture><img src="images/logo.svg">', out)
+        self.assertEqual(out.count("<source "), len(image_variants.formats()) - 1)
+        # Already responsive: left alone
+        self.assertEqual(image_variants.rewrite_images(out, sets), out)
+
+        # The <picture> takes over the banner's place in the .page flex
+        # column: its margin-top: auto keeps it at the bottom of the page
+        banner = re.search(r'<img src="images/course_pipeline_v3.jpg"[^>]*>',
+                           (REPO / "canonical" / "pdf-base" / "Week_01.html").read_text(encoding="utf-8"))
+        wrapped = image_variants.rewrite_images(banner.group(0).replace("course_pipeline_v3", "chart%20v1"), sets)
+        wrapper = re.match(r'<picture style="([^"]*)">', wrapped)
+        self.assertIsNotNone(wrapper)
+        declarations = dict(d.split(": ") for d in wrapper.group(1).split("; "))
+        self.assertEqual((declarations["display"], declarations["margin-top"]), ("block", "auto"))
+        self.assertNotIn("width", declarations)   # sizing stays on the <img>
+        self.assertIn('style="display: block; width: 100%; height: auto; margin-top: auto;', wrapped)
+
+        page = self.tmp / "Week_01.html"
+        page.write_text(out, encoding="utf-8")
+        self.assertEqual(image_sync.referenced_images([page]),
+                         {"chart v1.jpg", "logo.svg"} | image_variants.variant_files(sets))
+        report = image_sync.sync_images(self.src, self.tmp / "out", image_sync.referenced_images([page]),
+                                        also_from=[image_variants.CACHE_DIR])
+        self.assertEqual(report.missing, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""Tests for json_loader.py (fast path + tolerant record recovery).
+
+Run:  python -m unittest scripts.test_json_loader  (from repo root)
+  or:  python scripts/test_json_loader.py
+"""
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+import json_loader  # noqa: E402
+
+
+class TestJsonLoader(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.tmp_path = Path(self._tmp.name)
+
+    def _load(self, text):
+        path = self.tmp_path / "records.json"
+        path.write_text(text, encoding="utf-8")
+        messages = []
+        return json_loader.load_records(path, report=messages.append), messages
+
+    def test_clean_and_concatenated_files_report_nothing(self):
+        self.assertEqual(self._load('[{"week": 1}, {"week": 2}]'), ([{"week": 1}, {"week": 2}], []))
+        self.assertEqual(self._load('[{"week": 1}]\n[{"week": 2}],\n]'), ([{"week": 1}, {"week": 2}], []))
+        self.assertEqual(self._load('{"week": 1}'), ([{"week": 1}], []))
+
+    def test_damaged_regions_are_skipped_and_reported(self):
+        text = '[{"week": 1},\n  {"week": 2, "x": {"week": 3}]\n[{"week": 4}] ßjunk {"week": 5}'
+        records, messages = self._load(text)
+        # week 3 is a field of the damaged week 2, not a record
+        self.assertEqual([r["week"] for r in records], [1, 4, 5])
+        self.assertEqual(len(messages), 2)
+        self.assertIn("skipped 28 chars at byte 16 (line 2, col 3)", messages[0])
+        # byte offset counts the 2-byte 'ß'; the column counts characters
+        _, skipped = json_loader.scan_records(text)
+        self.assertEqual((skipped[1].line, skipped[1].column), (3, 15))
+        self.assertEqual(skipped[1].offset, len(text[:text.index("ß")].encode("utf-8")))
+
+    def test_corrupted_nested_object_is_skipped_whole(self):
+        text = ('[{"week": 1, "l1_vocab": [{"word": "a"}]},\n'
+                ' {"week": 2, "l1_vocab": [{"word": "b"} {"word": "c"}, {"word": "d"}], "note": "x"},\n'
+                ' {"week": 3, "l1_vocab": [{"word": "e", "forms": "]}"}]}, "x", 7]\n'
+                '[{"week": 4, "l1_vocab": [{"word": "f"}')
+        records, messages = self._load(text)
+        self.assertEqual([r["week"] for r in records], [1, 3])
+        self.assertEqual(records[1]["l1_vocab"], [{"word": "e", "forms": "]}"}])
+        self.assertEqual(len(messages), 4)
+        self.assertIn("line 2, col 2", messages[0])
+        self.assertIn("not a record (str)", messages[1])
+        self.assertIn("not a record (int)", messages[2])
+        self.assertIn("line 4, col 2", messages[3])
+        # A clean file with non-records goes through the scanner to report them
+        self.assertEqual(self._load('[{"week": 1}, "x"]')[0], [{"week": 1}])
+
+    def test_arrays_appended_after_a_cut_short_record_are_kept(self):
+        records, skipped = json_loader.scan_records('[{"week": 1}, {"week": 2, "x": \n[{"week": 3}, {"week": 4}]')
+        self.assertEqual([r["week"] for r in records], [1, 3, 4])
+        self.assertEqual((len(skipped), skipped[0].preview), (1, '{"week": 2, "x": \n'))
+        # Pretty-printed, as the generators write them
+        text = ('[\n  {\n    "week": 1,\n    "l1_vocab": [\n      {"word": "a"\n'
+                '[\n  {\n    "week": 2,\n    "l1_vocab": [\n      {"word": "b"}\n    ]\n  }\n]\n')
+        records, skipped = json_loader.scan_records(text)
+        self.assertEqual(([r["week"] for r in records], len(skipped)), ([2], 1))
+
+    def test_many_skips_stay_linear(self):
+        text = "[" + ", ".join(['{"week": 1}', '{"week": 2 "x"}'] * 20000) + "]"
+        start = time.perf_counter()
+        records, skipped = json_loader.scan_records(text)
+        self.assertLess(time.perf_counter() - start, 2.0)
+        self.assertEqual((len(records), len(skipped)), (20000, 20000))
+        self.assertEqual(skipped[-1].offset, text.rindex('{"week": 2'))
+
+    def test_unterminated_tail_is_skipped_in_one_region(self):
+        # The old loader retried raw_decode at every character of this string:
+        # quadratic. The scanner gives up on it once and jumps to the end.
+        text = '[{"week": 1}, {"week": 2, "note": "' + "x" * 200000
+        records, skipped = json_loader.scan_records(text)
+        self.assertEqual(records, [{"week": 1}])
+        self.assertEqual(len(skipped), 1)
+        self.assertEqual(skipped[0].offset, text.index('{"week": 2'))
+
+    def test_missing_file(self):
+        messages = []
+        self.assertEqual(json_loader.load_records(self.tmp_path / "nope.json", report=messages.append), [])
+        self.assertIn("not found", messages[0])
+        self.assertIsNone(json_loader.load_json(self.tmp_path / "nope.json"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+"""Tests for local_oss.py (file-backed stand-in for the OSS bucket).
+
+Run:  python -m unittest scripts.test_local_oss  (from repo root)
+  or:  python scripts/test_local_oss.py
+"""
+import hashlib
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+sys.path.insert(0, str(REPO / "scripts"))
+
+try:
+    import oss2
+    import local_oss
+    import upload_to_oss
+except ImportError:
+    oss2 = None
+
+
+class TestLocalBucket(unittest.TestCase):
+    def setUp(self):
+        if oss2 is None:
+            self.skipTest("oss2 not installed")
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.bucket = local_oss.LocalBucket(self.tmp / "bucket")
+        self.bucket.create_bucket(oss2.BUCKET_ACL_PUBLIC_READ)
+
+    def test_objects_behave_like_oss(self):
+        bucket = self.bucket
+        self.assertEqual(bucket.get_bucket_acl().acl, oss2.BUCKET_ACL_PUBLIC_READ)
+        with self.assertRaises(oss2.exceptions.NoSuchKey):
+            bucket.head_object("a.html")
+        src = self.tmp / "a.html"
+        src.write_bytes(b"<p>a</p>")
+        put = bucket.put_object_from_file("a.html", str(src), headers={
+            "Content-Type": "text/html", "Cache-Control": "no-cache", "X-Oss-Meta-Content-Md5": "m",
+            "Authorization": "not stored"})
+        head = bucket.head_object("a.html")
+        self.assertEqual(put.etag, head.etag)
+        self.assertEqual(head.etag, hashlib.md5(b"<p>a</p>").hexdigest().upper())
+        self.assertEqual(head.headers["cache-control"], "no-cache")
+        self.assertEqual(head.headers["x-oss-meta-content-md5"], "m")
+        self.assertNotIn("authorization", head.headers)
+        self.assertEqual(bucket.get_object("a.html").read(), b"<p>a</p>")
+        bucket.delete_object("a.html")
+        bucket.delete_object("a.html")
+        self.assertFalse(bucket.object_exists("a.html"))
+        with self.assertRaises(oss2.exceptions.ServerError):
+            bucket.put_object("../escape", b"x")
+
+    def test_listing_pages_through_oss2_iterators(self):
+        keys = [f"Week_{i:02d}.html" for i in range(1, 8)] + ["images/a.jpg", "images/b.jpg", "index.html"]
+        for key in keys:
+            self.bucket.put_object(key, key.encode("utf-8"))
+        listed = [obj.key for obj in oss2.ObjectIteratorV2(self.bucket, max_keys=3)]
+        self.assertEqual(listed, sorted(keys))
+        self.assertEqual(self.bucket.calls["list_objects_v2"], 4)
+        self.assertEqual([obj.key for obj in oss2.ObjectIterator(self.bucket, prefix="images/", max_keys=1)],
+                         ["images/a.jpg", "images/b.jpg"])
+        top = [obj.key for obj in oss2.ObjectIteratorV2(self.bucket, delimiter="/", max_keys=2)]
+        self.assertEqual(top, sorted([k for k in keys if "/" not in k] + ["images/"]))
+
+    def test_latency_and_failures_drive_the_uploader(self):
+        bucket = local_oss.LocalBucket(self.tmp / "flaky", latency=0.02, seed=7)
+        bucket.create_bucket()
+        bucket.failure_rate = 0.3
+        tasks = []
+        for i in range(12):
+            path = self.tmp / f"Week_{i + 1:02d}.html"
+            path.write_text(f"<p>{i}</p>", encoding="utf-8")
+            tasks.append(upload_to_oss.UploadTask(path.name, path, "text/html"))
+        start = time.perf_counter()
+        report = upload_to_oss.upload_all(bucket, tasks, jobs=12, retries=8, backoff=0)
+        self.assertLess(time.perf_counter() - start, 12 * 2 * 0.02)
+        self.assertEqual((len(report.ok), report.failed), (12, []))
+        self.assertGreater(bucket.calls["put_object"] + bucket.calls["head_object"], 24)
+
+        bucket.failure_rate = 1.0
+        with self.assertRaises((oss2.exceptions.RequestError, oss2.exceptions.ServerError)):
+            bucket.head_object("Week_01.html")
+
+    def test_releases_switch_copy_rollback_and_prune(self):
+        bucket = self.bucket
+        pages = {name: self.tmp / name for name in ("Week_01.html", "Week_02.html", "index.html")}
+        for path in pages.values():
+            path.write_text(f"<p>{path.stem} v1</p>", encoding="utf-8")
+        bucket.put_object("Week_01.html", b"<p>legacy</p>")
+
+        def publish(release_id, pointer, keep=2):
+            remote = upload_to_oss.RemoteIndex(bucket, "local", path=self.tmp / "manifest.json")
+            live = lambda name: upload_to_oss.release_key(pointer["current"], name) if pointer["current"] else name
+            tasks = [upload_to_oss.UploadTask(upload_to_oss.release_key(release_id, name), path, "text/html",
+                                              reuse_from=live(name) if live(name) in remote.etags else None)
+                     for name, path in pages.items()]
+            report = upload_to_oss.upload_all(bucket, tasks, backoff=0, remote=remote)
+            self.assertEqual(report.failed, [])
+            self.assertEqual(bucket.serve(next(iter(pages))), before)   # staged, not live
+            pointer = upload_to_oss.switch_release(bucket, release_id, pointer)
+            pruned = upload_to_oss.prune_releases(bucket, remote, pointer, keep)
+            remote.save()
+            return report, pointer, pruned
+
+        before = b"<p>legacy</p>"
+        report, pointer, pruned = publish("r1", upload_to_oss.read_release_pointer(bucket))
+        self.assertEqual((len(report.ok), report.copied, pruned), (3, [], []))
+        self.assertEqual(bucket.serve("Week_01.html"), b"<p>Week_01 v1</p>")
+        self.assertEqual(upload_to_oss.read_release_pointer(bucket), pointer)
+
+        # Unchanged pages are server-side copies of the live release
+        pages["Week_02.html"].write_text("<p>Week_02 v2</p>", encoding="utf-8")
+        before = b"<p>Week_01 v1</p>"
+        bucket.calls.clear()
+        report, pointer, _ = publish("r2", pointer)
+        self.assertEqual((report.ok, sorted(report.copied)),
+                         (["releases/r2/Week_02.html"], ["releases/r2/Week_01.html", "releases/r2/index.html"]))
+        self.assertEqual((bucket.calls["copy_object"], bucket.calls["put_object"]), (2, 2))
+        self.assertEqual(bucket.serve("Week_02.html"), b"<p>Week_02 v2</p>")
+
+        # No change since r2: every page would be a copy (main() then stages
+        # nothing), decided from the manifest without a request
+        remote = upload_to_oss.RemoteIndex(bucket, "local", path=self.tmp / "manifest.json")
+        same = [upload_to_oss.UploadTask(upload_to_oss.release_key("r9", name), path, "text/html",
+                                         reuse_from=upload_to_oss.release_key("r2", name))
+                for name, path in pages.items()]
+        bucket.calls.clear()
+        self.assertTrue(all(upload_to_oss.reuses_live(remote, task) for task in same))
+        self.assertEqual((dict(bucket.calls), remote.hashed), ({}, 0))
+        pages["index.html"].write_text("<p>index, v2</p>", encoding="utf-8")
+        self.assertFalse(upload_to_oss.reuses_live(remote, same[-1]))
+
+        # Rollback: one website update (plus the pointer), no uploads
+        bucket.calls.clear()
+        pointer = upload_to_oss.switch_release(bucket, "r1", pointer)
+        self.assertEqual(bucket.serve("Week_02.html"), b"<p>Week_02 v1</p>")
+        self.assertEqual((bucket.calls["put_bucket_website"], bucket.calls["put_object"]), (1, 1))
+        self.assertEqual(pointer, {"current": "r1", "releases": ["r2", "r1"]})
+
+        # A third release prunes beyond `keep`, never the live one
+        pointer = upload_to_oss.switch_release(bucket, "r2", pointer)
+        before = b"<p>Week_02 v2</p>"
+        pages = {"Week_02.html": pages["Week_02.html"]}
+        _, pointer, pruned = publish("r3", pointer, keep=2)
+        self.assertEqual(pruned, ["r1"])
+        self.assertFalse(bucket.object_exists("releases/r1/Week_01.html"))
+        self.assertTrue(bucket.object_exists(upload_to_oss.RELEASE_POINTER))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
 """Integration tests for make_interactive.py.
 
-Runs the script on the actual Week_01.html fixture and verifies
-the three insertions, idempotency, and that originals stay untouched.
+Runs the script on the canonical Week_01.html fixture (the pre-merge
+template parse_data.py fans out; root Week_*.html files are post-merged
+and no longer carry the Draft/Polished anchors) and verifies the
+insertions, idempotency, and that originals stay untouched.
 
 Run:  python -m unittest scripts.test_make_interactive  (from repo root)
   or:  python scripts/test_make_interactive.py
@@ -13,6 +15,8 @@ import unittest
 from pathlib import Path
 
 REPO = Path(__file__).resolve().parents[1]
+FIXTURE = "canonical/pdf-base/Week_01.html"
+sys.path.insert(0, str(REPO / "scripts"))
 
 
 def _run(in_path: str, out_dir: str, *, endpoint="https://test.fcapp.run", bucket="http://test.local"):
@@ -29,6 +33,15 @@ def _run(in_path: str, out_dir: str, *, endpoint="https://test.fcapp.run", bucke
     )
 
 
+def _bake(in_path: str, out_dir: str, *extra: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, str(REPO / "scripts" / "make_interactive.py"),
+         "--in", in_path, "--out", out_dir,
+         "--endpoint", "https://test.fcapp.run", "--bucket-base", "http://test.local", *extra],
+        cwd=REPO, capture_output=True, text=True, encoding="utf-8",
+    )
+
+
 class TestMakeInteractive(unittest.TestCase):
     def setUp(self):
         self._tmp = tempfile.TemporaryDirectory()
@@ -37,7 +50,7 @@ class TestMakeInteractive(unittest.TestCase):
 
     def test_week1_round_trip(self):
         out = self.tmp_path / "out"
-        _run("Week_01.html", str(out))
+        _run(FIXTURE, str(out))
         result = out / "Week_01.html"
         text = result.read_text(encoding="utf-8")
         # All three insertions present
@@ -59,28 +72,177 @@ class TestMakeInteractive(unittest.TestCase):
 
     def test_idempotent(self):
         out = self.tmp_path / "out"
-        _run("Week_01.html", str(out))
+        _run(FIXTURE, str(out))
         first = (out / "Week_01.html").read_bytes()
-        _run("Week_01.html", str(out))
+        _run(FIXTURE, str(out))
         second = (out / "Week_01.html").read_bytes()
         self.assertEqual(first, second, "Re-running must produce byte-identical output")
 
+    def test_unchanged_files_are_reused(self):
+        src = self.tmp_path / "src"
+        src.mkdir()
+        fixture = (REPO / FIXTURE).read_bytes()
+        for n in (1, 2):
+            (src / f"Week_{n:02d}.html").write_bytes(fixture)
+        out = self.tmp_path / "out"
+        self.assertIn("Processed: 2 rebuilt, 0 reused", _bake(str(src), str(out)).stdout)
+        baked = out / "Week_01.html"
+        mtime = baked.stat().st_mtime_ns
+        self.assertIn("Processed: 0 rebuilt, 2 reused", _bake(str(src), str(out)).stdout)
+        self.assertEqual(baked.stat().st_mtime_ns, mtime)
+
+        (src / "Week_02.html").write_bytes(fixture.replace(b"</body>", b"<p>new</p></body>", 1))
+        self.assertIn("Processed: 1 rebuilt, 1 reused", _bake(str(src), str(out)).stdout)
+        # A setting change, --force or a missing output rebakes
+        self.assertIn("Processed: 2 rebuilt", _bake(str(src), str(out), "--gate-title", "X").stdout)
+        self.assertIn("Processed: 2 rebuilt", _bake(str(src), str(out), "--gate-title", "X",
+                                                    "--force").stdout)
+        baked.unlink()
+        self.assertIn("Processed: 1 rebuilt, 1 reused",
+                      _bake(str(src), str(out), "--gate-title", "X").stdout)
+        # --weeks leaves the other files' manifest entries alone
+        _bake(str(src), str(out), "--weeks", "1")
+        self.assertIn("Processed: 1 rebuilt, 1 reused", _bake(str(src), str(out)).stdout)
+
     def test_originals_untouched(self):
-        src = REPO / "Week_01.html"
+        src = REPO / FIXTURE
         before = src.read_bytes()
         out = self.tmp_path / "out"
-        _run("Week_01.html", str(out))
+        _run(FIXTURE, str(out))
         after = src.read_bytes()
         self.assertEqual(before, after)
 
     def test_lesson_key_propagates(self):
         out = self.tmp_path / "out"
-        _run("Week_01.html", str(out))
+        _run(FIXTURE, str(out))
         text = (out / "Week_01.html").read_text(encoding="utf-8")
         # __LESSON_KEY__ should be replaced with the file stem
         self.assertIn("Week_01", text)
         self.assertNotIn("__LESSON_KEY__", text)
 
+    def test_asset_bundle_cache_matches_fresh_build(self):
+        import make_interactive
+        fresh = make_interactive._build_bundle(True)
+        self.assertEqual(make_interactive.load_bundle(True), fresh)
+        # The script is minified before substitution: the placeholders must survive it
+        for token in ("__AI_ENDPOINT__", "__PRONUNCIATIONS_URL__", "__LESSON_KEY__"):
+            self.assertEqual(fresh.script.count(token), 1, token)
+        # The lazy modules follow the core as inert blocks, in order
+        core, *modules = fresh.script.split("\n</script>\n")
+        self.assertIn("window.__ielts_build.MODULES", core)
+        self.assertEqual([m.split('"')[3] for m in modules], list(make_interactive._LAZY_MODULES))
+        for module in modules:
+            self.assertTrue(module.startswith('<script type="text/plain" data-ielts-module="'))
+            self.assertNotIn("__LESSON_KEY__", module)
+        self.assertNotEqual(make_interactive._bundle_key(True), make_interactive._bundle_key(False))
+
+    def test_rewriter_matches_chain(self):
+        import make_interactive
+        fixture = (REPO / FIXTURE).read_text(encoding="utf-8")
+        variants = {
+            "fixture": fixture,
+            # No spider legs: insertion 4 adds no map recorders either
+            "no-legs": fixture.replace('<div class="spider-leg"', '<div class="spider-arm"'),
+            # Already has is-interactive: the body tag is left as is
+            "body-class": fixture.replace("<body", '<body class="is-interactive"', 1),
+        }
+        bundle = make_interactive.load_bundle(True)
+        for name, html in variants.items():
+            with self.subTest(name):
+                path = self.tmp_path / "Week_01.html"
+                path.write_text(html, encoding="utf-8")
+                args = (path, "https://test.fcapp.run", "http://test.local", "Course")
+                chain = make_interactive.transform(*args, single_pass=False)
+                self.assertIsNotNone(make_interactive.rewrite(
+                    html, "https://test.fcapp.run", "http://test.local", "Week_01", "Course", bundle))
+                self.assertEqual(make_interactive.transform(*args), chain)
+
+    def test_rewriter_falls_back_to_chain(self):
+        import make_interactive
+        html = (REPO / FIXTURE).read_text(encoding="utf-8")
+        args = ("https://test.fcapp.run", "http://test.local", "Week_01", "Course")
+        # Unminified CSS quotes a <body> tag, which insertion 6 rewrites
+        self.assertIsNone(make_interactive.rewrite(html, *args, make_interactive.load_bundle(False)))
+        bundle = make_interactive.load_bundle(True)
+        baked = make_interactive.rewrite(html, *args, bundle)
+        self.assertIsNone(make_interactive.rewrite(baked, *args, bundle))
+        # Post-merged page: the chain's SkipFile message comes through unchanged
+        for single_pass in (True, False):
+            with self.assertRaisesRegex(make_interactive.SkipFile, "Draft"):
+                make_interactive.transform(REPO / "Week_03.html", *args[:2], "Course",
+                                           single_pass=single_pass)
+        result = _bake(FIXTURE, str(self.tmp_path / "out"), "--check-rewriter", "--no-minify")
+        self.assertEqual(result.returncode, 0, result.stdout)
+        self.assertIn("differences: 0, chain fallbacks: 1", result.stdout)
+        self.assertFalse((self.tmp_path / "out").exists())
+
+    def test_external_assets(self):
+        out = self.tmp_path / "out"
+        result = _bake(FIXTURE, str(out), "--external-assets")
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        text = (out / "Week_01.html").read_text(encoding="utf-8")
+        inline = self.tmp_path / "inline"
+        _run(FIXTURE, str(inline))
+        self.assertLess(len(text), len((inline / "Week_01.html").read_text(encoding="utf-8")) - 100_000)
+
+        assets = {p.name for p in (out / "assets").iterdir()}
+        css = next(n for n in assets if n.startswith("app.") and n.endswith(".css"))
+        js = next(n for n in assets if n.startswith("app.") and n.endswith(".js"))
+        self.assertIn(f'<link rel="stylesheet" href="assets/{css}">', text)
+        self.assertIn(f'<script src="assets/{js}">', text)
+        self.assertIn('LESSON_KEY: "Week_01"', text)
+        self.assertIn('AI_ENDPOINT: "https://test.fcapp.run"', text)
+        # The fonts are referenced from the CSS by their hashed names
+        css_text = (out / "assets" / css).read_text(encoding="utf-8")
+        fonts = [n for n in assets if n.endswith(".woff2")]
+        self.assertEqual(len(fonts), 2)
+        for name in fonts:
+            self.assertIn(f"url({name})", css_text)
+        js_text = (out / "assets" / js).read_text(encoding="utf-8")
+        self.assertIn("window.__ielts_build.LESSON_KEY", js_text)
+        self.assertNotIn("__LESSON_KEY__", js_text)
+        # The lazy modules are separate files, listed for the core to fetch
+        import make_interactive
+        for name in make_interactive._LAZY_MODULES:
+            module = next(n for n in assets if n.startswith(f"{name}.") and n.endswith(".js"))
+            self.assertIn(f'"{name}": "assets/{module}"', text)
+        self.assertNotIn("data-ielts-module", text)
+
+        # Re-baking writes nothing new; the rewriter still matches the chain
+        again = _bake(FIXTURE, str(out), "--external-assets")
+        self.assertIn("(0 written)", again.stdout)
+        check = _bake(FIXTURE, str(out), "--external-assets", "--check-rewriter")
+        self.assertIn("differences: 0, chain fallbacks: 0", check.stdout)
+
+    def test_jobs_match_serial(self):
+        src = self.tmp_path / "src"
+        src.mkdir()
+        fixture = (REPO / FIXTURE).read_bytes()
+        for n in (1, 2, 3, 4):
+            (src / f"Week_{n:02d}.html").write_bytes(fixture)
+        # Post-merged page: no Draft/Polished anchor -> SkipFile, exit 1
+        (src / "Week_03.html").write_bytes((REPO / "Week_03.html").read_bytes())
+        serial = _bake(str(src), str(self.tmp_path / "serial"))
+        parallel = _bake(str(src), str(self.tmp_path / "parallel"), "--jobs", "3")
+        self.assertEqual((serial.returncode, parallel.returncode), (1, 1))
+        report = lambda out: [line for line in out.splitlines() if line.startswith("  [")]
+        self.assertEqual(report(parallel.stdout), report(serial.stdout))
+        self.assertEqual(report(serial.stdout)[:3],
+                         ["  [ok] Week_01.html", "  [ok] Week_02.html", "  [ok] Week_04.html"])
+        for n in (1, 2, 4):
+            name = f"Week_{n:02d}.html"
+            self.assertEqual((self.tmp_path / "serial" / name).read_bytes(),
+                             (self.tmp_path / "parallel" / name).read_bytes())
+
+    def test_unexpected_error_is_fatal_with_file_name(self):
+        src = self.tmp_path / "src"
+        src.mkdir()
+        (src / "Week_01.html").write_bytes((REPO / FIXTURE).read_bytes())
+        (src / "Week_02.html").write_bytes(b"\xff\xfe not utf-8")
+        result = _bake(str(src), str(self.tmp_path / "out"), "--jobs", "2")
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("FATAL while processing Week_02.html", result.stderr)
+
     def test_skip_files_dont_match_pattern(self):
         """The script only matches Week_*.html; other files ignored."""
         src = self.tmp_path / "src"
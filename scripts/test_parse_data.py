@@ -0,0 +1,91 @@
+"""Integration tests for parse_data.py.
+
+Runs the real fan-out (canonical template + data files) into a temp folder.
+
+Run:  python -m unittest scripts.test_parse_data  (from repo root)
+  or:  python scripts/test_parse_data.py
+"""
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+
+
+def _run(out_dir: str, *extra: str) -> str:
+    return subprocess.check_output(
+        [sys.executable, str(REPO / "parse_data.py"), "--out", out_dir, *extra],
+        cwd=REPO, text=True, encoding="utf-8",
+    )
+
+
+class TestParseData(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.tmp_path = Path(self._tmp.name)
+
+    def test_parallel_matches_serial(self):
+        serial, parallel = self.tmp_path / "serial", self.tmp_path / "parallel"
+        _run(str(serial))
+        log = _run(str(parallel), "--jobs", "2")
+        names = sorted(p.name for p in serial.glob("Week_*.html"))
+        self.assertEqual(len(names), 40)
+        self.assertEqual(names, sorted(p.name for p in parallel.glob("Week_*.html")))
+        for name in names:
+            self.assertEqual((serial / name).read_bytes(), (parallel / name).read_bytes(),
+                             f"{name} differs between serial and --jobs 2")
+        # Per-week timing table, in week order
+        self.assertIn("Week  Status     Time", log)
+        self.assertLess(log.index("--- Generating Week 9 ---"),
+                        log.index("--- Generating Week 10 ---"))
+
+    def test_incremental_rebuild(self):
+        out = self.tmp_path / "out"
+        _run(str(out), "--renderer", "compiled")
+        week5 = out / "Week_05.html"
+        mtime = week5.stat().st_mtime_ns
+        log = _run(str(out), "--renderer", "compiled")
+        self.assertIn("Rebuilt: 0, unchanged: 40", log)
+        self.assertEqual(week5.stat().st_mtime_ns, mtime)
+        # A missing output is rebuilt even though its inputs are unchanged
+        week5.unlink()
+        log = _run(str(out), "--renderer", "compiled")
+        self.assertIn("Rebuilt: 1, unchanged: 39", log)
+        self.assertTrue(week5.exists())
+        log = _run(str(out), "--renderer", "compiled", "--force")
+        self.assertIn("Rebuilt: 40, unchanged: 0 (--force)", log)
+
+    def test_weeks_selection_leaves_other_weeks_alone(self):
+        out = self.tmp_path / "out"
+        _run(str(out), "--renderer", "compiled", "--weeks", "3,5-6")
+        self.assertEqual(sorted(p.name for p in out.glob("Week_*.html")),
+                         ["Week_03.html", "Week_05.html", "Week_06.html"])
+        week3 = out / "Week_03.html"
+        mtime = week3.stat().st_mtime_ns
+        log = _run(str(out), "--renderer", "compiled", "--weeks", "6-7")
+        self.assertIn("Success: 2/2", log)
+        self.assertIn("Rebuilt: 1, unchanged: 1", log)
+        self.assertEqual(week3.stat().st_mtime_ns, mtime)
+        # The manifest still covers weeks built by earlier selective runs
+        log = _run(str(out), "--renderer", "compiled", "--weeks", "3,5-7")
+        self.assertIn("Rebuilt: 0, unchanged: 4", log)
+
+    def test_compiled_renderer_matches_soup(self):
+        # --check-renderer exits 1 (CalledProcessError) on any byte difference
+        log = _run(str(self.tmp_path), "--check-renderer")
+        self.assertEqual(log.count(": identical"), 40)
+        self.assertIn("Renderers agree byte-for-byte on every week.", log)
+        self.assertEqual(list(self.tmp_path.iterdir()), [])  # check mode writes nothing
+
+    def test_compile_rejects_template_without_slots(self):
+        sys.path.insert(0, str(REPO))
+        from template_renderer import CompiledTemplate, TemplateCompileError
+        with self.assertRaises(TemplateCompileError):
+            CompiledTemplate("<html><body><div class='page'>no lesson here</div></body></html>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""Tests for pipeline_trace.py (opt-in Chrome trace export).
+
+Run:  python -m unittest scripts.test_pipeline_trace  (from repo root)
+  or:  python scripts/test_pipeline_trace.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+import pipeline_trace  # noqa: E402
+
+# Owner process: one traced call, then a sub-command that appends its own span.
+_OWNER = textwrap.dedent("""
+    import subprocess, sys
+    import pipeline_trace
+
+    @pipeline_trace.traced
+    def insertion(html):
+        return html + "<!-- x -->"
+
+    with pipeline_trace.scope(week=17):
+        insertion("<p>é</p>")
+    subprocess.run([sys.executable, "-c",
+                    "import pipeline_trace\\n"
+                    "with pipeline_trace.span('child', week=3) as a: a['bytes'] = 5"], check=True)
+""")
+
+
+class TestPipelineTrace(unittest.TestCase):
+    def test_disabled_by_default(self):
+        if pipeline_trace.enabled():
+            self.skipTest(f"${pipeline_trace.ENV_VAR} is set for this test run")
+        with pipeline_trace.span("noop") as args:
+            self.assertEqual(args, {})
+        self.assertEqual(pipeline_trace.traced(str.upper)("a"), "A")
+
+    def test_run_with_subprocess_is_one_trace(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / "trace.json"
+            env = {k: v for k, v in os.environ.items() if not k.startswith("IELTS_TRACE")}
+            env[pipeline_trace.ENV_VAR] = str(out)
+            env["PYTHONPATH"] = str(REPO)
+            subprocess.run([sys.executable, "-c", _OWNER], cwd=tmp, env=env, check=True,
+                           capture_output=True)
+            events = json.loads(out.read_text(encoding="utf-8"))["traceEvents"]
+        spans = {e["name"]: e for e in events if e["ph"] == "X"}
+        self.assertEqual(spans["insertion"]["args"], {"week": 17, "bytes_in": 9, "bytes_out": 19})
+        self.assertEqual(spans["child"]["args"], {"week": 3, "bytes": 5})
+        self.assertNotEqual(spans["insertion"]["pid"], spans["child"]["pid"])
+        self.assertEqual(sum(e["ph"] == "M" for e in events), 2)  # a process_name per process
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""Tests for precompress.py and the precompressed uploads in upload_to_oss.py.
+
+Run:  python -m unittest scripts.test_precompress  (from repo root)
+  or:  python scripts/test_precompress.py
+"""
+import gzip
+import hashlib
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+sys.path.insert(0, str(REPO / "scripts"))
+
+import precompress  # noqa: E402
+
+PAGE = (REPO / "canonical" / "pdf-base" / "Week_01.html").read_bytes()
+
+
+class Bucket:
+    """head_object / put_object_from_file / put_object, keeping the headers."""
+
+    def __init__(self):
+        self.objects = {}   # key -> (body, headers)
+        self.puts = 0
+
+    def head_object(self, key):
+        if key not in self.objects:
+            import oss2
+            raise oss2.exceptions.NotFound(404, {}, b"", {})
+        body, headers = self.objects[key]
+        return SimpleNamespace(etag=f'"{hashlib.md5(body).hexdigest().upper()}"',
+                               headers={k.lower(): v for k, v in headers.items()})
+
+    def put_object(self, key, data, headers=None):
+        self.objects[key] = (data, dict(headers or {}))
+        self.puts += 1
+
+    def put_object_from_file(self, key, filename, headers=None):
+        self.put_object(key, Path(filename).read_bytes(), headers)
+
+
+class TestPrecompress(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.page = self.tmp / "Week_01.html"
+        self.page.write_bytes(PAGE)
+
+    def test_variants_round_trip_and_are_reused(self):
+        found = precompress.variants(self.page)
+        self.assertEqual(tuple(found), precompress.encodings())
+        self.assertEqual(gzip.decompress(found["gzip"].read_bytes()), PAGE)
+        if "br" in found:
+            import brotli
+            self.assertEqual(brotli.decompress(found["br"].read_bytes()), PAGE)
+        for variant in found.values():
+            self.assertLess(variant.stat().st_size, len(PAGE))
+
+        stamp = {e: v.stat().st_ino for e, v in found.items()}
+        precompress.variants(self.page)
+        self.assertEqual({e: v.stat().st_ino for e, v in found.items()}, stamp)
+        # A rewritten source is recompressed, even within the same second
+        self.page.write_bytes(PAGE + b"<!-- x -->")
+        os.utime(self.page, ns=(0, 10**9))
+        precompress.variants(self.page)
+        self.assertEqual(gzip.decompress(found["gzip"].read_bytes()), PAGE + b"<!-- x -->")
+
+    def test_best_picks_smallest_allowed(self):
+        path, encoding = precompress.best(self.page, precompress.encodings())
+        self.assertEqual(encoding, precompress.encodings()[0])
+        self.assertEqual(path.name, "Week_01.html" + precompress.SUFFIX[encoding])
+        self.assertEqual(precompress.best(self.page, ["gzip"])[1], "gzip")
+        self.assertEqual(precompress.best(self.page, ()), (self.page, None))
+        tiny = self.tmp / "tiny.json"
+        tiny.write_bytes(b"{}")
+        self.assertEqual(precompress.best(tiny, ["gzip"]), (tiny, None))
+        image = self.tmp / "a.png"
+        image.write_bytes(b"\0" * 1000)
+        self.assertEqual(precompress.best(image, ["gzip"]), (image, None))
+        self.assertEqual(precompress.best_bytes(PAGE, ["gzip"]),
+                         (precompress.compress_bytes(PAGE, "gzip"), "gzip"))
+
+    def test_smart_upload_skips_on_compressed_body(self):
+        import upload_to_oss
+        bucket = Bucket()
+        upload = lambda *encodings: upload_to_oss._smart_upload(
+            bucket, "Week_01.html", self.page, "text/html; charset=utf-8", encodings)
+
+        status, sent = upload("gzip")
+        self.assertEqual(status, "ok")
+        body, headers = bucket.objects["Week_01.html"]
+        self.assertEqual(gzip.decompress(body), PAGE)
+        self.assertEqual(sent, len(body))
+        self.assertEqual((headers["Content-Encoding"], "Vary" in headers), ("gzip", False))
+        self.assertEqual(headers["Cache-Control"], upload_to_oss.CACHE_CONTROL[".html"])
+
+        self.assertEqual(upload("gzip"), ("skip", 0))
+        # Switching the encoding off re-uploads the plain body, without the header
+        self.assertEqual(upload()[0], "ok")
+        body, headers = bucket.objects["Week_01.html"]
+        self.assertEqual((body, "Content-Encoding" in headers), (PAGE, False))
+        self.assertEqual(upload(), ("skip", 0))
+        self.assertEqual(bucket.puts, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,231 @@
+"""Tests for the concurrent upload engine in upload_to_oss.py.
+
+Run:  python -m unittest scripts.test_upload_to_oss  (from repo root)
+  or:  python scripts/test_upload_to_oss.py
+"""
+import hashlib
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+sys.path.insert(0, str(REPO / "scripts"))
+
+from test_precompress import Bucket  # noqa: E402
+
+try:
+    import oss2
+    import upload_to_oss
+except ImportError:
+    oss2 = None
+
+
+class SlowFlakyBucket(Bucket):
+    """Bucket whose PUTs take `latency` seconds and fail as scripted, and
+    which lists `page` keys per request and counts its HEADs and listings."""
+
+    def __init__(self, latency=0.0, failures=None, page=3):
+        super().__init__()
+        self.latency = latency
+        self.failures = dict(failures or {})   # key -> [exception, ...] raised in turn
+        self.lock = threading.Lock()
+        self.active = self.peak = 0
+        self.page = page
+        self.heads = self.listings = 0
+
+    def head_object(self, key):
+        with self.lock:
+            self.heads += 1
+        return super().head_object(key)
+
+    def list_objects_v2(self, prefix="", continuation_token="", **_kw):
+        self.listings += 1
+        keys = sorted(k for k in self.objects if k.startswith(prefix) and k > continuation_token)
+        listed = keys[:self.page]
+        etag = lambda key: f'"{hashlib.md5(self.objects[key][0]).hexdigest().upper()}"'
+        return SimpleNamespace(
+            object_list=[SimpleNamespace(key=k, etag=etag(k)) for k in listed], prefix_list=[],
+            is_truncated=len(keys) > len(listed), next_continuation_token=listed[-1] if listed else "")
+
+    def put_object(self, key, data, headers=None):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            pending = self.failures.get(key)
+            error = pending.pop(0) if pending else None
+        try:
+            time.sleep(self.latency)
+            if error is not None:
+                raise error
+            with self.lock:
+                super().put_object(key, data, headers)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def _server_error(status):
+    return oss2.exceptions.ServerError(status, {}, b"", {})
+
+
+class TestConcurrentUpload(unittest.TestCase):
+    def setUp(self):
+        if oss2 is None:
+            self.skipTest("oss2 not installed")
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tasks = []
+        for i in range(20):
+            path = Path(tmp.name) / f"Week_{i + 1:02d}.html"
+            path.write_text(f"<p>week {i + 1}</p>", encoding="utf-8")
+            self.tasks.append(upload_to_oss.UploadTask(path.name, path, "text/html"))
+        self.sleep = mock.Mock()   # no real backoff waits
+
+    def test_with_retry_retries_only_transient_errors(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise oss2.exceptions.RequestError(ConnectionResetError("reset"))
+            return "done"
+
+        self.assertEqual(upload_to_oss.with_retry(flaky, "k", retries=3, sleep=self.sleep), "done")
+        self.assertEqual((len(calls), self.sleep.call_count), (3, 2))
+        # Backoff grows with the attempt (full jitter: uniform(0, base * 2**n))
+        with mock.patch.object(upload_to_oss.random, "uniform", side_effect=lambda a, b: b):
+            calls.clear()
+            self.sleep.reset_mock()
+            upload_to_oss.with_retry(flaky, "k", retries=3, backoff=1.0, sleep=self.sleep)
+            self.assertEqual([c.args[0] for c in self.sleep.call_args_list], [1.0, 2.0])
+
+        def denied():
+            calls.append(1)
+            raise _server_error(403)
+
+        calls.clear()
+        with self.assertRaises(oss2.exceptions.ServerError):
+            upload_to_oss.with_retry(denied, "k", retries=3, sleep=self.sleep)
+        self.assertEqual(len(calls), 1)
+        with self.assertRaises(oss2.exceptions.ServerError):
+            upload_to_oss.with_retry(lambda: (_ for _ in ()).throw(_server_error(503)), "k",
+                                     retries=2, sleep=self.sleep)
+
+    def test_upload_all_runs_concurrently_and_tallies(self):
+        bucket = SlowFlakyBucket(latency=0.05, failures={
+            "Week_03.html": [_server_error(503), _server_error(429)],   # recovers
+            "Week_07.html": [_server_error(403)],                       # doesn't
+        })
+        start = time.perf_counter()
+        report = upload_to_oss.upload_all(bucket, self.tasks, jobs=10, retries=3, backoff=0)
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, 20 * 0.05 / 2)
+        self.assertGreater(bucket.peak, 1)
+        self.assertLessEqual(bucket.peak, 10)
+        self.assertEqual(len(report.ok), 19)
+        self.assertIn("Week_03.html", report.ok)
+        self.assertEqual([key for key, _ in report.failed], ["Week_07.html"])
+        self.assertIn("ServerError", report.failed[0][1])
+
+        again = upload_to_oss.upload_all(bucket, self.tasks, jobs=10, retries=3, backoff=0)
+        self.assertEqual((len(again.ok), len(again.skipped), again.failed),
+                         (1, 19, []))
+        self.assertEqual(again.ok, ["Week_07.html"])
+        self.assertEqual(upload_to_oss.upload_all(bucket, [], jobs=4), ([], [], [], []))
+
+    def test_failed_head_is_retried_not_taken_for_absent(self):
+        bucket = SlowFlakyBucket()
+        upload_to_oss.upload_all(bucket, self.tasks[:2], backoff=0)
+        puts = bucket.puts
+        errors = {"Week_01.html": [_server_error(503)], "Week_02.html": [_server_error(403)]}
+        head = bucket.head_object
+        bucket.head_object = lambda key: head(key) if not errors[key] else (_ for _ in ()).throw(errors[key].pop())
+        report = upload_to_oss.upload_all(bucket, self.tasks[:2], retries=2, backoff=0)
+        self.assertEqual(report.skipped, ["Week_01.html"])
+        self.assertEqual([key for key, _ in report.failed], ["Week_02.html"])
+        self.assertEqual(bucket.puts, puts)   # neither was re-uploaded
+
+
+    def test_remote_index_replaces_per_object_heads(self):
+        bucket = SlowFlakyBucket()
+        record = Path(self.tasks[0].src).parent / "oss" / "bucket.json"
+        index = lambda: upload_to_oss.RemoteIndex(bucket, "bucket", path=record)
+
+        remote = index()
+        self.assertEqual(len(upload_to_oss.upload_all(bucket, self.tasks, remote=remote).ok), 20)
+        self.assertEqual(bucket.heads, 0)   # an unlisted key is absent: no HEAD needed
+        body, headers = bucket.objects["Week_01.html"]
+        self.assertEqual(headers[upload_to_oss._META_MD5], hashlib.md5(body).hexdigest())
+        remote.save()
+
+        # Nothing changed: 7 listings of 3 keys, no HEADs, all skipped
+        bucket.listings = 0
+        remote = index()
+        report = upload_to_oss.upload_all(bucket, self.tasks, remote=remote)
+        self.assertEqual((len(report.skipped), bucket.heads, bucket.listings), (20, 0, 7))
+
+        # Without the record each object costs one HEAD, once
+        record.unlink()
+        remote = index()
+        self.assertEqual(len(upload_to_oss.upload_all(bucket, self.tasks, remote=remote).skipped), 20)
+        self.assertEqual((remote.heads, bucket.heads), (20, 20))
+        remote.save()
+
+        # An object changed behind our back is HEADed and re-uploaded
+        bucket.objects["Week_05.html"] = (b"other", {})
+        remote = index()
+        report = upload_to_oss.upload_all(bucket, self.tasks, remote=remote)
+        self.assertEqual((report.ok, remote.heads), (["Week_05.html"], 1))
+        self.assertEqual(remote.keys("Week_0"), [f"Week_0{i}.html" for i in range(1, 10)])
+
+
+    def test_manifest_skips_hashing_untouched_files(self):
+        bucket = SlowFlakyBucket(page=100)
+        manifest = Path(self.tasks[0].src).parent / "oss" / "bucket.json"
+        index = lambda verify=False: upload_to_oss.RemoteIndex(bucket, "bucket", path=manifest,
+                                                               verify=verify)
+        remote = index()
+        upload_to_oss.upload_all(bucket, self.tasks, remote=remote)
+        self.assertEqual(remote.hashed, 20)
+        remote.save()
+        saved = upload_to_oss.json.loads(manifest.read_text(encoding="utf-8"))
+        entry = saved["files"][str(self.tasks[0].src.resolve())]
+        self.assertEqual(entry["stat"][0], self.tasks[0].src.stat().st_size)
+        self.assertEqual(entry["md5"], saved["objects"]["Week_01.html"]["md5"])
+
+        remote = index()
+        self.assertEqual(len(upload_to_oss.upload_all(bucket, self.tasks, remote=remote).skipped), 20)
+        self.assertEqual((remote.hashed, remote.heads), (0, 0))
+        # Keyed by local path: the same files under new keys aren't hashed either
+        moved = [task._replace(key=f"releases/r2/{task.key}") for task in self.tasks]
+        self.assertEqual(len(upload_to_oss.upload_all(bucket, moved, remote=remote).ok), 20)
+        self.assertEqual(remote.hashed, 0)
+        for task in moved:
+            del bucket.objects[task.key]
+        remote.forget(task.key for task in moved)
+
+        # A touched file is hashed again; same bytes -> still a skip
+        src = self.tasks[2].src
+        src.write_bytes(src.read_bytes())
+        upload_to_oss.os.utime(src, ns=(0, 10**9))
+        report = upload_to_oss.upload_all(bucket, self.tasks, remote=remote)
+        self.assertEqual((len(report.skipped), remote.hashed), (20, 1))
+        src.write_text("<p>new</p>", encoding="utf-8")
+        report = upload_to_oss.upload_all(bucket, self.tasks, remote=remote)
+        self.assertEqual((report.ok, remote.hashed), (["Week_03.html"], 2))
+        remote.save()
+
+        # --verify: every file hashed and every object HEADed, nothing re-sent
+        remote = index(verify=True)
+        report = upload_to_oss.upload_all(bucket, self.tasks, remote=remote)
+        self.assertEqual((len(report.skipped), remote.hashed, remote.heads), (20, 20, 20))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+"""Tests for week_selection.py (the shared --weeks selector).
+
+Run:  python -m unittest scripts.test_week_selection  (from repo root)
+  or:  python scripts/test_week_selection.py
+"""
+import argparse
+import sys
+import unittest
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+import week_selection  # noqa: E402
+
+
+class TestWeekSelection(unittest.TestCase):
+    def test_parse_and_round_trip(self):
+        self.assertEqual(week_selection.parse("17"), (17,))
+        self.assertEqual(week_selection.parse("22, 17,20-21,21"), (17, 20, 21, 22))
+        self.assertEqual(week_selection.to_spec((17, 20, 21, 22)), "17,20-22")
+        self.assertEqual(week_selection.parse(week_selection.to_spec(range(1, 41))), tuple(range(1, 41)))
+
+    def test_rejects_bad_selectors(self):
+        for spec in ("", "0", "41", "5-3", "1-50", "x", "3,,4"):
+            with self.assertRaises(ValueError, msg=spec):
+                week_selection.parse(spec)
+        ap = argparse.ArgumentParser()
+        week_selection.add_argument(ap)
+        self.assertIsNone(ap.parse_args([]).weeks)
+        with self.assertRaises(SystemExit):
+            ap.parse_args(["--weeks", "41"])
+
+    def test_filter_paths(self):
+        paths = [Path("x/Week_01.html"), Path("x/Week_17.html"), Path("x/index.html"), "Week_20.html"]
+        self.assertEqual(week_selection.filter_paths(paths, None), paths)
+        self.assertEqual(week_selection.filter_paths(paths, (17, 20)), [paths[1], paths[3]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Tests for week_store.py (week-indexed data files + pickle snapshot).
+
+Run:  python -m unittest scripts.test_week_store  (from repo root)
+  or:  python scripts/test_week_store.py
+"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+import week_store  # noqa: E402
+
+
+class TestWeekStore(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.base = Path(self._tmp.name)
+        self._write("master Curiculum.json", json.dumps([{"week": 1, "topic": "A"}, {"week": 2, "topic": "B"},
+                                                          {"week": 2, "topic": "duplicate"}]))
+        # Two arrays glued together, as the vocab/homework generators write them
+        self._write("vocab_plan.json", '[{"week": 1, "v": 1}]\n[{"week": 2, "v": 2}]')
+        self._write("teacher_dynamic_content.json", json.dumps({"1": {"lesson_1": {}}}))
+
+    def _write(self, name, text):
+        (self.base / name).write_text(text, encoding="utf-8")
+
+    def _load(self):
+        return week_store.load(str(self.base), verbose=False)
+
+    def test_indexes_by_week(self):
+        store = self._load()
+        self.assertEqual(store.weeks(), [1, 2])
+        self.assertEqual(store.curriculum[2]["topic"], "B")  # first entry wins
+        self.assertEqual(store.vocab[2]["v"], 2)
+        self.assertEqual(store.teacher[1], {"lesson_1": {}})
+        week = store.week_inputs(1)
+        self.assertEqual(week["peer"], None)
+        self.assertEqual(week["ai"], {})
+        self.assertIsNone(store.week_inputs(3))
+
+    def test_snapshot_reused_until_a_source_changes(self):
+        self._load()
+        snapshot = self.base / week_store.SNAPSHOT_PATH
+        self.assertTrue(snapshot.exists())
+        mtime = snapshot.stat().st_mtime_ns
+        self.assertEqual(self._load().curriculum[1]["topic"], "A")
+        self.assertEqual(snapshot.stat().st_mtime_ns, mtime)
+
+        self._write("master Curiculum.json", json.dumps([{"week": 1, "topic": "changed"}]))
+        self.assertEqual(self._load().curriculum[1]["topic"], "changed")
+
+    def test_corrupt_snapshot_is_rebuilt(self):
+        self._load()
+        (self.base / week_store.SNAPSHOT_PATH).write_bytes(b"not a pickle")
+        self.assertEqual(self._load().curriculum[1]["topic"], "A")
+
+    def test_no_snapshot_mode_leaves_disk_alone(self):
+        week_store.load(str(self.base), use_snapshot=False, verbose=False)
+        self.assertFalse(os.path.exists(self.base / week_store.SNAPSHOT_PATH))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,27 +1,110 @@
 #!/usr/bin/env python3
 """One-shot script: create the aischool-ielts-bj OSS bucket (if absent),
-set public-read ACL, and upload all 40 interactive HTMLs + pronunciations.json
+set public-read ACL, and upload all 40 interactive HTMLs (plus their shared
+Interactive/assets/ files, if baked with --external-assets) + pronunciations.json
 with the correct MIME types.
 
 OSS public URL pattern after upload:
   https://aischool-ielts-bj.oss-cn-beijing.aliyuncs.com/<filename>
 
 Run:  python scripts/upload_to_oss.py
+      python scripts/upload_to_oss.py --weeks 17,20-22   # only these Week HTMLs
+                                                          # (shared assets still synced)
+      python scripts/upload_to_oss.py --encodings br,gzip   # Brotli bodies (see below)
+      python scripts/upload_to_oss.py --jobs 16 --retries 5
+      python scripts/upload_to_oss.py --releases          # stage + switch a release (see below)
+      python scripts/upload_to_oss.py --rollback          # back to the previous release
+      python scripts/upload_to_oss.py --rollback 20261017T091500Z
+
+Releases (--releases). By default the pages (Week_NN.html, index.html,
+pronunciations.json) overwrite their live keys one by one, so students
+can load a mix of old and new weeks mid-publish. With --releases a
+publish stages a complete set under releases/<UTC timestamp>/ (a page
+that is unchanged, or not in --weeks, is a server-side copy from the
+live release, not a re-upload) and only when every object has landed
+switches the site to it with one PutBucketWebsite: Internal routing rules
+that serve Week_*, index.html and pronunciations.json from that prefix.
+A publish that changes no page stages nothing and leaves the live
+release in place. releases/current.json records the live release and the
+history; --rollback switches back with the same single request. The
+newest --keep-releases (default 5) stay, older prefixes are deleted.
+assets/ and images/ stay at the bucket root (their names carry a hash,
+or are long-cached and only added to), as do the admin page and
+_pwhash.json. Routing rules only apply on the bucket's static-website
+endpoint, and the CDN pulls from the plain bucket endpoint today, where
+a release would never be served: --releases refuses to run until the CDN
+origin is moved and CDN_ORIGIN (pipeline.yaml's cdn.origin) says
+"website". The HTML max-age (5 min) still applies after a switch.
+
+Objects go up from a pool of --jobs threads (default 8): each one is a
+HEAD plus a PUT over the cross-border link, so a full re-upload takes
+about as long as the slowest few objects rather than the sum of all of
+them. A key that fails with a network error, 5xx or 429 is retried up to
+--retries times with exponential backoff; one that still fails is
+reported and counted, the others carry on, and the exit status is 1.
+The shared assets/ go first, as their own batch, so no page is live
+before the files it links.
+
+Whether an object is up to date comes from one paginated listing of the
+bucket (RemoteIndex), not a HEAD per object: the listing gives each key's
+ETag, and the upload manifest .cache/oss/<bucket>.json records the MD5,
+Cache-Control and Content-Encoding we last uploaded under that ETag. Only
+an object the manifest doesn't cover (first run on this machine, or
+changed by someone else) costs a HEAD. Every upload also stores its MD5
+and Cache-Control as x-oss-meta-* metadata, so that HEAD can tell even
+when the ETag is not the MD5 (multipart uploads).
+
+The manifest also keeps, per local file, its (size, mtime_ns, inode) and
+MD5 when last hashed: a file whose stat still matches isn't hashed again,
+whichever key it is compared with. `--verify` trusts none of it: every file is
+hashed, every object HEADed, and the manifest rewritten from the results.
+
+Text files go up precompressed (precompress.py): the smallest of the file
+and its variants in --encodings, with Content-Encoding set. OSS serves one
+stored body per key and does not negotiate, so --encodings decides what
+every client gets, whatever its Accept-Encoding. The default is gzip,
+which every client accepts; `br,gzip` uploads Brotli bodies (smaller,
+but unreadable to a client without br), and `identity` uploads
+everything uncompressed.
 
 Reads AccessKey from env: ALIYUN_ACCESS_KEY_ID, ALIYUN_ACCESS_KEY_SECRET.
+With --local DIR it needs none: the bucket is local_oss.LocalBucket over
+DIR, optionally slowed (--local-latency) and made flaky
+(--local-failure-rate), for trying the upload paths offline.
 """
 from __future__ import annotations
+import argparse
+import concurrent.futures
 import hashlib
+import json
 import os
+import random
 import re
 import sys
+import threading
+import time
 from pathlib import Path
+from typing import Callable, Iterable, NamedTuple
 
 import oss2
+from oss2.models import REDIRECT_TYPE_INTERNAL, BucketWebsite, Condition, Redirect, RoutingRule
 
 REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO))
+
+import image_sync  # noqa: E402
+import local_oss  # noqa: E402
+import pipeline_trace  # noqa: E402
+import precompress  # noqa: E402
+import week_selection  # noqa: E402
+
 BUCKET_NAME = "aischool-ielts-bj"
 ENDPOINT = "https://oss-cn-beijing.aliyuncs.com"
+# What the CDN pulls from: "bucket" (the endpoint above) or "website" (the
+# bucket's static-website endpoint, the only one that applies the routing
+# rules --releases switches with). Keep in sync with pipeline.yaml's
+# `cdn.origin`.
+CDN_ORIGIN = "bucket"
 
 # Cache-Control header policy. CDN caches per these durations; clients
 # (browsers) cache for max-age. Values balance "students see fresh
@@ -29,15 +112,25 @@ ENDPOINT = "https://oss-cn-beijing.aliyuncs.com"
 #   HTMLs:  5 min   — fresh enough for last-minute curriculum tweaks
 #   JSON:   1 hour  — pronunciations.json is essentially static
 #   Images: 7 days  — course pipeline PNGs change rarely
+#   CSS/JS/fonts: 1 year, immutable — only the Interactive/assets/ files
+#           (make_interactive.py --external-assets), whose names carry a
+#           content hash: a changed file is a new URL
+_IMMUTABLE = "public, max-age=31536000, immutable"
 CACHE_CONTROL = {
     ".html": "public, max-age=300, must-revalidate",
     ".json": "public, max-age=3600",
     ".png":  "public, max-age=604800",
     ".jpg":  "public, max-age=604800",
     ".webp": "public, max-age=604800",
+    ".avif": "public, max-age=604800",
     ".svg":  "public, max-age=604800",
     ".gif":  "public, max-age=604800",
+    ".css":  _IMMUTABLE,
+    ".js":   _IMMUTABLE,
+    ".woff2": _IMMUTABLE,
 }
+ASSET_MIME = {".css": "text/css; charset=utf-8", ".js": "application/javascript; charset=utf-8",
+              ".woff2": "font/woff2"}
 
 # Round 29 (2026-05-03): admin console + rotating-password gate config.
 # admin/index.html and _pwhash.json are NOT cached at the CDN — admin
@@ -61,43 +154,372 @@ def _file_md5(path: Path) -> str:
     return h.hexdigest()
 
 
-def _oss_object_state(bucket, key: str) -> tuple[str | None, str | None]:
-    """Return (md5, cache_control) for an OSS object, or (None, None) if absent.
-    Used to decide whether to skip the upload — we re-upload if either
-    the body changed OR the cache-control header is missing/stale."""
+def _oss_object_state(bucket, key: str) -> tuple[str | None, str | None, str | None]:
+    """Return (md5, cache_control, content_encoding) for an OSS object, or
+    (None, None, None) if absent. Used to decide whether to skip the
+    upload — we re-upload if the body changed OR the cache-control /
+    content-encoding header is missing/stale. Any other HEAD failure
+    (timeout, 5xx, 403) is raised, for with_retry to retry or report,
+    rather than taken for "absent" and re-uploaded."""
     try:
         meta = bucket.head_object(key)
+        headers = {k.lower(): v for k, v in meta.headers.items()}
         etag = (meta.etag or "").strip('"').lower()
-        if "-" in etag:  # multipart upload — ETag isn't the MD5
-            return (None, None)
-        # Cache-Control is in headers, lower-cased by HTTP convention
-        cc = meta.headers.get("cache-control") or meta.headers.get("Cache-Control")
-        return (etag, cc)
-    except oss2.exceptions.NoSuchKey:
-        return (None, None)
-    except Exception:
-        return (None, None)
+        md5 = headers.get(_META_MD5) or (etag if "-" not in etag else None)   # multipart: ETag isn't the MD5
+        if md5 is None:
+            return (None, None, None)
+        return (md5, headers.get("cache-control"), headers.get("content-encoding"))
+    except oss2.exceptions.NotFound:   # HEAD has no body: a missing key is a bare 404
+        return (None, None, None)
+
+
+# Every client gets the one stored body, so only what they all accept.
+DEFAULT_ENCODINGS = ("gzip",)
+
+
+def _encoding_headers(encoding: str | None) -> dict:
+    return {"Content-Encoding": encoding} if encoding else {}
 
 
-def _smart_upload(bucket, key: str, src: Path, content_type: str) -> tuple[str, int]:
+# ---------- Remote state: one listing instead of a HEAD per object ----------
+
+_META_MD5 = "x-oss-meta-content-md5"
+_META_CC = "x-oss-meta-cache-control"
+REMOTE_CACHE_DIR = REPO / ".cache" / "oss"
+
+
+def _meta_headers(md5: str, cache_control: str) -> dict:
+    return {_META_MD5: md5, _META_CC: cache_control}
+
+
+def _fingerprint(st: os.stat_result) -> list[int]:
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+class RemoteIndex:
+    """The bucket's objects from one paginated listing, plus the upload
+    manifest kept in REMOTE_CACHE_DIR/<bucket>.json:
+
+      {"objects": {key: {"etag", "md5", "cache_control", "encoding"}},
+       "files": {local path: {"stat", "md5"}}}
+
+    state(key) answers like _oss_object_state(): from "objects" when the
+    listed ETag is the one recorded, absent when the key isn't listed, and
+    with one HEAD (then recorded) otherwise. local_md5(path) hashes `path`
+    only if its stat differs from the one in "files" — keyed by the local
+    path, so it holds whatever key the file goes to (a new release prefix
+    every publish). With verify=True the manifest is ignored (and rebuilt).
+    Thread-safe; call save() at the end of the run."""
+
+    def __init__(self, bucket, name: str, prefix: str = "", path: Path | None = None,
+                 verify: bool = False):
+        self.bucket = bucket
+        self.path = path or REMOTE_CACHE_DIR / f"{name}.json"
+        self.etags = {obj.key: (obj.etag or "").strip('"').lower()
+                      for obj in oss2.ObjectIteratorV2(bucket, prefix=prefix, max_keys=1000)}
+        try:
+            manifest = {} if verify else json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            manifest = {}   # no manifest yet: every listed key gets one HEAD
+        if "objects" not in manifest:
+            manifest = {}   # the old flat {key: ...} layout: start over
+        self.records = manifest.get("objects", {})
+        self.files = manifest.get("files", {})
+        self.heads = self.hashed = 0
+        self._lock = threading.Lock()
+
+    def local_md5(self, path: Path) -> str:
+        """MD5 of `path`, from the manifest while its stat is unchanged."""
+        path = str(Path(path).resolve())
+        stat = _fingerprint(os.stat(path))   # before reading: a write during the hash changes it
+        with self._lock:
+            entry = self.files.get(path) or {}
+        if entry.get("stat") == stat:
+            return entry["md5"]
+        md5 = _file_md5(Path(path))
+        with self._lock:
+            self.hashed += 1
+            self.files[path] = {"stat": stat, "md5": md5}
+        return md5
+
+    def keys(self, prefix: str = "") -> list[str]:
+        return sorted(k for k in self.etags if k.startswith(prefix))
+
+    def state(self, key: str) -> tuple[str | None, str | None, str | None]:
+        etag = self.etags.get(key)
+        if etag is None:
+            return (None, None, None)
+        with self._lock:
+            record = self.records.get(key)
+        if record and record.get("etag") == etag:
+            return (record["md5"], record["cache_control"], record["encoding"])
+        with self._lock:
+            self.heads += 1
+        md5, cc, enc = _oss_object_state(self.bucket, key)
+        if md5 is not None:
+            self.record(key, etag, md5, cc, enc)
+        return (md5, cc, enc)
+
+    def record(self, key: str, etag: str | None, md5: str, cache_control: str | None,
+               encoding: str | None) -> None:
+        """Note what `key` now holds (after an upload, etag is the PUT's)."""
+        etag = (etag or md5).strip('"').lower()
+        with self._lock:
+            self.etags[key] = etag
+            self.records[key] = {"etag": etag, "md5": md5, "cache_control": cache_control,
+                                 "encoding": encoding}
+
+    def forget(self, keys: Iterable[str]) -> None:
+        """Drop deleted keys."""
+        with self._lock:
+            for key in keys:
+                self.etags.pop(key, None)
+                self.records.pop(key, None)
+
+    def save(self) -> None:
+        with self._lock:
+            files = {path: entry for path, entry in self.files.items() if os.path.exists(path)}
+            data = json.dumps({"objects": self.records, "files": files}, indent=1, sort_keys=True)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # read-only checkout: the next run HEADs instead
+
+
+def _upload_body(key: str, src: Path, encodings=()) -> tuple[Path, str | None, str]:
+    """(file to send, its Content-Encoding, the Cache-Control for `key`)."""
+    body, encoding = precompress.best(src, encodings)
+    return body, encoding, CACHE_CONTROL.get(Path(key).suffix.lower(), "")
+
+
+@pipeline_trace.traced(args=lambda bucket, key, src, content_type, encodings=(), remote=None, reuse_from=None:
+                       {"key": key, "bytes": src.stat().st_size if src else 0},
+                       result=lambda r: {"status": r[0], "bytes_uploaded": r[1]})
+def _smart_upload(bucket, key: str, src: Path | None, content_type: str,
+                  encodings=(), remote: RemoteIndex | None = None,
+                  reuse_from: str | None = None) -> tuple[str, int]:
     """Upload `src` to `key` with appropriate Cache-Control header. Skip
     if local MD5 matches OSS ETag AND cache-control header matches.
     The cache-control check ensures objects backfilled with new header
     policy on a subsequent run instead of staying stuck on old metadata.
-    Returns (status_str, bytes_uploaded). status_str in {ok, skip, fail}."""
-    ext = src.suffix.lower()
-    expected_cc = CACHE_CONTROL.get(ext, "")
-    headers = {"Content-Type": content_type}
+
+    With `encodings`, a text file goes up as the smallest of itself and its
+    precompress.py variants in those encodings; the MD5 and the
+    Content-Encoding compared are then the compressed body's.
+
+    With `remote`, the remote state comes from its listing instead of a
+    HEAD, the local MD5 from its manifest when the file is untouched, and
+    the outcome is recorded in it.
+
+    `reuse_from` is another key (the page in the live release) that is
+    copied server-side instead of uploading when it already holds this
+    body and these headers; with src=None it is copied whatever it holds.
+    Returns (status_str, bytes_uploaded). status_str in {ok, copy, skip, fail}."""
+    if src is None:
+        return _copy_object(bucket, reuse_from, key, remote)
+    body, encoding, expected_cc = _upload_body(key, src, encodings)
+    headers = {"Content-Type": content_type, **_encoding_headers(encoding)}
     if expected_cc:
         headers["Cache-Control"] = expected_cc
-    local_md5 = _file_md5(src)
-    remote_md5, remote_cc = _oss_object_state(bucket, key)
+    if remote is None:
+        local_md5 = _file_md5(body)
+        remote_md5, remote_cc, remote_enc = _oss_object_state(bucket, key)
+    else:
+        local_md5 = remote.local_md5(body)
+        remote_md5, remote_cc, remote_enc = remote.state(key)
     body_match = local_md5 == remote_md5
-    header_match = (remote_cc or "").strip() == expected_cc.strip()
+    header_match = ((remote_cc or "").strip() == expected_cc.strip()
+                    and (remote_enc or None) == encoding)
     if body_match and header_match:
         return ("skip", 0)
-    bucket.put_object_from_file(key, str(src), headers=headers)
-    return ("ok", src.stat().st_size)
+    if reuse_from is not None and remote is not None and remote_md5 is None:
+        if remote.state(reuse_from) == (local_md5, expected_cc or None, encoding):
+            return _copy_object(bucket, reuse_from, key, remote)
+    result = bucket.put_object_from_file(key, str(body),
+                                         headers={**headers, **_meta_headers(local_md5, expected_cc)})
+    if remote is not None:
+        remote.record(key, getattr(result, "etag", None), local_md5, expected_cc or None, encoding)
+    return ("ok", body.stat().st_size)
+
+
+def reuses_live(remote: RemoteIndex, task: UploadTask) -> bool:
+    """Whether task.reuse_from already holds what `task` would put at its
+    key, i.e. the task would be a copy (from the manifest: no requests
+    while the file and the object are as last recorded)."""
+    if task.reuse_from is None:
+        return False
+    if task.src is None:
+        return True
+    body, encoding, expected_cc = _upload_body(task.key, task.src, task.encodings)
+    return remote.state(task.reuse_from) == (remote.local_md5(body), expected_cc or None, encoding)
+
+
+def _copy_object(bucket, source: str, key: str, remote: RemoteIndex | None) -> tuple[str, int]:
+    result = bucket.copy_object(bucket.bucket_name, source, key)
+    if remote is not None:
+        md5, cc, enc = remote.state(source)
+        if md5 is not None:
+            remote.record(key, getattr(result, "etag", None), md5, cc, enc)
+    return ("copy", 0)
+
+
+# ---------- Concurrent uploads ----------
+
+DEFAULT_JOBS = 8
+DEFAULT_RETRIES = 3
+BACKOFF_BASE = 0.5   # seconds; attempt n waits ~BACKOFF_BASE * 2**n, jittered
+
+
+class UploadTask(NamedTuple):
+    key: str
+    src: Path | None                # None: copy reuse_from as it is
+    content_type: str
+    encodings: tuple[str, ...] = ()
+    reuse_from: str | None = None   # see _smart_upload()
+
+
+class UploadReport(NamedTuple):
+    ok: list[str]                   # uploaded
+    skipped: list[str]              # already up to date
+    failed: list[tuple[str, str]]   # (key, last error), after the retries
+    copied: list[str]               # server-side copies (see UploadTask.reuse_from)
+
+
+def _retryable(exc: Exception) -> bool:
+    """Network errors, throttling and server errors; not 4xx like AccessDenied."""
+    if isinstance(exc, oss2.exceptions.RequestError):   # connection / timeout
+        return True
+    if isinstance(exc, oss2.exceptions.OssError):
+        return exc.status == 429 or exc.status >= 500
+    return isinstance(exc, (ConnectionError, TimeoutError))
+
+
+def with_retry(fn: Callable, what: str, retries: int = DEFAULT_RETRIES,
+               backoff: float = BACKOFF_BASE, sleep: Callable = time.sleep):
+    """fn(), retried up to `retries` times on a retryable error, with
+    exponential backoff and full jitter between attempts."""
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == retries or not _retryable(e):
+                raise
+            delay = random.uniform(0, backoff * 2 ** attempt)
+            print(f"  [retry {attempt + 1}/{retries}] {what}: {type(e).__name__} — "
+                  f"again in {delay:.1f}s", file=sys.stderr)
+            sleep(delay)
+
+
+def upload_all(bucket, tasks: Iterable[UploadTask], jobs: int = DEFAULT_JOBS,
+               retries: int = DEFAULT_RETRIES, backoff: float = BACKOFF_BASE,
+               quiet_skips: bool = True, remote: RemoteIndex | None = None) -> UploadReport:
+    """_smart_upload() every task from a pool of `jobs` threads.
+
+    Prints a progress line per finished key (skips only with
+    quiet_skips=False) and returns the tally. A task that still fails
+    after its retries is recorded in `failed`; the rest continue."""
+    tasks = list(tasks)
+    report = UploadReport([], [], [], [])
+    if not tasks:
+        return report
+
+    def run(task: UploadTask) -> tuple[str, int]:
+        return with_retry(lambda: _smart_upload(bucket, task.key, task.src, task.content_type,
+                                                task.encodings, remote, task.reuse_from),
+                          task.key, retries, backoff)
+
+    width = len(str(len(tasks)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(jobs, len(tasks)))) as pool:
+        futures = {pool.submit(run, task): task for task in tasks}
+        for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            key = futures[future].key
+            try:
+                status, _ = future.result()
+            except Exception as e:
+                status, error = "fail", f"{type(e).__name__}: {e}"
+                report.failed.append((key, error))
+            else:
+                {"ok": report.ok, "copy": report.copied, "skip": report.skipped}[status].append(key)
+            if status != "skip" or not quiet_skips:
+                line = f"  [{done:>{width}}/{len(tasks)}] [{status}] {key}"
+                print(line + (f"  ({error})" if status == "fail" else ""),
+                      file=sys.stderr if status == "fail" else sys.stdout)
+    return report
+
+
+# ---------- Versioned releases ----------
+
+RELEASES_PREFIX = "releases/"
+RELEASE_POINTER = "releases/current.json"
+DEFAULT_KEEP_RELEASES = 5
+# Root key prefixes the website serves from the live release.
+RELEASE_KEY_PREFIXES = ("Week_", "index.html", "pronunciations.json")
+
+
+def new_release_id() -> str:
+    return time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+
+
+def release_key(release_id: str, name: str) -> str:
+    return f"{RELEASES_PREFIX}{release_id}/{name}"
+
+
+def read_release_pointer(bucket, retries: int = DEFAULT_RETRIES) -> dict:
+    """{"current": id or None, "releases": [ids, newest first]}."""
+    try:
+        data = with_retry(lambda: bucket.get_object(RELEASE_POINTER).read(), RELEASE_POINTER, retries)
+    except oss2.exceptions.NoSuchKey:
+        return {"current": None, "releases": []}
+    return json.loads(data)
+
+
+def _is_release_rule(rule) -> bool:
+    return (rule.redirect is not None
+            and (rule.redirect.replace_key_prefix_with or "").startswith(RELEASES_PREFIX))
+
+
+def switch_release(bucket, release_id: str, pointer: dict,
+                   retries: int = DEFAULT_RETRIES) -> dict:
+    """Serves `release_id`: one PutBucketWebsite carrying its routing rules
+    (any other rules are kept, after them), then the pointer update."""
+    try:
+        website = with_retry(bucket.get_bucket_website, "website config", retries)
+        index_file, error_file, others = website.index_file, website.error_file, website.rules
+    except oss2.exceptions.NoSuchWebsite:
+        index_file, error_file, others = "index.html", "index.html", []
+    rules = [RoutingRule(rule_num=number, condition=Condition(key_prefix_equals=prefix),
+                         redirect=Redirect(redirect_type=REDIRECT_TYPE_INTERNAL,
+                                           replace_key_prefix_with=release_key(release_id, prefix)))
+             for number, prefix in enumerate(RELEASE_KEY_PREFIXES, 1)]
+    for rule in others:
+        if not _is_release_rule(rule):
+            rule.rule_num = len(rules) + 1
+            rules.append(rule)
+    with_retry(lambda: bucket.put_bucket_website(BucketWebsite(index_file, error_file or index_file, rules)),
+               "website config", retries)
+    releases = [release_id] + [r for r in pointer["releases"] if r != release_id]
+    pointer = {"current": release_id, "releases": sorted(releases, reverse=True)}
+    with_retry(lambda: bucket.put_object(RELEASE_POINTER, json.dumps(pointer, indent=1),
+                                         headers={"Content-Type": "application/json",
+                                                  "Cache-Control": _NO_CACHE}),
+               RELEASE_POINTER, retries)
+    return pointer
+
+
+def prune_releases(bucket, remote: RemoteIndex, pointer: dict, keep: int) -> list[str]:
+    """Deletes every releases/<id>/ but the newest `keep` and the live one
+    (which includes staged releases that never went live); returns the ids."""
+    kept = set(pointer["releases"][:keep]) | {pointer["current"]}
+    doomed = [key for key in remote.keys(RELEASES_PREFIX)
+              if key != RELEASE_POINTER and key[len(RELEASES_PREFIX):].split("/", 1)[0] not in kept]
+    for start in range(0, len(doomed), 1000):
+        chunk = doomed[start:start + 1000]
+        with_retry(lambda: bucket.batch_delete_objects(chunk), "delete old releases")
+    remote.forget(doomed)
+    return sorted({key[len(RELEASES_PREFIX):].split("/", 1)[0] for key in doomed})
 
 
 def _check_fc_url_drift(repo: Path) -> None:
@@ -112,7 +534,8 @@ def _check_fc_url_drift(repo: Path) -> None:
     if not sample:
         return
     content = sample.read_text(encoding="utf-8")
-    m = re.search(r'AI_ENDPOINT\s*=\s*["\']([^"\']+)["\']', content)
+    # `AI_ENDPOINT = "..."` inline, `AI_ENDPOINT: "..."` with --external-assets
+    m = re.search(r'AI_ENDPOINT\s*[=:]\s*["\']([^"\']+)["\']', content)
     if m and m.group(1) != deployed:
         print(f"WARN: FC URL drift detected!", file=sys.stderr)
         print(f"  DEPLOYED_URL.txt: {deployed}", file=sys.stderr)
@@ -125,15 +548,60 @@ def _check_fc_url_drift(repo: Path) -> None:
 
 
 def main() -> int:
-    ak = os.environ.get("ALIYUN_ACCESS_KEY_ID")
-    sk = os.environ.get("ALIYUN_ACCESS_KEY_SECRET")
-    if not ak or not sk:
-        print("error: ALIYUN_ACCESS_KEY_ID and ALIYUN_ACCESS_KEY_SECRET env vars required",
-              file=sys.stderr)
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--encodings", default=",".join(DEFAULT_ENCODINGS), metavar="LIST",
+                    help="Content-Encodings text files may be uploaded in, smallest wins; every "
+                         "client gets that body (default: %(default)s; 'br,gzip' opts in to "
+                         "Brotli; 'identity' = uncompressed)")
+    ap.add_argument("--prune-images", action="store_true",
+                    help="Delete bucket images/ objects that no Interactive page references "
+                         "(they are always listed)")
+    ap.add_argument("--jobs", "-j", type=int, default=DEFAULT_JOBS,
+                    help="Concurrent uploads (default: %(default)s)")
+    ap.add_argument("--verify", action="store_true",
+                    help="Ignore the upload manifest: hash every file, HEAD every object, "
+                         "and rebuild the manifest")
+    ap.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                    help="Retries per object on network/5xx/429 errors (default: %(default)s)")
+    ap.add_argument("--local", type=Path, metavar="DIR",
+                    help="Upload to a file-backed stand-in bucket in DIR (local_oss.py) "
+                         "instead of OSS; no credentials needed")
+    ap.add_argument("--local-latency", type=float, default=0.0, metavar="SECONDS",
+                    help="With --local: delay added to every request (default: %(default)s)")
+    ap.add_argument("--local-failure-rate", type=float, default=0.0, metavar="P",
+                    help="With --local: probability a request fails transiently (default: %(default)s)")
+    ap.add_argument("--keep-releases", type=int, default=DEFAULT_KEEP_RELEASES, metavar="N",
+                    help="Releases kept in the bucket; older ones are deleted (default: %(default)s)")
+    ap.add_argument("--rollback", nargs="?", const="previous", metavar="RELEASE",
+                    help="Switch the site back to the previous release (or RELEASE) and exit")
+    ap.add_argument("--releases", action="store_true",
+                    help="Stage the pages as a new release and switch the site to it "
+                         "(needs the CDN on the website endpoint; see Releases above)")
+    week_selection.add_argument(ap)
+    pipeline_trace.add_argument(ap)
+    args = ap.parse_args()
+    pipeline_trace.start_from_args(args.trace)
+    encodings = tuple(e for e in args.encodings.split(",") if e.strip() and e != "identity")
+    unknown = [e for e in encodings if e not in precompress.encodings()]
+    if unknown:
+        print(f"error: --encodings: can't produce {', '.join(unknown)} "
+              f"(available: {', '.join(precompress.encodings())})", file=sys.stderr)
+        return 2
+    if (args.releases or args.rollback) and args.local is None and CDN_ORIGIN != "website":
+        print(f"error: --releases/--rollback switch website routing rules, but the CDN pulls from "
+              f"the {CDN_ORIGIN} endpoint, which ignores them. Move the CDN origin to the "
+              f"bucket's website endpoint first and record it (pipeline.yaml cdn.origin, "
+              f"CDN_ORIGIN in this script).", file=sys.stderr)
         return 2
 
-    auth = oss2.Auth(ak, sk)
-    service = oss2.Service(auth, ENDPOINT)
+    if args.local is None:
+        ak = os.environ.get("ALIYUN_ACCESS_KEY_ID")
+        sk = os.environ.get("ALIYUN_ACCESS_KEY_SECRET")
+        if not ak or not sk:
+            print("error: ALIYUN_ACCESS_KEY_ID and ALIYUN_ACCESS_KEY_SECRET env vars required",
+                  file=sys.stderr)
+            return 2
 
     # 0. Sanity check: warn if the FC URL drifted between DEPLOYED_URL.txt
     # and what's baked into Interactive HTMLs. This catches the failure
@@ -141,9 +609,22 @@ def main() -> int:
     _check_fc_url_drift(REPO)
 
     # 1. Check if bucket exists; create if absent with public-read ACL.
-    existing = [b.name for b in oss2.BucketIterator(service)]
-    bucket = oss2.Bucket(auth, ENDPOINT, BUCKET_NAME)
-    if BUCKET_NAME in existing:
+    if args.local is not None:
+        bucket = local_oss.LocalBucket(args.local, latency=args.local_latency,
+                                       failure_rate=args.local_failure_rate)
+        bucket_exists = bucket.exists()
+        # Its own manifest: a local run must not vouch for the real bucket.
+        manifest_name = "local-" + hashlib.sha256(str(args.local.resolve()).encode("utf-8")).hexdigest()[:12]
+        print(f"Using the local stand-in bucket in {args.local}.")
+    else:
+        # One pooled HTTP connection per upload thread (oss2's default is 10).
+        oss2.defaults.connection_pool_size = max(oss2.defaults.connection_pool_size, args.jobs)
+        auth = oss2.Auth(ak, sk)
+        service = oss2.Service(auth, ENDPOINT)
+        bucket_exists = BUCKET_NAME in [b.name for b in oss2.BucketIterator(service)]
+        bucket = oss2.Bucket(auth, ENDPOINT, BUCKET_NAME)
+        manifest_name = BUCKET_NAME
+    if bucket_exists:
         print(f"Bucket '{BUCKET_NAME}' already exists.")
         # Ensure public-read ACL.
         try:
@@ -155,27 +636,76 @@ def main() -> int:
         bucket.create_bucket(oss2.BUCKET_ACL_PUBLIC_READ)
         print(f"Created bucket '{BUCKET_NAME}' with public-read ACL in cn-beijing.")
 
-    ok = skip = 0
+    # 1b. Remote state of every object: one listing (1000 keys a page).
+    remote = RemoteIndex(bucket, manifest_name, verify=args.verify)
+    print(f"Listed {len(remote.etags)} objects in the bucket.")
+    batch = lambda tasks: upload_all(bucket, tasks, args.jobs, args.retries, remote=remote)
+    reports = []
+    pointer = (read_release_pointer(bucket, args.retries) if RELEASE_POINTER in remote.etags
+               else {"current": None, "releases": []})
+
+    if args.rollback:
+        releases = pointer["releases"]
+        older = releases[releases.index(pointer["current"]) + 1:] if pointer["current"] in releases else []
+        target = (older[0] if older else None) if args.rollback == "previous" else args.rollback
+        if target is None or target not in releases or not remote.keys(release_key(target, "")):
+            wanted = (target if args.rollback != "previous"
+                      else f"older than {pointer['current']}" if pointer["current"] else "to go back to")
+            print(f"error: --rollback: no release {wanted} in the bucket "
+                  f"(kept: {', '.join(releases) or 'none'})", file=sys.stderr)
+            return 2
+        switch_release(bucket, target, pointer, args.retries)
+        print(f"Switched the site: {pointer['current']} -> {target} (live now)")
+        return 0
 
-    # 2. Upload 40 interactive HTMLs with Text/HTML mime + cache headers.
+    # 2. Upload the shared assets/ first (--external-assets bakes), so no
+    #    uploaded page links a file that isn't there yet.
     interactive = REPO / "Interactive"
-    htmls = sorted(interactive.glob("Week_*.html"))
-    print(f"\nUploading {len(htmls)} HTML files (skip-unchanged enabled)...")
-    for f in htmls:
-        status, _ = _smart_upload(bucket, f.name, f, "Text/HTML; charset=utf-8")
-        if status == "ok":   ok += 1
-        elif status == "skip": skip += 1
-        # Less verbose: only print uploaded ones; skipped ones suppressed
-        if status == "ok":
-            print(f"  [ok] {f.name}")
-
-    # 3. Upload pronunciations.json.
+    assets = interactive / "assets"
+    if assets.is_dir():
+        asset_files = sorted(f for f in assets.iterdir()
+                             if f.is_file() and f.suffix.lower() in ASSET_MIME)
+        print(f"\nUploading {len(asset_files)} shared assets (immutable)...")
+        reports.append(batch(UploadTask(f"assets/{f.name}", f, ASSET_MIME[f.suffix.lower()], encodings)
+                             for f in asset_files))
+        if reports[-1].failed:
+            print(f"error: {len(reports[-1].failed)} shared asset(s) failed to upload; "
+                  "not uploading the pages that link them", file=sys.stderr)
+            remote.save()
+            return 1
+
+    # 2b. The 40 interactive HTMLs with Text/HTML mime + cache headers,
+    #     pronunciations.json, index.html and the referenced images, as one
+    #     batch. Skipped (unchanged) objects aren't printed. With
+    #     --releases the pages are staged as a new release: unchanged ones
+    #     (and those --weeks leaves out) are copied from the live release,
+    #     or from the root keys the first time.
+    release_id = new_release_id() if args.releases else None
+    if not args.releases and pointer["current"]:
+        print(f"  WARN: release {pointer['current']} is live; the site keeps serving it, "
+              f"not the pages uploaded in place", file=sys.stderr)
+    live = lambda name: release_key(pointer["current"], name) if pointer["current"] else name
+
+    def page_task(name: str, src: Path | None, content_type: str) -> UploadTask | None:
+        if release_id is None:
+            return UploadTask(name, src, content_type, encodings)
+        reuse = live(name) if live(name) in remote.etags else None
+        if src is None and reuse is None:
+            print(f"  WARN: {name} is not in the live release; left out of {release_id}",
+                  file=sys.stderr)
+            return None
+        return UploadTask(release_key(release_id, name), src, content_type, encodings, reuse)
+
+    all_htmls = sorted(interactive.glob("Week_*.html"))
+    htmls = week_selection.filter_paths(all_htmls, args.weeks)
+    carried = [] if release_id is None else [f for f in all_htmls if f not in htmls]
+    page_tasks = [page_task(f.name, f, "Text/HTML; charset=utf-8") for f in htmls]
+    page_tasks += [page_task(f.name, None, "Text/HTML; charset=utf-8") for f in carried]
+
+    # 3. pronunciations.json.
     pron = REPO / "pronunciations.json"
     if pron.exists():
-        status, _ = _smart_upload(bucket, "pronunciations.json", pron, "application/json; charset=utf-8")
-        if status == "ok":   ok += 1
-        elif status == "skip": skip += 1
-        print(f"  [{status}] pronunciations.json")
+        page_tasks.append(page_task("pronunciations.json", pron, "application/json; charset=utf-8"))
     else:
         print("  WARN: pronunciations.json not found at repo root", file=sys.stderr)
 
@@ -194,32 +724,72 @@ def main() -> int:
         subprocess.run([sys.executable, str(REPO / "scripts" / "build_landing_page.py")],
                        check=True, cwd=str(REPO))
     if index_path.exists():
-        status, _ = _smart_upload(bucket, "index.html", index_path, "text/html; charset=utf-8")
-        if status == "ok":   ok += 1
-        elif status == "skip": skip += 1
-        print(f"  [{status}] index.html")
+        page_tasks.append(page_task("index.html", index_path, "text/html; charset=utf-8"))
     else:
         print("  WARN: index.html not found and build_landing_page.py failed", file=sys.stderr)
 
-    # 4. Upload images/*.png with long cache TTL.
+    # 4. The images the pages reference (image_sync.py), with long cache
+    #    TTL. Bucket images/ objects no page references are listed, and
+    #    deleted with --prune-images. The reference set always comes from
+    #    every Interactive page (and index.html), whatever --weeks selects.
     candidates = [REPO / "Interactive" / "images", REPO / "images"]
     src_images = next((p for p in candidates if p.is_dir()), None)
+    mime_by_ext = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg",
+                   ".webp": "image/webp", ".avif": "image/avif", ".svg": "image/svg+xml", ".gif": "image/gif"}
+    referenced = set()
+    tasks = []
     if src_images is None:
         print("  WARN: no images/ folder found", file=sys.stderr)
     else:
-        mime_by_ext = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg",
-                       ".webp": "image/webp", ".svg": "image/svg+xml", ".gif": "image/gif"}
-        img_count = 0
-        for img in sorted(src_images.iterdir()):
-            if img.is_file() and img.suffix.lower() in mime_by_ext:
-                status, _ = _smart_upload(bucket, f"images/{img.name}", img,
-                                          mime_by_ext[img.suffix.lower()])
-                if status == "ok":   ok += 1
-                elif status == "skip": skip += 1
-                print(f"  [{status}] images/{img.name}")
-                img_count += 1
-        if img_count:
-            print(f"Processed {img_count} image(s) from {src_images}")
+        pages = sorted(interactive.glob("Week_*.html")) + [p for p in [REPO / "index.html"] if p.exists()]
+        referenced = image_sync.referenced_images(pages)
+        for name in sorted(referenced):
+            img = src_images / name
+            if not img.is_file() or img.suffix.lower() not in mime_by_ext:
+                print(f"  WARN: images/{name} is referenced but not in {src_images}", file=sys.stderr)
+                continue
+            tasks.append(UploadTask(f"images/{img.name}", img, mime_by_ext[img.suffix.lower()]))
+
+    page_tasks = [task for task in page_tasks if task is not None]
+    if release_id is not None and all(reuses_live(remote, task) for task in page_tasks):
+        # Nothing to switch to: a copy of the live pages would only cost
+        # the copies and take a --keep-releases slot from a real change.
+        live_now = f"release {pointer['current']}" if pointer["current"] else "the root pages"
+        print(f"  [release] no page changes; {live_now} stays live")
+        page_tasks, release_id = [], None
+    tasks = page_tasks + tasks
+    print(f"\nUploading {len(tasks)} files: {len(htmls) if page_tasks else 0} HTML pages"
+          + (f" (weeks {week_selection.to_spec(args.weeks)})" if args.weeks else "")
+          + (f" into release {release_id}" if release_id else "")
+          + f", data, images (skip-unchanged enabled, {args.jobs} at a time)...")
+    reports.append(batch(tasks))
+
+    # 4b. Switch the site to the new release only once all of it is there.
+    if release_id is not None:
+        if reports[-1].failed:
+            print(f"error: release {release_id} is incomplete; the site stays on "
+                  f"{pointer['current'] or 'the root keys'}", file=sys.stderr)
+        else:
+            previous = pointer["current"]
+            pointer = switch_release(bucket, release_id, pointer, args.retries)
+            print(f"  [live] release {release_id}"
+                  + (f" (was {previous}; --rollback returns to it)" if previous else ""))
+            for old in prune_releases(bucket, remote, pointer, args.keep_releases):
+                print(f"  [pruned] release {old}")
+
+    if src_images is not None:
+        local_extra = sorted(p.name for p in src_images.iterdir()
+                             if p.is_file() and p.suffix.lower() in mime_by_ext and p.name not in referenced)
+        if local_extra:
+            print(f"  [info] not uploaded (no page references them): {', '.join(local_extra)}")
+        remote_extra = [key for key in remote.keys("images/")
+                        if key[len("images/"):] not in referenced]
+        for key in remote_extra:
+            if args.prune_images:
+                bucket.delete_object(key)
+                print(f"  [pruned] {key}")
+            else:
+                print(f"  [unreferenced] {key}  (--prune-images deletes it)")
 
     # 5. Upload the admin console (Round 29). Reads scripts/admin/index.html,
     #    substitutes __FC_ENDPOINT__ at upload time, and pushes to OSS at
@@ -234,31 +804,51 @@ def main() -> int:
         admin_html = admin_src.read_text(encoding="utf-8").replace(
             "__FC_ENDPOINT__", fc_endpoint.rstrip("/")
         )
-        # Skip-unchanged: hash the SUBSTITUTED body, not the source file.
-        admin_md5 = hashlib.md5(admin_html.encode("utf-8")).hexdigest()
-        existing_md5, existing_cc = _oss_object_state(bucket, ADMIN_KEY)
-        if existing_md5 == admin_md5 and (existing_cc or "").strip() == _NO_CACHE:
+        # Skip-unchanged: hash the SUBSTITUTED (and compressed) body, not
+        # the source file.
+        admin_body, admin_enc = precompress.best_bytes(admin_html.encode("utf-8"), encodings)
+        admin_md5 = hashlib.md5(admin_body).hexdigest()
+        existing_md5, existing_cc, existing_enc = remote.state(ADMIN_KEY)
+        admin = UploadReport([], [], [], [])
+        if (existing_md5 == admin_md5 and (existing_cc or "").strip() == _NO_CACHE
+                and (existing_enc or None) == admin_enc):
             print(f"  [skip] {ADMIN_KEY}")
-            skip += 1
+            admin.skipped.append(ADMIN_KEY)
         else:
-            bucket.put_object(
-                ADMIN_KEY,
-                admin_html.encode("utf-8"),
-                headers={
-                    "Content-Type": "text/html; charset=utf-8",
-                    "Cache-Control": _NO_CACHE,
-                },
-            )
-            print(f"  [ok] {ADMIN_KEY}  (FC endpoint: {fc_endpoint})")
-            ok += 1
+            try:
+                result = with_retry(lambda: bucket.put_object(
+                    ADMIN_KEY,
+                    admin_body,
+                    headers={
+                        "Content-Type": "text/html; charset=utf-8",
+                        "Cache-Control": _NO_CACHE,
+                        **_encoding_headers(admin_enc),
+                        **_meta_headers(admin_md5, _NO_CACHE),
+                    },
+                ), ADMIN_KEY, args.retries)
+            except Exception as e:
+                print(f"  [fail] {ADMIN_KEY}  ({type(e).__name__}: {e})", file=sys.stderr)
+                admin.failed.append((ADMIN_KEY, f"{type(e).__name__}: {e}"))
+            else:
+                remote.record(ADMIN_KEY, result.etag, admin_md5, _NO_CACHE, admin_enc)
+                print(f"  [ok] {ADMIN_KEY}  (FC endpoint: {fc_endpoint})")
+                admin.ok.append(ADMIN_KEY)
+        reports.append(admin)
     else:
         print(f"  WARN: scripts/admin/index.html not found — admin console not uploaded",
               file=sys.stderr)
 
-    print(f"\nResult: {ok} uploaded, {skip} skipped (already up-to-date)")
+    remote.save()
+    failed = [f for r in reports for f in r.failed]
+    print(f"\nResult: {sum(len(r.ok) for r in reports)} uploaded, "
+          f"{sum(len(r.copied) for r in reports)} copied from the live release, "
+          f"{sum(len(r.skipped) for r in reports)} skipped (already up-to-date), {len(failed)} failed"
+          + f"; {remote.hashed} file(s) hashed, {remote.heads} HEAD request(s)")
+    for key, error in failed:
+        print(f"  FAILED {key}: {error}", file=sys.stderr)
     print(f"Public landing page: https://ielts.aischool.studio/")
     print(f"Admin console:       https://ielts.aischool.studio/admin/")
-    return 0
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
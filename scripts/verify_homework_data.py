@@ -23,7 +23,6 @@ Exit codes:
   2 — homework_plan.json missing or unparseable (fatal)
 """
 from __future__ import annotations
-import json
 import re
 import sys
 from pathlib import Path
@@ -37,6 +36,9 @@ if hasattr(sys.stdout, "reconfigure"):
 REPO = Path(__file__).resolve().parent.parent
 HOMEWORK_PATH = REPO / "homework_plan.json"
 
+sys.path.insert(0, str(REPO))
+import json_loader  # noqa: E402
+
 EXPECTED_VOCAB_COUNT = 5      # the homework page has exactly 5 vocab-table rows
 EXPECTED_GRAMMAR_COUNT = 5    # the grammar-clinic box fits 5 sentences
 MAX_WRITING_TASK_CHARS = 100  # h3 wraps to 2 lines beyond this — pushes layout
@@ -122,10 +124,15 @@ def main() -> int:
     if not HOMEWORK_PATH.exists():
         print(f"FATAL: {HOMEWORK_PATH} not found")
         return 2
+    raw = HOMEWORK_PATH.read_bytes()
     try:
-        data = json.loads(HOMEWORK_PATH.read_text(encoding="utf-8"))
-    except json.JSONDecodeError as e:
+        data = json_loader.loads(raw)
+    except (ValueError, UnicodeDecodeError) as e:
         print(f"FATAL: {HOMEWORK_PATH.name} is not valid JSON: {e}")
+        # Point at every damaged region, not just the first error.
+        _, skipped = json_loader.scan_records(raw.decode("utf-8", errors="replace"))
+        for region in skipped:
+            print(f"  {region.describe()}")
         return 2
 
     if not isinstance(data, list):
@@ -0,0 +1,487 @@
+"""Compiled-template renderer for the parse_data.py week fan-out.
+
+The legacy path parses the 212 KB canonical template into a soup for every
+week, then clears and refills the nodes the process_* functions locate with
+find/find_all. This module does the locating once: CompiledTemplate parses
+the template a single time, turns every region those functions rewrite into
+a named slot, and keeps everything else as precompiled text. Rendering a
+week is then filling the slots and joining strings — no full parse, no tree
+walk, no serialize.
+
+Slot fillers reuse parse_data's content builders (_vocab_table_rows,
+_band5_box, ...): node trees are serialized with fragment_builder.render,
+and the remaining HTML strings go through the same parse_fragment round
+trip the legacy path does, so both paths emit the same bytes.
+`parse_data.py --check-renderer` diffs them across all 40 weeks.
+
+Slots are located on the *unmodified* template, while the legacy path runs
+its find() calls on a soup the earlier passes have already edited. The two
+only diverge if week data injects markup that a later locator would match
+(e.g. a model answer containing a `border-top:1px dotted` div), which is
+exactly what the checker is for.
+
+Usage:
+  compiled = CompiledTemplate(template_html)
+  html = compiled.render(week_number, week)   # week = WeekStore.week_inputs(n)
+"""
+from __future__ import annotations
+
+import re
+from functools import cached_property
+
+from bs4 import NavigableString
+from bs4.formatter import HTMLFormatter
+
+import fragment_builder as fb
+import parse_data as pd
+from html_backend import parse_document, parse_fragment
+
+# Placeholders stitched into the compile-time soup. Private-use code points:
+# never in the template, and passed through unescaped by the serializer.
+_OPEN, _CLOSE = "", ""
+_PLACEHOLDER_RE = re.compile(f'"{_OPEN}(@[^{_CLOSE}]+){_CLOSE}"|{_OPEN}([^{_CLOSE}]+){_CLOSE}')
+
+_FORMATTER = HTMLFormatter.REGISTRY["minimal"]  # what str(soup) uses
+
+
+class TemplateCompileError(RuntimeError):
+    """The template is missing (or nests) a region a process_* pass rewrites."""
+
+
+def _fragment(markup: str) -> str:
+    """Serialize `markup` exactly as `tag.append(parse_fragment(markup))` would."""
+    return parse_fragment(markup).decode_contents()
+
+
+def _text(value: str) -> str:
+    """Serialize `value` exactly as `tag.string = value` would."""
+    return _FORMATTER.substitute(value)
+
+
+def _attr(value: str) -> str:
+    """Serialize an attribute value, quotes included."""
+    return _FORMATTER.quoted_attribute_value(_FORMATTER.attribute_value(value))
+
+
+class _Slot:
+    __slots__ = ("kind", "default", "fill")
+
+    def __init__(self, kind, default, fill):
+        self.kind = kind          # 'html' | 'text' | 'attr'
+        self.default = default    # serialized template content, used when fill() returns None
+        self.fill = fill          # fill(ctx) -> raw value or None
+
+
+class _Week:
+    """Per-week values shared by several slots, computed on first use."""
+
+    def __init__(self, week_number, week):
+        self.n = week_number
+        self.data = week["curriculum"]
+        self.vocab = week["vocab"]
+        self.homework = week["homework"]
+        self.teacher = week["teacher"]
+        self.peer = week["peer"]
+        self.phrase = week["phrase"]
+
+    @cached_property
+    def topic(self):
+        return self.data.get("topic", "")
+
+    @cached_property
+    def target_phrase(self):
+        return pd._target_phrase(self.topic, self.phrase)
+
+    @cached_property
+    def l1t(self):
+        return self.teacher.get("lesson_1", {})
+
+    @cached_property
+    def l2t(self):
+        return self.teacher.get("lesson_2", {})
+
+    def part2(self, q_key):
+        return self.data.get("lesson_1_part_2", {}).get(q_key, {})
+
+    @cached_property
+    def q_soups(self):
+        return {k: parse_fragment(self.part2(k).get("html", ""))
+                for k in ("q1", "q2", "q3")}
+
+    @cached_property
+    def cue_words(self):
+        return {k: pd.extract_cue_words(self.part2(k).get("html", ""))
+                for k in ("q1", "q2", "q3")}
+
+    @cached_property
+    def cue_card(self):
+        prompt_p = self.q_soups["q1"].find("p")
+        return pd._cue_card_parts(prompt_p) if prompt_p else None
+
+    def part3(self, q_key):
+        return self.data.get("lesson_2_part_3", {}).get(q_key, {})
+
+    @cached_property
+    def part3_parts(self):
+        return {k: pd._part3_parts(self.part3(k)) for k in ("q1", "q2", "q3", "q4", "q5", "q6")}
+
+
+class CompiledTemplate:
+    """The canonical template, pre-split into static text and named slots."""
+
+    def __init__(self, template_html: str):
+        soup = parse_document(template_html)
+        self._slots: dict[str, _Slot] = {}
+        self._claimed: list = []
+        # Same order as the legacy passes in parse_data.render_week().
+        self._compile_cover(soup)
+        self._compile_teacher_plan(soup)
+        self._compile_vocabulary(soup)
+        self._compile_student_l1(soup)
+        self._compile_mind_maps(soup)
+        self._compile_student_l2(soup)
+        self._compile_homework(soup)
+        self._compile_page_numbers(soup)
+
+        parts = _PLACEHOLDER_RE.split(str(soup))
+        # split() with two groups yields [text, attr_name, inner_name, text, ...]
+        self._chunks = parts[0::3]
+        self._order = [a or b for a, b in zip(parts[1::3], parts[2::3])]
+        missing = set(self._slots) - set(self._order)
+        if missing:
+            raise TemplateCompileError(f"slots lost during serialization: {sorted(missing)}")
+
+    # ---------- slot registration ----------
+
+    def _claim(self, node, name):
+        for other in self._claimed:
+            if node is other or other in node.parents or node.find(string=lambda s: _OPEN in s):
+                raise TemplateCompileError(f"slot {name!r} overlaps another slot")
+        self._claimed.append(node)
+        if name in self._slots:
+            raise TemplateCompileError(f"duplicate slot {name!r}")
+
+    def _inner(self, name, node, kind, fill):
+        """Slot covering a node's children ('html' or 'text')."""
+        if node is None:
+            return
+        self._claim(node, name)
+        self._slots[name] = _Slot(kind, node.decode_contents(), fill)
+        node.clear()
+        node.append(NavigableString(f"{_OPEN}{name}{_CLOSE}"))
+
+    def _attribute(self, name, node, attr, fill):
+        name = "@" + name
+        self._claim(node, name)
+        self._slots[name] = _Slot("attr", _attr(node[attr]), fill)
+        node[attr] = f"{_OPEN}{name}{_CLOSE}"
+
+    # ---------- compile: one method per legacy pass ----------
+
+    def _compile_cover(self, soup):
+        if soup.title:
+            self._inner("title", soup.title, "text",
+                        lambda w: f"Week {w.n} Master Lesson Pack")
+        self._inner("cover", soup.find("div", class_="cover-page"), "html", _fill_cover)
+
+    def _compile_teacher_plan(self, soup):
+        for i, header in enumerate(soup.find_all("span", class_="week-tag")):
+            current = header.string
+            if pd._week_tag_text(current, 0, "") is not None:
+                self._inner(f"week_tag_{i}", header, "text",
+                            lambda w, cur=current: pd._week_tag_text(cur, w.n, w.topic))
+
+        l1_page = soup.find("div", class_="l1")
+        if l1_page:
+            self._compile_plan_cards(l1_page, "l1", _fill_l1_objectives, _fill_l1_band5,
+                                     _fill_l1_band6, lambda w: w.l1t)
+            table = l1_page.find("table", class_="lp-table")
+            for r, row in enumerate(table.find_all("tr") if table else []):
+                cells = row.find_all("td")
+                if len(cells) <= 1:
+                    continue
+                cell_text = cells[1].get_text()
+                if "Lead-in" in cell_text:
+                    self._inner(f"l1_lead_in_{r}", cells[1], "html",
+                                lambda w: _fragment(pd._l1_lead_in_html(w.l1t, w.target_phrase)))
+                elif "Input" in cell_text:
+                    content = cells[1].decode_contents()
+                    self._inner(f"l1_input_{r}", cells[1], "html",
+                                lambda w, content=content: _fragment(re.sub(
+                                    r'Highlight "(.*?)"',
+                                    f'Highlight "{pd._l1_input_target_word(w.l1t)}"', content)))
+                elif "Vocab Drill" in cell_text:
+                    # Data-independent: apply once here, it becomes static text.
+                    content = cells[1].decode_contents()
+                    if '"Thick and thin"' in content:
+                        cells[1].clear()
+                        cells[1].append(parse_fragment(content.replace('"Thick and thin"', '"idioms"')))
+
+        l2_pages = soup.find_all("div", class_="l2")
+        if l2_pages:
+            l2_teacher_page = l2_pages[0]
+            self._compile_plan_cards(l2_teacher_page, "l2", _fill_l2_objectives, _fill_l2_band5,
+                                     _fill_l2_band6, lambda w: w.l2t)
+            table = l2_teacher_page.find("table", class_="lp-table")
+            for r, row in enumerate(table.find_all("tr") if table else []):
+                cells = row.find_all("td")
+                if len(cells) <= 1:
+                    continue
+                cell_text = cells[1].get_text()
+                if "Intro:" in cell_text or "intro" in cell_text.lower():
+                    self._inner(f"l2_intro_{r}", cells[1], "html",
+                                lambda w: _fragment(pd._l2_intro_html(w.target_phrase)))
+
+        for i, btn in enumerate(soup.find_all("a", class_="bili-btn")):
+            self._attribute(f"bili_href_{i}", btn, "href", lambda w: pd._bilibili_url(w.l1t))
+
+    def _compile_plan_cards(self, page, prefix, fill_objectives, fill_band5, fill_band6, lesson):
+        lo_h4 = page.find("h4", string=re.compile(r"Learning Objectives"))
+        diff_h4 = page.find("h4", string=re.compile(r"Differentiation"))
+        if lo_h4 is None or diff_h4 is None:
+            raise TemplateCompileError(f"{prefix} teacher page lost its Learning Objectives / Differentiation card")
+        self._inner(f"{prefix}_objectives", lo_h4.parent.find("ul"), "html", fill_objectives)
+
+        criteria_h4 = page.find("h4", string=re.compile(r"Criteria"))
+        if criteria_h4:
+            self._inner(f"{prefix}_criteria", criteria_h4.find_next_sibling("div"), "html",
+                        lambda w: _fragment(lesson(w).get("success_criteria", "")))
+
+        diff_card = diff_h4.parent
+        self._inner(f"{prefix}_band5", diff_card.find("div", style=lambda x: x and "background:#e8f8f5" in x),
+                    "html", fill_band5)
+        self._inner(f"{prefix}_band6", diff_card.find("div", style=lambda x: x and "background:#fef9e7" in x),
+                    "html", fill_band6)
+
+    def _compile_vocabulary(self, soup):
+        for lesson, table in zip((1, 2), soup.find_all("table", class_="vocab-table")):
+            self._inner(f"vocab_l{lesson}", table.find("tbody"), "html",
+                        lambda w, lesson=lesson: _rows(pd._vocab_table_rows(w.vocab, w.n, lesson)))
+
+    def _compile_student_l1(self, soup):
+        self._inner("part2_banner", soup.find("span", class_="header-title", string=re.compile(r"Part 2:")),
+                    "text", lambda w: f"Part 2: {w.data.get('theme', 'General')}")
+
+        cue_card_div = soup.find("div", style=lambda x: x and "border-left:5px solid #fbc02d" in x)
+        if cue_card_div:
+            self._inner("cue_card_question", cue_card_div.find("h3"), "text",
+                        lambda w: f"📌 CUE CARD: {w.cue_card[0]}" if w.cue_card else None)
+            self._inner("cue_card_bullets", cue_card_div.find("div", style=lambda x: x and "color:#444" in x),
+                        "html", lambda w: _fragment(w.cue_card[1]) if w.cue_card else None)
+
+        self._inner("model_answer", soup.find("div", class_="model-box"), "html", _fill_model_answer)
+
+    def _compile_mind_maps(self, soup):
+        spider_centers = soup.find_all("div", class_="spider-center")
+        if spider_centers:
+            self._inner("map_q1_center", spider_centers[0], "html",
+                        lambda w: _fragment(pd.extract_keyword(w.q_soups["q1"].get_text())))
+
+        l1_pages = soup.find_all("div", class_="l1")
+        if len(l1_pages) < 3:
+            raise TemplateCompileError("template has fewer than 3 Lesson 1 pages")
+        brainstorm_card = l1_pages[2].find("div", class_="card")
+        if brainstorm_card:
+            self._inner("map_q1_prompt", brainstorm_card.find("div", style=lambda x: x and "color:#444" in x),
+                        "html", lambda w: _fill_map_prompt(w, "q1"))
+
+        spider_legs = soup.find_all("div", class_="spider-legs")
+        if spider_legs:
+            self._compile_legs("q1", spider_legs[0].find_all("div", class_="spider-leg"), ["", "", "", ""])
+
+        for q_key, heading in (("q2", r"Part 2: Q2"), ("q3", r"Part 2: Q3")):
+            card_h3 = soup.find("h3", string=re.compile(heading))
+            if not card_h3:
+                continue
+            self._inner(f"map_{q_key}_prompt", card_h3.find_next_sibling("div"), "html",
+                        lambda w, q_key=q_key: _fill_map_prompt(w, q_key))
+            container = card_h3.find_next_sibling("div", class_="spider-container")
+            if container:
+                self._inner(f"map_{q_key}_center", container.find("div", class_="spider-center"), "html",
+                            lambda w, q_key=q_key: _fragment(pd.extract_keyword(w.q_soups[q_key].get_text())))
+                self._compile_legs(q_key, container.find_all("div", class_="spider-leg"), [])
+
+    def _compile_legs(self, q_key, legs, default_hints):
+        # Mirrors parse_data._apply_cue_labels_and_hints.
+        for i, leg in enumerate(legs):
+            span = leg.find("span")
+            if span is None:
+                raise TemplateCompileError(f"{q_key} spider-leg {i + 1} has no <span>; "
+                                           f"pre-span legs need the soup renderer")
+
+            def label(w, i=i):
+                cues = w.cue_words[q_key]
+                return f"{i + 1}. {cues[i]}:" if cues and i < len(cues) else None
+
+            def hint(w, i=i):
+                hints = w.part2(q_key).get("spider_diagram_hints", default_hints)
+                return hints[i] if hints and i < len(hints) else None
+
+            self._inner(f"map_{q_key}_leg{i}_label", leg.find("strong"), "text", label)
+            self._inner(f"map_{q_key}_leg{i}_hint", span, "text", hint)
+
+    def _compile_student_l2(self, soup):
+        cards = [("q1", soup.find("div", id="p5-q1"), True),
+                 ("q2", soup.find("div", id="p6-q2"), True),
+                 ("q3", soup.find("div", id="p6-q3"), True)]
+        l2_pages = soup.find_all("div", class_="l2")
+        if len(l2_pages) >= 4:
+            compact_cards = l2_pages[3].find_all("div", class_="card compact")
+            if len(compact_cards) >= 3:
+                cards += [("q4", compact_cards[0], False), ("q5", compact_cards[1], False),
+                          ("q6", compact_cards[2], False)]
+
+        for q_key, card, by_id in cards:
+            if not card:
+                continue
+            self._inner(f"part3_{q_key}_question", card.find("h3"), "text",
+                        lambda w, q_key=q_key: w.part3_parts[q_key][0])
+            self._inner(f"part3_{q_key}_answer", card.find("div", class_="model-box"), "html",
+                        lambda w, q_key=q_key: _fragment(w.part3_parts[q_key][1]) if w.part3_parts[q_key][1] else "")
+            self._inner(f"part3_{q_key}_hints", card.find("ul", class_="scaffold-text"), "html",
+                        lambda w, q_key=q_key: "".join(f"<li>{_text(h)}</li>"
+                                                       for h in w.part3(q_key).get("ore_hints", [])))
+
+            if by_id:
+                writing_box = card.find("div", style=lambda x: x and "border:1px solid #ddd" in x)
+                if not writing_box:
+                    writing_box = card.find("div", style=lambda x: x and "border-top:1px dashed" in x)
+            else:
+                writing_box = card.find("div", style=lambda x: x and "border-top:1px dashed" in x)
+            if writing_box:
+                self._inner(f"part3_{q_key}_peer", writing_box.find("div", style=lambda x: x and "border-top:1px dotted" in x),
+                            "html", lambda w, q_key=q_key: _fill_peer_check(w, q_key))
+
+    def _compile_homework(self, soup):
+        hw_page = soup.find("div", class_="page hw")
+        if hw_page is None:
+            raise TemplateCompileError("template has no homework page")
+        vocab_table = hw_page.find("table", class_="vocab-table")
+        if vocab_table:
+            self._inner("hw_vocab", vocab_table.find("tbody"), "html",
+                        lambda w: "".join(f"<tr>{fb.render(row)}</tr>" for row in pd._homework_vocab_rows(
+                            w.n, w.homework.get("vocab_review", []))))
+        self._inner("hw_grammar", hw_page.find("div", style=lambda x: x and "display:flex; flex-direction:column; gap:5px;" in x),
+                    "html", _fill_grammar_clinic)
+        self._inner("hw_writing_task", hw_page.find("h3", string=re.compile(r"Writing Task")), "text",
+                    lambda w: f"3. Writing Task: {w.homework.get('writing_task', '')} (10 minutes)")
+        self._inner("hw_answer_key", hw_page.find("div", style=lambda x: x and "transform:rotate(180deg)" in x),
+                    "text", lambda w: w.homework.get("answer_key", ""))
+
+    def _compile_page_numbers(self, soup):
+        content_index = 0
+        for page in soup.find_all("div", class_="page"):
+            if "cover-page" in page.get("class", []):
+                continue
+            content_index += 1
+            existing = page.find("div", class_="page-number", recursive=False)
+            if not existing:
+                existing = soup.new_tag("div", **{"class": "page-number"})
+                page.append(existing)
+            self._inner(f"page_number_{content_index}", existing, "text",
+                        lambda w, idx=content_index: str((w.n - 1) * pd.CONTENT_PAGES_PER_WEEK + idx))
+
+    # ---------- render ----------
+
+    @property
+    def slot_names(self) -> list[str]:
+        return list(self._order)
+
+    def render(self, week_number: int, week: dict) -> str:
+        """Fill every slot for one week; same output as parse_data.render_week()."""
+        w = _Week(week_number, week)
+        out = [self._chunks[0]]
+        for name, chunk in zip(self._order, self._chunks[1:]):
+            slot = self._slots[name]
+            value = slot.fill(w)
+            if value is None:
+                out.append(slot.default)
+            elif slot.kind == "text":
+                out.append(_text(value))
+            elif slot.kind == "attr":
+                out.append(_attr(value))
+            else:
+                out.append(value)
+            out.append(chunk)
+        return "".join(out)
+
+
+# ---------- fillers shared by several slots ----------
+
+def _rows(rows) -> str:
+    out = []
+    for tr_class, cells in rows:
+        open_tag = f'<tr class="{tr_class}">' if tr_class else "<tr>"
+        out.append(f"{open_tag}{fb.render(cells)}</tr>")
+    return "".join(out)
+
+
+def _fill_cover(w):
+    return ('<div class="cover-content">'
+            '<div class="cover-top-label">IELTS Speaking Course</div>'
+            f'<h1 class="cover-week">{_text(f"WEEK {w.n}")}</h1>'
+            f'<h2 class="cover-title-large">{_text(w.data.get("theme", "General"))}</h2>'
+            f'<div class="cover-subtitle">{_text(w.data.get("topic", "Discussion"))}</div>'
+            '</div><div class="cover-footer"></div>')
+
+
+def _fill_l1_objectives(w):
+    return fb.render(pd._objective_items(
+        w.l1t.get("learning_objectives", []), "Grammar:",
+        pd._objective_replacement("Grammar:", "Use narrative tenses or relevant grammar for", w.target_phrase)))
+
+
+def _fill_l2_objectives(w):
+    return fb.render(pd._objective_items(
+        w.l2t.get("learning_objectives", []), "Speaking:",
+        pd._objective_replacement("Speaking:", "Discuss abstract ideas about", w.target_phrase)))
+
+
+def _differentiation(lesson_data, band):
+    return lesson_data.get("differentiation", {}).get(band, {})
+
+
+def _fill_l1_band5(w):
+    return fb.render(pd._band5_box(pd._l1_starter(_differentiation(w.l1t, "band_5"), w.n, w.target_phrase)))
+
+
+def _fill_l1_band6(w):
+    return fb.render(pd._band6_box(_differentiation(w.l1t, "band_6").get("transitions", ""),
+                                   ["Ask specific questions about ", fb.markup(w.target_phrase), "."]))
+
+
+def _fill_l2_band5(w):
+    return fb.render(pd._band5_box(_differentiation(w.l2t, "band_5").get("starter", "")))
+
+
+def _fill_l2_band6(w):
+    return fb.render(pd._band6_box(_differentiation(w.l2t, "band_6").get("transitions", ""),
+                                   ["Challenge questions about ", fb.markup(w.target_phrase),
+                                    " (e.g., 'Is this always true?')."]))
+
+
+def _fill_model_answer(w):
+    new_content = pd._model_answer_html(w.q_soups["q1"])
+    return _fragment(new_content) if new_content is not None else None
+
+
+def _fill_map_prompt(w, q_key):
+    prompt_p = w.q_soups[q_key].find("p")
+    if not prompt_p:
+        return None
+    return _fragment(pd.format_bullet_text(prompt_p.decode_contents()))
+
+
+def _fill_grammar_clinic(w):
+    out = []
+    for i, item in enumerate(w.homework.get("grammar_clinic", [])):
+        error = item.get("error", "")
+        out.append(f'<div class="grammar-sent">{_text(f"{i+1}. {error}")}</div>')
+    return "".join(out)
+
+
+def _fill_peer_check(w, q_key):
+    peer_questions = w.peer.get("lesson_2_part_3", {}) if w.peer else {}
+    q_peer_data = peer_questions.get(q_key, {})
+    return fb.render(pd._peer_check_nodes(q_peer_data.get("band_5_peer_question", "Why?"),
+                                          q_peer_data.get("band_6_plus_peer_question", "Can you expand?")))
@@ -2,6 +2,8 @@
 import json
 import re
 
+import json_loader
+
 def get_pos(word, forms):
     word_lower = word.lower()
     forms_lower = forms.lower()
@@ -60,8 +62,11 @@ def get_pos(word, forms):
     return word
 
 def update_vocab():
-    with open('vocab_plan.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # Strict: this file is written back, so a damaged region the tolerant
+    # load_records skipped would be deleted for good.
+    data = json_loader.load_json('vocab_plan.json')
+    if data is None:
+        raise SystemExit("Error: vocab_plan.json not found.")
         
     for week in data:
         # L1
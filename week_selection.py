@@ -0,0 +1,83 @@
+"""The `--weeks` selector shared by the pipeline scripts.
+
+A one-week typo fix used to mean re-running every stage over all 40
+weeks. Each stage that works per week (parse_data.py, make_interactive.py,
+post_merge_draft_polished.py, batch_convert_pdf.py, upload_to_oss.py)
+accepts the same selector, and scripts/publish.py passes it through:
+
+    --weeks 17            one week
+    --weeks 17,20-22      a list of weeks and inclusive ranges
+
+Weeks outside the selection are not read, rewritten or uploaded, so their
+outputs (and mtimes) are left exactly as they were. Without --weeks every
+stage covers all 40 weeks, as before.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+from pathlib import Path
+
+ALL_WEEKS = range(1, 41)
+_WEEK_FILE_RE = re.compile(r"Week_(\d{2})\.html")
+
+
+def parse(spec: str) -> tuple[int, ...]:
+    """'17,20-22' -> (17, 20, 21, 22): sorted, de-duplicated.
+
+    Raises ValueError on a malformed item, a reversed range or a week
+    outside 1-40.
+    """
+    weeks = set()
+    for item in spec.split(","):
+        item = item.strip()
+        m = re.fullmatch(r"(\d+)(?:\s*-\s*(\d+))?", item)
+        if not m:
+            raise ValueError(f"bad week selector {item!r} (expected N or N-M)")
+        first = int(m.group(1))
+        last = int(m.group(2)) if m.group(2) else first
+        if first > last:
+            raise ValueError(f"bad week range {item!r} (start is after end)")
+        if first not in ALL_WEEKS or last not in ALL_WEEKS:
+            raise ValueError(f"week out of range in {item!r} "
+                             f"(weeks are {ALL_WEEKS.start}-{ALL_WEEKS.stop - 1})")
+        weeks.update(range(first, last + 1))
+    return tuple(sorted(weeks))
+
+
+def _argparse_type(spec: str) -> tuple[int, ...]:
+    try:
+        return parse(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def add_argument(ap: argparse.ArgumentParser) -> None:
+    """Adds the shared `--weeks` option (args.weeks is None when absent)."""
+    ap.add_argument("--weeks", type=_argparse_type, metavar="LIST",
+                    help="Only these weeks, e.g. 17 or 17,20-22 (default: all 40)")
+
+
+def to_spec(weeks) -> str:
+    """(17, 20, 21, 22) -> '17,20-22', for passing a selection on to a sub-command."""
+    parts = []
+    for week in sorted(set(weeks)):
+        if parts and parts[-1][1] == week - 1:
+            parts[-1][1] = week
+        else:
+            parts.append([week, week])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in parts)
+
+
+def week_of(path) -> int | None:
+    """Week number of a Week_NN.html path, or None for any other file."""
+    m = _WEEK_FILE_RE.fullmatch(Path(path).name)
+    return int(m.group(1)) if m else None
+
+
+def filter_paths(paths, weeks):
+    """The Week_NN.html paths whose week is selected (all of them when weeks is None)."""
+    if weeks is None:
+        return list(paths)
+    wanted = set(weeks)
+    return [p for p in paths if week_of(p) in wanted]
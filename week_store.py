@@ -0,0 +1,166 @@
+"""Week-indexed access to the course data files.
+
+parse_data.py used to re-read and re-parse the seven data files on every
+run, then find each week with a linear `next()` scan per file. WeekStore
+loads them once into dicts keyed by week number (first entry wins, like the
+old scans) and pickles the result to .cache/week_store.pickle. The snapshot
+records a SHA-256 of every source file, so editing any of them — or this
+module's SNAPSHOT_VERSION — invalidates it; otherwise a run starts from the
+snapshot without touching the JSON parser.
+
+Usage:
+  store = week_store.load()              # snapshot if fresh, else parse + save
+  store.curriculum[5]                    # O(1) per-week lookups
+  store.week_inputs(5)                   # everything one week's render needs
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+
+import json_loader
+
+SNAPSHOT_VERSION = 4
+SNAPSHOT_PATH = os.path.join('.cache', 'week_store.pickle')
+
+# attribute -> (file, how it's stored on disk)
+#   'array'        JSON array of {"week": N, ...} objects
+#   'concatenated' one or more such arrays glued together (json_loader.loads_records)
+#   'keyed'        JSON object keyed by the week number as a string
+DATA_FILES = {
+    'curriculum': ('master Curiculum.json', 'array'),
+    'vocab': ('vocab_plan.json', 'concatenated'),
+    'homework': ('homework_plan.json', 'concatenated'),
+    'ai': ('ai_dynamic_content.json', 'keyed'),
+    'peer': ('peer_check_questions.json', 'array'),
+    'phrase': ('noun_or_verb_phrases_for_weekly_topics.json', 'array'),
+    'teacher': ('teacher_dynamic_content.json', 'keyed'),
+}
+
+# What load_all_data() used to print when a file was missing.
+_MISSING_MESSAGES = {
+    'curriculum': "Error: master Curiculum.json not found.",
+    'vocab': "Error: vocab_plan.json not found.",
+    'homework': "Error: homework_plan.json not found.",
+    'peer': "Warning: peer_check_questions.json not found.",
+    'phrase': "Warning: noun_or_verb_phrases_for_weekly_topics.json not found.",
+    'teacher': "Warning: teacher_dynamic_content.json not found.",
+}
+
+
+def _index_by_week(items):
+    """{week: entry} for entries with an int week; the first entry for a week wins."""
+    out = {}
+    for item in items:
+        week = item.get('week') if isinstance(item, dict) else None
+        if isinstance(week, int) and week not in out:
+            out[week] = item
+    return out
+
+
+class WeekStore:
+    """All data files, each as a {week_number: entry} dict."""
+
+    def __init__(self, tables, warnings=()):
+        # json_loader recovery reports; kept so a snapshot load repeats them
+        self.warnings = list(warnings)
+        self.curriculum = tables['curriculum']
+        self.vocab = tables['vocab']
+        self.homework = tables['homework']
+        self.ai = tables['ai']
+        self.peer = tables['peer']
+        self.phrase = tables['phrase']
+        self.teacher = tables['teacher']
+
+    def weeks(self):
+        return sorted(self.curriculum)
+
+    def week_inputs(self, week_number):
+        """Everything one week's render needs, or None without a curriculum entry."""
+        week_curriculum = self.curriculum.get(week_number)
+        if not week_curriculum:
+            return None
+        return {
+            'curriculum': week_curriculum,
+            'vocab': self.vocab.get(week_number),
+            'homework': self.homework.get(week_number),
+            'teacher': self.teacher.get(week_number, {}),
+            'peer': self.peer.get(week_number),
+            'ai': self.ai.get(week_number, {}),  # Legacy/Fallback
+            'phrase': self.phrase.get(week_number),
+        }
+
+
+def _read_sources(base_dir):
+    """{attr: bytes or None} for every data file."""
+    raw = {}
+    for attr, (name, _) in DATA_FILES.items():
+        try:
+            with open(os.path.join(base_dir, name), 'rb') as f:
+                raw[attr] = f.read()
+        except FileNotFoundError:
+            raw[attr] = None
+    return raw
+
+
+def _fingerprint(raw):
+    return {attr: hashlib.sha256(data).hexdigest() if data is not None else None
+            for attr, data in raw.items()}
+
+
+def _parse(raw):
+    tables, warnings = {}, []
+    for attr, (name, layout) in DATA_FILES.items():
+        data = raw[attr]
+        if data is None:
+            if attr in _MISSING_MESSAGES:
+                warnings.append(_MISSING_MESSAGES[attr])
+            tables[attr] = {}
+            continue
+        if layout == 'keyed':
+            tables[attr] = {int(k): v for k, v in json_loader.loads(data).items() if k.isdigit()}
+        elif layout == 'concatenated':
+            tables[attr] = _index_by_week(json_loader.loads_records(data, name, report=warnings.append))
+        else:
+            tables[attr] = _index_by_week(json_loader.loads(data))
+    return WeekStore(tables, warnings)
+
+
+def load(base_dir='.', use_snapshot=True, verbose=True):
+    """Loads the data files, from the snapshot when none of them has changed.
+
+    A missing or stale snapshot is rebuilt from the JSON files and rewritten.
+    Missing-file and json_loader recovery warnings are printed (verbose) on
+    every load, snapshot or not.
+    use_snapshot=False always parses the JSON and leaves the snapshot alone.
+    """
+    raw = _read_sources(base_dir)
+    fingerprint = _fingerprint(raw)
+    snapshot_path = os.path.join(base_dir, SNAPSHOT_PATH)
+
+    if use_snapshot:
+        try:
+            with open(snapshot_path, 'rb') as f:
+                snapshot = pickle.load(f)
+            if snapshot.get('version') == SNAPSHOT_VERSION and snapshot.get('sources') == fingerprint:
+                store = snapshot['store']
+                if verbose:
+                    for message in store.warnings:
+                        print(message)
+                return store
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+            pass  # missing or unreadable snapshot → rebuild below
+
+    store = _parse(raw)
+    if verbose:
+        for message in store.warnings:
+            print(message)
+    if use_snapshot:
+        os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+        tmp = snapshot_path + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump({'version': SNAPSHOT_VERSION, 'sources': fingerprint, 'store': store},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, snapshot_path)
+    return store